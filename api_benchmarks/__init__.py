@@ -0,0 +1,9 @@
+"""API Micro-Benchmark Suite — measures per-request overheads of semant_demo API layers without external services."""
+
+import os
+import sys
+
+# semant_demo lives in semant_demo_backend/, make it importable when run from the repository root
+_BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "semant_demo_backend")
+if os.path.isdir(_BACKEND_DIR) and _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
@@ -0,0 +1,9 @@
+"""
+API Micro-Benchmark Suite — package entry point.
+Allows: python -m api_benchmarks
+"""
+
+from .run_all import run
+
+if __name__ == "__main__":
+    run()
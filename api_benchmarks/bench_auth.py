@@ -0,0 +1,60 @@
+"""
+Overhead of the authentication dependency with and without the verified-token user cache.
+
+Mirrors what ``current_active_user`` does per request: open a session,
+build the user manager and read the bearer token with the JWT strategy.
+Uses a temporary SQLite database with one registered user.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import semant_demo.routes  # noqa: F401  (same import order as the app, users.auth is imported by the routers)
+from semant_demo.schemas import TasksBase
+from semant_demo.users.auth import CachedJWTStrategy
+from semant_demo.users.manager import UserManager
+from semant_demo.users.models import User
+from semant_demo.users.user_cache import auth_user_cache
+
+from .stats import summarize, time_async
+
+SECRET = "benchmark-secret-long-enough-for-hmac-sha256"
+
+
+async def run_auth_benchmarks(repeats: int) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(TasksBase.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with session_maker() as session:
+            user = User(email="bench@example.com", hashed_password="x", is_active=True,
+                        is_superuser=False, is_verified=True, username="bench")
+            session.add(user)
+            await session.commit()
+
+        plain = JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+        cached = CachedJWTStrategy(secret=SECRET, lifetime_seconds=3600)
+        token = await plain.write_token(user)
+
+        def authenticate(strategy: JWTStrategy):
+            async def run():
+                async with session_maker() as session:
+                    manager = UserManager(SQLAlchemyUserDatabase(session, User))
+                    assert await strategy.read_token(token, manager) is not None
+            return run
+
+        auth_user_cache.clear()
+        results = [
+            {"operation": "auth dependency (no cache)", **summarize(await time_async(authenticate(plain), repeats))},
+            {"operation": "auth dependency (user cache)", **summarize(await time_async(authenticate(cached), repeats))},
+        ]
+        await engine.dispose()
+    return results
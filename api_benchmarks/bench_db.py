@@ -0,0 +1,99 @@
+"""
+Write contention on the SQLite task database: the previous engine setup
+(rollback journal, ``synchronous=FULL``, pool 20 + 60) vs ``create_db_engine``
+(WAL, ``synchronous=NORMAL``, busy timeout, pool 5 + 5).
+
+Concurrent writers update task progress the way tagging does
+(``update_task_status``: one UPDATE and commit per call) while readers
+list tasks sorted by ``time_updated``, as the task list route does.
+Each setup uses a fresh temporary database created by the migrations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import asc, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+import semant_demo.routes  # noqa: F401  (same import order as the app)
+from semant_demo.database import create_db_engine
+from semant_demo.migrations import migrate
+from semant_demo.schemas import Task
+from semant_demo.tagging.sql_utils import update_task_status
+
+from .stats import summarize
+
+WRITERS = 8
+READERS = 8
+TASKS = 50
+
+
+async def _contention(engine: AsyncEngine, operations: int) -> dict:
+    await migrate(engine)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    task_ids = [str(uuid.uuid4()) for _ in range(TASKS)]
+    async with session_maker() as session:
+        session.add_all(Task(taskId=task_id, status="RUNNING", task_name="bench") for task_id in task_ids)
+        await session.commit()
+
+    write_samples, read_samples, errors = [], [], 0
+
+    async def writer(worker: int):
+        nonlocal errors
+        for i in range(operations):
+            t0 = time.perf_counter()
+            try:
+                async with session_maker() as session:
+                    await update_task_status(task_ids[(worker + i) % TASKS], "RUNNING", processed_count=i,
+                                             session=session)
+            except Exception:
+                errors += 1
+            write_samples.append(time.perf_counter() - t0)
+
+    async def reader():
+        nonlocal errors
+        for _ in range(operations):
+            t0 = time.perf_counter()
+            try:
+                async with session_maker() as session:
+                    (await session.execute(select(Task).order_by(asc(Task.time_updated)))).scalars().all()
+            except Exception:
+                errors += 1
+            read_samples.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(WRITERS)), *(reader() for _ in range(READERS)))
+    elapsed = time.perf_counter() - t0
+    writes, reads = summarize(write_samples), summarize(read_samples)
+    return {
+        "ops_per_s": round((len(write_samples) + len(read_samples)) / elapsed),
+        "write_p50_us": writes["p50_us"],
+        "write_p99_us": writes["p99_us"],
+        "read_p50_us": reads["p50_us"],
+        "read_p99_us": reads["p99_us"],
+        "errors": errors,
+    }
+
+
+async def run_db_benchmarks(repeats: int) -> list[dict]:
+    operations = max(20, repeats // 40)
+    setups = {
+        "sqlite rollback journal (previous)":
+            lambda url: create_async_engine(url, pool_size=20, max_overflow=60),
+        "sqlite WAL (create_db_engine)":
+            lambda url: create_db_engine(url, sqlite_wal=True),
+    }
+    results = []
+    for name, make_engine in setups.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+            try:
+                results.append({"operation": name, **await _contention(engine, operations)})
+            finally:
+                await engine.dispose()
+    return results
@@ -0,0 +1,137 @@
+"""
+Serialisation and compression of large API responses.
+
+Representative payloads are built from the real response schemas:
+  - ``search``     — ``SearchResponse`` with 200 results and full document metadata
+  - ``document``   — ``DocumentDetail`` of a whole book (2000 chunks with text)
+  - ``spans``      — 5000 ``TagSpan`` (``/api/tag_spans``)
+  - ``collection`` — ``GetCollectionChunksResponse`` with 2000 chunks
+
+Each payload is encoded by the path FastAPI takes for a ``response_model``
+(validation + encoding, both the JSON bytes path of recent versions and the
+dict + ``json.dumps`` path of older ones), by orjson over ``model_dump()``
+of every model and by ``FastJSONResponse``. The fast body is then
+compressed by gzip (levels 1 and 5) and brotli (when installed); the
+compressed size is reported in ``bytes``.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import uuid
+from datetime import datetime
+
+import orjson
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from semant_demo import schemas
+from semant_demo.utils.fast_response import FastJSONResponse, brotli, compress
+
+from .stats import summarize, time_async
+
+WORDS = "město kniha dějiny obec kostel škola rok válka pan kníže hrad řeka lidé práce země".split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _document(rng: random.Random) -> schemas.Document:
+    return schemas.Document(
+        id=uuid.UUID(int=rng.getrandbits(128)), library="mzk", title=_text(rng, 8), subtitle=_text(rng, 5),
+        yearIssued=rng.randrange(1800, 1950), dateIssued=datetime(rng.randrange(1800, 1950), 1, 1),
+        author=_text(rng, 2), publisher=_text(rng, 3), language="cze", description=_text(rng, 60),
+        documentType="BOOK", keywords=[_text(rng, 1) for _ in range(5)], genre="history", placeTerm="Brno",
+    )
+
+
+def _chunk_fields(rng: random.Random, order: int, document_id: uuid.UUID) -> dict:
+    return dict(
+        id=uuid.UUID(int=rng.getrandbits(128)), text=_text(rng, 250), start_page_id=uuid.uuid4(),
+        from_page=order, to_page=order + 1, document=document_id, title=_text(rng, 4), language="cze",
+        order=order, ner_P=[_text(rng, 2) for _ in range(3)], ner_G=[_text(rng, 1) for _ in range(2)],
+    )
+
+
+def build_payloads() -> dict[str, tuple[type, object, bool]]:
+    """name -> (response model, content, exclude_none)"""
+    rng = random.Random(41)
+    search_results = []
+    for order in range(200):
+        document = _document(rng)
+        search_results.append(schemas.TextChunkWithDocument(
+            **_chunk_fields(rng, order, document.id), query_title=_text(rng, 6),
+            query_summary=_text(rng, 40), document_object=document))
+    search = schemas.SearchResponse(
+        results=search_results, search_request=schemas.SearchRequest(query="dějiny města", tag_uuids=[],
+                                                                     positive=False, automatic=False),
+        time_spent=0.5, search_log=[], tags_result=[])
+
+    book = _document(rng)
+    document = schemas.DocumentDetail(document=book, chunks=[
+        schemas.DocumentDetailTextChunkWithUserCollectionInfo(**_chunk_fields(rng, order, book.id),
+                                                              in_user_collection=order % 7 == 0)
+        for order in range(2000)
+    ])
+
+    spans = [
+        schemas.TagSpan(id=str(uuid.uuid4()), chunkId=str(uuid.uuid4()), tagId=str(uuid.uuid4()),
+                        start=i, end=i + 12, type=schemas.SpanType.auto, reason=_text(rng, 12), confidence=0.8)
+        for i in range(5000)
+    ]
+
+    collection = schemas.GetCollectionChunksResponse(chunks_of_collection=[
+        schemas.CollectionChunks(text_chunk=_text(rng, 250), chunk_id=str(uuid.uuid4())) for _ in range(2000)
+    ])
+
+    return {
+        "search": (schemas.SearchResponse, search, False),
+        "document": (schemas.DocumentDetail, document, True),
+        "spans": (list[schemas.TagSpan], spans, False),
+        "collection": (schemas.GetCollectionChunksResponse, collection, False),
+    }
+
+
+async def run_serialization_benchmarks(repeats: int) -> list[dict]:
+    # payloads are large, each iteration takes milliseconds instead of microseconds
+    repeats = max(10, repeats // 40)
+    results = []
+    for name, (model, content, exclude_none) in build_payloads().items():
+        field = create_model_field(name=f"Response_{name}", type_=model, mode="serialization")
+
+        async def fastapi_bytes():
+            return await serialize_response(field=field, response_content=content,
+                                            exclude_none=exclude_none, dump_json=True)
+
+        async def fastapi_dict():
+            data = await serialize_response(field=field, response_content=content, exclude_none=exclude_none)
+            return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        async def fast():
+            return FastJSONResponse(content, exclude_none=exclude_none).body
+
+        def dump(obj):
+            return obj.model_dump(exclude_none=exclude_none)
+
+        async def orjson_dump():
+            return orjson.dumps(content if isinstance(content, list) else dump(content), default=dump)
+
+        paths = {"fastapi (json bytes)": fastapi_bytes, "fastapi (dict + json)": fastapi_dict,
+                 "orjson": orjson_dump, "FastJSONResponse": fast}
+
+        for path, fn in paths.items():
+            body = await fn()
+            results.append({"operation": f"{name}: {path}", **summarize(await time_async(fn, repeats)),
+                            "bytes": len(body)})
+
+        body = await fast()
+        codings = [("gzip", 1), ("gzip", 5)] + ([("br", 4)] if brotli is not None else [])
+        for encoding, level in codings:
+            async def run_compress(encoding=encoding, level=level):
+                return compress(body, encoding, gzip_level=level, brotli_quality=level)
+            results.append({"operation": f"{name}: {encoding}-{level}",
+                            **summarize(await time_async(run_compress, repeats)),
+                            "bytes": len(await run_compress())})
+    return results
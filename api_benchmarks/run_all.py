@@ -0,0 +1,58 @@
+"""
+Main entry point — run the API micro-benchmarks and print a summary.
+
+Usage:
+    python -m api_benchmarks                  # run everything
+    python -m api_benchmarks --only auth      # run one benchmark group
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+
+from .bench_auth import run_auth_benchmarks
+from .bench_db import run_db_benchmarks
+from .bench_serialization import run_serialization_benchmarks
+
+BENCHMARKS = {
+    "auth": run_auth_benchmarks,
+    "serialization": run_serialization_benchmarks,
+    "db": run_db_benchmarks,
+}
+
+RESULTS_PATH = os.getenv("BENCH_API_RESULTS", os.path.join(os.path.dirname(__file__), "results.json"))
+
+
+def _print_summary(results: list[dict]):
+    print(f"\n{'='*80}")
+    print("  API MICRO-BENCHMARKS")
+    print(f"{'='*80}")
+    keys = list(dict.fromkeys(k for r in results for k in r if k != "operation"))
+    print(f"{'Operation':<40} " + " ".join(f"{k:>12}" for k in keys))
+    for r in results:
+        print(f"{r['operation']:<40} " + " ".join(f"{str(r.get(k, '-')):>12}" for k in keys))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="API Micro-Benchmark Suite")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append", help="Run only this group (repeatable)")
+    parser.add_argument("--repeats", type=int, default=2000, help="Measured iterations per operation")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        results += await BENCHMARKS[name](args.repeats)
+    _print_summary(results)
+    with open(RESULTS_PATH, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def run():
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,31 @@
+"""
+Timing helpers shared by the micro-benchmarks.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from typing import Awaitable, Callable
+
+
+def summarize(samples: list[float]) -> dict:
+    """Latency summary of samples in seconds, reported in microseconds."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 2),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 2),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6, 2),
+    }
+
+
+async def time_async(fn: Callable[[], Awaitable], repeats: int, warmup: int = 10) -> list[float]:
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
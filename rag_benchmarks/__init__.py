@@ -0,0 +1,9 @@
+"""RAG Pipeline Benchmark Suite — runs semant_demo RAG classes against a deterministic fake LLM."""
+
+import os
+import sys
+
+# semant_demo lives in semant_demo_backend/, make it importable when run from the repository root
+_BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "semant_demo_backend")
+if os.path.isdir(_BACKEND_DIR) and _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
@@ -0,0 +1,9 @@
+"""
+RAG Benchmark Suite — package entry point.
+Allows: python -m rag_benchmarks
+"""
+
+from .run_all import run
+
+if __name__ == "__main__":
+    run()
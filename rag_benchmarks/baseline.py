@@ -0,0 +1,80 @@
+"""
+Stored baseline and regression detection.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+
+from . import config as cfg
+
+log = logging.getLogger("rag_bench")
+
+# Latency differences below this (ms) are noise (scheduler jitter), never reported as a regression
+MIN_LATENCY_DELTA_MS = 10.0
+
+
+def _settings() -> dict:
+    return {
+        "fake_llm_latency": cfg.FAKE_LLM_LATENCY,
+        "fake_search_latency": cfg.FAKE_SEARCH_LATENCY,
+        "fake_embedding_latency": cfg.FAKE_EMBEDDING_LATENCY,
+    }
+
+
+def load_baseline(path: str = cfg.BASELINE_PATH) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: list[dict], searcher: str, path: str = cfg.BASELINE_PATH):
+    data = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "searcher": searcher,
+        "settings": _settings(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    log.info(f"Baseline saved to {path}")
+
+
+def compare_with_baseline(results: list[dict], baseline: dict, tolerance: float = cfg.REGRESSION_TOLERANCE,
+                          latency_tolerance: float = cfg.LATENCY_REGRESSION_TOLERANCE,
+                          metrics: list[str] = cfg.REGRESSION_METRICS) -> list[dict]:
+    """
+    Finds metrics that got worse than the baseline by more than ``tolerance`` (relative),
+    ``latency_tolerance`` is used for latency metrics.
+
+    :return: list of regressions (variant, metric, baseline, current, change)
+    """
+    if baseline.get("settings") != _settings():
+        log.warning("Baseline was recorded with different fake latencies, latency comparison is not meaningful.")
+
+    baseline_by_variant = {r["variant"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = baseline_by_variant.get(result["variant"])
+        if base is None:
+            log.info(f"{result['variant']}: not in baseline.")
+            continue
+        for metric in metrics:
+            old, new = base.get(metric), result.get(metric)
+            is_latency = metric.endswith("_ms")
+            if old is None or new is None or new <= old * (1 + (latency_tolerance if is_latency else tolerance)):
+                continue
+            if is_latency and new - old < MIN_LATENCY_DELTA_MS:
+                continue
+            regressions.append({
+                "variant": result["variant"],
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": (new - old) / old if old else float("inf"),
+            })
+    return regressions
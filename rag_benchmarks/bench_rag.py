@@ -0,0 +1,180 @@
+"""
+RAG pipeline benchmarks — every RAG configuration replays the question set against the fake LLM.
+
+Reported per variant:
+- p50 / p95 / mean latency of a whole ``rag_request``
+- LLM calls, prompt tokens, search calls and embedding calls per question
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from semant_demo.config import Config
+from semant_demo.rag.rag_factory import RAG_CLASS_MODULES, rag_load_single_config
+from semant_demo.schemas import RagRequest, RagSearch
+
+from . import config as cfg
+from .fake_llm import FakeChatModel, FakeLLMScript, FakeOpenAIClient, LLMCallStats, install_fake_llm
+from .stub_searcher import SearchStats, StubSearcher, fake_embeddings
+
+log = logging.getLogger("rag_bench")
+
+
+@dataclass
+class Variant:
+    id: str
+    class_name: str
+    rag: object
+
+
+@dataclass
+class VariantResult:
+    variant: str
+    class_name: str
+    requests: int = 0
+    errors: int = 0
+    p50: float = 0.0
+    p95: float = 0.0
+    mean: float = 0.0
+    llm_calls: float = 0.0
+    prompt_tokens: float = 0.0
+    search_calls: float = 0.0
+    embedding_calls: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "variant": self.variant,
+            "class_name": self.class_name,
+            "requests": self.requests,
+            "errors": self.errors,
+            "p50_ms": round(self.p50 * 1000, 3),
+            "p95_ms": round(self.p95 * 1000, 3),
+            "mean_ms": round(self.mean * 1000, 3),
+            "llm_calls": round(self.llm_calls, 3),
+            "prompt_tokens": round(self.prompt_tokens, 1),
+            "search_calls": round(self.search_calls, 3),
+            "embedding_calls": round(self.embedding_calls, 3),
+        }
+
+
+def load_questions(path: str = cfg.QUESTIONS_PATH) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["questions"]
+
+
+def load_variants(configs_path: str = cfg.RAG_CONFIGS_PATH, only: list[str] | None = None) -> list[Variant]:
+    """Instantiates every RAG configuration whose class is registered in rag_factory."""
+    global_config = Config()
+    # model clients are replaced by the fake, they only must be constructible
+    global_config.OPENAI_API_KEY = global_config.OPENAI_API_KEY or "bench-fake-key"
+    global_config.GOOGLE_API_KEY = global_config.GOOGLE_API_KEY or "bench-fake-key"
+    # web search fallback must not reach the network
+    global_config.WEB_SEARCH_PROVIDER = "static"
+
+    variants = []
+    for filename in sorted(os.listdir(configs_path)):
+        if not filename.endswith(".yaml"):
+            continue
+        loaded = rag_load_single_config(global_config, os.path.join(configs_path, filename))
+        if loaded is None:
+            log.warning(f"Skipping {filename}: configuration could not be loaded.")
+            continue
+        rag_id, _, instance = loaded
+        if only and rag_id not in only:
+            continue
+        variants.append(Variant(id=rag_id, class_name=type(instance).__name__, rag=instance))
+
+    benchmarked = {v.class_name for v in variants}
+    for class_name in RAG_CLASS_MODULES:
+        if class_name not in benchmarked:
+            log.info(f"RAG class {class_name} has no benchmarked configuration.")
+    return variants
+
+
+@contextlib.asynccontextmanager
+async def open_searcher(kind: str, questions: list[dict], search_stats: SearchStats):
+    if kind == "stub":
+        searcher = StubSearcher(questions)
+        searcher.stats = search_stats
+        searcher.textChunk.stats = search_stats
+        with fake_embeddings(search_stats):
+            yield searcher
+    elif kind == "weaviate":
+        from semant_demo.config import config as semant_config
+        from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
+
+        searcher = await WeaviateAbstraction.create(semant_config)
+        search = searcher.textChunk.search
+
+        async def counted_search(*args, **kwargs):
+            search_stats.search_calls += 1
+            return await search(*args, **kwargs)
+
+        searcher.textChunk.search = counted_search
+        try:
+            yield searcher
+        finally:
+            await searcher.close()
+    else:
+        raise ValueError(f"Unknown searcher: {kind}")
+
+
+async def run_variant(variant: Variant, questions: list[dict], searcher, llm_stats: LLMCallStats,
+                      search_stats: SearchStats, repeats: int) -> VariantResult:
+    latencies = []
+    result = VariantResult(variant=variant.id, class_name=variant.class_name)
+    llm_stats.reset()
+    search_stats.reset()
+
+    for _ in range(repeats):
+        for question in questions:
+            request = RagRequest(question=question["question"], rag_search=RagSearch(), history=[])
+            t0 = time.perf_counter()
+            try:
+                await variant.rag.rag_request(request, searcher)
+            except Exception as e:
+                result.errors += 1
+                log.warning(f"{variant.id}: request failed: {e}")
+            latencies.append(time.perf_counter() - t0)
+
+    result.requests = len(latencies)
+    if latencies:
+        arr = np.array(latencies)
+        result.p50 = float(np.percentile(arr, 50))
+        result.p95 = float(np.percentile(arr, 95))
+        result.mean = float(np.mean(arr))
+        result.llm_calls = llm_stats.calls / result.requests
+        result.prompt_tokens = llm_stats.prompt_tokens / result.requests
+        result.search_calls = search_stats.search_calls / result.requests
+        result.embedding_calls = search_stats.embedding_calls / result.requests
+    return result
+
+
+async def run_rag_benchmarks(configs_path: str = cfg.RAG_CONFIGS_PATH, questions_path: str = cfg.QUESTIONS_PATH,
+                             searcher_kind: str = cfg.SEARCHER, repeats: int = cfg.REPEATS,
+                             only: list[str] | None = None) -> list[dict]:
+    questions = load_questions(questions_path)
+    variants = load_variants(configs_path, only)
+    script = FakeLLMScript.load()
+    llm_stats = LLMCallStats()
+    search_stats = SearchStats()
+    chat_model = FakeChatModel(script=script, stats=llm_stats, latency=cfg.FAKE_LLM_LATENCY)
+    openai_client = FakeOpenAIClient(script, llm_stats, latency=cfg.FAKE_LLM_LATENCY)
+
+    results = []
+    async with open_searcher(searcher_kind, questions, search_stats) as searcher:
+        for variant in variants:
+            if install_fake_llm(variant.rag, chat_model, openai_client) == 0:
+                log.info(f"{variant.id}: no LLM client found, running as is.")
+            log.info(f"Benchmarking {variant.id} ({variant.class_name}) …")
+            result = await run_variant(variant, questions, searcher, llm_stats, search_stats, repeats)
+            results.append(result.to_dict())
+    return results
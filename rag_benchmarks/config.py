@@ -0,0 +1,48 @@
+"""
+Configuration for RAG pipeline benchmarks.
+All parameters can be overridden via environment variables.
+"""
+
+import os
+
+_HERE = os.path.dirname(__file__)
+
+# ── Pipeline variants ───────────────────────────────────────────────────────
+# Directory with RAG YAML configurations, every config is one benchmarked variant
+RAG_CONFIGS_PATH = os.getenv(
+    "BENCH_RAG_CONFIGS_PATH",
+    os.path.join(_HERE, "..", "semant_demo_backend", "semant_demo", "rag", "rag_configs", "configs"),
+)
+
+# ── Inputs ──────────────────────────────────────────────────────────────────
+# Question set replayed against every variant (also the stub searcher corpus)
+QUESTIONS_PATH = os.getenv("BENCH_QUESTIONS_PATH", os.path.join(_HERE, "questions.json"))
+
+# Scripted responses of the fake LLM (prompt substring -> response)
+FAKE_LLM_SCRIPT_PATH = os.getenv("BENCH_FAKE_LLM_SCRIPT", os.path.join(_HERE, "fake_llm_script.json"))
+
+# ── Simulated latencies (seconds) ───────────────────────────────────────────
+FAKE_LLM_LATENCY = float(os.getenv("BENCH_FAKE_LLM_LATENCY", 0.02))
+FAKE_SEARCH_LATENCY = float(os.getenv("BENCH_FAKE_SEARCH_LATENCY", 0.01))
+FAKE_EMBEDDING_LATENCY = float(os.getenv("BENCH_FAKE_EMBEDDING_LATENCY", 0.005))
+
+# ── Benchmark parameters ────────────────────────────────────────────────────
+# How many times the whole question set is replayed per variant
+REPEATS = int(os.getenv("BENCH_REPEATS", 3))
+
+# Searcher backend: "stub" (in-memory corpus) or "weaviate" (local instance from semant_demo config)
+SEARCHER = os.getenv("BENCH_SEARCHER", "stub")
+
+# ── Regression detection ────────────────────────────────────────────────────
+BASELINE_PATH = os.getenv("BENCH_RAG_BASELINE", os.path.join(_HERE, "baseline.json"))
+
+# Relative increase over the baseline that is reported as a regression
+# (call counts are deterministic, latencies with fake backends still jitter)
+REGRESSION_TOLERANCE = float(os.getenv("BENCH_REGRESSION_TOLERANCE", 0.2))
+LATENCY_REGRESSION_TOLERANCE = float(os.getenv("BENCH_LATENCY_REGRESSION_TOLERANCE", 0.5))
+
+# Metrics compared against the baseline (lower is better for all of them)
+REGRESSION_METRICS = ["p50_ms", "p95_ms", "llm_calls", "prompt_tokens", "search_calls"]
+
+# Output directory
+RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR", os.path.join(_HERE, "results"))
@@ -0,0 +1,199 @@
+"""
+Deterministic fake LLM used instead of Ollama / OpenAI.
+
+Responses are scripted: the first rule whose ``match`` substring occurs in the prompt wins.
+Every call sleeps for the configured latency and is recorded in :class:`LLMCallStats`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionMessage, ChatCompletionMessageFunctionToolCall
+from openai.types.chat.chat_completion import Choice
+from openai.types.chat.chat_completion_message_function_tool_call import Function
+
+from . import config as cfg
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for relative comparison."""
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+# ── Call accounting ─────────────────────────────────────────────────────────
+
+
+@dataclass
+class LLMCallStats:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def record(self, prompt: str, completion: str):
+        self.calls += 1
+        self.prompt_tokens += approx_tokens(prompt)
+        self.completion_tokens += approx_tokens(completion)
+
+    def reset(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+
+# ── Script ──────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class FakeLLMScript:
+    rules: list[dict[str, str]] = field(default_factory=list)
+    default: str = "Fake answer based on the context [doc 1]."
+
+    @classmethod
+    def load(cls, path: str = cfg.FAKE_LLM_SCRIPT_PATH) -> "FakeLLMScript":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(rules=data.get("rules", []), default=data.get("default", cls.default))
+
+    def respond(self, prompt: str) -> str:
+        for rule in self.rules:
+            if rule["match"] in prompt:
+                return rule["response"]
+        return self.default
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+# ── LangChain chat model (RagGenerator, IncrementalAdaptiveRagGenerator) ───
+
+
+class FakeChatModel(BaseChatModel):
+    script: FakeLLMScript
+    stats: LLMCallStats
+    latency: float = 0.0
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages: list[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(_message_text(m.content) for m in messages)
+        text = self.script.respond(prompt)
+        self.stats.record(prompt, text)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self._respond(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+# ── OpenAI client (xmartiAgentRag) ──────────────────────────────────────────
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeOpenAIClient"):
+        self.owner = owner
+
+    async def create(self, model: str, messages: list[dict], temperature: float | None = None,
+                     tools: list[dict] | None = None, **kwargs) -> ChatCompletion:
+        await asyncio.sleep(self.owner.latency)
+        prompt = "\n".join(_message_text(m.get("content")) for m in messages)
+
+        if tools:
+            message = self.owner.agent_turn(messages)
+        else:
+            message = ChatCompletionMessage(role="assistant", content=self.owner.script.respond(prompt))
+
+        self.owner.stats.record(prompt, message.content or "")
+        return ChatCompletion(
+            id=f"fake-{uuid.uuid4().hex}",
+            object="chat.completion",
+            created=0,
+            model=model,
+            choices=[Choice(index=0, finish_reason="stop", message=message)],
+        )
+
+
+class _FakeChat:
+    def __init__(self, owner: "FakeOpenAIClient"):
+        self.completions = _FakeCompletions(owner)
+
+
+class FakeOpenAIClient:
+    """
+    Minimal stand-in for ``AsyncOpenAI``. Tool-enabled calls follow a fixed agent policy:
+    search with the user question, synthesize the evidence, then answer with the synthesis.
+    """
+
+    def __init__(self, script: FakeLLMScript, stats: LLMCallStats, latency: float = 0.0):
+        self.script = script
+        self.stats = stats
+        self.latency = latency
+        self.chat = _FakeChat(self)
+
+    @staticmethod
+    def _tool_call(name: str, **arguments) -> ChatCompletionMessageFunctionToolCall:
+        return ChatCompletionMessageFunctionToolCall(
+            id=f"call_{uuid.uuid4().hex[:12]}",
+            type="function",
+            function=Function(name=name, arguments=json.dumps(arguments, ensure_ascii=False)),
+        )
+
+    def agent_turn(self, messages: list[dict]) -> ChatCompletionMessage:
+        question = next((m["content"] for m in messages if m["role"] == "user"), "")
+        tool_outputs = [m for m in messages if m["role"] == "tool"]
+
+        if not tool_outputs:
+            return ChatCompletionMessage(role="assistant", content=None,
+                                         tool_calls=[self._tool_call("weaviate_search", query=question)])
+        if len(tool_outputs) == 1:
+            return ChatCompletionMessage(role="assistant", content=None, tool_calls=[
+                self._tool_call("synthesize_evidence", question=question, retrieved_documents=tool_outputs[0]["content"])
+            ])
+        return ChatCompletionMessage(role="assistant", content=tool_outputs[-1]["content"])
+
+
+# ── Installation into RAG instances ─────────────────────────────────────────
+
+
+def install_fake_llm(rag, chat_model: FakeChatModel, openai_client: FakeOpenAIClient) -> int:
+    """
+    Replaces every LLM client held by a RAG instance with the fakes.
+
+    :param rag: RAG instance created by rag_factory
+    :param chat_model: replacement of LangChain models
+    :param openai_client: replacement of AsyncOpenAI clients
+    :return: number of replaced clients
+    """
+    replaced = 0
+    for name, value in list(vars(rag).items()):
+        if isinstance(value, BaseLanguageModel):
+            setattr(rag, name, chat_model)
+            replaced += 1
+        elif isinstance(value, AsyncOpenAI):
+            setattr(rag, name, openai_client)
+            replaced += 1
+        elif isinstance(getattr(value, "client", None), AsyncOpenAI):
+            value.client = openai_client
+            replaced += 1
+    return replaced
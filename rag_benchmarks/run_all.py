@@ -0,0 +1,101 @@
+"""
+Main entry point — benchmark all RAG configurations and compare with the stored baseline.
+
+Usage:
+    python -m rag_benchmarks                        # run and compare with baseline.json
+    python -m rag_benchmarks --update-baseline      # run and store results as the new baseline
+    python -m rag_benchmarks --variant <rag_id>     # benchmark only selected configurations
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from . import config as cfg
+from .baseline import compare_with_baseline, load_baseline, save_baseline
+from .bench_rag import run_rag_benchmarks
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger("rag_bench")
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+
+def _print_summary(results: list[dict]):
+    """Pretty-print a summary table to stdout."""
+    print(f"\n{'='*118}")
+    print("  RAG PIPELINE BENCHMARK")
+    print(f"{'='*118}")
+    header = (f"{'Variant':<70} {'P50':>8} {'P95':>8} {'LLM':>6} {'Tokens':>8} {'Search':>7} {'Embed':>6} {'Err':>4}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['variant'][:70]:<70} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['llm_calls']:>6.2f} "
+              f"{r['prompt_tokens']:>8.0f} {r['search_calls']:>7.2f} {r['embedding_calls']:>6.2f} {r['errors']:>4}")
+
+
+def _print_regressions(regressions: list[dict]):
+    print(f"\n{'!'*80}")
+    print(f"  {len(regressions)} REGRESSION(S) AGAINST BASELINE")
+    print(f"{'!'*80}")
+    for r in regressions:
+        print(f"{r['variant'][:50]:<50} {r['metric']:<14} {r['baseline']:>10} -> {r['current']:>10} ({r['change']:+.0%})")
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="RAG Pipeline Benchmark Suite")
+    parser.add_argument("--configs", default=cfg.RAG_CONFIGS_PATH, help="Directory with RAG YAML configurations")
+    parser.add_argument("--questions", default=cfg.QUESTIONS_PATH, help="Question set JSON")
+    parser.add_argument("--searcher", choices=["stub", "weaviate"], default=cfg.SEARCHER,
+                        help="Stub in-memory searcher or local Weaviate from semant_demo config")
+    parser.add_argument("--repeats", type=int, default=cfg.REPEATS, help="Replays of the question set per variant")
+    parser.add_argument("--variant", action="append", help="Benchmark only this RAG configuration id (repeatable)")
+    parser.add_argument("--baseline", default=cfg.BASELINE_PATH, help="Baseline JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=cfg.REGRESSION_TOLERANCE,
+                        help="Relative increase of call/token counts reported as a regression")
+    parser.add_argument("--latency-tolerance", type=float, default=cfg.LATENCY_REGRESSION_TOLERANCE,
+                        help="Relative increase of p50/p95 latency reported as a regression")
+    args = parser.parse_args()
+
+    t_start = time.perf_counter()
+    results = await run_rag_benchmarks(args.configs, args.questions, args.searcher, args.repeats, args.variant)
+    log.info(f"All benchmarks completed in {time.perf_counter() - t_start:.1f}s")
+    _print_summary(results)
+
+    os.makedirs(cfg.RESULTS_DIR, exist_ok=True)
+    results_path = os.path.join(cfg.RESULTS_DIR, "rag_benchmarks.json")
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    log.info(f"Results saved to {results_path}")
+
+    if args.update_baseline:
+        save_baseline(results, args.searcher, args.baseline)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        log.warning(f"No baseline at {args.baseline}, run with --update-baseline to create it.")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance, args.latency_tolerance)
+    if regressions:
+        _print_regressions(regressions)
+        return 1
+    log.info("No regressions against baseline.")
+    return 0
+
+
+def run():
+    sys.exit(asyncio.run(main()))
+
+
+if __name__ == "__main__":
+    run()
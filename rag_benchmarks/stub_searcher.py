@@ -0,0 +1,105 @@
+"""
+In-memory stand-in for ``WeaviateAbstraction`` with a deterministic corpus.
+
+Only ``textChunk.search`` is implemented — that is all the RAG pipelines use. Chunks are ranked
+by token overlap with the query, so the same query always returns the same chunks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import re
+import uuid
+from dataclasses import dataclass
+from unittest import mock
+
+from semant_demo import schemas
+
+from . import config as cfg
+
+_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "semant-demo/rag-benchmarks")
+
+
+def _tokens(text: str) -> set[str]:
+    return set(re.findall(r"\w+", text.casefold()))
+
+
+@dataclass
+class SearchStats:
+    search_calls: int = 0
+    embedding_calls: int = 0
+
+    def reset(self):
+        self.search_calls = 0
+        self.embedding_calls = 0
+
+
+class StubTextChunk:
+    def __init__(self, corpus: list[schemas.TextChunkWithDocument], stats: SearchStats, latency: float):
+        self.corpus = corpus
+        self.stats = stats
+        self.latency = latency
+        self._corpus_tokens = [_tokens(c.text) for c in corpus]
+
+    async def search(self, search_request: schemas.SearchRequest, query_vector: list[float] | None = None) -> schemas.SearchResponse:
+        await asyncio.sleep(self.latency)
+        self.stats.search_calls += 1
+
+        query_tokens = _tokens(search_request.query)
+        ranked = sorted(
+            range(len(self.corpus)),
+            key=lambda i: (-len(query_tokens & self._corpus_tokens[i]), i),
+        )
+        results = [self.corpus[i].model_copy() for i in ranked[:search_request.limit]]
+        return schemas.SearchResponse(
+            results=results,
+            search_request=search_request,
+            time_spent=self.latency,
+            search_log=[],
+            tags_result=[],
+        )
+
+
+class StubSearcher:
+    """Exposes the ``textChunk`` attribute of ``WeaviateAbstraction``."""
+
+    def __init__(self, questions: list[dict], latency: float = cfg.FAKE_SEARCH_LATENCY):
+        self.stats = SearchStats()
+        self.textChunk = StubTextChunk(self._build_corpus(questions), self.stats, latency)
+
+    @staticmethod
+    def _build_corpus(questions: list[dict]) -> list[schemas.TextChunkWithDocument]:
+        corpus = []
+        for q_index, question in enumerate(questions):
+            doc_id = uuid.uuid5(_NAMESPACE, f"doc-{q_index}")
+            document = schemas.Document(id=doc_id, library="bench", title=f"Benchmark document {q_index}",
+                                        yearIssued=1850 + q_index)
+            for order, passage in enumerate(question.get("passages", [])):
+                chunk_id = uuid.uuid5(_NAMESPACE, f"chunk-{q_index}-{order}")
+                corpus.append(schemas.TextChunkWithDocument(
+                    id=chunk_id,
+                    title=document.title,
+                    start_page_id=doc_id,
+                    from_page=order,
+                    to_page=order,
+                    order=order,
+                    text=passage,
+                    document=doc_id,
+                    document_object=document,
+                ))
+        return corpus
+
+
+@contextlib.contextmanager
+def fake_embeddings(stats: SearchStats, latency: float = cfg.FAKE_EMBEDDING_LATENCY):
+    """Replaces calls of the embedding service made by the RAG retrieval path with a constant vector."""
+
+    async def embed(text: str) -> list[float]:
+        await asyncio.sleep(latency)
+        stats.embedding_calls += 1
+        return [0.0] * 8
+
+    with mock.patch("semant_demo.rag.retrieval_memo.get_query_embedding", embed), \
+            mock.patch("semant_demo.rag.retrieval_memo.get_hyde_document_embedding", embed):
+        yield
@@ -1,5 +1,14 @@
+import os
+
 from semant_demo.config import config
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("semant_demo.main:app", host="0.0.0.0", port=config.PORT, reload=True)
+    if config.WORKERS > 1:
+        # inherited by the worker processes: tagging jobs run in the one holding the job lock,
+        # embedding, search and LLM caches are shared through one SQLite file
+        os.environ["TAGGING_JOBS_QUEUED"] = "1"
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
+        uvicorn.run("semant_demo.main:app", host="0.0.0.0", port=config.PORT, workers=config.WORKERS)
+    else:
+        uvicorn.run("semant_demo.main:app", host="0.0.0.0", port=config.PORT, reload=True)
@@ -5,11 +5,18 @@ Builds a rich system prompt around a single :class:`TagSpan` (its tag
 definition + examples, host document metadata and the chunk text with a few
 hundred characters of surrounding context) and streams the assistant's reply
 from an OpenAI-compatible Chat Completions endpoint.
+
+The context block of a span does not change between turns of a chat, so it
+is cached per span (see :class:`SpanContextCache`) and rebuilt only when the
+span or its tag changes.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
+from time import monotonic
 from typing import Any
 from uuid import UUID
 
@@ -18,6 +25,7 @@ from weaviate.classes.query import Filter, QueryReference, Sort
 
 from semant_demo import schemas
 from semant_demo.config import config
+from semant_demo.metrics import register_cache
 from semant_demo.schema.ai_assistance import SpanChatMessage
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
 
@@ -230,35 +238,44 @@ async def build_context_message(
     Assemble the per-conversation context block (document metadata + tag info
     + span text in surrounding context) that's prepended as a system message.
     """
-    # Tag
-    tag = None
-    if span.tagId:
+    async def read_tag():
+        if not span.tagId:
+            return None
         try:
-            tag = await searcher.tag.read(UUID(span.tagId))
+            return await searcher.tag.read(UUID(span.tagId))
         except Exception as e:
             logger.warning("Failed to load tag %s: %s", span.tagId, e)
+            return None
 
-    # Chunk + document
-    chunk_props, document_id = await _fetch_chunk_with_doc(searcher, span.chunkId)
-    first_chunk_text: str = (chunk_props or {}).get("text") or ""
-    chunk_order: int | None = (chunk_props or {}).get("order")
-
-    document = None
-    if document_id:
+    async def read_document(document_id: str | None):
+        if not document_id:
+            return None
         try:
-            document = await searcher.document.read(document_id)
+            return await searcher.document.read(document_id)
         except Exception as e:
             logger.warning("Failed to load document %s: %s", document_id, e)
+            return None
+
+    # Tag and chunk are independent reads
+    tag, (chunk_props, document_id) = await asyncio.gather(
+        read_tag(), _fetch_chunk_with_doc(searcher, span.chunkId)
+    )
+    first_chunk_text: str = (chunk_props or {}).get("text") or ""
+    chunk_order: int | None = (chunk_props or {}).get("order")
 
     # Cross-chunk spans are stored as ``chunkId = first chunk`` with ``end``
     # measured across the concatenation of consecutive chunks. Build that
-    # concatenation (only fetching extra chunks when actually needed).
-    assembled_text, consumed_orders = await _assemble_chunks_covering_span(
-        searcher,
-        document_id=document_id,
-        first_chunk_text=first_chunk_text,
-        first_chunk_order=chunk_order,
-        span_end=span.end,
+    # concatenation (only fetching extra chunks when actually needed) while
+    # the document metadata loads.
+    document, (assembled_text, consumed_orders) = await asyncio.gather(
+        read_document(document_id),
+        _assemble_chunks_covering_span(
+            searcher,
+            document_id=document_id,
+            first_chunk_text=first_chunk_text,
+            first_chunk_order=chunk_order,
+            span_end=span.end,
+        ),
     )
 
     # Span text (defensive bounds — fall back to whatever we managed to fetch)
@@ -328,6 +345,104 @@ async def build_context_message(
     return "\n".join(parts)
 
 
+class SpanContextCache:
+    """
+    Built context blocks keyed by span id.
+
+    An entry is valid only for the span version it was built for (chunk, tag
+    and offsets of the span), so a moved / re-tagged span is rebuilt on its
+    next turn even without explicit invalidation. Routes that modify spans or
+    tags additionally call :meth:`invalidate_span` / :meth:`invalidate_tag`
+    (tag definition and examples are part of the context). Concurrent turns
+    about the same span share one build.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 1800.0):
+        """
+        :param max_size: max number of cached spans (least recently used are evicted)
+        :param ttl: seconds an entry is valid, bounds staleness of document metadata and chunk text
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, tuple, str]] = OrderedDict()
+        self._in_flight: dict[tuple[str, tuple], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def span_version(span: schemas.TagSpan) -> tuple:
+        return span.chunkId, span.tagId, span.start, span.end
+
+    def get(self, span: schemas.TagSpan) -> str | None:
+        entry = self._entries.get(span.id)
+        if entry is None:
+            return None
+        expires_at, version, context = entry
+        if expires_at < monotonic() or version != self.span_version(span):
+            del self._entries[span.id]
+            return None
+        self._entries.move_to_end(span.id)
+        return context
+
+    def put(self, span: schemas.TagSpan, context: str):
+        self._entries[span.id] = (monotonic() + self.ttl, self.span_version(span), context)
+        self._entries.move_to_end(span.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_span(self, span_id: str):
+        self._entries.pop(str(span_id), None)
+
+    def invalidate_tag(self, tag_id: str):
+        tag_id = str(tag_id)
+        for span_id in [k for k, (_, version, _) in self._entries.items() if version[1] == tag_id]:
+            del self._entries[span_id]
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_build(self, searcher: WeaviateAbstraction, span: schemas.TagSpan) -> str:
+        """
+        Cached context of the span, built by :func:`build_context_message` on a miss.
+        """
+        context = self.get(span)
+        if context is not None:
+            self.hits += 1
+            return context
+
+        key = (span.id, self.span_version(span))
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            context = await build_context_message(searcher, span=span)
+        except Exception as e:
+            future.set_exception(e)
+            # mark as retrieved, nobody may be waiting for it
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+        self.put(span, context)
+        future.set_result(context)
+        return context
+
+
+span_context_cache = SpanContextCache(
+    max_size=config.SPAN_CHAT_CONTEXT_CACHE_SIZE,
+    ttl=config.SPAN_CHAT_CONTEXT_CACHE_TTL,
+)
+register_cache("span_chat_context", span_context_cache)
+
+
 def _truncate_history(messages: list[SpanChatMessage]) -> list[SpanChatMessage]:
     limit = max(1, config.SPAN_CHAT_HISTORY_LIMIT)
     if len(messages) <= limit:
@@ -342,11 +457,16 @@ async def stream_span_discussion(
     *,
     span_id: str,
     messages: list[SpanChatMessage],
+    client: AsyncOpenAI | None,
 ) -> AsyncGenerator[str, None]:
     """
     Async generator yielding plain text deltas (no NDJSON wrapping — the
     route layer wraps each delta as it pleases).
 
+    ``client`` is the application wide client (see
+    ``routes.dependencies.get_span_chat_client``), ``None`` when no API key
+    is configured.
+
     Raises :class:`ValueError` if the span / required context cannot be
     resolved up-front so the route can return a 4xx instead of an opaque
     streaming error.
@@ -360,7 +480,7 @@ async def stream_span_discussion(
     if span is None:
         raise ValueError(f"span {span_id} not found")
 
-    context_block = await build_context_message(searcher, span=span)
+    context_block = await span_context_cache.get_or_build(searcher, span)
 
     # The Responses API takes a single ``instructions`` blob for the
     # system-level behaviour and a list of conversation turns in ``input``.
@@ -372,16 +492,11 @@ async def stream_span_discussion(
         for m in _truncate_history(messages)
     ]
 
-    if not config.SPAN_CHAT_API_KEY:
+    if client is None:
         raise ValueError(
             "SPAN_CHAT_API_KEY (or OPENAI_API_KEY) is not configured on the server"
         )
 
-    client = AsyncOpenAI(
-        api_key=config.SPAN_CHAT_API_KEY,
-        base_url=config.SPAN_CHAT_API_URL,
-    )
-
     stream = await client.responses.create(
         model=config.SPAN_CHAT_MODEL,
         instructions=instructions,
@@ -0,0 +1,175 @@
+"""
+Write-behind persistence of AI span proposals.
+
+Proposals of many concurrently processed chunks are collected by a single
+:class:`BatchSpanWriter`, deduplicated against spans that already exist and
+written with one Weaviate batch insert per flush instead of one insert (plus
+reference writes) per proposal. Every caller waits only until the batch
+containing its spans is acknowledged, so results can be streamed per chunk
+as soon as they are durable.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from semant_demo import schemas
+from semant_demo.schema.spans import PostSpan
+from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
+
+logger = logging.getLogger(__name__)
+
+
+def span_key(chunk_id: str, tag_id: str, start: int, end: int) -> tuple[str, str, int, int]:
+    """Identity of a span for deduplication, regardless of its type."""
+    return str(chunk_id), str(tag_id), int(start), int(end)
+
+
+@dataclass
+class _PendingWrite:
+    spans: list[PostSpan]
+    done: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class BatchSpanWriter:
+    """
+    Collects spans from concurrent producers and persists them in batches.
+
+    Use as an async context manager; leaving the context flushes everything
+    that was submitted. A batch is written when ``max_batch_size`` spans are
+    pending or ``flush_interval`` seconds after the first pending submission,
+    whichever comes first.
+    """
+
+    def __init__(
+        self,
+        searcher: WeaviateAbstraction,
+        *,
+        existing: dict[str, list[schemas.TagSpan]] | None = None,
+        max_batch_size: int = 200,
+        flush_interval: float = 0.05,
+    ):
+        """
+        :param searcher: Weaviate abstraction
+        :param existing: spans already stored, keyed by chunk id (as returned by ``span.read_batch``)
+        :param max_batch_size: spans written by one batch insert at most
+        :param flush_interval: seconds to wait for more spans before a partial batch is written
+        """
+        self.searcher = searcher
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._known: set[tuple[str, str, int, int]] = {
+            span_key(s.chunkId, s.tagId, s.start, s.end)
+            for spans in (existing or {}).values() for s in spans
+        }
+        self._pending: list[_PendingWrite] = []
+        self._pending_count = 0
+        self._flush_task: asyncio.Task | None = None
+        self._writes: set[asyncio.Task] = set()
+        self.duplicates = 0
+        self.batches = 0
+
+    async def __aenter__(self) -> "BatchSpanWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.flush()
+        else:
+            self._cancel()
+
+    async def write(self, spans: list[PostSpan]) -> list[schemas.TagSpan]:
+        """
+        Queue spans for the next batch and wait until they are stored.
+
+        Spans equal to an existing or already queued span (same chunk, tag and
+        offsets) are skipped.
+
+        :return: created spans; spans rejected by Weaviate are left out
+        """
+        unique: list[PostSpan] = []
+        for span in spans:
+            key = span_key(span.chunkId, span.tagId, span.start, span.end)
+            if key in self._known:
+                self.duplicates += 1
+                continue
+            self._known.add(key)
+            unique.append(span)
+        if not unique:
+            return []
+
+        pending = _PendingWrite(unique)
+        self._pending.append(pending)
+        self._pending_count += len(unique)
+        if self._pending_count >= self.max_batch_size:
+            self._start_write()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+        # shielded, a cancelled producer must not fail spans of other producers in the same batch
+        return await asyncio.shield(pending.done)
+
+    async def flush(self):
+        """Write all pending spans and wait for all running batches."""
+        self._start_write()
+        while self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        self._start_write()
+
+    def _start_write(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_count = self._pending, [], 0
+        task = asyncio.create_task(self._write_batch(batch))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write_batch(self, batch: list[_PendingWrite]):
+        spans = [span for pending in batch for span in pending.spans]
+        try:
+            created = await self.searcher.span.create_many(spans)
+        except Exception as e:
+            logger.warning("Batch insert of %d auto spans failed: %s", len(spans), e)
+            self._fail(batch, e)
+            return
+        except BaseException:
+            self._fail(batch, None)
+            raise
+
+        self.batches += 1
+        offset = 0
+        for pending in batch:
+            result = created[offset:offset + len(pending.spans)]
+            offset += len(pending.spans)
+            if not pending.done.done():
+                pending.done.set_result([span for span in result if span is not None])
+
+    def _fail(self, batch: list[_PendingWrite], error: Exception | None):
+        for pending in batch:
+            # not stored, may be proposed again
+            for span in pending.spans:
+                self._known.discard(span_key(span.chunkId, span.tagId, span.start, span.end))
+            if pending.done.done():
+                continue
+            if error is None:
+                pending.done.cancel()
+            else:
+                pending.done.set_exception(error)
+                # mark as retrieved, the producer may have been cancelled meanwhile
+                pending.done.exception()
+
+    def _cancel(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        for pending in self._pending:
+            pending.done.cancel()
+        self._pending, self._pending_count = [], 0
@@ -6,17 +6,31 @@ Topicer (running by default at http://localhost:8089) exposes:
 - ``POST /v1/tags/propose/texts`` — propose tag spans for a single provided text chunk.
 - ``POST /v1/tags/propose/db/stream`` — propose tag spans for chunks stored in
   the database, streaming NDJSON results as each chunk completes.
+
+All callers share one pooled :class:`httpx.AsyncClient` (see
+:func:`topicer_client`), so connections to Topicer are reused across requests.
+Text proposals are cached by :data:`topicer_cache`.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
+import os
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
+from pathlib import Path
+from time import time
 from typing import Any, AsyncGenerator
 
 import httpx
 
+from semant_demo.circuit_breaker import CircuitOpenError, circuit_breaker
 from semant_demo.config import config
+from semant_demo.metrics import register_cache
 
 logger = logging.getLogger(__name__)
 
@@ -35,11 +49,193 @@ class TopicerError(RuntimeError):
     pass
 
 
+_client: httpx.AsyncClient | None = None
+
+# while Topicer is down, proposals fail fast with a TopicerError instead of waiting for TOPICER_TIMEOUT
+topicer_breaker = circuit_breaker("topicer")
+
+
 @asynccontextmanager
 async def topicer_client() -> AsyncGenerator[httpx.AsyncClient, None]:
-    timeout = httpx.Timeout(config.TOPICER_TIMEOUT, connect=10.0)
-    async with httpx.AsyncClient(base_url=config.TOPICER_URL, timeout=timeout) as client:
-        yield client
+    """
+    Yield the process wide Topicer client. The client outlives the context,
+    it is closed by :func:`close_topicer_client` on application shutdown.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        timeout = httpx.Timeout(config.TOPICER_TIMEOUT, connect=10.0)
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        _client = httpx.AsyncClient(base_url=config.TOPICER_URL, timeout=timeout, limits=limits)
+    yield _client
+
+
+async def close_topicer_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# namespaces of the values kept in topicer_cache, each caller stores its own shape
+PROPOSALS_NAMESPACE = "proposals"  # list of tag_span_proposals, propose_for_text_chunk
+PAYLOAD_NAMESPACE = "payload"  # whole Topicer response, /api/propose_tags
+
+
+def topicer_cache_key(chunk_text: str, tags: list[dict[str, Any]], config_name: str, namespace: str) -> str:
+    """
+    Cache key of a Topicer text proposal: hashes of the chunk text and of the
+    tag payload (order of tags does not matter) plus the Topicer config name,
+    prefixed by the ``namespace`` of the cached value shape.
+    """
+    text_hash = hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()
+    tags_json = json.dumps(
+        sorted(tags, key=lambda t: str(t.get("id"))), sort_keys=True, ensure_ascii=False
+    )
+    tags_hash = hashlib.sha256(tags_json.encode("utf-8")).hexdigest()
+    return f"{namespace}:{config_name}:{text_hash}:{tags_hash}"
+
+
+class TopicerResultCache:
+    """
+    Two tier cache of Topicer responses with a TTL: an in-memory LRU in front
+    of an optional on-disk tier (one JSON file per key), so proposals survive
+    restarts and are shared by workers using the same directory. Responses
+    are stored as returned by Topicer (JSON compatible objects).
+
+    :meth:`get_or_fetch` coalesces identical in-flight requests, so concurrent
+    callers asking for the same key wait for a single Topicer call.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 24 * 3600.0, disk_path: str | None = None):
+        """
+        :param max_size: max number of in-memory entries
+        :param ttl: seconds an entry is valid (in both tiers)
+        :param disk_path: directory of the on-disk tier, None or empty disables it
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.disk_path = Path(disk_path) if disk_path else None
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def _memory_get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _disk_file(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.disk_path / digest[:2] / f"{digest}.json"
+
+    def _disk_get(self, key: str) -> tuple[float, Any] | None:
+        file = self._disk_file(key)
+        try:
+            with open(file, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Unreadable Topicer cache file %s: %s", file, e)
+            return None
+        if entry.get("key") != key:
+            return None
+        if entry["expires_at"] < time():
+            file.unlink(missing_ok=True)
+            return None
+        return entry["expires_at"], entry["value"]
+
+    def _disk_put(self, key: str, value: Any, expires_at: float) -> None:
+        file = self._disk_file(key)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = file.with_name(f"{file.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "expires_at": expires_at, "value": value}, f, ensure_ascii=False)
+        # atomic, readers never see a partially written file
+        os.replace(tmp, file)
+
+    async def get(self, key: str) -> Any | None:
+        value = self._memory_get(key)
+        if value is not None or self.disk_path is None:
+            return value
+        entry = await asyncio.to_thread(self._disk_get, key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        self._memory_put(key, value, expires_at)
+        self.disk_hits += 1
+        return value
+
+    async def put(self, key: str, value: Any) -> None:
+        expires_at = time() + self.ttl
+        self._memory_put(key, value, expires_at)
+        if self.disk_path is not None:
+            try:
+                await asyncio.to_thread(self._disk_put, key, value, expires_at)
+            except OSError as e:
+                logger.warning("Failed to store Topicer response in %s: %s", self.disk_path, e)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Cached value of ``key``; on a miss ``fetch`` is called once and its
+        result is stored, also for callers that asked meanwhile. Failures are
+        not cached.
+        """
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await fetch()
+            await self.put(key, value)
+        except Exception as e:
+            future.set_exception(e)
+            # mark as retrieved, nobody may be waiting for it
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        """Clear the in-memory tier."""
+        self._entries.clear()
+
+
+topicer_cache = TopicerResultCache(
+    max_size=config.TOPICER_CACHE_SIZE,
+    ttl=config.TOPICER_CACHE_TTL,
+    disk_path=config.TOPICER_CACHE_DIR,
+)
+register_cache("topicer", topicer_cache)
 
 
 async def propose_for_text_chunk(
@@ -48,34 +244,50 @@ async def propose_for_text_chunk(
     chunk_id: str,
     chunk_text: str,
     tags: list[dict[str, Any]],
+    use_cache: bool = True,
 ) -> list[dict[str, Any]]:
     """
     Call ``POST /v1/tags/propose/texts`` for a single chunk + a list of tags.
 
+    Proposals do not depend on the chunk id, so they are cached by the chunk
+    text, the tag payload and the Topicer config name (``use_cache=False``
+    forces a new Topicer call).
+
     Returns the list of ``tag_span_proposals`` from Topicer's response.
     """
-    body = {
-        "text_chunk": {"id": str(chunk_id), "text": chunk_text},
-        "tags": [_tag_payload(t) for t in tags],
-    }
-    path = "/v1/tags/propose/texts"
-    full_url = f"{str(client.base_url).rstrip('/')}{path}?config_name={config.TOPICER_CONFIG_NAME}"
-    try:
-        resp = await client.post(
-            path,
-            params={"config_name": config.TOPICER_CONFIG_NAME},
-            json=body,
-        )
-        resp.raise_for_status()
-    except httpx.HTTPError as e:
-        logger.warning(
-            "Topicer POST %s failed for chunk %s: %s (%s)",
-            full_url, chunk_id, e, type(e).__name__,
-        )
-        raise TopicerError(str(e)) from e
+    tag_payloads = [_tag_payload(t) for t in tags]
+
+    async def fetch() -> list[dict[str, Any]]:
+        body = {
+            "text_chunk": {"id": str(chunk_id), "text": chunk_text},
+            "tags": tag_payloads,
+        }
+        path = "/v1/tags/propose/texts"
+        full_url = f"{str(client.base_url).rstrip('/')}{path}?config_name={config.TOPICER_CONFIG_NAME}"
+        try:
+            with topicer_breaker.guard():
+                resp = await client.post(
+                    path,
+                    params={"config_name": config.TOPICER_CONFIG_NAME},
+                    json=body,
+                )
+                resp.raise_for_status()
+        except CircuitOpenError as e:
+            raise TopicerError(str(e)) from e
+        except httpx.HTTPError as e:
+            logger.warning(
+                "Topicer POST %s failed for chunk %s: %s (%s)",
+                full_url, chunk_id, e, type(e).__name__,
+            )
+            raise TopicerError(str(e)) from e
 
-    data = resp.json()
-    return list(data.get("tag_span_proposals") or [])
+        data = resp.json()
+        return list(data.get("tag_span_proposals") or [])
+
+    if not use_cache:
+        return await fetch()
+    key = topicer_cache_key(chunk_text, tag_payloads, config.TOPICER_CONFIG_NAME, PROPOSALS_NAMESPACE)
+    return await topicer_cache.get_or_fetch(key, fetch)
 
 
 async def propose_for_db_stream(
@@ -101,20 +313,23 @@ async def propose_for_db_stream(
     path = "/v1/tags/propose/db/stream"
     full_url = f"{str(client.base_url).rstrip('/')}{path}?config_name={config.TOPICER_CONFIG_NAME}"
     try:
-        async with client.stream(
-            "POST",
-            path,
-            params={"config_name": config.TOPICER_CONFIG_NAME},
-            json=body,
-        ) as resp:
-            resp.raise_for_status()
-            async for line in resp.aiter_lines():
-                if not line or not line.strip():
-                    continue
-                try:
-                    yield json.loads(line)
-                except json.JSONDecodeError:
-                    logger.warning("Topicer stream produced non-JSON line: %r", line)
+        with topicer_breaker.guard():
+            async with client.stream(
+                "POST",
+                path,
+                params={"config_name": config.TOPICER_CONFIG_NAME},
+                json=body,
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line or not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning("Topicer stream produced non-JSON line: %r", line)
+    except CircuitOpenError as e:
+        raise TopicerError(str(e)) from e
     except httpx.HTTPError as e:
         logger.warning(
             "Topicer POST %s failed (tag=%s, doc=%s): %s (%s)",
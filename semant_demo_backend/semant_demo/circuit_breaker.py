@@ -0,0 +1,208 @@
+"""
+Circuit breakers of the downstream dependencies: the embedding service,
+Topicer and the LLM APIs (one breaker per Ollama node).
+
+Without them a dependency that is down makes every request wait for the
+full client timeout, piling up coroutines and sockets. A breaker tracks
+the outcome and latency of the calls of the last ``window`` seconds; when
+at least ``min_calls`` were made and the share of failed ones (errors and
+calls slower than ``slow_call_s``) reaches ``failure_rate``, the circuit
+opens and calls fail fast with :class:`CircuitOpenError`. After
+``open_seconds`` it is half-open: ``half_open_probes`` calls are let
+through, a successful probe closes the circuit, a failed one opens it again.
+
+Callers decide on the fallback: search drops to text (BM25) search when
+embeddings are unavailable, search results are not summarized while the
+LLM circuit is open.
+
+Breakers are shared by name, see :func:`circuit_breaker`. Their state is
+exported as the ``semant_circuit_state`` metric.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import httpx
+
+from semant_demo.config import config
+from semant_demo.metrics import CIRCUIT_REJECTED, CIRCUIT_STATE
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open), retry in {retry_after:.0f} s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_server_failure(e: BaseException) -> bool:
+    """Client errors (HTTP 4xx) say nothing about the health of the dependency, anything else does."""
+    status = getattr(e, "status_code", None)
+    if status is None and isinstance(getattr(e, "response", None), httpx.Response):
+        status = e.response.status_code
+    return not (isinstance(status, int) and 400 <= status < 500)
+
+
+class _Call:
+    __slots__ = ("failed",)
+
+    def __init__(self):
+        self.failed = False
+
+    def fail(self):
+        """Marks a call that returned an error instead of raising it as failed."""
+        self.failed = True
+
+
+class CircuitBreaker:
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 5, window: float = 30.0,
+                 open_seconds: float = 15.0, slow_call_s: float | None = None, half_open_probes: int = 1,
+                 is_failure: Callable[[BaseException], bool] = is_server_failure, enabled: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.slow_call_s = slow_call_s
+        self.half_open_probes = half_open_probes
+        self.is_failure = is_failure
+        self.enabled = enabled
+        self.clock = clock
+        # (finished at, failed, duration) of the calls in the window
+        self._calls: deque[tuple[float, bool, float]] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        CIRCUIT_STATE.labels(name).set(0)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """True when a call would be let through."""
+        if not self.enabled:
+            return True
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and self._probes < self.half_open_probes)
+
+    def stats(self) -> dict:
+        """Calls, failure rate and mean latency of the window."""
+        self._prune(self.clock())
+        calls = len(self._calls)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": sum(failed for _, failed, _ in self._calls) / calls if calls else 0.0,
+            "mean_latency_s": sum(duration for _, _, duration in self._calls) / calls if calls else 0.0,
+        }
+
+    @contextmanager
+    def guard(self) -> Iterator[_Call]:
+        """
+        Records the outcome of the enclosed call, raises :class:`CircuitOpenError` instead of entering it
+        while the circuit is open. Cancelled calls are not recorded.
+        """
+        if not self.enabled:
+            yield _Call()
+            return
+        probe = self._acquire()
+        call = _Call()
+        t0 = self.clock()
+        try:
+            yield call
+        except Exception as e:
+            self._record(probe, self.is_failure(e), self.clock() - t0)
+            raise
+        except BaseException:
+            if probe:
+                self._probes -= 1
+            raise
+        else:
+            duration = self.clock() - t0
+            slow = self.slow_call_s is not None and duration > self.slow_call_s
+            self._record(probe, call.failed or slow, duration)
+
+    def protect(self, func: Callable) -> Callable:
+        """Decorator guarding every call of the coroutine function ``func``."""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with self.guard():
+                return await func(*args, **kwargs)
+        return wrapper
+
+    def _acquire(self) -> bool:
+        """True for a half-open probe."""
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        CIRCUIT_REJECTED.labels(self.name).inc()
+        raise CircuitOpenError(self.name, max(0.0, self._opened_at + self.open_seconds - self.clock()))
+
+    def _record(self, probe: bool, failed: bool, duration: float):
+        now = self.clock()
+        if probe:
+            self._probes -= 1
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self._calls.clear()
+                    self._set_state(CLOSED)
+            return
+        self._calls.append((now, failed, duration))
+        self._prune(now)
+        if self._state == CLOSED and len(self._calls) >= self.min_calls:
+            failures = sum(failed for _, failed, _ in self._calls)
+            if failures / len(self._calls) >= self.failure_rate:
+                self._open(now)
+
+    def _open(self, now: float):
+        self._opened_at = now
+        self._set_state(OPEN)
+
+    def _prune(self, now: float):
+        while self._calls and self._calls[0][0] < now - self.window:
+            self._calls.popleft()
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logger.warning("Circuit of %s is %s", self.name, state.replace("_", "-"))
+        self._state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Breaker of the dependency ``name`` with the configured thresholds, created on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        options = dict(failure_rate=config.CIRCUIT_FAILURE_RATE, min_calls=config.CIRCUIT_MIN_CALLS,
+                       window=config.CIRCUIT_WINDOW, open_seconds=config.CIRCUIT_OPEN_SECONDS,
+                       enabled=config.CIRCUIT_BREAKERS_ENABLED)
+        options.update(kwargs)
+        breaker = _breakers[name] = CircuitBreaker(name, **options)
+    return breaker
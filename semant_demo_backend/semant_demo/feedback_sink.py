@@ -0,0 +1,213 @@
+"""
+Background delivery of feedback, off the request path.
+
+:class:`BatchWriter` is an in-memory queue drained by a single writer task,
+which hands everything queued so far to ``write_batch`` at once. Handlers
+only enqueue, so a slow disk, database or webhook never blocks the event
+loop or the response. The queue is bounded, when full new records are
+dropped with a warning instead of growing the memory without limit.
+
+  - :class:`JsonlBatchWriter` appends a batch to a JSON lines file in one
+    write from a worker thread, fsyncing at most every ``fsync_interval`` s.
+  - :class:`WebhookSender` POSTs every record to a webhook with retries
+    and exponential backoff.
+
+Sinks are created on first use by :func:`get_sink` and drained on shutdown
+by :func:`close_feedback_sinks`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import anyio.to_thread
+import httpx
+
+from semant_demo.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    Queue of records written in batches of at most ``max_batch`` by one background task.
+    ``write_batch`` may return the number of records it failed to write, when it raises
+    the error is logged and the whole batch is dropped.
+    """
+
+    def __init__(self, name: str, write_batch: Callable[[list[Any]], Awaitable[int | None]],
+                 max_batch: int = 256, max_queue: int = 10_000):
+        self.name = name
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def _ensure_started(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run(), name=f"batch-writer-{self.name}")
+
+    def submit(self, record: Any) -> bool:
+        """Queues a record, False when the queue is full and the record was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("%s backlog is full (%d), dropping a record", self.name, self.max_queue)
+            return False
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                failed = await self.write_batch(batch) or 0
+                self.written += len(batch) - failed
+                self.failed += failed
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error("%s failed to write %d records: %s", self.name, len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def flush(self):
+        """Waits until everything queued so far is written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self, timeout: float = 10.0):
+        """Writes the backlog, waiting at most ``timeout`` seconds, and stops the writer task."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("%s closed with %d records unwritten", self.name, self.backlog)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+
+class JsonlBatchWriter(BatchWriter):
+    """Appends records to a JSON lines file, one write per batch, fsync at most every ``fsync_interval`` s."""
+
+    def __init__(self, name: str, path: str | Path, fsync_interval: float = 1.0, **kwargs):
+        super().__init__(name, self._write_lines, **kwargs)
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self._file = None
+        self._last_fsync = 0.0
+
+    def _append(self, data: str):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write(data)
+        self._file.flush()
+        now = time.monotonic()
+        if now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    async def _write_lines(self, batch: list[dict]):
+        data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+        await anyio.to_thread.run_sync(self._append, data)
+
+    def _close_file(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    async def close(self, timeout: float = 10.0):
+        await super().close(timeout)
+        await anyio.to_thread.run_sync(self._close_file)
+
+
+class WebhookSender(BatchWriter):
+    """POSTs every record as JSON to ``url``, retrying failed deliveries with exponential backoff."""
+
+    def __init__(self, name: str, url: str, retries: int = 3, backoff: float = 0.5, timeout: float = 5.0,
+                 max_queue: int = 1000, client: httpx.AsyncClient | None = None):
+        super().__init__(name, self._send_batch, max_batch=32, max_queue=max_queue)
+        self.url = url
+        self.retries = retries
+        self.backoff = backoff
+        self._client = client or httpx.AsyncClient(timeout=timeout)
+
+    async def _send(self, record: dict):
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._client.post(self.url, json=record)
+                response.raise_for_status()
+                return
+            except httpx.HTTPError as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning("%s delivery failed (%s), retrying", self.name, e)
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def _send_batch(self, batch: list[dict]) -> int:
+        failed = 0
+        for record in batch:
+            try:
+                await self._send(record)
+            except httpx.HTTPError as e:
+                failed += 1
+                logger.error("%s dropped a record after %d retries: %s", self.name, self.retries, e)
+        return failed
+
+    async def close(self, timeout: float = 10.0):
+        await super().close(timeout)
+        await self._client.aclose()
+
+
+_sinks: dict[str, BatchWriter] = {}
+
+
+def get_sink(name: str, factory: Callable[[], BatchWriter]) -> BatchWriter:
+    """The sink registered as ``name``, created by ``factory`` on first use and drained by :func:`close_feedback_sinks`."""
+    if name not in _sinks:
+        _sinks[name] = factory()
+    return _sinks[name]
+
+
+def get_app_feedback_log() -> JsonlBatchWriter:
+    return get_sink("app_feedback_log", lambda: JsonlBatchWriter(
+        "app_feedback_log", config.FEEDBACK_LOG_PATH, fsync_interval=config.FEEDBACK_FSYNC_INTERVAL))
+
+
+def get_app_feedback_webhook() -> WebhookSender | None:
+    if not config.FEEDBACK_WEBHOOK_URL:
+        return None
+    return get_sink("app_feedback_webhook", lambda: WebhookSender(
+        "app_feedback_webhook", config.FEEDBACK_WEBHOOK_URL,
+        retries=config.FEEDBACK_WEBHOOK_RETRIES, max_queue=config.FEEDBACK_WEBHOOK_MAX_BACKLOG))
+
+
+async def close_feedback_sinks():
+    for sink in _sinks.values():
+        await sink.close()
+    _sinks.clear()
@@ -1,7 +1,26 @@
 import httpx
+from semant_demo.circuit_breaker import CircuitOpenError, circuit_breaker
 from semant_demo.config import config
+from semant_demo.metrics import EMBEDDING_CALL_DURATION, observe_call
+from semant_demo.shared_cache import shared_cache
+from semant_demo.tracing import traced
+
+query_embedding_cache = shared_cache("query_embedding", config.EMBEDDING_CACHE_TTL)
+embedding_breaker = circuit_breaker("embedding", slow_call_s=config.EMBEDDING_SLOW_CALL_S)
+
+# raised when the embedding service cannot be reached, search falls back to text search then.
+# HTTP error responses are not included: a rejected query is not fixed by searching differently.
+EMBEDDING_UNAVAILABLE = (CircuitOpenError, httpx.TransportError)
+
 
 async def get_query_embedding(query: str) -> list[float]:
+    key = query_embedding_cache.make_key(config.GEMMA_URL, query)
+    return await query_embedding_cache.get_or_compute(key, lambda: _embed_query(query))
+
+@embedding_breaker.protect
+@observe_call(EMBEDDING_CALL_DURATION, "embedding", "embed_query")
+@traced("embedding.embed_query")
+async def _embed_query(query: str) -> list[float]:
     print("Embedding...")
     async with httpx.AsyncClient() as client:
         resp = await client.post(
@@ -12,6 +31,9 @@ async def get_query_embedding(query: str) -> list[float]:
         resp.raise_for_status()
         return resp.json()["embedding"]
 
+@embedding_breaker.protect
+@observe_call(EMBEDDING_CALL_DURATION, "embedding", "embed_documents")
+@traced("embedding.embed_documents", lambda texts: {"texts": len(texts)})
 async def get_documents_embeddings(texts: list[str]) -> list[list[float]]:
     async with httpx.AsyncClient() as client:
         resp = await client.post(
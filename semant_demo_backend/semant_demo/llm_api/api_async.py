@@ -8,7 +8,14 @@ from typing import AsyncGenerator
 from ollama import AsyncClient
 from openai import APIError, RateLimitError, AsyncOpenAI
 
+from semant_demo.circuit_breaker import CircuitBreaker, CircuitOpenError, circuit_breaker
 from semant_demo.llm_api.base import APIOutput, APIModelResponseOllama, APIModelResponseOpenAI, APIBase, APIRequest
+from semant_demo.metrics import observe_llm_call
+from semant_demo.tracing import traced
+
+
+def _llm_span_attributes(api, request: APIRequest) -> dict:
+    return {"model": request.model, "custom_id": request.custom_id}
 
 
 class APIAsync(APIBase):
@@ -16,6 +23,14 @@ class APIAsync(APIBase):
     Handles asynchronous requests to the API.
     """
 
+    # breaker of the API endpoint, requests fail fast with an error output while its circuit is open
+    breaker: CircuitBreaker | None = None
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit of the API endpoint is open."""
+        return self.breaker is None or self.breaker.available
+
     @abstractmethod
     async def process_single_request(self, request: APIRequest) -> APIOutput:
         """
@@ -46,6 +61,7 @@ class OpenAsyncAPI(APIAsync):
         self.client = AsyncOpenAI(
             api_key=self.api_key, base_url=self.base_url
         )
+        self.breaker = circuit_breaker(f"openai:{self.base_url}")
         self.semaphore = asyncio.Semaphore(self.concurrency)
 
     def convert_api_request_to_dict(self, request: APIRequest) -> dict:
@@ -67,16 +83,19 @@ class OpenAsyncAPI(APIAsync):
             "response_format": request.response_format
         }
 
+    @observe_llm_call("openai")
+    @traced("llm.openai", _llm_span_attributes)
     async def process_single_request(self, request: APIRequest) -> APIOutput:
         async with self.semaphore:
             try:
-                while True:
-                    try:
-                        response = await self.client.chat.completions.create(**self.convert_api_request_to_dict(request))
-                        break
-                    except RateLimitError:
-                        logging.error(f"Rate limit reached. Waiting for {self.pool_interval} seconds.")
-                        await asyncio.sleep(self.pool_interval)
+                with self.breaker.guard():
+                    while True:
+                        try:
+                            response = await self.client.chat.completions.create(**self.convert_api_request_to_dict(request))
+                            break
+                        except RateLimitError:
+                            logging.error(f"Rate limit reached. Waiting for {self.pool_interval} seconds.")
+                            await asyncio.sleep(self.pool_interval)
 
                 return APIOutput(
                     custom_id=request.custom_id,
@@ -86,7 +105,7 @@ class OpenAsyncAPI(APIAsync):
                     ),
                     error=None
                 )
-            except APIError as e:
+            except (APIError, CircuitOpenError) as e:
                 return APIOutput(
                     custom_id=request.custom_id,
                     response=None,
@@ -101,6 +120,8 @@ class OllamaAsyncAPI(APIAsync):
 
     def __post_init__(self):
         self.client = AsyncClient(host=self.base_url)
+        # shared with the OllamaProxy breaker of the same node
+        self.breaker = circuit_breaker(f"ollama:{self.base_url}")
         self.semaphore = asyncio.Semaphore(self.concurrency)
 
     def convert_api_request_to_dict(self, request: APIRequest) -> dict:
@@ -129,10 +150,13 @@ class OllamaAsyncAPI(APIAsync):
 
         return res
 
+    @observe_llm_call("ollama")
+    @traced("llm.ollama", _llm_span_attributes)
     async def process_single_request(self, request: APIRequest) -> APIOutput:
         async with self.semaphore:
             try:
-                response = await self.client.chat(**self.convert_api_request_to_dict(request))
+                with self.breaker.guard():
+                    response = await self.client.chat(**self.convert_api_request_to_dict(request))
 
                 return APIOutput(
                     custom_id=request.custom_id,
@@ -60,6 +60,13 @@ class APIModelResponse(BaseModel, ABC):
         """
         ...
 
+    @abstractmethod
+    def token_usage(self) -> tuple[Optional[int], Optional[int]]:
+        """
+        Returns the number of prompt and completion tokens, None if not reported.
+        """
+        ...
+
 
 class APIModelResponseOpenAI(APIModelResponse):
     type: Literal["openai"] = "openai"
@@ -77,6 +84,12 @@ class APIModelResponseOpenAI(APIModelResponse):
 
         return self.body.choices[choice].message.content
 
+    def token_usage(self) -> tuple[Optional[int], Optional[int]]:
+        usage = self.body.usage
+        if usage is None:
+            return None, None
+        return usage.prompt_tokens, usage.completion_tokens
+
 
 class APIModelResponseOllama(APIModelResponse):
     type: Literal["ollama"] = "ollama"
@@ -88,6 +101,9 @@ class APIModelResponseOllama(APIModelResponse):
 
         return self.body.message.content
 
+    def token_usage(self) -> tuple[Optional[int], Optional[int]]:
+        return self.body.prompt_eval_count, self.body.eval_count
+
 
 class APIOutput(BaseModel):
     """
@@ -1,38 +1,60 @@
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+import asyncio
 import logging
 
 from semant_demo.config import config
 from semant_demo.rag.rag_factory import rag_factory
-from semant_demo.routes.dependencies import cleanup_dependencies, get_engine, get_search, get_summarizer
+from semant_demo.routes.dependencies import cleanup_dependencies, create_tagging_job_runner, get_engine, get_search, get_summarizer
 from time import time
 from fastapi.staticfiles import StaticFiles
 import os
 
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from semant_demo.schemas import TasksBase
 from semant_demo.routes import export_router
 from semant_demo.users.auth import auth_router, register_router, users_router
-# Import User model so its table is included in TasksBase.metadata
-import semant_demo.users.models  # noqa: F401
+from semant_demo.utils.fast_response import CompressionMiddleware
+from semant_demo import metrics
+from semant_demo.tracing import SlowRequestLog, TracingMiddleware
+from semant_demo.migrations import migrate
+from semant_demo.warmup import create_warmup
 
 logging.basicConfig(level=logging.INFO)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global_engine, _ = get_engine()
-    async with global_engine.begin() as conn:
-        # create tables
-        await conn.run_sync(TasksBase.metadata.create_all)
-    #load rags configurations and create instances
+    if config.SQL_AUTO_MIGRATE:
+        # create or upgrade the tables
+        await migrate(global_engine)
+    #load rags configurations, instances are created on first use
     rag_factory(global_config=config, configs_path=config.RAG_CONFIGS_PATH)
+    #warm up in the background, /ready reports when it is done
+    warmup_task = asyncio.create_task(warmup.run())
+    lag_monitor = None
+    if config.METRICS_ENABLED:
+        lag_monitor = asyncio.create_task(metrics.monitor_event_loop_lag(config.METRICS_EVENT_LOOP_LAG_INTERVAL))
+    job_runner = None
+    if config.TAGGING_JOBS_QUEUED:
+        job_runner = asyncio.create_task(create_tagging_job_runner().run())
 
     yield
 
+    warmup_task.cancel()
+    await asyncio.gather(warmup_task, return_exceptions=True)
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+    if job_runner is not None:
+        job_runner.cancel()
+        await asyncio.gather(job_runner, return_exceptions=True)
+
     #shutdown all dependencies
     await cleanup_dependencies()
     logging.info(f"Application cleanup complete.")
 
+warmup = create_warmup()
+
 #app definition
 app = FastAPI(lifespan=lifespan)
 # mount routes
@@ -45,6 +67,15 @@ app.include_router(users_router, prefix="/api/users", tags=["users"])
 async def health():
     return {"status": "ok"}
 
+@app.get("/ready")
+async def ready():
+    return JSONResponse(warmup.report(), status_code=200 if warmup.ready else 503)
+
+if config.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[config.ALLOWED_ORIGIN],  # http://localhost:9000
@@ -53,6 +84,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if config.RESPONSE_COMPRESSION:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.RESPONSE_COMPRESSION_MIN_SIZE,
+        gzip_level=config.RESPONSE_GZIP_LEVEL,
+        brotli_quality=config.RESPONSE_BROTLI_QUALITY,
+    )
+
+if config.TRACING_ENABLED:
+    app.add_middleware(
+        TracingMiddleware,
+        slow_request_ms=config.TRACE_SLOW_REQUEST_MS,
+        sink=SlowRequestLog(config.TRACE_SLOW_LOG_PATH),
+        timing_header=config.TRACE_TIMING_HEADER,
+    )
+
+if config.METRICS_ENABLED:
+    # outermost, the latency includes compression and CORS handling
+    app.add_middleware(metrics.MetricsMiddleware)
+
 if os.path.isdir(config.STATIC_PATH):
     logging.info(f"Serving static files from '{config.STATIC_PATH}' directory")
     app.mount("/", StaticFiles(directory=config.STATIC_PATH,
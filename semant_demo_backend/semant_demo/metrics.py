@@ -0,0 +1,324 @@
+"""
+Built-in performance metrics in the Prometheus text format, served at ``/metrics``.
+
+Recorded when ``METRICS_ENABLED`` is set:
+  - latency of every route (:class:`MetricsMiddleware`)
+  - latency of every public method of the Weaviate wrappers (:func:`instrument_methods`)
+  - latency of embedding and LLM calls, LLM token counts (:func:`observe_call`, :func:`observe_llm_call`)
+  - requests and calls in flight
+  - event loop lag (:func:`monitor_event_loop_lag`)
+  - hits and misses of the registered caches, read when scraped (:func:`register_cache`)
+
+When metrics are disabled the decorators return the functions unchanged and
+the middleware and the lag monitor are not installed, so the instrumented
+code runs exactly as without them.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import math
+import time
+from typing import Any, Callable, Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from semant_demo.config import config
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, Any] = {}
+
+    def labels(self, *values) -> Any:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def samples(self) -> Iterable[str]:
+        for key, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def samples(self) -> Iterable[str]:
+        inf = 'le="+Inf"'
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, inf)} {child.count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(child.sum)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {child.count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._caches: dict[str, Any] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_cache(self, name: str, cache: Any):
+        self._caches[name] = cache
+
+    def _cache_metrics(self) -> list[Metric]:
+        hits = Counter("semant_cache_hits_total", "Cache hits", ["cache"])
+        misses = Counter("semant_cache_misses_total", "Cache misses", ["cache"])
+        ratio = Gauge("semant_cache_hit_ratio", "Cache hits / (hits + misses) since start", ["cache"])
+        for name, cache in sorted(self._caches.items()):
+            cache_hits, cache_misses = getattr(cache, "hits", 0), getattr(cache, "misses", 0)
+            hits.labels(name).set(cache_hits)
+            misses.labels(name).set(cache_misses)
+            if cache_hits + cache_misses:
+                ratio.labels(name).set(cache_hits / (cache_hits + cache_misses))
+        return [hits, misses, ratio]
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in [*self._metrics, *self._cache_metrics()]) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "semant_http_request_duration_seconds", "Latency of API requests", ["method", "route", "status"]))
+WEAVIATE_CALL_DURATION = registry.register(Histogram(
+    "semant_weaviate_call_duration_seconds", "Latency of Weaviate operations", ["component", "operation", "outcome"]))
+EMBEDDING_CALL_DURATION = registry.register(Histogram(
+    "semant_embedding_call_duration_seconds", "Latency of embedding service calls", ["endpoint", "outcome"]))
+LLM_CALL_DURATION = registry.register(Histogram(
+    "semant_llm_call_duration_seconds", "Latency of LLM calls", ["api", "model", "custom_id", "outcome"],
+    buckets=LLM_BUCKETS))
+LLM_TOKENS = registry.register(Counter(
+    "semant_llm_tokens_total", "Tokens of LLM calls", ["model", "custom_id", "kind"]))
+IN_FLIGHT = registry.register(Gauge(
+    "semant_in_flight", "Requests and calls in progress", ["kind"]))
+CIRCUIT_STATE = registry.register(Gauge(
+    "semant_circuit_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open", ["dependency"]))
+CIRCUIT_REJECTED = registry.register(Counter(
+    "semant_circuit_rejected_total", "Calls failed fast by an open circuit", ["dependency"]))
+EVENT_LOOP_LAG = registry.register(Histogram(
+    "semant_event_loop_lag_seconds", "Delay of a scheduled event loop wake-up", buckets=LAG_BUCKETS))
+
+
+def register_cache(name: str, cache: Any):
+    """Exposes ``hits``/``misses`` of a cache, read only when metrics are scraped."""
+    registry.register_cache(name, cache)
+
+
+def observe_call(histogram: Histogram, kind: str, *labels: str) -> Callable:
+    """Decorator recording the latency of an async function, labelled by ``labels`` and the outcome."""
+    def decorator(fn: Callable) -> Callable:
+        if not config.METRICS_ENABLED:
+            return fn
+        in_flight = IN_FLIGHT.labels(kind)
+        ok, error = histogram.labels(*labels, "ok"), histogram.labels(*labels, "error")
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            in_flight.inc()
+            start = time.perf_counter()
+            outcome = error
+            try:
+                result = await fn(*args, **kwargs)
+                outcome = ok
+                return result
+            finally:
+                outcome.observe(time.perf_counter() - start)
+                in_flight.dec()
+        return wrapper
+    return decorator
+
+
+def instrument_methods(component: str) -> Callable[[type], type]:
+    """Class decorator recording the latency of every public coroutine method as a Weaviate operation."""
+    def decorator(cls: type) -> type:
+        if not config.METRICS_ENABLED:
+            return cls
+        for name, attr in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(attr):
+                setattr(cls, name, observe_call(WEAVIATE_CALL_DURATION, "weaviate", component, name)(attr))
+        return cls
+    return decorator
+
+
+def observe_llm_call(api: str) -> Callable:
+    """
+    Decorator of ``process_single_request(self, request) -> APIOutput``, records latency
+    and token counts labelled by the model and ``custom_id`` of the request.
+    """
+    def decorator(fn: Callable) -> Callable:
+        if not config.METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(self, request, *args, **kwargs):
+            in_flight = IN_FLIGHT.labels("llm")
+            in_flight.inc()
+            start = time.perf_counter()
+            output = None
+            try:
+                output = await fn(self, request, *args, **kwargs)
+                return output
+            finally:
+                failed = output is None or output.error is not None
+                LLM_CALL_DURATION.labels(api, request.model, request.custom_id, "error" if failed else "ok").observe(
+                    time.perf_counter() - start)
+                in_flight.dec()
+                if output is not None and output.response is not None:
+                    prompt, completion = output.response.token_usage()
+                    if prompt:
+                        LLM_TOKENS.labels(request.model, request.custom_id, "prompt").inc(prompt)
+                    if completion:
+                        LLM_TOKENS.labels(request.model, request.custom_id, "completion").inc(completion)
+        return wrapper
+    return decorator
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    # the route template, not the path, keeps ids out of the label values
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency and in-flight count of HTTP requests per route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.in_flight = IN_FLIGHT.labels("http")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(scope["method"], _route_label(scope), status).observe(
+                time.perf_counter() - start)
+            self.in_flight.dec()
+
+
+async def monitor_event_loop_lag(interval: float):
+    """Measures how late the event loop wakes up from a sleep of ``interval`` seconds, runs until cancelled."""
+    loop = asyncio.get_running_loop()
+    lag = EVENT_LOOP_LAG.labels()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag.observe(max(0.0, loop.time() - start - interval))
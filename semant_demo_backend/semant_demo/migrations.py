@@ -0,0 +1,150 @@
+"""
+Versioned schema migrations of the SQL database (tasks, RAG feedback, users).
+
+Every migration has a revision number and an ``upgrade(connection)``
+function, the applied revisions are recorded in the ``schema_migrations``
+table. Migrations are idempotent: databases created by ``create_all``
+before migrations existed are upgraded in place.
+
+Applied on startup with ``SQL_AUTO_MIGRATE`` (default), or by hand::
+
+    python -m semant_demo.migrations upgrade
+    python -m semant_demo.migrations current
+
+To change the schema, change the model and append a migration bringing
+existing databases to it.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from semant_demo.schemas import RagUserFeedback, Task, TasksBase
+from semant_demo.users.models import User
+
+logger = logging.getLogger(__name__)
+
+# arbitrary key of the PostgreSQL advisory lock serialising concurrent upgrades
+_PG_LOCK_KEY = 7_204_112_001
+
+_version_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _version_metadata,
+    Column("revision", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    revision: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_tables(connection: Connection):
+    TasksBase.metadata.create_all(
+        connection, tables=[Task.__table__, RagUserFeedback.__table__, User.__table__], checkfirst=True)
+
+
+def _index_tasks_time_updated(connection: Connection):
+    # the task list is sorted by time_updated
+    existing = {index["name"] for index in inspect(connection).get_indexes("tasks")}
+    if "ix_tasks_time_updated" not in existing:
+        Index("ix_tasks_time_updated", Task.__table__.c.time_updated).create(connection)
+
+
+def _add_column_if_missing(connection: Connection, table: Table, name: str):
+    if name in {column["name"] for column in inspect(connection).get_columns(table.name)}:
+        return
+    column = table.c[name]
+    column_type = column.type.compile(dialect=connection.dialect)
+    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{name}" {column_type}'))
+
+
+def _queued_task_columns(connection: Connection):
+    _add_column_if_missing(connection, Task.__table__, "request")
+    _add_column_if_missing(connection, Task.__table__, "cancel_requested")
+
+
+def _task_heartbeat_columns(connection: Connection):
+    _add_column_if_missing(connection, Task.__table__, "worker_id")
+    _add_column_if_missing(connection, Task.__table__, "heartbeat_at")
+
+
+MIGRATIONS = [
+    Migration(1, "tasks, rag_user_feedback and user tables", _create_tables),
+    Migration(2, "index tasks.time_updated", _index_tasks_time_updated),
+    Migration(3, "tasks.request and tasks.cancel_requested of queued jobs", _queued_task_columns),
+    Migration(4, "tasks.worker_id and tasks.heartbeat_at of running queued jobs", _task_heartbeat_columns),
+]
+
+
+def _applied(connection: Connection) -> set[int]:
+    return set(connection.execute(select(schema_migrations.c.revision)).scalars())
+
+
+def _upgrade(connection: Connection) -> list[Migration]:
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+    _version_metadata.create_all(connection, checkfirst=True)
+    applied = _applied(connection)
+    pending = [m for m in MIGRATIONS if m.revision not in applied]
+    for migration in pending:
+        logger.info("Applying migration %d: %s", migration.revision, migration.description)
+        migration.upgrade(connection)
+        connection.execute(schema_migrations.insert().values(
+            revision=migration.revision, description=migration.description,
+            applied_at=datetime.datetime.now(datetime.timezone.utc)))
+    return pending
+
+
+async def migrate(engine: AsyncEngine, attempts: int = 3) -> list[Migration]:
+    """Applies pending migrations in one transaction, returns them."""
+    for attempt in range(attempts):
+        try:
+            async with engine.begin() as connection:
+                return await connection.run_sync(_upgrade)
+        except (OperationalError, IntegrityError):
+            # another worker upgraded the SQLite file concurrently, read the new state and retry
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(0.5 * (attempt + 1))
+    return []
+
+
+async def current_revision(engine: AsyncEngine) -> int | None:
+    async with engine.connect() as connection:
+        if not await connection.run_sync(lambda sync: inspect(sync).has_table("schema_migrations")):
+            return None
+        return max(await connection.run_sync(_applied), default=None)
+
+
+async def _main(command: str):
+    from semant_demo.database import create_db_engine
+
+    engine = create_db_engine()
+    try:
+        if command == "upgrade":
+            applied = await migrate(engine)
+            print(f"Applied {len(applied)} migrations" + "".join(f"\n  {m.revision}: {m.description}" for m in applied))
+        print(f"Current revision: {await current_revision(engine)} (latest {MIGRATIONS[-1].revision})")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Schema migrations of the SQL_DB_URL database")
+    parser.add_argument("command", choices=["upgrade", "current"])
+    asyncio.run(_main(parser.parse_args().command))
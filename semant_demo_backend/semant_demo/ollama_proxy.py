@@ -3,20 +3,34 @@ from typing import List, Optional
 from ollama import AsyncClient
 import random
 
+from semant_demo.circuit_breaker import circuit_breaker
+
 class OllamaProxy:
     def __init__(self, ollama_urls: List[str]):
         self.ollama_urls = ollama_urls
         self.clients = [AsyncClient(host=url) for url in ollama_urls]
+        # nodes whose circuit is open are skipped while another one is available
+        self.breakers = [circuit_breaker(f"ollama:{url}") for url in ollama_urls]
         self._counter = 0
         self._lock = asyncio.Lock()
 
+    def _available_node(self, idx: int) -> int:
+        """First node from ``idx`` on whose circuit is not open, ``idx`` when all are open."""
+        for offset in range(len(self.clients)):
+            candidate = (idx + offset) % len(self.clients)
+            if self.breakers[candidate].available:
+                return candidate
+        return idx
+
     async def call_ollama(self, model: str, prompt: str) -> Optional[str]:
         async with self._lock:
             idx = self._counter % len(self.clients)
             self._counter += 1
+        idx = self._available_node(idx)
         client = self.clients[idx]
         try:
-            response = await client.generate(model=model, prompt=prompt)
+            with self.breakers[idx].guard():
+                response = await client.generate(model=model, prompt=prompt)
         except Exception as e:
             print(f"Error calling model {model} at {self.ollama_urls[idx]}: {e}")
             return None
@@ -33,9 +47,12 @@ class OllamaProxy:
         return None
 
     async def call_ollama_chat(self, model: str, messages: list[dict]) -> str:
-        client = random.choice(self.clients)
+        available = [i for i, breaker in enumerate(self.breakers) if breaker.available]
+        idx = random.choice(available or range(len(self.clients)))
+        client = self.clients[idx]
         try:
-            response = await client.chat(model=model, messages=messages, stream=False)
+            with self.breakers[idx].guard():
+                response = await client.chat(model=model, messages=messages, stream=False)
             return response['message']['content']
         except Exception as e:
             print(f"Error calling model: {model} at {client.host}: {e}")
@@ -1,4 +1,4 @@
-from semant_demo.rag.rag_generator import RagGenerator
-from semant_demo.rag.rag_test import TestRag
-from semant_demo.rag.agentic_rag import xmartiAgentRag
-from semant_demo.rag.incremental_rag import IncrementalAdaptiveRagGenerator
\ No newline at end of file
+"""
+RAG implementations, registered by name in :data:`semant_demo.rag.rag_factory.RAG_CLASS_MODULES`
+and imported on first use.
+"""
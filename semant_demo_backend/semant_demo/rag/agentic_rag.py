@@ -6,6 +6,9 @@ from langchain_core.messages import (
 )
 from langchain_core.tools import tool
 from openai import AsyncOpenAI
+import asyncio
+import logging
+import re
 import time
 import json
 import uuid
@@ -15,7 +18,8 @@ from typing import Dict, List, Any
 from semant_demo.rag.rag_factory import BaseRag, register_rag_class
 from semant_demo.config import Config
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
-from semant_demo.schemas import SearchResponse, SearchRequest, SearchType, RagSearch, RagRequest, RagResponse
+from semant_demo.rag.retrieval_memo import RetrievalMemo
+from semant_demo.schemas import SearchResponse, SearchRequest, SearchType, RagSearch, RagRequest, RagResponse, TextChunkWithDocument
 
 
 def create_async_openai_client(model_type: str, global_config: Config) -> AsyncOpenAI:
@@ -175,12 +179,15 @@ class LangchainLLM:
 
 
 class WeaviateToolWrapper:
-    def __init__(self, searcher: WeaviateAbstraction, rag_search: RagSearch, alpha: float, chunk_limit: int):
+    def __init__(self, searcher: WeaviateAbstraction, rag_search: RagSearch, alpha: float, chunk_limit: int,
+                 memo: RetrievalMemo | None = None):
         self.searcher = searcher
         self.rag_search = rag_search
         self.alpha = alpha
         self.chunk_limit = chunk_limit
+        self.memo = memo
         self.last_results = None 
+        self.results_by_query: dict[str, list[TextChunkWithDocument]] = {}
 
     async def _call_weaviate_search(self, rag_search: RagSearch,  type: SearchType) -> SearchResponse:
         #create db search request
@@ -199,27 +206,39 @@ class WeaviateToolWrapper:
             automatic = False
         )
 
+        # the model often repeats (nearly) the same query, the memo answers those without another search
+        if self.memo is not None:
+            return await self.memo.search(search_request)
         search_response = await self.searcher.textChunk.search(search_request)
         return search_response
 
-    # @tool
-    async def weaviate_search(self, query: str) -> str:
-        self.rag_search.search_query = query
+    async def search(self, query: str) -> list[TextChunkWithDocument]:
+        # copy of rag_search so concurrent tool calls do not overwrite each other's query
+        rag_search = self.rag_search.model_copy(update={"search_query": query})
 
         response = await self._call_weaviate_search(
-            self.rag_search,
-            self.rag_search.search_type
+            rag_search,
+            rag_search.search_type
         )
 
-        self.last_results = response.results
+        self.results_by_query[query] = response.results
+        return response.results
 
+    @staticmethod
+    def format_results(results: list[TextChunkWithDocument]) -> str:
         formatted_chunks = []
 
-        for i, hit in enumerate(response.results, start=1):
+        for i, hit in enumerate(results, start=1):
             formatted_chunks.append(f"[doc {i}] {hit.text}")
 
         return "\n\n".join(formatted_chunks)
 
+    # @tool
+    async def weaviate_search(self, query: str) -> str:
+        results = await self.search(query)
+        self.last_results = results
+        return self.format_results(results)
+
 
 class AssessRetrievalQualityTool:
     def __init__(self, model: str, client: AsyncOpenAI, system_prompt: str):
@@ -324,6 +343,12 @@ class xmartiAgentRag(BaseRag):
         self.alpha = param_config.get("alpha")
         self.chunk_limit = param_config.get("chunk_limit")
         self.agent_iterations = param_config.get("agent_iterations", 7)
+        # wall-clock budget of the agent loop in seconds (None = only agent_iterations limit)
+        self.agent_time_budget = param_config.get("agent_time_budget", None)
+        # max number of tool calls of one turn executed concurrently
+        self.tool_concurrency = param_config.get("tool_concurrency", 4)
+        # search all sub-questions returned by decompose_question right away
+        self.presearch_sub_queries = param_config.get("presearch_sub_queries", False)
         prompts = param_config.get("prompts", {})
         self.system_prompt_template = prompts.get("system_prompt_template")
         self.assess_prompt = prompts.get("assess_retrieval_quality_prompt")
@@ -332,6 +357,50 @@ class xmartiAgentRag(BaseRag):
         self.synthesize_prompt = prompts.get("synthesize_evidence_prompt")
 
 
+    def _parse_sub_queries(self, observation: str) -> list[str]:
+        clean = re.sub(r'```json|```', '', observation).strip()
+        try:
+            decomposition = json.loads(clean)
+        except (json.JSONDecodeError, ValueError):
+            return []
+        if not isinstance(decomposition, dict):
+            return []
+        sub_queries = decomposition.get("sub_queries") or []
+        return [q for q in sub_queries if isinstance(q, str) and q.strip()]
+
+    async def _presearch_sub_queries(self, observation: str, weaviate_tool: WeaviateToolWrapper,
+                                     tool_semaphore: asyncio.Semaphore) -> tuple[str, list[str]]:
+        """
+        Searches all sub-questions returned by decompose_question in one batch and appends the results
+        to the tool observation, so the agent does not need one LLM turn per sub-question search.
+
+        :param observation: decompose_question output
+        :param weaviate_tool: search tool of the current request
+        :param tool_semaphore: bounds the searches running at once, shared with the tool calls
+        :return: observation extended with the search results and the searched sub-queries
+        """
+        sub_queries = self._parse_sub_queries(observation)
+        if not sub_queries:
+            return observation, []
+
+        async def search(sub_query: str):
+            async with tool_semaphore:
+                return await weaviate_tool.search(sub_query)
+
+        results = await asyncio.gather(*(search(q) for q in sub_queries))
+        parts = [observation]
+        for sub_query, sub_results in zip(sub_queries, results):
+            parts.append(f"Search results for sub-query \"{sub_query}\":\n{weaviate_tool.format_results(sub_results)}")
+        return "\n\n".join(parts), sub_queries
+
+    @staticmethod
+    def _merge_results(results: list[list[TextChunkWithDocument]]) -> list[TextChunkWithDocument]:
+        unique_chunks = {}
+        for chunks in results:
+            for chunk in chunks:
+                unique_chunks.setdefault(chunk.id, chunk)
+        return list(unique_chunks.values())
+
     async def rag_request(
         self,
         request: RagRequest,
@@ -342,11 +411,13 @@ class xmartiAgentRag(BaseRag):
 
         # Tool init
         iteration_limit = self.agent_iterations  # Use the configured number of agent iterations
+        retrieval_memo = RetrievalMemo(searcher)
         weaviate_tool = WeaviateToolWrapper(
             searcher=searcher,
             rag_search=request.rag_search,
             alpha=self.alpha,
-            chunk_limit=self.chunk_limit
+            chunk_limit=self.chunk_limit,
+            memo=retrieval_memo
         )
         assess_tool = AssessRetrievalQualityTool(self.model_name, self._client, self.assess_prompt)
         expand_tool = ExpandQueryTool(self.model_name, self._client, self.expand_prompt)
@@ -355,6 +426,16 @@ class xmartiAgentRag(BaseRag):
 
         retrieved_sources = []
 
+        # per-tool latency accounting, returned in RagResponse.timing
+        timing: dict[str, float] = {"llm_time": 0.0, "agent_turns": 0}
+        tool_semaphore = asyncio.Semaphore(self.tool_concurrency)
+
+        def add_timing(key: str, value: float):
+            timing[key] = timing.get(key, 0) + value
+
+        def response_timing() -> dict[str, float]:
+            timing["total_time"] = time.perf_counter() - start_time
+            return {**timing, **retrieval_memo.stats()}
 
         tools = {
             "weaviate_search": weaviate_tool.weaviate_search,
@@ -364,6 +445,26 @@ class xmartiAgentRag(BaseRag):
             "synthesize_evidence": synthesize_tool.synthesize_evidence,
         }
 
+        async def run_tool_call(tool_call) -> tuple[str, list[str]]:
+            tool_name = tool_call.function.name
+            tool_args = json.loads(tool_call.function.arguments)
+
+            async with tool_semaphore:
+                t1 = time.perf_counter()
+                observation = await tools[tool_name](**tool_args)
+                add_timing(f"tool_{tool_name}_time", time.perf_counter() - t1)
+                add_timing(f"tool_{tool_name}_calls", 1)
+
+            searched_queries = [tool_args["query"]] if tool_name == "weaviate_search" else []
+            if tool_name == "decompose_question" and self.presearch_sub_queries:
+                t1 = time.perf_counter()
+                observation, sub_queries = await self._presearch_sub_queries(observation, weaviate_tool,
+                                                                             tool_semaphore)
+                add_timing("presearch_time", time.perf_counter() - t1)
+                searched_queries.extend(sub_queries)
+
+            return observation, searched_queries
+
         messages = [
             SystemMessage(
                 content=self.system_prompt_template.format(remaining_iterations=iteration_limit)
@@ -373,41 +474,43 @@ class xmartiAgentRag(BaseRag):
 
         for i in range(iteration_limit):
 
+            if self.agent_time_budget is not None and time.perf_counter() - start_time > self.agent_time_budget:
+                logging.warning(f"Agentic RAG: time budget {self.agent_time_budget}s exhausted after {i} turns.")
+                timing["time_budget_exhausted"] = 1
+                break
+
             # Use low temperature for consistent, focused tool usage
             temperature = 0.3 if i < iteration_limit - 1 else 0.2
 
+            t1 = time.perf_counter()
             ai_msg = await self.llm.invoke(messages, temperature=temperature)
+            timing["llm_time"] += time.perf_counter() - t1
+            timing["agent_turns"] += 1
             print(f"LLM response at iteration {i+1}:\nTool Calls: {ai_msg.tool_calls}\n{'-'*50}")
 
-            # 🔹 CASE 1 — model wants to call a tool
+            # 🔹 CASE 1 — model wants to call tools
             if getattr(ai_msg, "tool_calls", None):
 
-                tool_call = ai_msg.tool_calls[0]
-                tool_name = tool_call.function.name
-                tool_args = json.loads(tool_call.function.arguments)
-
-
-                tool_fn = tools.get(tool_name)
-                if tool_fn is None:
-                    raise ValueError(f"Unknown tool {tool_name}")
+                tool_calls = ai_msg.tool_calls
+                for tool_call in tool_calls:
+                    if tool_call.function.name not in tools:
+                        raise ValueError(f"Unknown tool {tool_call.function.name}")
 
                 # Add assistant message WITH tool call metadata
                 messages.append(
                     AIMessage(
                         content="",
                         additional_kwargs={
-                            "tool_calls": [tool_call]
+                            "tool_calls": tool_calls
                         }
                     )
                 )
 
-                # Call tool
-                observation = await tool_fn(**tool_args)
+                # Call all tools of this turn concurrently (bounded by tool_semaphore)
+                outputs = await asyncio.gather(*(run_tool_call(tool_call) for tool_call in tool_calls))
 
-                # Handle different tool responses
-                if tool_name == "weaviate_search":
-                    retrieved_sources = weaviate_tool.last_results or []
-                    # Add tool response
+                # every tool call has to be answered by its ToolMessage, in the order of the calls
+                for tool_call, (observation, _) in zip(tool_calls, outputs):
                     messages.append(
                         ToolMessage(
                             tool_call_id=tool_call.id,
@@ -415,14 +518,17 @@ class xmartiAgentRag(BaseRag):
                         )
                     )
 
-                elif tool_name == "assess_retrieval_quality":
-                    # Pass assessment to agent for decision making
-                    messages.append(
-                        ToolMessage(
-                            tool_call_id=tool_call.id,
-                            content=observation
-                        )
+                searched_queries = [q for _, queries in outputs for q in queries]
+                if searched_queries:
+                    weaviate_tool.last_results = self._merge_results(
+                        [weaviate_tool.results_by_query.get(q, []) for q in searched_queries]
                     )
+                    retrieved_sources = weaviate_tool.last_results
+
+                # Guidance after assessment is added once all ToolMessages are in place
+                for tool_call, (observation, _) in zip(tool_calls, outputs):
+                    if tool_call.function.name != "assess_retrieval_quality":
+                        continue
 
                     # Check if assessment indicates any retrieval quality
                     # If so, strongly guide agent to proceed to synthesis
@@ -453,35 +559,7 @@ class xmartiAgentRag(BaseRag):
                                     content="Assessment parsing failed, but I have retrieved documents. I should attempt to answer using synthesize_evidence."
                                 )
                             )
-
-                elif tool_name in ["expand_query", "decompose_question"]:
-                    # These tools return structured info for the agent to use
-                    messages.append(
-                        ToolMessage(
-                            tool_call_id=tool_call.id,
-                            content=observation
-                        )
-                    )
-
-                elif tool_name == "synthesize_evidence":
-                    # This should be the final answer generation
-                    messages.append(
-                        ToolMessage(
-                            tool_call_id=tool_call.id,
-                            content=observation
-                        )
-                    )
-
-
-                else:
-                    messages.append(
-                        ToolMessage(
-                            tool_call_id=tool_call.id,
-                            content=observation
-                        )
-                    )
-                # if tool_name != "weaviate_search":
-                #     print(f"Tool response for {tool_name}:\n{observation}\n{'-'*50}")
+                    break
 
                 continue
 
@@ -493,7 +571,8 @@ class xmartiAgentRag(BaseRag):
                 response_id = str(uuid.uuid4()),
                 rag_answer=final_answer,
                 sources=weaviate_tool.last_results or [],
-                time_spent=time.perf_counter() - start_time
+                time_spent=time.perf_counter() - start_time,
+                timing=response_timing()
             )
 
 
@@ -505,17 +584,21 @@ class xmartiAgentRag(BaseRag):
             retrieved_docs_text = "\n\n".join(formatted_chunks)
 
             try:
+                t1 = time.perf_counter()
                 final_synthesis = await synthesize_tool.synthesize_evidence(
                     request.question,
                     retrieved_docs_text
                 )
+                add_timing("tool_synthesize_evidence_time", time.perf_counter() - t1)
+                add_timing("tool_synthesize_evidence_calls", 1)
 
                 print("Returning final answer after synthesis:", final_synthesis)
                 return RagResponse(
                     response_id=str(uuid.uuid4()),
                     rag_answer=final_synthesis,
                     sources=weaviate_tool.last_results or [],
-                    time_spent=time.perf_counter() - start_time
+                    time_spent=time.perf_counter() - start_time,
+                    timing=response_timing()
                 )
             except Exception as e:
                 pass
@@ -527,5 +610,6 @@ class xmartiAgentRag(BaseRag):
             response_id = str(uuid.uuid4()),
             rag_answer="Sorry, I can´t answer the question based on the retrieved information.",
             sources=weaviate_tool.last_results or [],
-            time_spent=time.perf_counter() - start_time
+            time_spent=time.perf_counter() - start_time,
+            timing=response_timing()
         )
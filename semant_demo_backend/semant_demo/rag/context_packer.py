@@ -0,0 +1,244 @@
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from semant_demo.schemas import TextChunkWithDocument
+
+# conservative for Czech / German OCR text, which splits into more tokens than English
+CHARS_PER_TOKEN = 3.5
+
+# context budgets (tokens) per model type, can be overridden by "context_token_budget" in a RAG config
+DEFAULT_CONTEXT_TOKEN_BUDGETS = {
+    "OLLAMA": 6000,
+    "OPENAI": 12000,
+    "GOOGLE": 12000,
+}
+DEFAULT_CONTEXT_TOKEN_BUDGET = 6000
+
+
+def approx_token_count(text: str) -> int:
+    """
+    Approximates number of tokens of a text without model specific tokenizer.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def default_context_token_budget(model_type: str | None) -> int:
+    return DEFAULT_CONTEXT_TOKEN_BUDGETS.get(model_type, DEFAULT_CONTEXT_TOKEN_BUDGET)
+
+
+_HYPHENATION = re.compile(r"(\w)-\s*\n\s*(\w)")
+_PAGE_NUMBER_LINE = re.compile(r"^\s*[-–—(\[]?\s*\d{1,4}\s*[-–—)\]]?\s*$", re.MULTILINE)
+_SEPARATOR_RUN = re.compile(r"([.\-_=*~·•])\1{3,}")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def strip_boilerplate(text: str) -> str:
+    """
+    Removes OCR noise that costs tokens without carrying information - hyphenation at line ends,
+    lines with page numbers only, runs of separator characters (dot leaders, underlines) and repeated whitespace.
+    """
+    text = text.replace("\\n", "\n")
+    text = _HYPHENATION.sub(r"\1\2", text)
+    text = _PAGE_NUMBER_LINE.sub(" ", text)
+    text = _SEPARATOR_RUN.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def merge_overlapping(first: str, second: str, min_overlap: int = 20, max_overlap: int = 1000) -> str:
+    """
+    Joins texts of two consecutive chunks, the longest suffix of the first one that is a prefix of the second one
+    (chunk overlap) is included only once.
+    """
+    for size in range(min(len(first), len(second), max_overlap), min_overlap - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return f"{first} {second}"
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts text to the token budget, preferably at the end of a sentence.
+    """
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if sentence_end > max_chars // 2:
+        return cut[:sentence_end + 1]
+    return cut.rsplit(" ", 1)[0] + " …"
+
+
+@dataclass
+class _Passage:
+    rank: int
+    chunks: list[TextChunkWithDocument]
+    text: str
+
+    @property
+    def document(self):
+        return self.chunks[0].document
+
+    @property
+    def last_order(self) -> int | None:
+        return self.chunks[-1].order
+
+
+@dataclass
+class PackedContext:
+    passages: list[TextChunkWithDocument] = field(default_factory=list)
+    tokens: int = 0
+    input_chunks: int = 0
+    duplicate_chunks: int = 0
+    merged_chunks: int = 0
+    dropped_passages: int = 0
+    truncated_passages: int = 0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "context_tokens": self.tokens,
+            "context_input_chunks": self.input_chunks,
+            "context_passages": len(self.passages),
+            "context_duplicate_chunks": self.duplicate_chunks,
+            "context_merged_chunks": self.merged_chunks,
+            "context_dropped_passages": self.dropped_passages,
+            "context_truncated_passages": self.truncated_passages,
+        }
+
+
+class ContextPacker:
+    """
+    Packs retrieved chunks into a token budget for the generation prompt.
+
+    Chunks are expected in the order of relevance (best first). Boilerplate is stripped, duplicate and contained
+    chunks of the same document are removed, chunks that follow each other in a document are merged into one passage,
+    and passages are greedily added by relevance until the budget is used up. Returned passages are copies of the
+    first chunk of each passage with the packed text, so they can be used both for the prompt and as sources.
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET, passage_overhead_tokens: int = 25,
+                 min_passage_tokens: int = 64):
+        """
+        :param token_budget: max number of context tokens
+        :param passage_overhead_tokens: tokens reserved per passage for its header (title, year, source markers)
+        :param min_passage_tokens: a passage is truncated to fit only if at least this many tokens remain
+        """
+        self.token_budget = token_budget
+        self.passage_overhead_tokens = passage_overhead_tokens
+        self.min_passage_tokens = min_passage_tokens
+
+    def _dedupe(self, chunks: list[TextChunkWithDocument], packed: PackedContext) -> list[_Passage]:
+        passages: list[_Passage] = []
+        for rank, chunk in enumerate(chunks):
+            text = strip_boilerplate(chunk.text)
+            if not text:
+                packed.duplicate_chunks += 1
+                continue
+            duplicate = False
+            for passage in passages:
+                if passage.document != chunk.document:
+                    continue
+                if text in passage.text:
+                    duplicate = True
+                    break
+                if passage.text in text:
+                    # better ranked chunk is contained in this one, keep the longer text with the better rank
+                    passage.text = text
+                    passage.chunks = [chunk]
+                    duplicate = True
+                    break
+            if duplicate:
+                packed.duplicate_chunks += 1
+                continue
+            passages.append(_Passage(rank=rank, chunks=[chunk], text=text))
+        return passages
+
+    def _merge_adjacent(self, passages: list[_Passage], packed: PackedContext) -> list[_Passage]:
+        by_position = sorted(
+            passages,
+            key=lambda p: (str(p.document), p.chunks[0].order if p.chunks[0].order is not None else -1, p.rank)
+        )
+        merged: list[_Passage] = []
+        for passage in by_position:
+            previous = merged[-1] if merged else None
+            if previous is not None and previous.document == passage.document \
+                    and previous.last_order is not None and passage.chunks[0].order is not None \
+                    and passage.chunks[0].order == previous.last_order + 1:
+                previous.text = merge_overlapping(previous.text, passage.text)
+                previous.chunks.extend(passage.chunks)
+                previous.rank = min(previous.rank, passage.rank)
+                packed.merged_chunks += 1
+            else:
+                merged.append(passage)
+        return sorted(merged, key=lambda p: p.rank)
+
+    def pack(self, chunks: list[TextChunkWithDocument]) -> PackedContext:
+        """
+        :param chunks: retrieved chunks, best first
+        :return: packed passages with statistics
+        """
+        packed = PackedContext(input_chunks=len(chunks))
+        passages = self._merge_adjacent(self._dedupe(chunks, packed), packed)
+
+        remaining = self.token_budget
+        for passage in passages:
+            tokens = approx_token_count(passage.text) + self.passage_overhead_tokens
+            text = passage.text
+            if tokens > remaining:
+                available = remaining - self.passage_overhead_tokens
+                if available < self.min_passage_tokens:
+                    # try smaller passages further down the ranking
+                    packed.dropped_passages += 1
+                    continue
+                text = truncate_to_tokens(text, available)
+                tokens = approx_token_count(text) + self.passage_overhead_tokens
+                packed.truncated_passages += 1
+
+            first = passage.chunks[0]
+            packed.passages.append(first.model_copy(update={
+                "text": text,
+                "to_page": max(c.to_page for c in passage.chunks),
+            }))
+            packed.tokens += tokens
+            remaining -= tokens
+
+        return packed
+
+
+async def generate_with_stats(prompt, model, output_parser, inputs: dict, label: str) -> tuple[str, dict[str, float]]:
+    """
+    Runs prompt | model | output_parser as a stream to measure time to the first token (≈ prompt prefill)
+    and logs the prompt size, so context budgets can be tuned.
+
+    :param prompt: prompt template
+    :param model: LangChain model
+    :param output_parser: output parser
+    :param inputs: prompt variables
+    :param label: name used in the log
+    :return: generated text and statistics (prompt_tokens, prefill_time, generation_time)
+    """
+    t0 = perf_counter()
+    prompt_value = await prompt.ainvoke(inputs)
+    prompt_tokens = approx_token_count(prompt_value.to_string())
+
+    first_token_time = None
+    parts = []
+    async for part in (model | output_parser).astream(prompt_value):
+        if first_token_time is None:
+            first_token_time = perf_counter()
+        parts.append(part)
+    end = perf_counter()
+
+    stats = {
+        "prompt_tokens": prompt_tokens,
+        "prefill_time": (first_token_time or end) - t0,
+        "generation_time": end - t0,
+    }
+    logging.info(
+        f"{label}: prompt ~{prompt_tokens} tokens, prefill {stats['prefill_time']:.2f}s, "
+        f"generation {stats['generation_time']:.2f}s"
+    )
+    return "".join(parts), stats
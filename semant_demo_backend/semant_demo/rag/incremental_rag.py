@@ -10,8 +10,6 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_ollama import OllamaLLM
 
-#from langchain_community.tools import DuckDuckGoSearchRun   #Tavily can be used as well but it requires API key
-from ddgs import DDGS
 import uuid
 
 from langgraph.graph import StateGraph, START, END
@@ -25,6 +23,10 @@ from semant_demo.rag.rag_factory import BaseRag, register_rag_class
 from semant_demo.config import Config
 from semant_demo.schemas import SearchResponse, SearchRequest, RagRequest, RagResponse, AdaptiveRagState, TextChunkWithDocument, Document, ExplainRequest
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
+from semant_demo.rag.retrieval_memo import RetrievalMemo
+from semant_demo.rag.web_search import get_web_searcher
+from semant_demo.rag.context_packer import ContextPacker, default_context_token_budget, generate_with_stats
+from semant_demo.tracing import traced
 #import prompts from prompt file
 from semant_demo.rag.incremental_rag_prompts import *
 
@@ -88,9 +90,13 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
         self.chunk_limit = param_config.get("chunk_limit", 5)
         self.alpha = param_config.get("alpha", 0.5)
         self.search_type = param_config.get("search_type", "hybrid")
+        #token budget of the context in the generation prompt
+        self.context_packer = ContextPacker(param_config.get("context_token_budget", default_context_token_budget(model_type)))
         #load and build graph
         self.max_retries = param_config.get("max_retries", 3)
         self.web_search_enabled = param_config.get("web_search_enabled", False)
+        # shared cached and concurrency limited web search (DuckDuckGo by default)
+        self.web_searcher = get_web_searcher(global_config)
         self.metadata_extraction_allowed = param_config.get("metadata_extraction_allowed", True)
         #build
         self.workflow = self._build_rag()
@@ -240,6 +246,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
 #--- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
     # retrieval node
     # use to get relevant documents from database based on question, history and metadata (if extracted)
+    @traced("rag.retrieve")
     async def node_retrieve(self, state: AdaptiveRagState):
         try:
             #get metadata
@@ -289,7 +296,10 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
                 )
                 if (DEBUG_PRINT):
                     print(f"search_request: {search_request}")
-                #call db search
+                #call db search, through the request memo so repeated queries across iterations are not searched again
+                memo = state.get("retrieval_memo")
+                if memo is not None:
+                    return await memo.search(search_request)
                 return await self.searcher.textChunk.search(search_request)
 
             #call in parallel
@@ -323,6 +333,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
     # funciton called at the beggining of the graph
     # detect language of the question to use best prompts
     # default is eng
+    @traced("rag.detect_language")
     async def node_detect_language(self, state: AdaptiveRagState):
         chain = self._create_chain(model=self.model, prompt=self.identify_language_prompt)
         result = await chain.ainvoke({"question_string" : state["question"]})
@@ -339,6 +350,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
 
     #rephrase question to search desired data in database
     # this node enables having a converstation with RAG system
+    @traced("rag.history_transformation")
     async def node_history_transformation(self, state: AdaptiveRagState):
         if (state["history"]):
             #create desired chain
@@ -362,6 +374,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
 
     # node to check if the context from previous interraction is sufficent to answer new question
     # it helps to answer more quicker if the question is related to previous one and the context is still relevant    
+    @traced("rag.check_context")
     async def node_check_context(self, state: AdaptiveRagState):
         if (state["history"] and state["documents"]):
             chain = self._create_chain(model=self.model, prompt=self.check_sufficient_context_prompt)
@@ -390,6 +403,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
     # node to extract metadata from question
     # extracts year and language information
     # note: language is in library format (ces, eng...) - NOT cs, en...
+    @traced("rag.extract_metadata")
     async def node_extract_metadata(self, state: AdaptiveRagState):
         if state.get("retrieval_iteration_counter", 0) == 1:
             if (state["metadata_extraction_allowed"] == True):
@@ -419,6 +433,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
     
     # retrive strategy node
     # first iteration is simple retrieval, second use multiquer with step-back approach and thirs uses hyde
+    @traced("rag.multi_query")
     async def node_multi_query(self, state: AdaptiveRagState):
         iteration = state.get("retrieval_iteration_counter", 0)
         language = state.get("language", "ces")
@@ -456,6 +471,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
 
     # grade retrieved documents
     # filtrate docs which were asssigned as not relevant to lower probability of halucunations
+    @traced("rag.grade_context")
     async def node_grade_context(self, state: AdaptiveRagState):
         #first basic rag query
         if (len(state["documents"]) <= 5 or state["retrieval_iteration_counter"] == 1):
@@ -520,41 +536,52 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
 
     # generate an answer
     # there are two different prompts based on if there is history or not
+    @traced("rag.generate")
     async def node_generate(self, state: AdaptiveRagState):
         language = state.get("language", "ces")
-        
+
+        # fit documents into the token budget (dedupe, merge neighbouring chunks, strip OCR noise)
+        # packed passages replace the documents so [doc X] citations match returned sources
+        packed = self.context_packer.pack(state["documents"])
+
         #join snippets
-        final_context = self._format_weaviate_context(state["documents"])
+        final_context = self._format_weaviate_context(packed.passages)
         if (DEBUG_PRINT):
             print(f"DEBUG: Context length (chars): {len(final_context)}")
 
         if (state["history"]):  #if there is history use different prompt which include history in the input
             prompt = self._get_prompt_by_language("generate_with_history", language)
-            chain = self._create_chain(model=self.model, prompt=prompt)
             #get history in desired format
             prompt_history = self._get_prompt_history(state["history"])
-
-            answer = await chain.ainvoke({
+            inputs = {
                 "context_string" : final_context,
                 "original_question" : state["original_question"],
                 "question_string" : state["question"],
                 "prompt_history" : prompt_history
-            })
+            }
         else: # if there is no history use simpler prompt
             prompt = self._get_prompt_by_language("generate_no_history", language)
-            chain = self._create_chain(model=self.model, prompt=prompt)
-            answer = await chain.ainvoke({
+            inputs = {
                 "context_string" : final_context,
                 "question_string" : state["question"]
-            })
+            }
+
+        answer, generation_stats = await generate_with_stats(
+            prompt=prompt,
+            model=self.model,
+            output_parser=self.output_parser,
+            inputs=inputs,
+            label=f"Adaptive RAG generation ({self.model_type})"
+        )
 
         if (DEBUG_PRINT):
             print(f"rag answer: {answer}")
 
-        return {"generation": answer}
+        return {"generation": answer, "documents": packed.passages, "generation_stats": {**packed.stats(), **generation_stats}}
     
     # grade generated answer
     # if the answer is not sufficient route back to retrieval with multiquery or hyde to get more relevant documents and generate again
+    @traced("rag.grade_generation")
     async def node_grade_generation (self, state: AdaptiveRagState):
         gen_value = state.get("generation_iteration_counter", 0) + 1
         language = state.get("language", "ces")
@@ -601,11 +628,13 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
     
     # internet fallback node
     # very helpful if database is lacking information about the question topic
+    @traced("rag.web_search")
     async def node_web_search (self, state: AdaptiveRagState):
         if (DEBUG_PRINT):
             print(f"Extracting keyword for the internet search.")
 
         # extract keywords from question to expand search
+        search_queries = [state["question"]]
         try:
             language = state.get("language", "ces")
             prompt = self._get_prompt_by_language("extract_keyword", language)
@@ -619,23 +648,12 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
             print(f"Rewriting web search queries, Error: {e}")
 
         if (DEBUG_PRINT):
-            print(f"Trying to search web using DuckDuckGo")
+            print(f"Trying to search web: {search_queries}")
 
         try:
-            def ddg(queries):
-                all_results = []
-                with DDGS() as ddgs:
-                    for q in queries:
-                        if (DEBUG_PRINT): 
-                            print(f"Searching web: {q}")
-                        results = [r["body"] for r in ddgs.text(q, max_results = 8)]
-                        all_results.extend(list(set(results)))
-
-                unique_results = list(dict.fromkeys(all_results))
-                return unique_results
-  
+            # keyword variants are searched in parallel, results are cached by keyword set
+            search_result = await self.web_searcher.search_many(search_queries)
             uuid_tmp = uuid.uuid4()
-            search_result = await asyncio.to_thread(ddg, search_queries)
             search_chunks = []
 
             # create hypothetical document which contations web search results
@@ -678,6 +696,7 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
             history_preprocessed = []
 
         print(previous_documents)
+        retrieval_memo = RetrievalMemo(self.searcher)
         # call rag graph
         try:
             t1 = time()
@@ -694,7 +713,9 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
                 "generation_iteration_counter": 0,
                 "metadata_extraction_allowed": self.metadata_extraction_allowed,
                 "feedback": "",
-                "web_search_performed" : False
+                "web_search_performed" : False,
+                "retrieval_memo" : retrieval_memo,
+                "generation_stats" : {}
             }
             
             config = {"recursion_limit" : 50}
@@ -717,7 +738,8 @@ class IncrementalAdaptiveRagGenerator(BaseRag):
             rag_answer=generated_result["generation"].strip(),
             sources=generated_result["documents"],
             time_spent=time_spent,
-            response_id= answer_id
+            response_id= answer_id,
+            timing={**retrieval_memo.stats(), **generated_result.get("generation_stats", {})}
         )
     
     #--- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- --- ---
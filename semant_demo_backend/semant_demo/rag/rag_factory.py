@@ -1,7 +1,12 @@
+import importlib
 import os
+import threading
 import yaml
 import logging
+from collections.abc import Mapping
 from typing import Dict, Type
+
+import anyio.to_thread
 from semant_demo.schemas import RagRouteConfig, RagRequest, RagResponse, ExplainRequest
 
 class BaseRag:
@@ -18,19 +23,108 @@ class BaseRag:
 #dict of rag implementations avalaible in application    
 RAG_IMPLEMENTATIONS: Dict[str, Type[BaseRag]] = {}
 
+#modules of the rag implementations, imported on first use: they pull in LangChain,
+#LangGraph and the provider SDKs, which the startup should not pay for
+RAG_CLASS_MODULES: Dict[str, str] = {
+    "RagGenerator": "semant_demo.rag.rag_generator",
+    "TestRag": "semant_demo.rag.rag_test",
+    "xmartiAgentRag": "semant_demo.rag.agentic_rag",
+    "IncrementalAdaptiveRagGenerator": "semant_demo.rag.incremental_rag",
+}
+
 #rag class registration
 def register_rag_class(rag_class: Type[BaseRag]):
     RAG_IMPLEMENTATIONS[rag_class.__name__] = rag_class
     return rag_class
 
+def get_rag_class(class_name: str) -> Type[BaseRag] | None:
+    """Registered rag class, its module is imported when it was not yet."""
+    if class_name not in RAG_IMPLEMENTATIONS and class_name in RAG_CLASS_MODULES:
+        importlib.import_module(RAG_CLASS_MODULES[class_name])
+    return RAG_IMPLEMENTATIONS.get(class_name)
+
+def is_known_rag_class(class_name: str) -> bool:
+    return class_name in RAG_IMPLEMENTATIONS or class_name in RAG_CLASS_MODULES
+
+
+class RagUnavailableError(RuntimeError):
+    """The rag instance of a configuration could not be created."""
+
+
+class LazyRagInstances(Mapping[str, BaseRag]):
+    """
+    Rag instances by configuration id, each instance is created on first access.
+    A configuration whose instance failed to be created is reported as failed
+    (and hidden from the frontend) until a later attempt succeeds.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, tuple] = {}
+        self._instances: Dict[str, BaseRag] = {}
+        self._failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, id: str, global_config, class_name: str, params: dict):
+        self._configs[id] = (global_config, class_name, params)
+        self._instances.pop(id, None)
+        self._failed.pop(id, None)
+
+    def clear(self):
+        self._configs.clear()
+        self._instances.clear()
+        self._failed.clear()
+
+    def __getitem__(self, id: str) -> BaseRag:
+        instance = self._instances.get(id)
+        if instance is not None:
+            return instance
+        global_config, class_name, params = self._configs[id]
+        with self._lock:
+            if id not in self._instances:
+                try:
+                    self._instances[id] = get_rag_class(class_name)(global_config=global_config, param_config=params)
+                except Exception as e:
+                    logging.error(f"Failed to create RAG {id} of class {class_name}: {e}")
+                    self._failed[id] = f"{type(e).__name__}: {e}"
+                    raise RagUnavailableError(f"RAG configuration {id} is unavailable.") from e
+                self._failed.pop(id, None)
+                logging.info(f"Created RAG {id} of class {class_name}.")
+            return self._instances[id]
+
+    def __iter__(self):
+        return iter(self._configs)
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def __contains__(self, id) -> bool:
+        return id in self._configs
+
+    def is_created(self, id: str) -> bool:
+        return id in self._instances
+
+    def has_failed(self, id: str) -> bool:
+        return id in self._failed
+
+    async def get_instance(self, id: str) -> BaseRag:
+        """
+        Instance of ``id``, the first one is created in a thread so that imports do not block the event loop.
+        Raises RagUnavailableError when it cannot be created.
+        """
+        instance = self._instances.get(id)
+        if instance is not None:
+            return instance
+        return await anyio.to_thread.run_sync(self.__getitem__, id)
+
+
 #rag dict of particular configurations
 #for backend
-RAG_INSTANCES: Dict[str, BaseRag] = {}
+RAG_INSTANCES = LazyRagInstances()
 #for frontend
 RAG_INSTANCES_CONFIGS: Dict[str, RagRouteConfig] = {}
 
-#load single rag configuration and return  id and frontend_config, instance of the class
-def rag_load_single_config(global_config, filepath: str):
+#read single rag configuration and return id, frontend_config, class name and params
+def rag_read_single_config(filepath: str):
     try:
         #load rag config
         with open (filepath, "r", encoding="utf-8") as f:
@@ -45,26 +139,34 @@ def rag_load_single_config(global_config, filepath: str):
         if (not id or not name or not desc or not class_name or not params):
             logging.error(f"Yaml is in wrong format, skipping configuration: {filepath}.")
             return None
-        if (class_name not in RAG_IMPLEMENTATIONS):
+        if (not is_known_rag_class(class_name)):
             logging.error(f"Unknown class: {class_name}, skipping configuration: {filepath}.")
             return None
 
-        
-        #get class of choice
-        RagClass = RAG_IMPLEMENTATIONS[class_name]
-        
-        #create an instance
-        instance = RagClass(global_config=global_config, param_config=params)
-        
         #create frontend config
         frontend_config = RagRouteConfig(id=id, name=name, description=desc)
 
-        return id, frontend_config, instance
+        return id, frontend_config, class_name, params
         
     except Exception as e:
         logging.error(f"Failed to load RAG configuration: {filepath}: {e}")
 
+#load single rag configuration and return  id and frontend_config, instance of the class
+def rag_load_single_config(global_config, filepath: str):
+    results = rag_read_single_config(filepath)
+    if results is None:
+        return None
+    id, frontend_config, class_name, params = results
+    try:
+        #create an instance
+        instance = get_rag_class(class_name)(global_config=global_config, param_config=params)
+    except Exception as e:
+        logging.error(f"Failed to load RAG configuration: {filepath}: {e}")
+        return None
+    return id, frontend_config, instance
+
 def rag_factory(global_config, configs_path: str):
+    """Reads the rag configurations, the instances are created on first use."""
     RAG_INSTANCES.clear()
     RAG_INSTANCES_CONFIGS.clear()
     
@@ -77,24 +179,24 @@ def rag_factory(global_config, configs_path: str):
             filepath = os.path.join(configs_path, filename)
 
             #load single config
-            results = rag_load_single_config(global_config=global_config, filepath=filepath)
+            results = rag_read_single_config(filepath=filepath)
 
             if (results is None):
                 continue
 
-            id, frontend_config, instance = results
+            id, frontend_config, class_name, params = results
 
             #duplicity check
             if (id in RAG_INSTANCES_CONFIGS):
                 logging.error(f"Same configuration id: {id}, skipping configuration: {filepath}.")
                 continue
                 
-            #create an instance
-            RAG_INSTANCES[id] = instance
+            #register the instance, created on first request
+            RAG_INSTANCES.add(id, global_config, class_name, params)
             
             #create frontend config
             RAG_INSTANCES_CONFIGS[id] = frontend_config
 
 #return all avalaible rag configurations registered in app
 def get_all_rag_configurations() -> list[RagRouteConfig]:
-    return list(RAG_INSTANCES_CONFIGS.values())
+    return [rag_config for id, rag_config in RAG_INSTANCES_CONFIGS.items() if not RAG_INSTANCES.has_failed(id)]
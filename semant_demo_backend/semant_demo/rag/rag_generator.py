@@ -17,6 +17,7 @@ from semant_demo.rag.rag_factory import BaseRag, register_rag_class
 from semant_demo.config import Config
 from semant_demo.schemas import SearchResponse, SearchRequest, SearchType, RagSearch, RagRouteConfig, RagRequest, RagResponse
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
+from semant_demo.rag.context_packer import ContextPacker, default_context_token_budget, generate_with_stats
 
 # prompt
 answer_question_prompt_template = [
@@ -70,6 +71,8 @@ class RagGenerator(BaseRag):
         self.chunk_limit = param_config.get("chunk_limit", 5)
         self.alpha = param_config.get("alpha", 0.5)
         self.search_type = param_config.get("search_type", "hybrid")
+        #token budget of the context in the prompt
+        self.context_packer = ContextPacker(param_config.get("context_token_budget", default_context_token_budget(model_type)))
 
     # initialize model
     def _create_model(self, model_type: str, model_name: str, api_key: str, temperature: float):
@@ -173,6 +176,8 @@ class RagGenerator(BaseRag):
 
 
         final_context = context_string
+        search_results = []
+        timing = {}
         # check if context was entered
         if (final_context == None):
             #convert search type
@@ -182,23 +187,32 @@ class RagGenerator(BaseRag):
                 raise ValueError(f"Rag error: Unknown search type: {rag_search.search_type}")
             #search in db
             search_response = await self._call_weaviate_search(type = type, rag_search = rag_search)
-            search_results = search_response.results
+            #fit chunks into the token budget, packed passages are also returned as sources so [doc X] numbering matches
+            packed = self.context_packer.pack(search_response.results)
+            search_results = packed.passages
+            timing.update(packed.stats())
             #convert context to desired format
             final_context = self._format_weaviate_context(search_results)
-        
-        chain = self._create_chain(model=model, prompt=self.main_prompt)
 
         #TODO DEBUG
         print(f"rag_config: {self.param_config}, rag_search: {rag_search} ")
 
-        result = await chain.ainvoke({
-            "context_string" : final_context,
-            "question_string" : question_string,
-            "prompt_history" : prompt_history
-        })
+        result, generation_stats = await generate_with_stats(
+            prompt=self.main_prompt,
+            model=model,
+            output_parser=self.output_parser,
+            inputs={
+                "context_string" : final_context,
+                "question_string" : question_string,
+                "prompt_history" : prompt_history
+            },
+            label=f"RAG generation ({self.model_type})"
+        )
+        timing.update(generation_stats)
         return {
             "answer": result,
-            "sources": search_results
+            "sources": search_results,
+            "timing": timing
         }
     
     #method that is implemented in base rag class - basicly just preprocessing of request and calling generate method
@@ -236,5 +250,6 @@ class RagGenerator(BaseRag):
             rag_answer=generated_result["answer"].strip(),
             sources=generated_result["sources"],
             time_spent=time_spent,
-            response_id= answer_id
+            response_id= answer_id,
+            timing=generated_result["timing"]
         )
\ No newline at end of file
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import re
+from time import time
+
+from semant_demo.gemma_embedding import get_query_embedding, get_hyde_document_embedding
+from semant_demo.schemas import SearchRequest, SearchResponse, SearchType
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes query text so near-identical variants (case, whitespace, trailing punctuation) share one memo entry.
+    """
+    return re.sub(r"\s+", " ", query).strip().strip("?!.,;:").strip().casefold()
+
+
+class RetrievalMemo:
+    """
+    Request-scoped memo of text chunk searches.
+
+    One instance is created per RAG request and shared by all graph nodes / agent tools, so repeated
+    retrieval iterations do not re-embed and re-search queries that were already answered. Identical
+    in-flight searches are coalesced, a search with a smaller limit is served from an already finished
+    search with the same parameters and a bigger limit, and returned chunks are canonicalized by id.
+    """
+
+    VECTOR_SEARCH_TYPES = (SearchType.hybrid, SearchType.vector)
+
+    def __init__(self, searcher):
+        """
+        :param searcher: WeaviateAbstraction used for the actual searches
+        """
+        self.searcher = searcher
+        self._searches: dict[tuple, asyncio.Future] = {}
+        self._embeddings: dict[tuple, asyncio.Future] = {}
+        self.chunks = {}
+
+        self.searches_executed = 0
+        self.searches_avoided = 0
+        self.embeddings_executed = 0
+        self.embeddings_avoided = 0
+        self.chunks_reused = 0
+        self.search_time = 0.0
+
+    @staticmethod
+    def _filters_key(request: SearchRequest) -> tuple:
+        return (
+            request.type,
+            round(request.hybrid_search_alpha, 3),
+            request.user_collection_id,
+            request.min_year,
+            request.max_year,
+            request.min_date,
+            request.max_date,
+            request.language,
+            tuple(sorted(request.tag_uuids)),
+            request.positive,
+            request.automatic,
+            request.is_hyde,
+        )
+
+    def _find_superset(self, query: str, filters_key: tuple, limit: int) -> asyncio.Future | None:
+        # finished search with the same parameters and bigger limit contains the top-limit results as its prefix
+        for (other_query, other_filters, other_limit), future in self._searches.items():
+            if other_query == query and other_filters == filters_key and other_limit > limit \
+                    and future.done() and not future.cancelled() and future.exception() is None:
+                return future
+        return None
+
+    async def _embed(self, query: str, is_hyde: bool) -> list[float]:
+        key = (normalize_query(query), is_hyde)
+        future = self._embeddings.get(key)
+        if future is not None:
+            self.embeddings_avoided += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._embeddings[key] = future
+        try:
+            if is_hyde:
+                vector = await get_hyde_document_embedding(query)
+            else:
+                vector = await get_query_embedding(query)
+            self.embeddings_executed += 1
+            future.set_result(vector)
+            return vector
+        except BaseException as e:
+            # do not memoize failures, next caller tries again
+            del self._embeddings[key]
+            future.set_exception(e)
+            future.exception()  # mark as retrieved, waiters get it through await
+            raise
+
+    async def _execute(self, request: SearchRequest) -> SearchResponse:
+        query_vector = None
+        if request.type in self.VECTOR_SEARCH_TYPES:
+            query_vector = await self._embed(request.query, request.is_hyde)
+
+        t1 = time()
+        response = await self.searcher.textChunk.search(request, query_vector=query_vector)
+        self.search_time += time() - t1
+        self.searches_executed += 1
+
+        canonical = []
+        for chunk in response.results:
+            chunk_id = str(chunk.id)
+            known = self.chunks.get(chunk_id)
+            if known is not None:
+                self.chunks_reused += 1
+                canonical.append(known)
+            else:
+                self.chunks[chunk_id] = chunk
+                canonical.append(chunk)
+        response.results = canonical
+        return response
+
+    def _served_from_memo(self, request: SearchRequest):
+        self.searches_avoided += 1
+        if request.type in self.VECTOR_SEARCH_TYPES:
+            self.embeddings_avoided += 1
+
+    async def search(self, request: SearchRequest) -> SearchResponse:
+        """
+        Searches text chunks, reusing results of equivalent searches made earlier in the same request.
+
+        :param request: search request
+        :return: search response, results are shared chunk objects - do not mutate them
+        """
+        query = normalize_query(request.query)
+        filters_key = self._filters_key(request)
+        key = (query, filters_key, request.limit)
+
+        future = self._searches.get(key)
+        if future is not None:
+            self._served_from_memo(request)
+            return await asyncio.shield(future)
+
+        superset = self._find_superset(query, filters_key, request.limit)
+        if superset is not None:
+            self._served_from_memo(request)
+            response = superset.result()
+            return response.model_copy(update={"results": response.results[:request.limit], "search_request": request})
+
+        future = asyncio.get_running_loop().create_future()
+        self._searches[key] = future
+        try:
+            response = await self._execute(request)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            del self._searches[key]
+            future.set_exception(e)
+            future.exception()
+            raise
+
+    def stats(self) -> dict[str, float]:
+        """
+        Statistics for the response timing metadata.
+        """
+        stats = {
+            "retrieval_searches": self.searches_executed,
+            "retrieval_searches_avoided": self.searches_avoided,
+            "retrieval_embeddings": self.embeddings_executed,
+            "retrieval_embeddings_avoided": self.embeddings_avoided,
+            "retrieval_chunks_reused": self.chunks_reused,
+            "retrieval_search_time": self.search_time,
+        }
+        logging.info(f"Retrieval memo: {stats}")
+        return stats
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import re
+from time import monotonic
+
+from ddgs import DDGS
+
+from semant_demo.config import Config
+
+
+class WebSearchProvider:
+    """
+    Source of web search results (text snippets).
+    """
+
+    async def search(self, query: str, max_results: int) -> list[str]:
+        """
+        :param query: search query
+        :param max_results: maximal number of returned snippets
+        :return: text snippets
+        """
+        raise NotImplementedError()
+
+
+class DuckDuckGoProvider(WebSearchProvider):
+    """
+    DuckDuckGo search. The ddgs client is blocking, so each search runs in a worker thread.
+    """
+
+    @staticmethod
+    def _search(query: str, max_results: int) -> list[str]:
+        with DDGS() as ddgs:
+            return [r["body"] for r in ddgs.text(query, max_results=max_results)]
+
+    async def search(self, query: str, max_results: int) -> list[str]:
+        return await asyncio.to_thread(self._search, query, max_results)
+
+
+class StaticWebSearchProvider(WebSearchProvider):
+    """
+    Local stand-in provider for tests and benchmarks. Returns results registered for a keyword set,
+    or the default results.
+    """
+
+    def __init__(self, results: dict[str, list[str]] | None = None, default: list[str] | None = None,
+                 latency: float = 0.0):
+        self.results = {keyword_key(q): r for q, r in (results or {}).items()}
+        self.default = default or []
+        self.latency = latency
+        self.calls = 0
+
+    async def search(self, query: str, max_results: int) -> list[str]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.results.get(keyword_key(query), self.default)[:max_results]
+
+
+def keyword_key(query: str) -> frozenset[str]:
+    """
+    Cache key of a query - set of its lower-cased keywords, so word order, punctuation and repeated words do not matter.
+    """
+    return frozenset(re.findall(r"\w+", query.casefold()))
+
+
+class WebSearcher:
+    """
+    Cached and concurrency limited front of a web search provider, shared by all RAG instances.
+    """
+
+    def __init__(self, provider: WebSearchProvider, cache_ttl: float = 3600.0, max_concurrency: int = 2,
+                 timeout: float = 10.0, max_results: int = 8, cache_size: int = 1024):
+        """
+        :param provider: web search provider
+        :param cache_ttl: seconds a result stays in the cache
+        :param max_concurrency: max number of provider searches running at the same time (process wide)
+        :param timeout: seconds one query may take, including waiting for a free slot
+        :param max_results: snippets requested per query
+        :param cache_size: max number of cached keyword sets
+        """
+        self.provider = provider
+        self.cache_ttl = cache_ttl
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_results = max_results
+        self.cache_size = cache_size
+        self._cache: dict[frozenset[str], tuple[float, list[str]]] = {}
+        self._in_flight: dict[frozenset[str], asyncio.Future] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # created lazily so it is bound to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _cache_get(self, key: frozenset[str]) -> list[str] | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at < monotonic():
+            del self._cache[key]
+            return None
+        return results
+
+    def _cache_put(self, key: frozenset[str], results: list[str]):
+        if len(self._cache) >= self.cache_size:
+            # drop the entry closest to expiration
+            del self._cache[min(self._cache, key=lambda k: self._cache[k][0])]
+        self._cache[key] = (monotonic() + self.cache_ttl, results)
+
+    async def _limited_search(self, query: str) -> list[str]:
+        semaphore = self._get_semaphore()
+        async with asyncio.timeout(self.timeout):
+            await semaphore.acquire()
+            task = asyncio.ensure_future(self.provider.search(query, self.max_results))
+            # the slot is released when the provider really finishes, not when we stop waiting,
+            # so timed out searches still count against the limit and worker threads cannot pile up
+            task.add_done_callback(lambda _: semaphore.release())
+            return await asyncio.shield(task)
+
+    async def search(self, query: str) -> list[str]:
+        """
+        Searches the web for a single query. Failures and timeouts are logged and result in no snippets.
+
+        :param query: search query
+        :return: text snippets
+        """
+        key = keyword_key(query)
+        if not key:
+            return []
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            results = list(dict.fromkeys(await self._limited_search(query)))
+            self._cache_put(key, results)
+        except TimeoutError:
+            logging.warning(f"Web search timed out after {self.timeout}s: {query}")
+            results = []
+        except Exception as e:
+            logging.error(f"Web search failed: {query}: {e}")
+            results = []
+        except BaseException:
+            # cancelled, callers waiting for the same keywords must not hang
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(results)
+        return results
+
+    async def search_many(self, queries: list[str]) -> list[str]:
+        """
+        Searches all query variants in parallel.
+
+        :param queries: query variants (e.g. keywords and the full question)
+        :return: unique snippets in the order of the queries
+        """
+        results = await asyncio.gather(*(self.search(q) for q in queries))
+        return list(dict.fromkeys(snippet for snippets in results for snippet in snippets))
+
+
+WEB_SEARCH_PROVIDERS = {
+    "duckduckgo": DuckDuckGoProvider,
+    "static": StaticWebSearchProvider,
+}
+
+_web_searcher: WebSearcher | None = None
+
+
+def get_web_searcher(config: Config) -> WebSearcher:
+    """
+    Process wide web searcher, so the cache and the concurrency limit are shared by all RAG instances.
+    """
+    global _web_searcher
+    if _web_searcher is None:
+        provider_cls = WEB_SEARCH_PROVIDERS.get(config.WEB_SEARCH_PROVIDER)
+        if provider_cls is None:
+            raise ValueError(f"Unknown web search provider: {config.WEB_SEARCH_PROVIDER}")
+        _web_searcher = WebSearcher(
+            provider=provider_cls(),
+            cache_ttl=config.WEB_SEARCH_CACHE_TTL,
+            max_concurrency=config.WEB_SEARCH_MAX_CONCURRENCY,
+            timeout=config.WEB_SEARCH_TIMEOUT,
+            max_results=config.WEB_SEARCH_MAX_RESULTS,
+        )
+    return _web_searcher
@@ -0,0 +1,42 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from semant_demo.config import config
+from semant_demo.profiler import ProfilerBusyError, profile
+from semant_demo.users.auth import current_superuser
+from semant_demo.users.models import User
+
+logger = logging.getLogger(__name__)
+
+exp_router = APIRouter()
+
+
+@exp_router.post("/api/admin/profile", response_class=PlainTextResponse, tags=["admin"])
+async def profile_backend(
+    seconds: float = Query(10.0, gt=0, description="Profile duration in seconds"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Sampling interval in milliseconds"),
+    include_idle: bool = Query(False, description="Keep samples of the event loop waiting for I/O"),
+    user: User = Depends(current_superuser),
+) -> PlainTextResponse:
+    """
+    Samples the stacks of this worker for ``seconds`` while it serves other requests
+    and returns them in the collapsed stack format (flamegraph.pl, speedscope).
+    Superusers only.
+    """
+    if seconds > config.PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"seconds must be at most {config.PROFILER_MAX_SECONDS}")
+    logger.info("Profiling for %.1f s requested by %s", seconds, user.email)
+    try:
+        profiler = await profile(seconds, interval=interval_ms / 1000, include_idle=include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "Content-Disposition": 'attachment; filename="profile.folded"',
+            "X-Profile-Samples": str(profiler.samples),
+        },
+    )
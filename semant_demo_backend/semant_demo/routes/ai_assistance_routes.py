@@ -34,6 +34,7 @@ from semant_demo.ai_assistance.topicer_client import (
     propose_for_text_chunk,
     topicer_client,
 )
+from semant_demo.ai_assistance.span_writer import BatchSpanWriter
 from semant_demo.routes.dependencies import get_search
 from semant_demo.schema.ai_assistance import (
     DeleteAutoSpansRequest,
@@ -86,8 +87,7 @@ async def _load_tag_dicts(
     return out
 
 
-async def _persist_proposal(
-    searcher: WeaviateAbstraction,
+def _proposal_to_span(
     *,
     chunk_id: str,
     chunk_length: int,
@@ -96,11 +96,11 @@ async def _persist_proposal(
     span_end: int,
     reason: str | None = None,
     confidence: float | None = None,
-) -> schemas.TagSpan | None:
+) -> PostSpan | None:
     """
-    Validate offsets and persist a single proposal as an auto-typed span.
+    Validate offsets of a proposal and convert it to an auto-typed span.
 
-    Returns the created TagSpan, or None on validation failure.
+    Returns None on validation failure.
     """
     if span_start is None or span_end is None:
         return None
@@ -108,20 +108,50 @@ async def _persist_proposal(
     end = min(int(span_end), chunk_length)
     if end <= start:
         return None
+    return PostSpan(
+        chunkId=str(chunk_id),
+        tagId=str(tag_id),
+        start=start,
+        end=end,
+        type=schemas.SpanType.auto,
+        reason=reason,
+        confidence=confidence,
+    )
+
+
+async def _persist_proposal(
+    searcher: WeaviateAbstraction,
+    *,
+    chunk_id: str,
+    chunk_length: int,
+    tag_id: str,
+    span_start: int,
+    span_end: int,
+    reason: str | None = None,
+    confidence: float | None = None,
+) -> schemas.TagSpan | None:
+    """
+    Validate offsets and persist a single proposal as an auto-typed span.
+
+    Returns the created TagSpan, or None on validation failure.
+    """
+    span = _proposal_to_span(
+        chunk_id=chunk_id,
+        chunk_length=chunk_length,
+        tag_id=tag_id,
+        span_start=span_start,
+        span_end=span_end,
+        reason=reason,
+        confidence=confidence,
+    )
+    if span is None:
+        return None
     try:
-        return await searcher.span.create(PostSpan(
-            chunkId=str(chunk_id),
-            tagId=str(tag_id),
-            start=start,
-            end=end,
-            type=schemas.SpanType.auto,
-            reason=reason,
-            confidence=confidence,
-        ))
+        return await searcher.span.create(span)
     except Exception as e:
         logger.warning(
             "Failed to persist auto span (chunk=%s, tag=%s, start=%s, end=%s): %s",
-            chunk_id, tag_id, start, end, e,
+            chunk_id, tag_id, span.start, span.end, e,
         )
         return None
 
@@ -144,7 +174,10 @@ async def _thorough_stream(
 
     Per-chunk Topicer calls are dispatched concurrently (bounded by
     :data:`_THOROUGH_CONCURRENCY`); results are streamed to the client in
-    completion order (not original chunk order).
+    completion order (not original chunk order). Proposals of all chunks are
+    persisted by one :class:`BatchSpanWriter`, a chunk's result is emitted once
+    the batch holding its spans is stored. Proposals equal to an existing span
+    (same chunk, tag and offsets) are not stored again.
     """
     tags = await _load_tag_dicts(searcher, tag_ids)
     if not tags:
@@ -156,13 +189,20 @@ async def _thorough_stream(
     if not chunks:
         return
 
+    try:
+        existing = await searcher.span.read_batch(
+            [str(c.id) for c in chunks], collection_id,
+        )
+    except Exception as e:
+        logger.warning("Failed to load existing spans, proposals are not deduplicated: %s", e)
+        existing = {}
+
     sem = asyncio.Semaphore(_THOROUGH_CONCURRENCY)
 
     async def process_chunk(
-        client, chunk,
+        client, writer: BatchSpanWriter, chunk,
     ) -> SuggestSpansChunkResult:
         async with sem:
-            new_spans: list[schemas.TagSpan] = []
             err: str | None = None
             try:
                 proposals = await propose_for_text_chunk(
@@ -175,33 +215,41 @@ async def _thorough_stream(
                 err = f"topicer: {e}"
                 proposals = []
 
-            for proposal in proposals:
-                tag_obj = proposal.get("tag") or {}
-                tag_id = tag_obj.get("id")
-                if not tag_id:
-                    continue
-                span = await _persist_proposal(
-                    searcher,
-                    chunk_id=str(chunk.id),
-                    chunk_length=len(chunk.text or ""),
-                    tag_id=str(tag_id),
-                    span_start=proposal.get("span_start"),
-                    span_end=proposal.get("span_end"),
-                    reason=proposal.get("reason"),
-                    confidence=proposal.get("confidence"),
-                )
-                if span is not None:
-                    new_spans.append(span)
-
-            return SuggestSpansChunkResult(
+        # persisting does not hold a Topicer slot
+        spans: list[PostSpan] = []
+        for proposal in proposals:
+            tag_obj = proposal.get("tag") or {}
+            tag_id = tag_obj.get("id")
+            if not tag_id:
+                continue
+            span = _proposal_to_span(
                 chunk_id=str(chunk.id),
-                spans=new_spans,
-                error=err,
+                chunk_length=len(chunk.text or ""),
+                tag_id=str(tag_id),
+                span_start=proposal.get("span_start"),
+                span_end=proposal.get("span_end"),
+                reason=proposal.get("reason"),
+                confidence=proposal.get("confidence"),
             )
+            if span is not None:
+                spans.append(span)
 
-    async with topicer_client() as client:
+        new_spans: list[schemas.TagSpan] = []
+        try:
+            new_spans = await writer.write(spans)
+        except Exception as e:
+            err = f"{err}; " if err else ""
+            err += f"failed to store spans: {e}"
+
+        return SuggestSpansChunkResult(
+            chunk_id=str(chunk.id),
+            spans=new_spans,
+            error=err,
+        )
+
+    async with topicer_client() as client, BatchSpanWriter(searcher, existing=existing) as writer:
         tasks = [
-            asyncio.create_task(process_chunk(client, chunk))
+            asyncio.create_task(process_chunk(client, writer, chunk))
             for chunk in chunks
         ]
         try:
@@ -1,23 +1,33 @@
 from semant_demo.config import config
+from semant_demo.database import create_db_engine
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
 #from semant_demo.weaviate_tag import WeaviateSearchAndTag
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from typing import AsyncGenerator
 
 #summarizer
 from semant_demo.summarization.templated import TemplatedSearchResultsSummarizer
 
+from openai import AsyncOpenAI
+
+from semant_demo.ai_assistance.topicer_client import close_topicer_client
+from semant_demo.feedback_sink import close_feedback_sinks
+from semant_demo.shared_cache import close_cache_backend
+from semant_demo.tagging.job_runner import TaggingJobRunner
+from semant_demo.tagging.tagging_utils import tag_and_store
+
 _engine = None
 _async_session_maker = None
 _searcher = None
 _tagger = None
 _summarizer = None
+_span_chat_client = None
 
 def get_engine():
     global _engine, _async_session_maker
     if _engine is None:
-        _engine = create_async_engine(config.SQL_DB_URL, pool_size=20, max_overflow=60)
+        _engine = create_db_engine()
         _async_session_maker = async_sessionmaker(_engine, autocommit=False, autoflush=True, expire_on_commit=False)
     return _engine, _async_session_maker
 
@@ -32,10 +42,36 @@ async def get_search() -> WeaviateAbstraction:
         _searcher = await WeaviateAbstraction.create(config)
     return _searcher
 
+async def get_span_chat_client() -> AsyncOpenAI | None:
+    """
+    One client (and so one HTTP connection pool) for all span chat requests, None if no API key is configured.
+    """
+    global _span_chat_client
+    if _span_chat_client is None and config.SPAN_CHAT_API_KEY:
+        _span_chat_client = AsyncOpenAI(api_key=config.SPAN_CHAT_API_KEY, base_url=config.SPAN_CHAT_API_URL)
+    return _span_chat_client
+
+def create_tagging_job_runner() -> TaggingJobRunner:
+    _, session_maker = get_engine()
+
+    async def run_job(request, task_id: str):
+        await tag_and_store(request, task_id, await get_search(), session_maker)
+
+    return TaggingJobRunner(session_maker, run_job, lock_path=config.JOB_WORKER_LOCK_PATH,
+                            poll_interval=config.JOB_POLL_INTERVAL, max_concurrent=config.JOB_MAX_CONCURRENT,
+                            stale_after=config.JOB_HEARTBEAT_TIMEOUT)
+
 async def cleanup_dependencies():
-    global _engine, _async_session_maker, _searcher
+    global _engine, _async_session_maker, _searcher, _span_chat_client
     if _searcher:
         await _searcher.close()
+    if _span_chat_client:
+        await _span_chat_client.close()
+        _span_chat_client = None
+    await close_topicer_client()
+    # drain the feedback queues while the engine is still open
+    await close_feedback_sinks()
+    await close_cache_backend()
     if _engine:
         await _engine.dispose()
 
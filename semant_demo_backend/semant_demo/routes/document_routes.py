@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
 
 from semant_demo import schemas
-from semant_demo.schema.documents import DocumentBrowse, Document
+from semant_demo.schema.documents import DocumentBrowse, Document, DocumentSearchResponse
 from semant_demo.routes.dependencies import get_search
+from semant_demo.weaviate_utils.document_browse import InvalidCursorError
+from semant_demo.utils.fast_response import fast_response
 
 
 exp_router = APIRouter()
@@ -28,31 +30,64 @@ async def browse_documents(collection_id: str | None = None,
                            author: str | None = None,
                            publisher: str | None = None,
                            document_type: str | None = None,
+                           cursor: str | None = Query(default=None, description="next_cursor of the previous page, replaces offset"),
                            searcher: WeaviateAbstraction = Depends(get_search)) -> DocumentBrowse:
     """
         Browses documents which belong to collection given by id with pagination, filtering and sorting options
     """
-    return await searcher.document.browse_documents(
-        collection_id=collection_id,
-        limit=limit,
-        offset=offset,
-        sort_by=sort_by,
-        sort_desc=sort_desc,
-        title=title,
-        author=author,
-        publisher=publisher,
-        document_type=document_type
-    )
+    try:
+        return await searcher.document.browse_documents(
+            collection_id=collection_id,
+            limit=limit,
+            offset=offset,
+            sort_by=sort_by,
+            sort_desc=sort_desc,
+            title=title,
+            author=author,
+            publisher=publisher,
+            document_type=document_type,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@exp_router.get("/api/documents/search", response_model=DocumentSearchResponse, response_model_exclude_none=True)
+async def search_documents(q: str = Query(min_length=1, description="Words searched in title, author, publisher and type"),
+                           collection_id: str | None = None,
+                           limit: int = Query(default=20, ge=1, le=200),
+                           searcher: WeaviateAbstraction = Depends(get_search)) -> DocumentSearchResponse:
+    """
+        Searches documents by their metadata, ranked by BM25 with per-field weights
+    """
+    return await searcher.document.search(query=q, collection_id=collection_id, limit=limit)
 
 
 @exp_router.get("/api/documents/{document_id}/{collection_id}/chunks", response_model=schemas.DocumentDetail, response_model_exclude_none=True)
 async def fetch_document_chunks(document_id: str,
                                 collection_id: str,
+                                projection: schemas.ChunkProjection = schemas.ChunkProjection.full,
+                                from_order: int | None = Query(default=None, ge=0, description="First chunk order of the window"),
+                                to_order: int | None = Query(default=None, ge=0, description="Last chunk order of the window"),
+                                limit: int | None = Query(default=None, ge=1, le=1000, description="Chunks per page, whole window if not set"),
+                                cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
                                 searcher: WeaviateAbstraction = Depends(get_search)) -> schemas.DocumentDetail:
     """
-    Retrieves all chunks for one document and marks whether each chunk belongs to the selected collection.
+    Retrieves chunks of one document sorted by order and marks whether each chunk belongs to the selected collection.
+    Chunks can be limited to an order window, paged by cursor and projected to an outline without text.
     """
-    response = await searcher.document.read_document_chunks(document_id=document_id, collection_id=collection_id)
+    try:
+        response = await searcher.document.read_document_chunks(
+            document_id=document_id,
+            collection_id=collection_id,
+            projection=projection,
+            from_order=from_order,
+            to_order=to_order,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if response is None:
         raise HTTPException(status_code=404, detail=f"Document with id {document_id} not found")
-    return response
+    return fast_response(response, exclude_none=True)
@@ -1,13 +1,23 @@
+import asyncio
 import json
 import logging
 import random
 import uuid
-from typing import NoReturn
+from typing import AsyncGenerator, NoReturn
 
 import httpx
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from semant_demo import schemas
+from semant_demo.ai_assistance.topicer_client import (
+    PAYLOAD_NAMESPACE,
+    topicer_breaker,
+    topicer_cache,
+    topicer_cache_key,
+    topicer_client,
+)
+from semant_demo.circuit_breaker import CircuitOpenError
 from semant_demo.config import config
 
 
@@ -19,6 +29,7 @@ TOPICER_CONFIGS_PATH = "/v1/configs"
 TOPICER_PROPOSE_MOST_PROBABLE_TAG_PATH = "/v1/tags/propose/texts/most_probable"
 CONFIG_NAME = "openai-xsucha"
 MAX_INLINE_SUGGESTIONS = 3
+_NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 def _topicer_http_timeout() -> httpx.Timeout:
@@ -142,9 +153,9 @@ def _topicer_proposal_to_auto_suggestions(
     return suggestions
 
 
-def _raise_topicer_gateway_error(detail: str) -> NoReturn:
+def _raise_topicer_gateway_error(detail: str, status_code: int = status.HTTP_502_BAD_GATEWAY) -> NoReturn:
     raise HTTPException(
-        status_code=status.HTTP_502_BAD_GATEWAY,
+        status_code=status_code,
         detail=detail,
     )
 
@@ -180,6 +191,125 @@ async def propose_tags_mock(
     )
 
 
+class _MethodNotApplicableError(Exception):
+    """Topicer config does not implement the requested method."""
+
+    def __init__(self, config_name: str):
+        super().__init__(config_name)
+        self.config_name = config_name
+
+
+def _method_not_applicable_detail(config_names: list[str]) -> str:
+    joined_configs = ", ".join(sorted(set(config_names)))
+    return (
+        "Tag proposal is not implemented for available Topicer configs: "
+        f"{joined_configs}. Set TOPICER_CONFIG_NAME to a config that supports tag proposal."
+    )
+
+
+def _topicer_error_detail(exc: Exception) -> str:
+    """Client facing description of a failed Topicer tag proposal."""
+    if isinstance(exc, HTTPException):
+        return str(exc.detail)
+    if isinstance(exc, _MethodNotApplicableError):
+        return _method_not_applicable_detail([exc.config_name])
+    if isinstance(exc, CircuitOpenError):
+        return f"Topicer is unavailable, retry in {exc.retry_after:.0f} s."
+    if isinstance(exc, httpx.ReadTimeout):
+        return (
+            "Topicer request timed out while waiting for LLM response. "
+            "Increase TOPICER_READ_WRITE_TIMEOUT (or TOPICER_TIMEOUT)."
+        )
+    if isinstance(exc, httpx.HTTPStatusError):
+        response_text = _extract_topicer_error_detail(exc.response)[:500]
+        return f"Topicer request failed with status {exc.response.status_code}: {response_text}"
+    if isinstance(exc, httpx.HTTPError):
+        return f"Unable to contact Topicer: {exc}"
+    return str(exc)
+
+
+async def _request_proposal(
+    client: httpx.AsyncClient,
+    chunk: schemas.TextChunk,
+    topicer_tags: list[dict[str, str]],
+) -> object:
+    """Raw Topicer propose tags payload for one chunk, fails fast while the Topicer circuit is open."""
+    with topicer_breaker.guard() as call:
+        response = await client.post(
+            TOPICER_PROPOSE_TAGS_TEXTS_PATH,
+            params={"config_name": CONFIG_NAME},
+            json={
+                "text_chunk": {
+                    "id": str(chunk.id),
+                    "text": chunk.text,
+                },
+                "tags": topicer_tags,
+            },
+            timeout=_topicer_http_timeout(),
+        )
+        if response.status_code >= 500:
+            call.fail()
+    if response.status_code >= 400:
+        if _is_method_not_applicable_error(response):
+            raise _MethodNotApplicableError(CONFIG_NAME)
+        response.raise_for_status()
+    try:
+        return response.json()
+    except ValueError as exc:
+        LOGGER.exception("Topicer returned invalid propose tags payload.")
+        _raise_topicer_gateway_error(
+            f"Topicer returned invalid propose tags payload: {exc}")
+
+
+async def _propose_for_chunk(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    chunk: schemas.TextChunk,
+    topicer_tags: list[dict[str, str]],
+) -> list[schemas.AutoAnnotationSuggestion]:
+    """
+    Topicer tag proposal for one chunk. Responses are cached by chunk text, tags
+    and config name; only cache misses take one of the ``semaphore`` slots.
+    """
+    def to_suggestions(payload: object) -> list[schemas.AutoAnnotationSuggestion]:
+        if isinstance(payload, dict):
+            # cached payload may come from another chunk with the same text
+            payload = {**payload, "id": str(chunk.id)}
+        try:
+            return _topicer_proposal_to_auto_suggestions(
+                payload,
+                fallback_chunk_id=str(chunk.id),
+            )
+        except Exception as exc:
+            LOGGER.exception(
+                "Topicer returned invalid propose tags payload.")
+            _raise_topicer_gateway_error(
+                f"Topicer returned invalid propose tags payload: {exc}")
+
+    async def fetch() -> object:
+        async with semaphore:
+            payload = await _request_proposal(client, chunk, topicer_tags)
+        # validated before it is cached
+        to_suggestions(payload)
+        return payload
+
+    cache_key = topicer_cache_key(chunk.text, topicer_tags, CONFIG_NAME, PAYLOAD_NAMESPACE)
+    return to_suggestions(await topicer_cache.get_or_fetch(cache_key, fetch))
+
+
+def _propose_tasks(
+    client: httpx.AsyncClient,
+    body: schemas.AutoAnnotationSuggestionRequest,
+) -> list[asyncio.Task]:
+    """One task per chunk, at most TOPICER_PROPOSE_CONCURRENCY of them call Topicer at a time."""
+    semaphore = asyncio.Semaphore(max(1, config.TOPICER_PROPOSE_CONCURRENCY))
+    topicer_tags = _build_topicer_tags_payload(body.tags)
+    return [
+        asyncio.create_task(_propose_for_chunk(client, semaphore, chunk, topicer_tags))
+        for chunk in body.chunks
+    ]
+
+
 @exp_router.post(
     "/api/propose_tags",
     response_model=schemas.AutoAnnotationsSuggestionsResponse,
@@ -187,81 +317,89 @@ async def propose_tags_mock(
 async def propose_tags(
     body: schemas.AutoAnnotationSuggestionRequest,
 ) -> schemas.AutoAnnotationsSuggestionsResponse:
-    """Call Topicer tag proposal on provided chunks and tags."""
+    """
+    Call Topicer tag proposal on provided chunks and tags.
+
+    Chunks are proposed concurrently; suggestions are returned in the order of
+    the chunks in the request.
+    """
     if len(body.chunks) == 0 or len(body.tags) == 0:
         return schemas.AutoAnnotationsSuggestionsResponse(suggestions=[])
 
-    topicer_tags = _build_topicer_tags_payload(body.tags)
+    async with topicer_client() as client:
+        tasks = _propose_tasks(client, body)
+        try:
+            per_chunk = await asyncio.gather(*tasks)
+        except HTTPException:
+            raise
+        except CircuitOpenError as exc:
+            LOGGER.warning("Topicer tag proposal rejected: %s", exc)
+            _raise_topicer_gateway_error(_topicer_error_detail(exc), status.HTTP_503_SERVICE_UNAVAILABLE)
+        except (httpx.HTTPError, _MethodNotApplicableError, ValueError) as exc:
+            LOGGER.exception("Topicer tag proposal failed.")
+            _raise_topicer_gateway_error(_topicer_error_detail(exc))
+        finally:
+            # first failure fails the whole request, do not keep Topicer busy
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
-    try:
-        async with httpx.AsyncClient() as client:
-            method_not_applicable_configs: list[str] = []
-
-            all_suggestions: list[schemas.AutoAnnotationSuggestion] = []
-
-            for chunk in body.chunks:
-                response = await client.post(
-                    f"{config.TOPICER_URL}{TOPICER_PROPOSE_TAGS_TEXTS_PATH}",
-                    params={"config_name": CONFIG_NAME},
-                    json={
-                        "text_chunk": {
-                            "id": str(chunk.id),
-                            "text": chunk.text,
-                        },
-                        "tags": topicer_tags,
-                    },
-                    timeout=_topicer_http_timeout(),
-                )
+    return schemas.AutoAnnotationsSuggestionsResponse(
+        suggestions=[s for suggestions in per_chunk for s in suggestions]
+    )
 
-                if response.status_code >= 400:
-                    if _is_method_not_applicable_error(response):
-                        method_not_applicable_configs.append(CONFIG_NAME)
-                        break
-                    response.raise_for_status()
 
-                try:
-                    chunk_suggestions = _topicer_proposal_to_auto_suggestions(
-                        response.json(),
-                        fallback_chunk_id=str(chunk.id),
+async def _propose_tags_stream(
+    body: schemas.AutoAnnotationSuggestionRequest,
+) -> AsyncGenerator[bytes, None]:
+    if len(body.chunks) == 0 or len(body.tags) == 0:
+        return
+
+    async with topicer_client() as client:
+        tasks = _propose_tasks(client, body)
+        chunk_id_by_task = {task: str(chunk.id) for task, chunk in zip(tasks, body.chunks)}
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=tasks.index):
+                    result = schemas.AutoAnnotationSuggestionsChunkResult(
+                        chunk_id=chunk_id_by_task[task], suggestions=[],
                     )
-                except Exception as exc:
-                    LOGGER.exception(
-                        "Topicer returned invalid propose tags payload.")
-                    _raise_topicer_gateway_error(
-                        f"Topicer returned invalid propose tags payload: {exc}")
+                    exc = task.exception()
+                    if exc is None:
+                        result.suggestions = task.result()
+                    else:
+                        LOGGER.warning("Topicer tag proposal failed for chunk %s: %s", result.chunk_id, exc)
+                        result.error = _topicer_error_detail(exc)
+                    yield (result.model_dump_json() + "\n").encode("utf-8")
+        finally:
+            # client disconnected, free Topicer slots
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
 
-                all_suggestions.extend(chunk_suggestions)
-            else:
-                return schemas.AutoAnnotationsSuggestionsResponse(suggestions=all_suggestions)
 
-            if len(method_not_applicable_configs) > 0:
-                unique_configs = sorted(set(method_not_applicable_configs))
-                joined_configs = ", ".join(unique_configs)
-                _raise_topicer_gateway_error(
-                    "Tag proposal is not implemented for available Topicer configs: "
-                    f"{joined_configs}. Set TOPICER_CONFIG_NAME to a config that supports tag proposal."
-                )
-    except httpx.ReadTimeout as exc:
-        LOGGER.exception("Topicer request timed out.")
-        _raise_topicer_gateway_error(
-            "Topicer request timed out while waiting for LLM response. "
-            "Increase TOPICER_READ_WRITE_TIMEOUT (or TOPICER_TIMEOUT)."
-        )
-    except httpx.HTTPStatusError as exc:
-        response_text = _extract_topicer_error_detail(exc.response)[:500]
-        LOGGER.exception("Topicer returned an error response.")
-        _raise_topicer_gateway_error(
-            f"Topicer request failed with status {exc.response.status_code}: {response_text}"
-        )
-    except httpx.HTTPError as exc:
-        LOGGER.exception("Topicer request failed.")
-        _raise_topicer_gateway_error(f"Unable to contact Topicer: {exc}")
-    except ValueError as exc:
-        LOGGER.exception("Topicer configuration resolution failed.")
-        _raise_topicer_gateway_error(str(exc))
-
-    _raise_topicer_gateway_error(
-        "Topicer request did not produce a valid response.")
+@exp_router.post(
+    "/api/propose_tags/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": (
+                "Stream of AutoAnnotationSuggestionsChunkResult, one JSON object per line."
+            ),
+            "content": {_NDJSON_MEDIA_TYPE: {}},
+        }
+    },
+)
+async def propose_tags_stream(
+    body: schemas.AutoAnnotationSuggestionRequest,
+):
+    """
+    Streaming variant of :func:`propose_tags`. Each NDJSON line holds the
+    suggestions (or an error) of one chunk, in the order chunks complete.
+    """
+    return StreamingResponse(_propose_tags_stream(body), media_type=_NDJSON_MEDIA_TYPE)
 
 
 @exp_router.post(
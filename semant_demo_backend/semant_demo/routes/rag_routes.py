@@ -5,21 +5,29 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from semant_demo import schemas
+from semant_demo.config import config
+from semant_demo.feedback_sink import BatchWriter, get_sink
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
 
 #import dependencies
-from semant_demo.routes.dependencies import get_async_session, get_search #, get_engine
+from semant_demo.routes.dependencies import get_async_session, get_engine, get_search
 from semant_demo.users.auth import current_active_optional_user
 from semant_demo.users.models import User
 
 
-from semant_demo.rag.rag_factory import get_all_rag_configurations, RAG_INSTANCES
+from semant_demo.rag.rag_factory import get_all_rag_configurations, RAG_INSTANCES, RagUnavailableError, BaseRag
 
 import datetime
 import logging
 
 exp_router = APIRouter()
 
+async def _get_rag_instance(id: str) -> BaseRag:
+    try:
+        return await RAG_INSTANCES.get_instance(id)
+    except RagUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 #routest
 @exp_router.get("/api/rag/configurations", response_model=list[schemas.RagRouteConfig])
 async def get_avalaible_rag_configurations(current_user: User | None = Depends(current_active_optional_user)):
@@ -36,7 +44,7 @@ async def rag(request: schemas.RagRequestMain, searcher: WeaviateAbstraction = D
     logging.info(f"RAG request received for RAG ID: {id} with question: {request.rag_request.question}")
     
     #load class and call instance
-    rag_instance = RAG_INSTANCES[id]
+    rag_instance = await _get_rag_instance(id)
     return await rag_instance.rag_request(request=request.rag_request, searcher=searcher)
 
 @exp_router.post("/api/rag/explain")
@@ -49,37 +57,66 @@ async def explain_selection(request: schemas.ExplainRequest,
     logging.info(f"Explain request received for RAG ID: {id} with selected text: {request.selected_text}")
 
     #load class and call instance
-    rag_instance = RAG_INSTANCES[id]
+    rag_instance = await _get_rag_instance(id)
     return await rag_instance.explain_selection(request=request)
 
+def _apply_feedback(request: schemas.FeedbackRequest, ex_feedback: schemas.RagUserFeedback | None):
+    """Updates the stored feedback of the response, the new row when there is none yet."""
+    if (ex_feedback):   #update
+        ex_feedback.rating = request.rating
+        ex_feedback.comment = request.comment
+        ex_feedback.error_types = ",".join(request.error_types) if request.rating == -1 else None
+        ex_feedback.timestamp = datetime.datetime.now(datetime.timezone.utc)
+        return None
+    #create new
+    serialized_sources = [doc.model_dump(mode='json') for doc in request.sources] if request.sources else []
+    return schemas.RagUserFeedback(
+        response_id=request.response_id,
+        rag_id=request.rag_id,
+        question=request.question,
+        answer=request.answer,
+        rating=request.rating,
+        error_types= ",".join(request.error_types) if request.rating == -1 else None,
+        comment=request.comment,
+        sources=serialized_sources
+    )
+
+
+async def _write_feedback_batch(batch: list[schemas.FeedbackRequest]):
+    """Stores a batch of feedback in one transaction, the last feedback of a response wins."""
+    latest = {request.response_id: request for request in batch}
+    _, session_maker = get_engine()
+    async with session_maker() as db:
+        result = await db.execute(select(schemas.RagUserFeedback)
+                                  .where(schemas.RagUserFeedback.response_id.in_(latest)))
+        existing = {feedback.response_id: feedback for feedback in result.scalars()}
+        for response_id, request in latest.items():
+            new_feedback = _apply_feedback(request, existing.get(response_id))
+            if new_feedback is not None:
+                db.add(new_feedback)
+        await db.commit()
+
+
+def get_feedback_writer() -> BatchWriter:
+    return get_sink("rag_feedback", lambda: BatchWriter("rag_feedback", _write_feedback_batch))
+
+
 # endpoint of feedback - like/dislike
 @exp_router.post("/api/rag/feedback")
 async def save_feedback(request: schemas.FeedbackRequest, db: AsyncSession = Depends(get_async_session),
                         current_user: User | None = Depends(current_active_optional_user)):
+    if config.RAG_FEEDBACK_BATCHED:
+        if not get_feedback_writer().submit(request):
+            raise HTTPException(status_code=503, detail="Feedback backlog is full, try again later.")
+        return {"status" : "success"}
+
     try:
         selser = select(schemas.RagUserFeedback).where(schemas.RagUserFeedback.response_id == request.response_id)
         result = await db.execute(selser)
-        ex_feedback = result.scalar_one_or_none()
-
-        if (ex_feedback):   #update
-            ex_feedback.rating = request.rating
-            ex_feedback.comment = request.comment
-            ex_feedback.error_types = ",".join(request.error_types) if request.rating == -1 else None
-            ex_feedback.timestamp = datetime.datetime.now(datetime.timezone.utc)
-        else:               #create new 
-            serialized_sources = [doc.model_dump(mode='json') for doc in request.sources] if request.sources else []
-            new_feedback = schemas.RagUserFeedback(
-                response_id=request.response_id,
-                rag_id=request.rag_id,
-                question=request.question,
-                answer=request.answer,
-                rating=request.rating,
-                error_types= ",".join(request.error_types) if request.rating == -1 else None,
-                comment=request.comment,
-                sources=serialized_sources
-            )
+        new_feedback = _apply_feedback(request, result.scalar_one_or_none())
+        if new_feedback is not None:
             db.add(new_feedback)
-        
+
         await db.commit()
 
         return {"status" : "success"}
@@ -88,5 +125,3 @@ async def save_feedback(request: schemas.FeedbackRequest, db: AsyncSession = Dep
         await db.rollback()
         logging.error(f"Feedback error: {e}")
         raise HTTPException(status_code=500, detail=f"Database error.")
-
-    
\ No newline at end of file
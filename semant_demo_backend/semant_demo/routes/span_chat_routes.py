@@ -20,9 +20,10 @@ from typing import AsyncGenerator
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
+from openai import AsyncOpenAI
 
 from semant_demo.ai_assistance.span_chat import stream_span_discussion
-from semant_demo.routes.dependencies import get_search
+from semant_demo.routes.dependencies import get_search, get_span_chat_client
 from semant_demo.schema.ai_assistance import (
     DiscussSpanRequest,
     SpanChatDelta,
@@ -47,12 +48,14 @@ async def _stream(
     *,
     span_id: str,
     body: DiscussSpanRequest,
+    client: AsyncOpenAI | None,
 ) -> AsyncGenerator[bytes, None]:
     try:
         async for delta in stream_span_discussion(
             searcher,
             span_id=span_id,
             messages=body.messages,
+            client=client,
         ):
             yield _ndjson(SpanChatDelta(delta=delta))
     except Exception as e:
@@ -66,6 +69,7 @@ async def _stream(
 async def discuss_span(
     body: DiscussSpanRequest,
     searcher: WeaviateAbstraction = Depends(get_search),
+    client: AsyncOpenAI | None = Depends(get_span_chat_client),
     current_user: User = Depends(current_active_user),
 ):
     """
@@ -87,6 +91,7 @@ async def discuss_span(
             searcher,
             span_id=body.span_id,
             body=body,
+            client=client,
         ),
         media_type=_NDJSON_MEDIA_TYPE,
     )
@@ -37,6 +37,8 @@ from semant_demo.tagging.tagging_utils import getTaskByName
 
 # import dependencies
 from semant_demo.routes.dependencies import get_async_session, get_engine, get_search
+from semant_demo.ai_assistance.span_chat import span_context_cache
+from semant_demo.utils.fast_response import fast_response
 from semant_demo.schema.spans import (
     PostSpan,
     PatchSpan,
@@ -44,7 +46,11 @@ from semant_demo.schema.spans import (
     DeleteSpansForTagsResponse,
     BulkUpdateSpansRequest,
     BulkUpdateSpansResponse,
+    SpanSegmentModel,
+    SpanViewportResponse,
+    ViewportSpan,
 )
+from semant_demo.weaviate_utils.span_index import span_index
 logging.basicConfig(level=logging.INFO)
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -74,7 +80,7 @@ async def read_tag_spans(
     """
     Get stored TagSpans for a given chunk ID and collection ID.
     """
-    return await tagger.span.read_all(chunk_id=chunk_id, collection_id=collection_id)
+    return fast_response(await tagger.span.read_all(chunk_id=chunk_id, collection_id=collection_id))
 
 
 @exp_router.post("/api/tag_spans/batch", response_model=dict[str, list[schemas.TagSpan]])
@@ -85,7 +91,38 @@ async def read_tag_spans_batch(
     """
     Get stored TagSpans for multiple chunk IDs in a single request.
     """
-    return await tagger.span.read_batch(chunk_ids=body.chunk_ids, collection_id=body.collection_id)
+    return fast_response(await tagger.span.read_batch(chunk_ids=body.chunk_ids, collection_id=body.collection_id))
+
+
+@exp_router.get("/api/tag_spans/viewport", response_model=SpanViewportResponse)
+async def read_tag_spans_in_viewport(
+    document_id: str,
+    collection_id: str,
+    from_order: int = Query(ge=0, description="Order of the first visible chunk"),
+    to_order: int = Query(ge=0, description="Order of the last visible chunk"),
+    tagger: WeaviateAbstraction = Depends(get_search)
+) -> SpanViewportResponse:
+    """
+    Get TagSpans touching the chunks with order in [from_order, to_order], including
+    cross-chunk spans starting before the viewport. Each span is split into per-chunk segments.
+    """
+    if to_order < from_order:
+        raise HTTPException(status_code=400, detail="to_order must not be smaller than from_order")
+    index = await span_index.get(tagger, document_id, collection_id)
+    spans = [
+        ViewportSpan(
+            **span.model_dump(),
+            segments=[SpanSegmentModel(**vars(segment)) for segment in index.segments(span)],
+        )
+        for span in index.touching_orders(from_order, to_order)
+    ]
+    return SpanViewportResponse(
+        document_id=document_id,
+        collection_id=collection_id,
+        from_order=from_order,
+        to_order=to_order,
+        spans=spans,
+    )
 
 
 @exp_router.patch("/api/tag_spans/{span_id}", response_model=schemas.TagSpan)
@@ -97,7 +134,7 @@ async def update_tag_span(
     """
     Update TagSpan's information (start, end, tagId, ...)
     """
-
+    span_context_cache.invalidate_span(span_id)
     return await tagger.span.update(
         span_id=span_id,
         update_fields=body
@@ -118,6 +155,8 @@ async def bulk_update_tag_spans(
     Used by the AI-assist "Approve / Reject all selected" action — collapses
     N PATCH calls into one and lets the server fan them out concurrently.
     """
+    for span_id in body.span_ids:
+        span_context_cache.invalidate_span(span_id)
     spans = await tagger.span.bulk_update(
         span_ids=body.span_ids,
         update_fields=body.update,
@@ -134,6 +173,7 @@ async def delete_tag_span(
     Delete a TagSpan's information
     """
     await tagger.span.delete(span_id=span_id)
+    span_context_cache.invalidate_span(span_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
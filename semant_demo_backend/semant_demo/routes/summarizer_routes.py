@@ -1,4 +1,5 @@
 
+import asyncio
 import openai
 import time
 import os
@@ -7,18 +8,25 @@ from fastapi import APIRouter, Depends, HTTPException
 from semant_demo import schemas
 from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
 from semant_demo.config import config
+from semant_demo.gemma_embedding import EMBEDDING_UNAVAILABLE
 from semant_demo.summarization.templated import TemplatedSearchResultsSummarizer
 
 #import dependencies
 from semant_demo.routes.dependencies import get_search, get_summarizer #, get_engine
 from semant_demo.users.auth import current_active_optional_user
 from semant_demo.users.models import User
+from semant_demo.utils.fast_response import fast_response
+from semant_demo.shared_cache import shared_cache
 import logging
 from openai import AsyncOpenAI
 
 
 exp_router = APIRouter()
 
+# shared by the workers with CACHE_BACKEND=sqlite, disabled unless SEARCH_CACHE_TTL / LLM_CACHE_TTL are set
+search_cache = shared_cache("search_response", config.SEARCH_CACHE_TTL)
+summary_cache = shared_cache("llm_summary", config.LLM_CACHE_TTL)
+
 
 def get_openai_client() -> AsyncOpenAI:
     return AsyncOpenAI(api_key=config.OPENAI_API_KEY)
@@ -30,21 +38,42 @@ async def search(req: schemas.SearchRequest, searcher: WeaviateAbstraction = Dep
     start_time = time.time()
 
     # <authorization>
+    query_vector = None
+    embedding_error = None
     if req.user_collection_id is not None:
         if current_user is None:
             raise HTTPException(status_code=401, detail="Unauthorized: user collection specified but no user authenticated")
-        collections = await searcher.userCollection.read_all(current_user)
-        user_collection_ids = {str(col.id) for col in collections}
-        if req.user_collection_id not in user_collection_ids:
+        # the access check runs while the query is being embedded
+        embedding = asyncio.create_task(searcher.textChunk.embed_query(req))
+        try:
+            allowed = await searcher.userCollection.has_access(current_user, req.user_collection_id)
+        except BaseException:
+            embedding.cancel()
+            raise
+        if not allowed:
+            embedding.cancel()
             raise HTTPException(status_code=403, detail="Forbidden: user does not have access to the specified collection")
+        try:
+            query_vector = await embedding
+        except EMBEDDING_UNAVAILABLE as e:
+            # search falls back to text search without embedding the query again
+            embedding_error = e
 
     # </authorization>
 
-    response = await searcher.textChunk.search(req)
-    await summarizer(req, response)
+    cache_key = search_cache.make_key(req.model_dump(mode="json")) if search_cache.enabled else None
+    cached = await search_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        response = schemas.SearchResponse.model_validate(cached)
+    else:
+        response = await searcher.textChunk.search(req, query_vector=query_vector, embedding_error=embedding_error)
+        await summarizer(req, response)
+        # degraded responses (text search instead of vector or hybrid) are not cached
+        if cache_key and response.search_request.type == req.type:
+            await search_cache.set(cache_key, response.model_dump(mode="json"))
 
     response.time_spent = time.time() - start_time
-    return response
+    return fast_response(response)
 
 
 @exp_router.post("/api/summarize/{summary_type}", response_model=schemas.SummaryResponse)
@@ -56,10 +85,15 @@ async def summarize(search_response: schemas.SearchResponse, summary_type: str,
         # only "results" is supported now
         raise HTTPException(status_code=400, detail=f"Unknown summary type: {summary_type}")
 
-    summary = await summarizer.gen_results_summary(
-        search_response.search_request.query,
-        search_response.results,
-    )
+    query = search_response.search_request.query
+    key = summary_cache.make_key(query, [chunk.text for chunk in search_response.results])
+
+    async def generate() -> str:
+        if not summarizer.api.available:
+            raise HTTPException(status_code=503, detail="LLM is unavailable, try again later")
+        return await summarizer.gen_results_summary(query, search_response.results)
+
+    summary = await summary_cache.get_or_compute(key, generate)
     time_spent = time.time() - start_time
     return schemas.SummaryResponse(
         summary=summary,
@@ -34,9 +34,12 @@ import yaml
 
 from semant_demo.tagging.sql_utils import DBError, update_task_status
 from semant_demo.tagging.tagging_utils import getTaskByName
+from semant_demo.tagging.job_runner import queue_tagging_task, request_cancel
+from semant_demo.config import config
 
 #import dependencies
 from semant_demo.routes.dependencies import get_async_session, get_engine, get_search
+from semant_demo.ai_assistance.span_chat import span_context_cache
 from semant_demo.users.auth import current_active_optional_user, current_active_user
 from semant_demo.users.models import User
 from semant_demo.schema.tags import PatchTag, Tag, PostTag
@@ -87,6 +90,7 @@ async def delete_tag(tag_uuid: str,
     Deletes tag
     """
     await searcher.tag.delete(tag_uuid)
+    span_context_cache.invalidate_tag(tag_uuid)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @exp_router.patch("/api/tags/{tag_uuid}", response_model=Tag)
@@ -97,6 +101,7 @@ async def update_tag(tag_uuid: str, tag_update: PatchTag,
     """
     try:
         response = await searcher.tag.update(tag_uuid, tag_update)
+        span_context_cache.invalidate_tag(tag_uuid)
         return response
     except WeaviateOperationError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from exc
@@ -111,6 +116,15 @@ async def start_tagging(tagReq: schemas.TaggingTaskReqTemplate,
     """
     logging.info("Tagging...")
     taskId = str(uuid.uuid4())  # generate id for current task
+    if config.TAGGING_JOBS_QUEUED:
+        # run by the job worker, whichever worker accepted the request
+        try:
+            await queue_tagging_task(session, taskId, tagReq)
+        except exc.SQLAlchemyError as e:
+            logging.exception(f'Failed adding object to database. Task ID={taskId}')
+            raise HTTPException(status_code=500, detail=f'Failed adding new task object to database. Task ID={taskId}')
+        return {"job_started": True, "task_id": taskId, "message": "Tagging task queued"}
+
     try:
         try:
             async with session.begin():
@@ -228,6 +242,11 @@ async def cancel_task(taskId: str, session: AsyncSession = Depends(get_async_ses
     """
     Cancel running task
     """
+    if config.TAGGING_JOBS_QUEUED:
+        if await request_cancel(session, taskId):
+            return {"message": f"Task {taskId} cancelled", "taskCanceled": True}
+        return {"message": f"No running task {taskId}", "taskCanceled": False}
+
     taskName = ""
     # get task by its name
     try:
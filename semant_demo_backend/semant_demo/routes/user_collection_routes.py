@@ -9,6 +9,7 @@ from semant_demo.users.auth import current_active_user, current_active_optional_
 from semant_demo.users.models import User
 
 from semant_demo.weaviate_exceptions import WeaviateOperationError
+from semant_demo.utils.fast_response import fast_response
 
 import os
 import openai
@@ -49,13 +50,15 @@ async def create_user_collection(collectionReq: PostCollection,
 
 
 @exp_router.get("/api/user_collections", response_model=list[Collection])
-async def fetch_collections(searcher: WeaviateAbstraction = Depends(get_search),
+async def fetch_collections(limit: int | None = Query(default=None, ge=1, le=1000),
+                            offset: int = Query(default=0, ge=0),
+                            searcher: WeaviateAbstraction = Depends(get_search),
                             current_user: User = Depends(current_active_user)) -> list[Collection]:
     """
-    Retrieves all collections for given user
+    Retrieves collections for given user ordered by creation time, all of them if limit is not given
     """
     
-    response = await searcher.userCollection.read_all(current_user)
+    response = await searcher.userCollection.read_all(current_user, limit=limit, offset=offset)
     return response
 
 
@@ -128,7 +131,7 @@ async def get_collection_chunks(collection_id: str,
     try:
         logging.info(f"In get collection chunks {collection_id}")
         response = await searcher.userCollection.read_all_chunks(collection_id)
-        return response
+        return fast_response(response)
     except Exception as e:
         logging.error(f"{e}")
 
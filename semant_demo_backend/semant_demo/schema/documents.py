@@ -29,9 +29,19 @@ class Document(BaseModel):
 class DocumentBrowse(BaseModel):
     items: list[Document]
     next_offset: int | None = None
+    # opaque keyset cursor of the next page, preferred over next_offset
+    next_cursor: str | None = None
     has_more: bool
     total_count: int
 
+class DocumentSearchHit(BaseModel):
+    document: Document
+    score: float
+
+class DocumentSearchResponse(BaseModel):
+    query: str
+    hits: list[DocumentSearchHit]
+
 class DocumentStats(BaseModel):
     document_id: str
     collection_id: str
@@ -50,4 +50,25 @@ class DeleteSpansForTagsRequest(BaseModel):
 
 class DeleteSpansForTagsResponse(BaseModel):
     """Result of a bulk per-tag deletion."""
-    deleted: int
\ No newline at end of file
+    deleted: int
+
+class SpanSegmentModel(BaseModel):
+    """Part of a span inside one chunk, offsets are local to that chunk."""
+    chunk_id: str
+    order: int
+    start: int
+    end: int
+
+
+class ViewportSpan(TagSpan):
+    """Span with its per-chunk segments (more than one for cross-chunk spans)."""
+    segments: list[SpanSegmentModel]
+
+
+class SpanViewportResponse(BaseModel):
+    """Spans touching the chunks currently shown in the document viewer."""
+    document_id: str
+    collection_id: str
+    from_order: int
+    to_order: int
+    spans: list[ViewportSpan]
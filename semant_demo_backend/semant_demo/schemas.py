@@ -6,7 +6,7 @@ import uuid
 from uuid import UUID
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import Column, String, JSON, Integer, DateTime, Text
+from sqlalchemy import Boolean, Column, String, JSON, Integer, DateTime, Text
 import sqlalchemy.sql.functions as funcs
 
 
@@ -118,9 +118,27 @@ class DocumentDetailTextChunkWithUserCollectionInfo(TextChunk):
     in_user_collection: bool
 
 
+class ChunkProjection(str, Enum):
+    full = "full"        # all chunk properties including text
+    outline = "outline"  # ids, order, titles and pages only
+
+
+class DocumentDetailChunkOutline(BaseModel):
+    id: uuid.UUID
+    document: uuid.UUID
+    order: int | None
+    title: str | None = None
+    start_page_id: uuid.UUID | None = None
+    from_page: int | None = None
+    to_page: int | None = None
+    in_user_collection: bool
+
+
 class DocumentDetail(BaseModel):
     document: Document
-    chunks: list[DocumentDetailTextChunkWithUserCollectionInfo]
+    chunks: list[DocumentDetailTextChunkWithUserCollectionInfo | DocumentDetailChunkOutline]
+    # set when the chunks were paged and more follow
+    next_cursor: str | None = None
 
 
 class FilteredChunksByTags(BaseModel):
@@ -211,6 +229,8 @@ class RagResponse(BaseModel):
     time_spent: float
     response_id: str
     sources: list[TextChunkWithDocument]
+    # Optional breakdown of time_spent and related counters (e.g. avoided searches)
+    timing: dict[str, float] | None = None
 
 
 class ExtractedMeradata(BaseModel):
@@ -238,6 +258,8 @@ class AdaptiveRagState(TypedDict):
     generation_iteration_counter: int
     feedback: str
     web_search_performed: bool
+    retrieval_memo: Any  # request-scoped RetrievalMemo shared by retrieval iterations
+    generation_stats: dict[str, float]  # context packing and prompt size / prefill statistics of the last generation
 
 
 class AvailableRagConfigurationsResponse(BaseModel):
@@ -521,6 +543,13 @@ class AutoAnnotationSuggestionRequest(BaseModel):
 
 class AutoAnnotationsSuggestionsResponse(BaseModel):
     suggestions: list[AutoAnnotationSuggestion]
+
+
+class AutoAnnotationSuggestionsChunkResult(BaseModel):
+    """One NDJSON line of the streamed tag proposal, suggestions of a single chunk."""
+    chunk_id: str
+    suggestions: list[AutoAnnotationSuggestion]
+    error: str | None = None
 # /Automatic annotation suggestions
 
 
@@ -558,9 +587,15 @@ class Task(TasksBase):
     collection_name = Column(String, nullable=True)
     tag_id = Column(String(36))  # 36 is max number of chars in uuid
     tag_processing_data = Column(JSON, nullable=True)
-    time_updated = Column(DateTime(timezone=True),
-                          onupdate=funcs.now())  # store updated time for loading tasks sorted by time updated
+    time_updated = Column(DateTime(timezone=True), onupdate=funcs.now(),
+                          index=True)  # store updated time for loading tasks sorted by time updated
     task_name = Column(String, nullable=True)
+    # request of a queued task, run by the job worker (TAGGING_JOBS_QUEUED)
+    request = Column(JSON, nullable=True)
+    cancel_requested = Column(Boolean, nullable=True, default=False)
+    # job worker running a queued task and its last sign of life, stale RUNNING tasks are requeued
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
 
 
 tag_class = {
@@ -0,0 +1,247 @@
+"""
+Caches shared by the worker processes of one machine.
+
+A :class:`SharedCache` is a namespace of JSON values with a TTL on top of
+a pluggable backend, chosen by ``CACHE_BACKEND``:
+
+  - ``memory``: an LRU dict of the process, the single worker default.
+  - ``sqlite``: one SQLite file (``CACHE_SQLITE_PATH``) in WAL mode, read
+    and written by every worker on the machine, so a query embedded or a
+    summary generated by one worker is served by all of them. Needs no
+    server and nothing beyond the standard library.
+
+Caches of query embeddings, search responses and LLM summaries are
+created with :func:`shared_cache`, their hits and misses are exported
+as metrics. A TTL of 0 disables a cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import anyio.to_thread
+import orjson
+
+from semant_demo.config import config
+from semant_demo.metrics import register_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Byte values by string keys with an expiration time."""
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU of the current process."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self):
+        self._entries.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache in a SQLite file shared by processes. Queries run in worker threads,
+    each with its own connection. Expired entries are removed when read, the
+    least recently written ones when the file holds more than ``max_entries``.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str | Path, max_entries: int = 100_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS cache "
+                               "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_cache_expires_at ON cache (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _get(self, key: str) -> bytes | None:
+        connection = self._connect()
+        row = connection.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            with connection:
+                connection.execute("DELETE FROM cache WHERE key = ? AND expires_at < ?", (key, time.time()))
+            return None
+        return row[0]
+
+    def _set(self, key: str, value: bytes, ttl: float):
+        connection = self._connect()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                               (key, value, time.time() + ttl))
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune(connection)
+
+    def _prune(self, connection: sqlite3.Connection):
+        with connection:
+            connection.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            # rowids grow with every INSERT OR REPLACE, the lowest ones were written first
+            connection.execute("DELETE FROM cache WHERE rowid <= "
+                               "(SELECT rowid FROM cache ORDER BY rowid DESC LIMIT 1 OFFSET ?)", (self.max_entries,))
+
+    def _clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def _close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    async def get(self, key: str) -> bytes | None:
+        return await anyio.to_thread.run_sync(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await anyio.to_thread.run_sync(self._set, key, value, ttl)
+
+    async def clear(self):
+        await anyio.to_thread.run_sync(self._clear)
+
+    async def close(self):
+        await anyio.to_thread.run_sync(self._close)
+
+
+class SharedCache:
+    """
+    JSON values of one namespace of a backend, the configured one when None.
+    Backend errors are logged and treated as misses, a broken cache never fails a request.
+    """
+
+    def __init__(self, namespace: str, ttl: float, backend: CacheBackend | None = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        # resolved on first use, importing a module with a cache does not open the file
+        return self._backend or get_cache_backend()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def make_key(self, *parts: Any) -> str:
+        """Key of the JSON serialisable ``parts``, hashed so that long texts make short keys."""
+        digest = hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    async def get(self, key: str) -> Any | None:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning("Cache %s read failed: %s", self.namespace, e)
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(value)
+
+    async def set(self, key: str, value: Any):
+        try:
+            await self.backend.set(key, orjson.dumps(value), self.ttl)
+        except Exception as e:
+            logger.warning("Cache %s write failed: %s", self.namespace, e)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value of ``key``, ``compute`` result stored on a miss. Computes every time when disabled."""
+        if not self.enabled:
+            return await compute()
+        value = await self.get(key)
+        if value is None:
+            value = await compute()
+            await self.set(key, value)
+        return value
+
+
+_backend: CacheBackend | None = None
+
+
+def get_cache_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        if config.CACHE_BACKEND == "sqlite":
+            _backend = SQLiteCacheBackend(config.CACHE_SQLITE_PATH, max_entries=config.CACHE_MAX_ENTRIES)
+        elif config.CACHE_BACKEND == "memory":
+            _backend = MemoryCacheBackend(max_entries=config.CACHE_MAX_ENTRIES)
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {config.CACHE_BACKEND!r}, use 'memory' or 'sqlite'")
+    return _backend
+
+
+def shared_cache(namespace: str, ttl: float) -> SharedCache:
+    """Cache of ``namespace`` on the configured backend, exported as the ``namespace`` cache metrics."""
+    cache = SharedCache(namespace, ttl)
+    register_cache(namespace, cache)
+    return cache
+
+
+async def close_cache_backend():
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+
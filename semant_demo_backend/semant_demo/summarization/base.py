@@ -1,3 +1,4 @@
+import logging
 from abc import ABC, abstractmethod
 from typing import Sequence, Optional
 
@@ -6,6 +7,7 @@ from classconfig.configurable import CreatableMixin
 
 from semant_demo.llm_api import APIAsync, OllamaAsyncAPI
 from semant_demo.schemas import SearchResponse, TextChunk, SummaryRequestBase
+from semant_demo.tracing import trace_span
 
 
 class SearchResultsSummarizer(ABC, ConfigurableMixin, CreatableMixin):
@@ -23,16 +25,26 @@ class SearchResultsSummarizer(ABC, ConfigurableMixin, CreatableMixin):
         :param results: search results to summarize
             Is modified in place.
         """
-
-        if request.search_title_generate:
-            await self.gen_titles(request.query, results.results, request.search_title_prompt)
-
-        if request.search_summary_generate:
-            await self.gen_query_summary_for_text_chunks(request.query, results.results, request.search_summary_prompt)
-
-        if request.search_results_summary_generate:
-            results.results_summary = await self.gen_results_summary(request.query, results.results,
-                                                                     request.search_results_summary_prompt)
+        # each phase is skipped while the LLM circuit is open, the results stay without titles and summaries
+        if request.search_title_generate and self._llm_available("titles"):
+            with trace_span("summarizer.titles", results=len(results.results)):
+                await self.gen_titles(request.query, results.results, request.search_title_prompt)
+
+        if request.search_summary_generate and self._llm_available("query summaries"):
+            with trace_span("summarizer.query_summaries", results=len(results.results)):
+                await self.gen_query_summary_for_text_chunks(request.query, results.results,
+                                                             request.search_summary_prompt)
+
+        if request.search_results_summary_generate and self._llm_available("results summary"):
+            with trace_span("summarizer.results_summary"):
+                results.results_summary = await self.gen_results_summary(request.query, results.results,
+                                                                         request.search_results_summary_prompt)
+
+    def _llm_available(self, phase: str) -> bool:
+        if self.api.available:
+            return True
+        logging.warning(f"LLM is unavailable, skipping search results {phase}.")
+        return False
 
     async def gen_titles(self, query: str, results: list[TextChunk], prompt: Optional[str] = None, model: Optional[str] = None, brevity: Optional[int] = None):
         """
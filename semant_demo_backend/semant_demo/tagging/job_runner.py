@@ -0,0 +1,192 @@
+"""
+Tagging jobs of a multi-worker deployment (``TAGGING_JOBS_QUEUED``).
+
+Started in the worker that accepted the request, an asyncio tagging task
+could only be cancelled through that same worker. Queued, the request is
+stored with the task row as ``PENDING`` and :class:`TaggingJobRunner` runs
+it in one dedicated worker: every worker runs the runner, but only the one
+holding an exclusive lock on ``JOB_WORKER_LOCK_PATH`` claims tasks. When
+that worker exits the lock is released and another one takes over.
+
+Cancellation goes through the database as well: the cancel route sets
+``cancel_requested`` and the job worker cancels the task on its next poll.
+
+A claimed task records the job worker (``worker_id``) and its heartbeat,
+refreshed on every poll. Tasks of a job worker that was killed or crashed
+stop getting heartbeats and are requeued as ``PENDING`` by the lock holder
+after ``stale_after`` seconds, tasks of a previous lock holder on the same
+machine as soon as the lock changes hands. Tasks interrupted by a graceful
+shutdown are requeued at once.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from semant_demo import schemas
+from semant_demo.schemas import Task
+from semant_demo.tagging.sql_utils import update_task_status
+
+try:
+    import fcntl
+except ImportError:  # Windows, run with a single worker there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+JobFunction = Callable[[schemas.TaggingTaskReqTemplate, str], Awaitable[None]]
+
+
+async def queue_tagging_task(session: AsyncSession, task_id: str, request: schemas.TaggingTaskReqTemplate):
+    """Stores the request of a new task for the job worker."""
+    session.add(Task(taskId=task_id, status="PENDING", request=request.model_dump(mode="json"),
+                     cancel_requested=False))
+    await session.commit()
+
+
+async def request_cancel(session: AsyncSession, task_id: str) -> bool:
+    """Cancels a pending task at once and asks the job worker to cancel a running one."""
+    result = await session.execute(
+        update(Task).where(Task.taskId == task_id, Task.status.in_(["PENDING", "RUNNING"]))
+        .values(cancel_requested=True))
+    await session.execute(
+        update(Task).where(Task.taskId == task_id, Task.status == "PENDING").values(status="CANCELED"))
+    await session.commit()
+    return result.rowcount > 0
+
+
+class TaggingJobRunner:
+    """Runs queued tagging tasks in the worker holding the job lock, at most ``max_concurrent`` at once."""
+
+    def __init__(self, session_maker: async_sessionmaker, run_job: JobFunction, lock_path: str | None,
+                 poll_interval: float = 2.0, max_concurrent: int = 4, stale_after: float = 60.0):
+        self.session_maker = session_maker
+        self.run_job = run_job
+        self.lock_path = lock_path
+        self.poll_interval = poll_interval
+        self.max_concurrent = max_concurrent
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.running: dict[str, asyncio.Task] = {}
+        self._cancel_requested: set[str] = set()
+        self._shutting_down = False
+        self._lock_file = None
+
+    def acquire_lock(self) -> bool:
+        """True when this process is the job worker."""
+        if self._lock_file is not None or self.lock_path is None or fcntl is None:
+            return True
+        lock_file = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info("Worker %d runs the queued tagging jobs", os.getpid())
+        return True
+
+    def release_lock(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    async def run(self):
+        """Polls for queued tasks and cancel requests until cancelled."""
+        try:
+            while True:
+                if self.acquire_lock():
+                    try:
+                        await self.poll()
+                    except Exception as e:
+                        logger.error("Tagging job poll failed: %s", e)
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            # interrupted tasks are requeued, not cancelled
+            self._shutting_down = True
+            tasks = list(self.running.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.release_lock()
+
+    async def poll(self):
+        async with self.session_maker() as session:
+            now = datetime.now(timezone.utc)
+            if self.running:
+                result = await session.execute(
+                    select(Task.taskId).where(Task.taskId.in_(list(self.running)), Task.cancel_requested.is_(True)))
+                for task_id in result.scalars():
+                    self._cancel_requested.add(task_id)
+                    self.running[task_id].cancel()
+                # time_updated orders the task list, a heartbeat is not an update of the task
+                await session.execute(
+                    update(Task).where(Task.taskId.in_(list(self.running)), Task.status == "RUNNING")
+                    .values(heartbeat_at=now, time_updated=Task.time_updated))
+            await self._requeue_stale(session, now)
+            await session.commit()
+
+            free = self.max_concurrent - len(self.running)
+            if free <= 0:
+                return
+            result = await session.execute(
+                select(Task.taskId, Task.request).where(Task.status == "PENDING", Task.request.is_not(None))
+                .limit(free))
+            for task_id, request in result.all():
+                # conditional update, a concurrent claim by a stale lock holder updates nothing
+                claimed = await session.execute(
+                    update(Task).where(Task.taskId == task_id, Task.status == "PENDING")
+                    .values(status="RUNNING", worker_id=self.worker_id, heartbeat_at=now))
+                await session.commit()
+                if claimed.rowcount == 1:
+                    self._start(task_id, schemas.TaggingTaskReqTemplate.model_validate(request))
+
+    async def _requeue_stale(self, session: AsyncSession, now: datetime):
+        """Requeues running tasks of job workers that stopped sending heartbeats, cancels them if requested."""
+        orphaned = [Task.heartbeat_at.is_(None), Task.heartbeat_at < now - timedelta(seconds=self.stale_after)]
+        if self._lock_file is not None:
+            # the lock changed hands, the previous job worker of this machine has exited
+            orphaned.append(Task.worker_id.startswith(f"{socket.gethostname()}:") & (Task.worker_id != self.worker_id))
+        stale = (Task.status == "RUNNING", Task.request.is_not(None), Task.taskId.not_in(list(self.running)),
+                 or_(*orphaned))
+        await session.execute(update(Task).where(*stale, Task.cancel_requested.is_(True)).values(status="CANCELED"))
+        requeued = await session.execute(
+            select(Task.taskId, Task.worker_id).where(*stale, Task.cancel_requested.is_not(True)))
+        for task_id, worker_id in requeued.all():
+            logger.warning("Requeuing tagging task %s of the stopped job worker %s", task_id, worker_id)
+            await session.execute(
+                update(Task).where(Task.taskId == task_id, Task.status == "RUNNING")
+                .values(status="PENDING", worker_id=None, heartbeat_at=None))
+
+    def _start(self, task_id: str, request: schemas.TaggingTaskReqTemplate):
+        task = asyncio.create_task(self._run_task(task_id, request), name=f"tagging-{task_id}")
+        self.running[task_id] = task
+
+    async def _run_task(self, task_id: str, request: schemas.TaggingTaskReqTemplate):
+        try:
+            await self.run_job(request, task_id)
+        except asyncio.CancelledError:
+            requeue = self._shutting_down and task_id not in self._cancel_requested
+            async with self.session_maker() as session:
+                if requeue:
+                    await session.execute(
+                        update(Task).where(Task.taskId == task_id)
+                        .values(status="PENDING", worker_id=None, heartbeat_at=None))
+                    await session.commit()
+                else:
+                    await update_task_status(task_id=task_id, status="CANCELED", session=session)
+            logger.info("Tagging task %s %s", task_id, "requeued on shutdown" if requeue else "cancelled")
+        except Exception as e:
+            logger.exception("Tagging task %s failed", task_id)
+            async with self.session_maker() as session:
+                await update_task_status(task_id=task_id, status="FAILED", result={"error": str(e)}, session=session)
+        finally:
+            self.running.pop(task_id, None)
+            self._cancel_requested.discard(task_id)
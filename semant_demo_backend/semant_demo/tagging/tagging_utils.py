@@ -20,16 +20,16 @@ from semant_demo.tagging.sql_utils import update_task_status
 import re
 import os
 
-# llm calling
-from langchain_core.prompts import ChatPromptTemplate
-from semant_demo.tagging.llm_caller import OllamaProxyRunnable
-from langchain_openai import ChatOpenAI
 import semant_demo.tagging.configs.prompt_templates as tagging_templates
 
 async def tag_chunks_with_llm(searcher: WeaviateAbstraction, tag_request: schemas.TaggingTaskReqTemplate, task_id: str, session=None) -> schemas.TagResponse:
         """
         Assigns automatic tags to chunks
         """
+        # llm calling, LangChain is imported by the first tagging task rather than on startup
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_openai import ChatOpenAI
+        from semant_demo.tagging.llm_caller import OllamaProxyRunnable
         try:
             # load config data
             # set model from config
@@ -0,0 +1,204 @@
+"""
+Lightweight in-process tracing of requests.
+
+:class:`TracingMiddleware` starts a trace, a tree of :class:`TraceSpan`, for
+every HTTP request. The current span is kept in a context variable, so spans
+opened by code awaited by the request, including tasks it creates, become
+its children::
+
+    with trace_span("weaviate.query", search_type="hybrid"):
+        ...
+
+    @traced("embedding.embed_query")
+    async def get_query_embedding(query: str): ...
+
+Outside a trace ``trace_span`` does nothing, with ``TRACING_ENABLED`` unset
+``traced`` returns the function unchanged and no middleware is installed.
+
+Requests slower than ``TRACE_SLOW_REQUEST_MS`` are written with their span
+tree as one JSON line to the slow request log (:class:`SlowRequestLog`),
+which works offline. With ``TRACE_TIMING_HEADER`` responses carry an
+``X-Debug-Timing`` header with the span durations in the Server-Timing syntax.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable
+
+import anyio.to_thread
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from semant_demo.config import config
+
+logger = logging.getLogger(__name__)
+
+TIMING_HEADER = "X-Debug-Timing"
+
+_current_span: ContextVar[TraceSpan | None] = ContextVar("semant_trace_span", default=None)
+
+
+class TraceSpan:
+    __slots__ = ("name", "attributes", "start", "end", "children")
+
+    def __init__(self, name: str, attributes: dict[str, Any] | None = None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.perf_counter()
+        self.end: float | None = None
+        self.children: list[TraceSpan] = []
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self, origin: float | None = None) -> dict:
+        """The span tree, times in milliseconds relative to the start of the root span."""
+        origin = self.start if origin is None else origin
+        data = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+        }
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.end is None:
+            data["unfinished"] = True
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in self.children]
+        return data
+
+
+def current_span() -> TraceSpan | None:
+    return _current_span.get()
+
+
+class _SpanScope:
+    __slots__ = ("span", "token")
+
+    def __init__(self, span: TraceSpan | None):
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> TraceSpan | None:
+        if self.span is not None:
+            self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is None:
+            return
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+        _current_span.reset(self.token)
+
+
+def trace_span(name: str, **attributes: Any) -> _SpanScope:
+    """Context manager of a child span of the current span, does nothing outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        return _SpanScope(None)
+    span = TraceSpan(name, attributes)
+    parent.children.append(span)
+    return _SpanScope(span)
+
+
+def traced(name: str, attributes: Callable[..., dict[str, Any]] | None = None) -> Callable:
+    """
+    Decorator running an async function in a span. ``attributes`` gets the
+    arguments of the call and returns the attributes of the span.
+    """
+    def decorator(fn: Callable) -> Callable:
+        if not config.TRACING_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await fn(*args, **kwargs)
+            with trace_span(name, **(attributes(*args, **kwargs) if attributes else {})):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def server_timing(root: TraceSpan) -> str:
+    """Total durations of the spans of a trace by name, in the Server-Timing header syntax."""
+    totals: dict[str, list[float]] = {}
+    stack = list(root.children)
+    while stack:
+        span = stack.pop()
+        entry = totals.setdefault(span.name, [0.0, 0])
+        entry[0] += span.duration
+        entry[1] += 1
+        stack.extend(span.children)
+    parts = [f"total;dur={root.duration * 1000:.1f}"]
+    for name, (duration, count) in sorted(totals.items(), key=lambda item: -item[1][0]):
+        parts.append(f'{name};dur={duration * 1000:.1f};desc="{count}x"')
+    return ", ".join(parts)
+
+
+class SlowRequestLog:
+    """JSON lines sink of the traces of slow requests, ``path`` None only logs them."""
+
+    def __init__(self, path: str | None):
+        self.path = Path(path) if path else None
+
+    def _append(self, line: str):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def write(self, trace_id: str, root: TraceSpan):
+        logger.warning("Slow request %s took %.0f ms (trace %s)", root.name, root.duration * 1000, trace_id)
+        if self.path is None:
+            return
+        line = json.dumps({"trace_id": trace_id, "timestamp": time.time(), **root.to_dict()},
+                          ensure_ascii=False, default=str)
+        await anyio.to_thread.run_sync(self._append, line)
+
+
+class TracingMiddleware:
+    """Traces every HTTP request, reports slow ones and optionally adds the timing header."""
+
+    def __init__(self, app: ASGIApp, slow_request_ms: float, sink: SlowRequestLog, timing_header: bool = False):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.sink = sink
+        self.timing_header = timing_header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root = TraceSpan(f"{scope['method']} {scope['path']}")
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.timing_header:
+                    MutableHeaders(scope=message).append(TIMING_HEADER, server_timing(root))
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_span.reset(token)
+            root.end = time.perf_counter()
+            root.attributes["status"] = status
+            route = scope.get("route")
+            if getattr(route, "path", None):
+                root.attributes["route"] = route.path
+            if root.duration * 1000 >= self.slow_request_ms:
+                await self.sink.write(uuid.uuid4().hex, root)
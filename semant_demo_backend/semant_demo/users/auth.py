@@ -1,20 +1,51 @@
 import uuid
 
-from fastapi_users import FastAPIUsers
+import jwt
+from fastapi_users import BaseUserManager, FastAPIUsers, exceptions
 from fastapi_users.authentication import AuthenticationBackend, BearerTransport, JWTStrategy
+from fastapi_users.jwt import decode_jwt
 
 from semant_demo.users.models import User
 from semant_demo.users.manager import get_user_manager
 from semant_demo.users.schemas import UserRead, UserCreate, UserUpdate
+from semant_demo.users.user_cache import auth_user_cache
 from semant_demo.config import config
 
 # JWT Bearer transport – token returned as JSON body on login
 bearer_transport = BearerTransport(tokenUrl="/api/auth/jwt/login")
 
 
+class CachedJWTStrategy(JWTStrategy[User, uuid.UUID]):
+    """JWT strategy serving users of recently verified tokens from :data:`auth_user_cache`."""
+
+    async def read_token(self, token: str | None,
+                         user_manager: BaseUserManager[User, uuid.UUID]) -> User | None:
+        if token is None:
+            return None
+        if auth_user_cache.enabled:
+            user = auth_user_cache.get(token)
+            if user is not None:
+                return user
+
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+        except jwt.PyJWTError:
+            return None
+
+        try:
+            user = await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+        auth_user_cache.put(token, user, token_expires=data.get("exp"))
+        return user
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    # 7-day lifetime; rotate secret via JWT_SECRET env var
-    return JWTStrategy(secret=config.JWT_SECRET, lifetime_seconds=60 * 60 * 24 * 7)
+    # 7-day lifetime by default; rotate secret via JWT_SECRET env var
+    return CachedJWTStrategy(secret=config.JWT_SECRET, lifetime_seconds=config.JWT_LIFETIME_SECONDS)
 
 
 auth_backend = AuthenticationBackend(
@@ -31,6 +62,7 @@ fastapi_users = FastAPIUsers[User, uuid.UUID](
 # Dependency shortcuts
 current_active_user = fastapi_users.current_user(active=True)
 current_active_optional_user = fastapi_users.current_user(active=True, optional=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
 
 # Routers (mounted in main.py)
 auth_router = fastapi_users.get_auth_router(auth_backend)
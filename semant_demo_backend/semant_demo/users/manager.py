@@ -9,6 +9,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from semant_demo.users.models import User
+from semant_demo.users.user_cache import auth_user_cache
 from semant_demo.routes.dependencies import get_async_session
 from semant_demo.config import config
 
@@ -58,6 +59,16 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         logger.info(f"User {user.id} registered.")
 
+    async def on_after_update(self, user: User, update_dict: dict, request: Optional[Request] = None):
+        # covers deactivation and password change, cached sessions must see the new state
+        auth_user_cache.invalidate_user(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        auth_user_cache.invalidate_user(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        auth_user_cache.invalidate_user(user.id)
+
     async def on_after_forgot_password(self, user: User, token: str, request: Optional[Request] = None):
         logger.info(f"User {user.id} requested password reset.")
 
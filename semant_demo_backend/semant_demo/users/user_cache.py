@@ -0,0 +1,92 @@
+"""
+Cache of users authenticated by a verified JWT.
+
+Every authenticated request decodes its bearer token and loads the user row
+from the SQL database. Span editing and AI suggestions fire many requests per
+second per user, so the result is cached by token hash for a short time
+(``AUTH_USER_CACHE_TTL``, never beyond the token expiry). User updates,
+password resets and deletions invalidate all entries of the user.
+
+Entries store the column values only; every hit gets its own detached
+``User`` instance so a request may attach it to its session (e.g. PATCH
+/users/me) without affecting concurrent requests.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from semant_demo.config import config
+from semant_demo.metrics import register_cache
+from semant_demo.users.models import User
+
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class AuthUserCache:
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._keys_by_user: dict[str, set[bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, token: str) -> User | None:
+        key = token_key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        user = User(**entry[1])
+        make_transient_to_detached(user)
+        return user
+
+    def put(self, token: str, user: User, token_expires: float | None = None):
+        if not self.enabled:
+            return
+        key = token_key(token)
+        expires = time.time() + self.ttl
+        if token_expires is not None:
+            expires = min(expires, token_expires)
+        self._entries[key] = (expires, {column: getattr(user, column) for column in _USER_COLUMNS})
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(str(user.id), set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: bytes):
+        _, values = self._entries.pop(key)
+        keys = self._keys_by_user.get(str(values["id"]))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[str(values["id"])]
+
+    def invalidate_user(self, user_id):
+        for key in self._keys_by_user.pop(str(user_id), set()):
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+
+auth_user_cache = AuthUserCache(ttl=config.AUTH_USER_CACHE_TTL, max_size=config.AUTH_USER_CACHE_SIZE)
+register_cache("auth_user", auth_user_cache)
@@ -0,0 +1,152 @@
+"""
+Fast path for large API responses.
+
+Routes returning a pydantic model let FastAPI validate it against the
+``response_model`` again and encode it, older FastAPI versions through
+JSON-compatible dicts and the stdlib ``json``. For search results with full
+document metadata or whole-book chunk lists this takes milliseconds of
+event loop time per request. :func:`fast_response` wraps a model the route
+has just built in a :class:`FastJSONResponse`, which FastAPI sends as it
+is, without validation. A model is dumped once and encoded by orjson,
+which is the fastest for text-heavy models; lists of many small models are
+encoded directly by pydantic-core (see ``api_benchmarks``).
+``response_model`` is kept on the routes for the OpenAPI schema.
+
+:class:`CompressionMiddleware` compresses complete responses above a size
+threshold with brotli (when installed) or gzip, negotiated by
+``Accept-Encoding``. Streamed responses (NDJSON, SSE, static files) are
+passed through unchanged.
+"""
+from __future__ import annotations
+
+import gzip
+from typing import Any
+
+import anyio.to_thread
+import orjson
+import pydantic_core
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from semant_demo.config import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def dump_json(content: Any, exclude_none: bool = False) -> bytes:
+    """JSON of a model, a list/dict of models or plain data, same as FastAPI would send."""
+    if isinstance(content, BaseModel):
+        return orjson.dumps(content.model_dump(exclude_none=exclude_none), option=orjson.OPT_UTC_Z)
+    return pydantic_core.to_json(content, exclude_none=exclude_none)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by :func:`dump_json`, content is not validated."""
+
+    def __init__(self, content: Any, *args, exclude_none: bool = False, **kwargs):
+        self.exclude_none = exclude_none
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content, exclude_none=self.exclude_none)
+
+
+def fast_response(content: Any, exclude_none: bool = False) -> Any:
+    """
+    The content as a :class:`FastJSONResponse` when ``FAST_RESPONSES`` is
+    enabled, otherwise unchanged for FastAPI to validate and serialise.
+    """
+    if not config.FAST_RESPONSES:
+        return content
+    return FastJSONResponse(content, exclude_none=exclude_none)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Preferred supported content coding of an ``Accept-Encoding`` header, None for identity."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = quality
+
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    ranked = [(accepted.get(e, accepted.get("*", 0.0)), -i, e) for i, e in enumerate(supported)]
+    quality, _, encoding = max(ranked)
+    return encoding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 1, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compresses complete responses of at least ``minimum_size`` bytes."""
+
+    # larger bodies are compressed in a worker thread to keep the event loop free
+    THREAD_MIN_SIZE = 256 * 1024
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 1, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or len(body) < self.minimum_size or "content-encoding" in headers:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= self.THREAD_MIN_SIZE:
+                body = await anyio.to_thread.run_sync(
+                    compress, body, encoding, self.gzip_level, self.brotli_quality)
+            else:
+                body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,154 @@
+"""
+Warm-up of a freshly started worker.
+
+The first search after a deploy used to pay for the Weaviate gRPC channel,
+the first forward pass of the embedding model, loading the Ollama model
+and importing the RAG implementations. The lifespan runs a
+:class:`Warmup` in the background instead and ``/ready`` answers 503
+until it has finished, so a load balancer routes only to warm workers
+while ``/health`` keeps reporting that the process is alive.
+
+Steps run concurrently, each with a timeout. A failed step is logged and
+reported by ``/ready`` but does not keep the worker out of rotation: the
+dependency may come up later and a cold request beats no request.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from semant_demo.config import config
+from semant_demo.gemma_embedding import get_documents_embeddings
+from semant_demo.llm_api import APIRequest
+from semant_demo.rag.rag_factory import RAG_INSTANCES
+from semant_demo.routes.dependencies import get_search, get_summarizer
+from semant_demo.schemas import TextChunk
+from semant_demo.utils.template import Template
+
+logger = logging.getLogger(__name__)
+
+WarmupStep = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class StepResult:
+    ok: bool
+    duration_ms: float
+    error: str | None = None
+
+
+class Warmup:
+    """Runs the warm-up steps once, ``ready`` when all of them have finished."""
+
+    def __init__(self, steps: dict[str, WarmupStep], timeout: float = 120.0):
+        self.steps = steps
+        self.timeout = timeout
+        self.status = "pending"
+        self.results: dict[str, StepResult] = {}
+        self.duration_ms: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    async def run(self):
+        self.status = "running"
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self.steps.items()))
+        self.duration_ms = (time.perf_counter() - t0) * 1000
+        self.status = "ready"
+        failed = [name for name, result in self.results.items() if not result.ok]
+        logger.info("Warm-up finished in %.0f ms%s", self.duration_ms,
+                    f", failed steps: {', '.join(failed)}" if failed else "")
+
+    async def _run_step(self, name: str, step: WarmupStep):
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(step(), self.timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout} s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        result = StepResult(ok=error is None, duration_ms=round((time.perf_counter() - t0) * 1000, 1), error=error)
+        self.results[name] = result
+        if error is None:
+            logger.info("Warm-up step %s took %.0f ms", name, result.duration_ms)
+        else:
+            logger.warning("Warm-up step %s failed: %s", name, error)
+
+    def report(self) -> dict:
+        return {
+            "status": self.status,
+            "duration_ms": None if self.duration_ms is None else round(self.duration_ms, 1),
+            "steps": {name: vars(self.results[name]) if name in self.results else {"ok": None}
+                      for name in self.steps},
+        }
+
+
+async def warm_up_weaviate():
+    searcher = await get_search()
+    if not await searcher.client.is_ready():
+        raise RuntimeError("Weaviate is not ready")
+
+
+async def warm_up_embedding():
+    # not the cached query embedding: the model has to run once in the embedding service
+    await get_documents_embeddings(["warm-up"])
+
+
+async def warm_up_llm():
+    summarizer = await get_summarizer()
+    models = {summarizer.gen_title_model, summarizer.gen_results_summary_model, summarizer.gen_query_summary_model}
+
+    async def touch(model: str):
+        output = await summarizer.api.process_single_request(APIRequest(
+            custom_id=f"warmup_{model}", model=model,
+            messages=[{"role": "user", "content": "Hi"}], max_completion_tokens=1))
+        if output.error is not None:
+            raise RuntimeError(f"{model}: {output.error}")
+
+    await asyncio.gather(*(touch(model) for model in models))
+
+
+async def warm_up_templates():
+    summarizer = await get_summarizer()
+    chunk = TextChunk(id=uuid.uuid4(), text="warm-up", start_page_id=uuid.uuid4(), from_page=0, to_page=0,
+                      document=uuid.uuid4(), order=0)
+    data = {"query": "warm-up", "text": chunk, "results": [chunk], "brevity": None}
+    for template in vars(summarizer).values():
+        if isinstance(template, Template):
+            template.render(data)
+
+
+async def warm_up_rag():
+    # imports the RAG implementations and builds their clients and prompts, failed ones are hidden from the frontend
+    results = await asyncio.gather(*(RAG_INSTANCES.get_instance(rag_id) for rag_id in RAG_INSTANCES),
+                                   return_exceptions=True)
+    failed = [rag_id for rag_id, result in zip(RAG_INSTANCES, results) if isinstance(result, BaseException)]
+    if failed:
+        raise RuntimeError(f"RAG configurations unavailable: {', '.join(failed)}")
+
+
+WARMUP_STEPS: dict[str, WarmupStep] = {
+    "weaviate": warm_up_weaviate,
+    "embedding": warm_up_embedding,
+    "llm": warm_up_llm,
+    "templates": warm_up_templates,
+    "rag": warm_up_rag,
+}
+
+
+def create_warmup() -> Warmup:
+    """Warm-up of the configured steps, none when ``WARMUP_ENABLED`` is off."""
+    steps = {}
+    if config.WARMUP_ENABLED:
+        for name in config.WARMUP_STEPS:
+            if name not in WARMUP_STEPS:
+                raise ValueError(f"Unknown warm-up step {name!r}, use some of {', '.join(WARMUP_STEPS)}")
+            steps[name] = WARMUP_STEPS[name]
+    return Warmup(steps, timeout=config.WARMUP_STEP_TIMEOUT)
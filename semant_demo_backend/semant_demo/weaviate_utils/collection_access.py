@@ -0,0 +1,87 @@
+"""
+Per-user cache of accessible user collection ids.
+
+Searches restricted to a user collection must check that the collection
+belongs to the current user. The ids of a user's collections change only
+when the user creates or deletes a collection, so they are cached for
+``USER_COLLECTION_CACHE_TTL`` seconds and invalidated by those operations
+in :mod:`semant_demo.weaviate_utils.user_collection`. A denied check reloads
+the ids once, so collections created through another worker are not refused.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from semant_demo.config import config
+from semant_demo.metrics import register_cache
+
+
+class CollectionAccessCache:
+    """LRU + TTL of collection ids keyed by user id, concurrent misses for one user share one load."""
+
+    def __init__(self, ttl: float = 60.0, max_users: int = 1024):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries: OrderedDict[str, tuple[float, frozenset[str]]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        # bumped by invalidations, a load that overlapped one is not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, user_id, load: Callable[[], Awaitable[set[str]]]) -> frozenset[str]:
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        generation = self._generation
+        try:
+            ids = frozenset(str(i) for i in await load())
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        if generation == self._generation:
+            self._entries[key] = (time.monotonic() + self.ttl, ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        future.set_result(ids)
+        return ids
+
+    async def reload(self, user_id, load: Callable[[], Awaitable[set[str]]]) -> frozenset[str]:
+        """Loads the ids again bypassing the cached entry, the fresh ids replace it."""
+        self.invalidate_user(user_id)
+        return await self.get_or_load(user_id, load)
+
+    def invalidate_user(self, user_id):
+        self._generation += 1
+        self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+
+collection_access_cache = CollectionAccessCache(ttl=config.USER_COLLECTION_CACHE_TTL)
+register_cache("collection_access", collection_access_cache)
@@ -1,5 +1,9 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
 from weaviate import WeaviateAsyncClient
-from weaviate.classes.query import Filter, Sort, QueryReference
+from weaviate.classes.query import Filter, FilterReturn, MetadataQuery, Sort, QueryReference
 from weaviate.exceptions import (
     WeaviateConnectionError,
     WeaviateTimeoutError,
@@ -19,15 +23,51 @@ from semant_demo.weaviate_exceptions import (
 )
 
 import semant_demo.schemas as schemas
+from semant_demo.config import config
 from semant_demo.weaviate_utils.helpers import WeaviateHelpers
-from semant_demo.schema.documents import DocumentBrowse, Document as DocumentSchema
+from semant_demo.metrics import instrument_methods, register_cache
+from semant_demo.weaviate_utils.document_browse import (
+    BrowseCountCache,
+    BrowseCursor,
+    ChunkCursor,
+    PagePrefetcher,
+    browse_signature,
+    keyset_value,
+)
+from semant_demo.weaviate_utils.document_metadata_index import DocumentMetadataIndex, DocumentMetadataIndexHolder
+from semant_demo.schema.documents import (
+    DocumentBrowse,
+    Document as DocumentSchema,
+    DocumentSearchHit,
+    DocumentSearchResponse,
+)
+
+logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class BrowseFilterPlan:
+    strategy: str
+    filters: FilterReturn | None
+    # the filters match no document, no query is needed
+    empty: bool = False
+
+
+@instrument_methods("document")
 class Document():
+    # chunks per request when a whole document (or window) is loaded
+    CHUNK_PAGE_SIZE = 500
+    CHUNK_OUTLINE_PROPERTIES = ["order", "title", "start_page_id", "from_page", "to_page"]
+
     def __init__(self, client: WeaviateAsyncClient, collectionNames: schemas.CollectionNames):
         self.client = client
         self.collectionNames = collectionNames
         self.helpers = WeaviateHelpers(client, collectionNames)
+        self.browse_count_cache = BrowseCountCache(ttl=config.DOCUMENT_COUNT_CACHE_TTL)
+        register_cache("document_count", self.browse_count_cache)
+        self.browse_prefetcher = PagePrefetcher(ttl=config.DOCUMENT_BROWSE_PREFETCH_TTL)
+        self.metadata_index = DocumentMetadataIndexHolder(
+            ttl=config.DOCUMENT_METADATA_INDEX_TTL, check_interval=config.DOCUMENT_METADATA_INDEX_CHECK_INTERVAL)
 
     #######
     # API #
@@ -52,12 +92,36 @@ class Document():
         """
         pass
 
-    async def read_document_chunks(self, document_id: str, collection_id: str) -> schemas.DocumentDetail | None:
+    async def read_document_chunks(
+        self,
+        document_id: str,
+        collection_id: str,
+        projection: schemas.ChunkProjection = schemas.ChunkProjection.full,
+        from_order: int | None = None,
+        to_order: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> schemas.DocumentDetail | None:
         """
-        Retrieves a document and all its chunks while marking membership in the selected collection.
+        Retrieves a document and its chunks sorted by order while marking membership in the selected collection.
+
+        :param projection: full chunks or their outline (ids, order, titles, pages) without text
+        :param from_order: first chunk order of the window (inclusive)
+        :param to_order: last chunk order of the window (inclusive)
+        :param limit: chunks per page, all chunks of the window if None
+        :param cursor: next_cursor of the previous page
+        Raises InvalidCursorError if the cursor belongs to another document or window.
         """
+        signature = browse_signature(document_id=document_id, from_order=from_order, to_order=to_order)
+        page_cursor = ChunkCursor.decode(cursor, signature) if cursor else ChunkCursor(signature=signature)
+
         document_collection = self.client.collections.get(self.collectionNames.document_collection_name)
-        document_response = await document_collection.query.fetch_object_by_id(document_id)
+        page_size = limit if limit is not None else self.CHUNK_PAGE_SIZE
+        document_response, page = await asyncio.gather(
+            document_collection.query.fetch_object_by_id(document_id),
+            self._fetch_chunk_page(document_id, collection_id, projection, from_order, to_order,
+                                   page_cursor, page_size + 1),
+        )
         if document_response is None:
             return None
 
@@ -70,50 +134,69 @@ class Document():
             **doc_props,
         )
 
-        chunks_collection = self.client.collections.get(self.collectionNames.chunks_collection_name)
-        chunk_filter = Filter.by_ref("document").by_id().equal(document_id)
-
-        chunks: list[schemas.DocumentDetailTextChunkWithUserCollectionInfo] = []
-        page_size = 100
-        offset = 0
-
+        chunks = []
         while True:
-            chunk_response = await chunks_collection.query.fetch_objects(
-                filters=chunk_filter,
-                return_references=[QueryReference(link_on="userCollection")],
-                limit=page_size,
-                offset=offset,
-            )
-
-            if not chunk_response.objects:
-                break
-
-            for chunk_obj in chunk_response.objects:
-                chunk_refs = chunk_obj.references.get("userCollection") if chunk_obj.references else None
-                current_collection_ids = [str(ref.uuid) for ref in (chunk_refs.objects if chunk_refs else [])]
-                in_user_collection = str(collection_id) in current_collection_ids
-
-                chunks.append(
-                    schemas.DocumentDetailTextChunkWithUserCollectionInfo(
-                        id=chunk_obj.uuid,
-                        **chunk_obj.properties,
-                        document=document_response.uuid,
-                        in_user_collection=in_user_collection,
-                    )
-                )
-
-            if len(chunk_response.objects) < page_size:
+            has_more = len(page) > page_size
+            page = page[:page_size]
+            chunks.extend(page)
+            position = page_cursor.position + len(page)
+            if (page_cursor.keyset and not has_more and from_order is None and to_order is None
+                    and position < await self._count_chunks(document_id)):
+                # chunks without an order are not reached by the range filter
+                has_more = True
+                page_cursor = ChunkCursor(position=position, signature=signature)
+            elif has_more:
+                page_cursor = self._next_chunk_cursor(page_cursor, page, position, signature)
+            if not has_more or limit is not None:
                 break
+            # whole window requested, continue by order instead of offset
+            page = await self._fetch_chunk_page(document_id, collection_id, projection, from_order, to_order,
+                                                page_cursor, page_size + 1)
 
-            offset += page_size
+        next_cursor = None
+        if has_more and limit is not None:
+            next_cursor = page_cursor.encode()
 
         return schemas.DocumentDetail(
             document=document,
             chunks=chunks,
+            next_cursor=next_cursor,
         )
 
-    def search():
-        pass
+    async def search(self, query: str, collection_id: str | None = None, limit: int = 20) -> DocumentSearchResponse:
+        """
+        Ranks documents by BM25 over their metadata (DOCUMENT_SEARCH_FIELDS, with per-field weights).
+
+        Query words typed without diacritics are expanded with their spellings found
+        in the metadata index (e.g. "hodonin" also searches "hodonín").
+        """
+        document_collection = self.client.collections.get(self.collectionNames.document_collection_name)
+        filters = None
+        if collection_id is not None:
+            filters = Filter.by_ref("collection").by_id().equal(collection_id)
+
+        expanded_query = query
+        index = self.metadata_index.current(self._build_metadata_index, self._count_documents)
+        if index is not None:
+            expanded_query = " ".join([query, *index.spellings(query)])
+
+        response = await document_collection.query.bm25(
+            query=expanded_query,
+            query_properties=config.DOCUMENT_SEARCH_FIELDS,
+            filters=filters,
+            limit=limit,
+            return_metadata=MetadataQuery(score=True),
+        )
+        return DocumentSearchResponse(
+            query=query,
+            hits=[
+                DocumentSearchHit(
+                    document=DocumentSchema(id=obj.uuid, **obj.properties),
+                    score=obj.metadata.score or 0.0,
+                )
+                for obj in response.objects
+            ],
+        )
 
     async def browse_documents(
         self,
@@ -125,58 +208,68 @@ class Document():
         title: str | None = None,
         author: str | None = None,
         publisher: str | None = None,
-        document_type: str | None = None
+        document_type: str | None = None,
+        cursor: str | None = None,
     ):
         """
         Retrieves documents in pages with optional filters for browsing large datasets.
+
+        Pages are continued either by ``offset`` or by the opaque ``cursor`` returned
+        as ``next_cursor`` of the previous page (keyset pagination, preferred).
+        Raises InvalidCursorError if the cursor is malformed or belongs to another query.
         """
         document_collection = self.client.collections.get(
             self.collectionNames.document_collection_name)
-        filters = None
+        plan = self._plan_browse_filters(
+            collection_id=collection_id,
+            title=title,
+            author=author,
+            publisher=publisher,
+            document_type=document_type,
+        )
+        filters = plan.filters
+        logger.debug("Browse metadata filter strategy: %s", plan.strategy)
 
-        def append_filter(current_filter, new_filter):
-            return new_filter if current_filter is None else current_filter & new_filter
+        filter_signature = browse_signature(
+            collection_id=collection_id, title=title, author=author,
+            publisher=publisher, document_type=document_type,
+        )
+        query_signature = browse_signature(filters=filter_signature, sort_by=sort_by, sort_desc=sort_desc)
+        page_cursor = BrowseCursor.decode(cursor, query_signature) if cursor else BrowseCursor(position=offset)
+        if plan.empty:
+            return DocumentBrowse(items=[], has_more=False, total_count=0)
+        # counts of the two strategies may differ, the cursor stays valid when the strategy changes
+        count_signature = f"{filter_signature}:{plan.strategy}"
 
-        if collection_id is not None:
-            filters = append_filter(
-                filters,
-                Filter.by_ref("collection").by_id().equal(collection_id)
+        async def count() -> int:
+            count_response = await document_collection.aggregate.over_all(
+                filters=filters,
+                total_count=True,
             )
+            return count_response.total_count or 0
 
-        if title:
-            filters = append_filter(
-                filters, Filter.by_property("title").like(f"*{title}*"))
-        if author:
-            filters = append_filter(
-                filters, Filter.by_property("author").like(f"*{author}*"))
-        if publisher:
-            filters = append_filter(filters, Filter.by_property(
-                "publisher").like(f"*{publisher}*"))
-        if document_type:
-            filters = append_filter(filters, Filter.by_property(
-                "documentType").like(f"*{document_type}*"))
-
-        sort = None
-        if sort_by:
-            sort = Sort.by_property(sort_by, ascending=not sort_desc)
-
-        count_response = await document_collection.aggregate.over_all(
-            filters=filters,
-            total_count=True,
-        )
-        total_count = count_response.total_count or 0
+        def fetch(page_cursor: BrowseCursor):
+            return self._fetch_browse_page(document_collection, filters, sort_by, sort_desc, limit, page_cursor)
 
-        response = await document_collection.query.fetch_objects(
-            filters=filters,
-            limit=limit + 1,
-            offset=offset,
-            sort=sort,
-        )
+        # pages are prefetched under the cursor or the offset that asks for them
+        prefetched = await self.browse_prefetcher.take(
+            (query_signature, limit, cursor) if cursor else (query_signature, limit, "offset", offset))
+        if prefetched is not None:
+            total_count = await self.browse_count_cache.get_or_count(count_signature, count)
+            objects = prefetched
+        else:
+            total_count, objects = await asyncio.gather(
+                self.browse_count_cache.get_or_count(count_signature, count),
+                fetch(page_cursor),
+            )
 
-        objects = response.objects
         has_more = len(objects) > limit
         if has_more:
             objects = objects[:limit]
+        position = page_cursor.position + len(objects)
+        if page_cursor.keyset and not has_more and position < total_count:
+            # documents without the sort property are not reached by the range filter
+            has_more = True
 
         items = [
             DocumentSchema(
@@ -186,13 +279,221 @@ class Document():
             for obj in objects
         ]
 
+        next_cursor = None
+        if has_more:
+            next_page_cursor = self._next_browse_cursor(
+                page_cursor, objects, position, sort_by, unfiltered=filters is None, signature=query_signature)
+            next_cursor = next_page_cursor.encode()
+            # a client continues the way it asked for this page: by next_cursor or by next_offset
+            if config.DOCUMENT_BROWSE_PREFETCH and cursor:
+                self.browse_prefetcher.schedule(
+                    (query_signature, limit, next_cursor), lambda: fetch(next_page_cursor))
+            elif config.DOCUMENT_BROWSE_PREFETCH:
+                self.browse_prefetcher.schedule(
+                    (query_signature, limit, "offset", position), lambda: fetch(BrowseCursor(position=position)))
+
         return DocumentBrowse(
             items=items,
             has_more=has_more,
-            next_offset=(offset + limit) if has_more else None,
+            next_offset=position if has_more else None,
+            next_cursor=next_cursor,
             total_count=total_count,
         )
 
     ###########
     # Helpers #
     ###########
+    def _plan_browse_filters(self, collection_id: str | None, title: str | None, author: str | None,
+                             publisher: str | None, document_type: str | None) -> BrowseFilterPlan:
+        """
+        Chooses how the metadata filters of a browse are evaluated:
+
+        - ``none``: no metadata filter
+        - ``token_index``: filter values resolved to document ids by the in-memory
+          metadata index (words inside words, case and diacritic insensitive), one ``contains_any`` filter
+        - ``like``: ``LIKE *x*`` filters (collection scan), while the index is being built or
+          when the filter matches more documents than DOCUMENT_METADATA_MAX_ID_FILTER
+        """
+        filters = None
+
+        def append_filter(current_filter, new_filter):
+            return new_filter if current_filter is None else current_filter & new_filter
+
+        if collection_id is not None:
+            filters = append_filter(
+                filters,
+                Filter.by_ref("collection").by_id().equal(collection_id)
+            )
+
+        metadata = {"title": title, "author": author, "publisher": publisher, "documentType": document_type}
+        metadata = {field: value for field, value in metadata.items() if value}
+        if not metadata:
+            return BrowseFilterPlan("none", filters)
+
+        index = self.metadata_index.current(self._build_metadata_index, self._count_documents)
+        if index is not None:
+            ids: set[str] | None = None
+            for field, value in metadata.items():
+                matched = index.match(field, value)
+                if matched is not None:
+                    ids = matched if ids is None else ids & matched
+            if ids is None:
+                return BrowseFilterPlan("token_index", filters)
+            if not ids:
+                return BrowseFilterPlan("token_index", filters, empty=True)
+            if len(ids) <= config.DOCUMENT_METADATA_MAX_ID_FILTER:
+                return BrowseFilterPlan(
+                    "token_index", append_filter(filters, Filter.by_id().contains_any(sorted(ids))))
+
+        for field, value in metadata.items():
+            filters = append_filter(filters, Filter.by_property(field).like(f"*{value}*"))
+        return BrowseFilterPlan("like", filters)
+
+    async def _fetch_chunk_page(self, document_id: str, collection_id: str, projection: schemas.ChunkProjection,
+                                from_order: int | None, to_order: int | None, cursor: ChunkCursor,
+                                limit: int) -> list:
+        """
+        Chunks of a document in order with their membership in the collection. Membership of the
+        whole page is resolved by one query restricted to the page ids instead of expanding the
+        userCollection references of every chunk.
+        """
+        chunks_collection = self.client.collections.get(self.collectionNames.chunks_collection_name)
+        filters = Filter.by_ref("document").by_id().equal(document_id)
+        if from_order is not None:
+            filters &= Filter.by_property("order").greater_or_equal(from_order)
+        if to_order is not None:
+            filters &= Filter.by_property("order").less_or_equal(to_order)
+        offset = cursor.position
+        if cursor.keyset:
+            filters &= Filter.by_property("order").greater_or_equal(cursor.order)
+            offset = cursor.ties
+
+        chunk_response = await chunks_collection.query.fetch_objects(
+            filters=filters,
+            limit=limit,
+            offset=offset,
+            # uuid breaks ties so keyset pages continue deterministically
+            sort=Sort.by_property("order", ascending=True).by_id(ascending=True),
+            return_properties=self.CHUNK_OUTLINE_PROPERTIES if projection == schemas.ChunkProjection.outline else None,
+        )
+        objects = chunk_response.objects
+        if not objects:
+            return []
+
+        member_response = await chunks_collection.query.fetch_objects(
+            filters=Filter.by_id().contains_any([obj.uuid for obj in objects])
+            & Filter.by_ref(self.collectionNames.user_collection_link_name).by_id().equal(collection_id),
+            limit=len(objects),
+            return_properties=[],
+        )
+        member_ids = {obj.uuid for obj in member_response.objects}
+
+        chunk_model = (schemas.DocumentDetailChunkOutline if projection == schemas.ChunkProjection.outline
+                       else schemas.DocumentDetailTextChunkWithUserCollectionInfo)
+        return [
+            chunk_model(
+                id=obj.uuid,
+                **obj.properties,
+                document=document_id,
+                in_user_collection=obj.uuid in member_ids,
+            )
+            for obj in objects
+        ]
+
+    async def _count_chunks(self, document_id: str) -> int:
+        chunks_collection = self.client.collections.get(self.collectionNames.chunks_collection_name)
+        response = await chunks_collection.aggregate.over_all(
+            filters=Filter.by_ref("document").by_id().equal(document_id),
+            total_count=True,
+        )
+        return response.total_count or 0
+
+    @staticmethod
+    def _next_chunk_cursor(cursor: ChunkCursor, chunks: list, position: int, signature: str) -> ChunkCursor:
+        order = chunks[-1].order
+        if order is None:
+            return ChunkCursor(position=position, signature=signature)
+        ties = 0
+        for chunk in reversed(chunks):
+            if chunk.order != order:
+                break
+            ties += 1
+        if ties == len(chunks) and cursor.keyset and cursor.order == order:
+            ties += cursor.ties
+        return ChunkCursor(position=position, keyset=True, order=order, ties=ties, signature=signature)
+
+    async def _build_metadata_index(self) -> DocumentMetadataIndex:
+        """Reads the metadata of all documents, keyset paged by uuid."""
+        document_collection = self.client.collections.get(self.collectionNames.document_collection_name)
+        index = DocumentMetadataIndex()
+        after = None
+        while True:
+            response = await document_collection.query.fetch_objects(
+                limit=1000,
+                after=after,
+                return_properties=list(index.fields),
+            )
+            for obj in response.objects:
+                index.add(str(obj.uuid), obj.properties)
+            if len(response.objects) < 1000:
+                break
+            after = response.objects[-1].uuid
+        # the substring index of the whole vocabulary is built off the event loop
+        return await asyncio.to_thread(index.freeze)
+
+    async def _count_documents(self) -> int:
+        document_collection = self.client.collections.get(self.collectionNames.document_collection_name)
+        response = await document_collection.aggregate.over_all(total_count=True)
+        return response.total_count or 0
+
+    async def _fetch_browse_page(self, document_collection, filters, sort_by: str | None, sort_desc: bool,
+                                 limit: int, cursor: BrowseCursor) -> list:
+        """One browse page plus one document to tell whether more pages follow."""
+        sort = None
+        if sort_by:
+            # uuid breaks ties so keyset pages continue deterministically
+            sort = Sort.by_property(sort_by, ascending=not sort_desc).by_id(ascending=True)
+
+        if cursor.after is not None:
+            response = await document_collection.query.fetch_objects(
+                limit=limit + 1,
+                after=cursor.after,
+            )
+            return response.objects
+
+        offset = cursor.position
+        if cursor.keyset:
+            value_filter = Filter.by_property(sort_by)
+            value_filter = (value_filter.less_or_equal(cursor.value) if sort_desc
+                            else value_filter.greater_or_equal(cursor.value))
+            filters = value_filter if filters is None else filters & value_filter
+            offset = cursor.ties
+
+        response = await document_collection.query.fetch_objects(
+            filters=filters,
+            limit=limit + 1,
+            offset=offset,
+            sort=sort,
+        )
+        return response.objects
+
+    @staticmethod
+    def _next_browse_cursor(cursor: BrowseCursor, objects: list, position: int, sort_by: str | None,
+                            unfiltered: bool, signature: str) -> BrowseCursor:
+        last = objects[-1] if objects else None
+        if last is not None and sort_by:
+            value = keyset_value(last.properties, sort_by,
+                                 whole_text=sort_by in config.DOCUMENT_BROWSE_KEYSET_TEXT_PROPERTIES)
+            if value is not None:
+                ties = 0
+                for obj in reversed(objects):
+                    if obj.properties.get(sort_by) != value:
+                        break
+                    ties += 1
+                if ties == len(objects) and cursor.keyset and cursor.value == value:
+                    ties += cursor.ties
+                return BrowseCursor(position=position, keyset=True, value=value, ties=ties, signature=signature)
+        elif last is not None and unfiltered and (cursor.after is not None or cursor.position == 0):
+            return BrowseCursor(position=position, after=str(last.uuid), signature=signature)
+        return BrowseCursor(position=position, signature=signature)
+
@@ -0,0 +1,228 @@
+"""
+Keyset pagination helpers for browsing the Documents collection and the chunks of a document.
+
+A browse page is continued by an opaque cursor instead of an offset. For a
+sorted browse the cursor holds the sort value of the last returned document,
+the next page is fetched with a range filter on the sort property (ties are
+ordered by uuid), so the cost of a page does not grow with its depth. The
+unsorted, unfiltered browse uses Weaviate's native ``after`` cursor. Pages
+that cannot be continued by value (documents without the sort property, word
+tokenized text properties) fall back to an offset.
+
+Chunks of a document are paged by their ``order`` the same way
+(:class:`ChunkCursor`), chunks without an order by offset.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def browse_signature(**params: Any) -> str:
+    """Stable identifier of the filters of a browse, cursors are only valid for the same signature."""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(data, dict):
+        raise InvalidCursorError("Malformed cursor")
+    return data
+
+
+def keyset_value(properties: dict, sort_by: str, whole_text: bool = False) -> Any:
+    """
+    Sort value usable for a range filter, None if the document cannot continue a keyset page.
+
+    Range filters on word tokenized text compare the tokens of the value, not the
+    whole string as ``Sort`` does, so text values are used only when the property
+    is ``field`` tokenized (``whole_text``).
+    """
+    value = properties.get(sort_by)
+    if isinstance(value, bool) or not isinstance(value, (str, int, float, datetime)):
+        return None
+    if isinstance(value, str) and not whole_text:
+        return None
+    return value
+
+
+@dataclass(frozen=True)
+class BrowseCursor:
+    # documents returned by all previous pages
+    position: int = 0
+    # keyset mode: sort value of the last returned document and the number of
+    # returned documents sharing it (they are skipped by offset within the tie)
+    keyset: bool = False
+    value: Any = None
+    ties: int = 0
+    # uuid of the last returned document, unsorted and unfiltered browse only
+    after: str | None = None
+    signature: str = ""
+
+    def encode(self) -> str:
+        data = asdict(self)
+        if isinstance(self.value, datetime):
+            data["value"] = {"datetime": self.value.isoformat()}
+        return encode_cursor(data)
+
+    @classmethod
+    def decode(cls, token: str, signature: str) -> "BrowseCursor":
+        data = decode_cursor(token)
+        try:
+            if isinstance(data.get("value"), dict):
+                data["value"] = datetime.fromisoformat(data["value"]["datetime"])
+            cursor = cls(**data)
+        except (ValueError, TypeError, KeyError) as e:
+            raise InvalidCursorError("Malformed cursor") from e
+        if cursor.signature != signature:
+            raise InvalidCursorError("Cursor belongs to a different filter or sort")
+        return cursor
+
+
+@dataclass(frozen=True)
+class ChunkCursor:
+    """
+    Continues the chunks of a document (sorted by ``order``, ties by uuid) after
+    the chunk with order ``order``, skipping the ``ties`` returned chunks sharing
+    it. After chunks without an order the pages continue by offset.
+    """
+    # chunks returned by all previous pages
+    position: int = 0
+    keyset: bool = False
+    order: int | None = None
+    ties: int = 0
+    signature: str = ""
+
+    def encode(self) -> str:
+        return encode_cursor(asdict(self))
+
+    @classmethod
+    def decode(cls, token: str, signature: str) -> "ChunkCursor":
+        try:
+            cursor = cls(**decode_cursor(token))
+        except TypeError as e:
+            raise InvalidCursorError("Malformed cursor") from e
+        if not (isinstance(cursor.position, int) and isinstance(cursor.ties, int)
+                and isinstance(cursor.order, int) == cursor.keyset):
+            raise InvalidCursorError("Malformed cursor")
+        if cursor.signature != signature:
+            raise InvalidCursorError("Cursor belongs to a different document or window")
+        return cursor
+
+
+class BrowseCountCache:
+    """
+    Total counts of browse queries keyed by filter signature, kept for a short
+    time so paging through one result set does not recount it on every page.
+    Concurrent misses for one signature share one count query.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_count(self, signature: str, count: Callable[[], Awaitable[int]]) -> int:
+        entry = self._entries.get(signature)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        future = self._in_flight.get(signature)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[signature] = future
+        try:
+            total = await count()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[signature]
+
+        self._entries[signature] = (time.monotonic() + self.ttl, total)
+        self._entries.move_to_end(signature)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        future.set_result(total)
+        return total
+
+    def clear(self):
+        self._entries.clear()
+
+
+class PagePrefetcher:
+    """
+    Next browse pages fetched in the background, keyed by the query and the
+    cursor that requests them. A prefetched page is handed out once.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 32):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._pages: OrderedDict[tuple, tuple[float, asyncio.Task]] = OrderedDict()
+        self.used = 0
+
+    def schedule(self, key: tuple, fetch: Callable[[], Awaitable[Any]]):
+        if key in self._pages:
+            return
+        task = asyncio.create_task(fetch())
+        # failures are retried by the request itself, do not report them as unretrieved
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._pages[key] = (time.monotonic() + self.ttl, task)
+        while len(self._pages) > self.max_entries:
+            _, (_, oldest) = self._pages.popitem(last=False)
+            oldest.cancel()
+
+    async def take(self, key: tuple) -> Any | None:
+        """Prefetched page for the key, None if there is none or it failed."""
+        entry = self._pages.pop(key, None)
+        if entry is None:
+            return None
+        expires, task = entry
+        if expires <= time.monotonic():
+            task.cancel()
+            return None
+        try:
+            page = await asyncio.shield(task)
+        except Exception:
+            return None
+        self.used += 1
+        return page
+
+    def clear(self):
+        for _, task in self._pages.values():
+            task.cancel()
+        self._pages.clear()
@@ -0,0 +1,217 @@
+"""
+Normalised-token index of document metadata.
+
+Browse filters on ``title``, ``author``, ``publisher`` and ``documentType``
+used ``LIKE *x*``, which cannot use Weaviate's inverted index and scans the
+whole Documents collection. This module keeps the metadata tokens of all
+documents in memory, folded to lower case without diacritics ("Hodonín" and
+"hodonin" are the same token), and resolves a filter value to document ids.
+The ids are then passed to Weaviate as one ``contains_any`` filter on the
+document id.
+
+Matching follows ``LIKE *x*`` on word tokenized properties: every word of
+the filter value has to occur inside some word of the field ("odon" matches
+"Hodonín"), the words may occur in any order. Unlike ``LIKE`` the match is
+diacritic insensitive.
+
+The index is built in the background on first use. Documents are imported
+and deleted by the offline tools, not by this process, so the number of
+documents is checked every ``DOCUMENT_METADATA_INDEX_CHECK_INTERVAL`` seconds
+and the index is rebuilt when it changed, or after ``DOCUMENT_METADATA_INDEX_TTL``
+at the latest. Until the first index is ready browsing falls back to ``LIKE``
+filters.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from typing import Awaitable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ("title", "author", "publisher", "documentType")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# tokens are looked up by their substrings of up to this length
+GRAM_SIZE = 3
+
+
+def fold(text: str) -> str:
+    """Case- and diacritic-insensitive form of a text."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _field_texts(value) -> Iterable[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [v for v in value if isinstance(v, str)]
+
+
+class DocumentMetadataIndex:
+    """Folded metadata tokens -> document ids, per field."""
+
+    def __init__(self, fields: tuple[str, ...] = METADATA_FIELDS):
+        self.fields = fields
+        self._postings: dict[str, dict[str, set[str]]] = {f: {} for f in fields}
+        # substring of up to GRAM_SIZE characters -> tokens containing it, per field
+        self._grams: dict[str, dict[str, set[str]]] = {f: {} for f in fields}
+        # folded token -> spellings found in the data, used to expand BM25 queries
+        self._spellings: dict[str, set[str]] = {}
+        self.documents = 0
+        self.built_at = time.monotonic()
+
+    def add(self, document_id: str, properties: dict):
+        self.documents += 1
+        for field in self.fields:
+            postings = self._postings[field]
+            for text in _field_texts(properties.get(field)):
+                for word in _TOKEN_RE.findall(text):
+                    token = fold(word)
+                    postings.setdefault(token, set()).add(str(document_id))
+                    if token != word.lower():
+                        self._spellings.setdefault(token, set()).add(word.lower())
+
+    def freeze(self) -> "DocumentMetadataIndex":
+        """Prepares substring lookups, call after the last :meth:`add`."""
+        for field, postings in self._postings.items():
+            grams = self._grams[field] = {}
+            for token in postings:
+                for n in range(1, GRAM_SIZE + 1):
+                    for i in range(len(token) - n + 1):
+                        grams.setdefault(token[i:i + n], set()).add(token)
+        self.built_at = time.monotonic()
+        return self
+
+    def _tokens_containing(self, field: str, part: str) -> set[str]:
+        grams = self._grams[field]
+        if len(part) <= GRAM_SIZE:
+            return grams.get(part, set())
+        # candidates contain every trigram of the part, the part itself is checked on them only
+        candidates = sorted((grams.get(part[i:i + GRAM_SIZE], set()) for i in range(len(part) - GRAM_SIZE + 1)),
+                            key=len)
+        return {token for token in candidates[0].intersection(*candidates[1:]) if part in token}
+
+    def _infix_match(self, field: str, part: str) -> set[str]:
+        postings = self._postings[field]
+        ids: set[str] = set()
+        for token in self._tokens_containing(field, part):
+            ids |= postings[token]
+        return ids
+
+    def match(self, field: str, query: str) -> set[str] | None:
+        """
+        Documents whose ``field`` contains each token of the query inside one of its tokens.
+        None if the query has no tokens (the filter does not restrict anything).
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return None
+        ids: set[str] | None = None
+        # the longest token is usually the most selective one
+        for token in sorted(query_tokens, key=len, reverse=True):
+            matched = self._infix_match(field, token)
+            ids = matched if ids is None else ids & matched
+            if not ids:
+                return set()
+        return ids
+
+    def spellings(self, query: str) -> list[str]:
+        """Spellings with diacritics of the query tokens, as they occur in the metadata."""
+        found = set()
+        for token in tokenize(query):
+            found |= self._spellings.get(token, set())
+        return sorted(found)
+
+
+class DocumentMetadataIndexHolder:
+    """
+    Holds the current :class:`DocumentMetadataIndex` and rebuilds it in the
+    background when missing, invalidated, older than ``ttl`` seconds or when
+    ``count`` (checked at most every ``check_interval`` seconds) no longer matches
+    the number of indexed documents. A stale index keeps being served while its
+    replacement is built.
+    """
+
+    def __init__(self, ttl: float = 600.0, check_interval: float = 30.0):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._index: DocumentMetadataIndex | None = None
+        self._build_task: asyncio.Task | None = None
+        self._check_task: asyncio.Task | None = None
+        self._checked_at = 0.0
+        self._stale = False
+
+    def current(self, build: Callable[[], Awaitable[DocumentMetadataIndex]],
+                count: Callable[[], Awaitable[int]] | None = None) -> DocumentMetadataIndex | None:
+        """The index if one was built, schedules a (re)build or a check of the document count when needed."""
+        now = time.monotonic()
+        if self._index is None or self._stale or now - self._index.built_at > self.ttl:
+            self._start_build(build)
+        elif count is not None and now - max(self._checked_at, self._index.built_at) > self.check_interval:
+            self._start_check(build, count)
+        return self._index
+
+    def invalidate(self):
+        """Rebuilds the index on next use, the current one is served until then."""
+        self._stale = True
+
+    async def get(self, build: Callable[[], Awaitable[DocumentMetadataIndex]]) -> DocumentMetadataIndex:
+        """The index, waits for the build if there is none yet."""
+        index = self.current(build)
+        if index is not None:
+            return index
+        return await asyncio.shield(self._build_task)
+
+    def _start_build(self, build: Callable[[], Awaitable[DocumentMetadataIndex]]):
+        if self._build_task is not None and not self._build_task.done():
+            return
+        self._stale = False
+        self._build_task = asyncio.create_task(build())
+        self._build_task.add_done_callback(self._build_done)
+
+    def _start_check(self, build: Callable[[], Awaitable[DocumentMetadataIndex]],
+                     count: Callable[[], Awaitable[int]]):
+        if (self._check_task is not None and not self._check_task.done()) or (
+                self._build_task is not None and not self._build_task.done()):
+            return
+        self._checked_at = time.monotonic()
+        index = self._index
+
+        async def check():
+            documents = await count()
+            if self._index is index and documents != index.documents:
+                logger.info("Documents changed (%d -> %d), rebuilding the metadata index", index.documents, documents)
+                self._start_build(build)
+
+        self._check_task = asyncio.create_task(check())
+        # a failed check is retried after the next interval
+        self._check_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def _build_done(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.warning("Building the document metadata index failed: %s", task.exception())
+            return
+        self._index = task.result()
+        logger.info("Document metadata index built over %d documents", self._index.documents)
+
+    def clear(self):
+        for task in (self._build_task, self._check_task):
+            if task is not None:
+                task.cancel()
+        self._build_task = None
+        self._check_task = None
+        self._index = None
+        self._stale = False
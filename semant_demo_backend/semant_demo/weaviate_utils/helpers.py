@@ -27,10 +27,13 @@ from weaviate.exceptions import (
     InsufficientPermissionsError,
 )
 from semant_demo.weaviate_exceptions import WeaviateConnectError, WeaviateDataValidationError, WeaviateLimitError, WeaviateServerError, WeaviateOperationError
+from semant_demo.metrics import instrument_methods
+from semant_demo.weaviate_utils.span_index import span_index
 
 import uuid
 
 
+@instrument_methods("helpers")
 class WeaviateHelpers:
     def __init__(self, client: WeaviateAsyncClient, collectionNames: schemas.CollectionNames):
         self.client = client
@@ -46,6 +49,7 @@ class WeaviateHelpers:
 
         # delete the span itself
         await span_collection.data.delete_by_id(span_id)
+        span_index.span_deleted(span_id)
 
     async def delete_tag_cascade(self, tag_id: str) -> None:
         """
@@ -96,6 +100,7 @@ class WeaviateHelpers:
 
         # finally delete the tag itself
         await tag_collection.data.delete_by_id(tag_id)
+        span_index.invalidate_tag(tag_id)
 
     async def delete_user_collection_cascade(self, collection_id: str) -> None:
         """"
@@ -144,6 +149,7 @@ class WeaviateHelpers:
 
         # finally delete the collection itself
         await usercollection_collection.data.delete_by_id(collection_id)
+        span_index.invalidate_collection(collection_id)
 
     async def delete_references_from_filtered_objects(
         self,
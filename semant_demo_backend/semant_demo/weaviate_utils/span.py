@@ -1,6 +1,7 @@
 from weaviate import WeaviateAsyncClient
 from weaviate.classes.query import Filter
-from uuid import UUID
+from weaviate.classes.data import DataObject
+from uuid import UUID, uuid4
 from typing import cast
 import asyncio
 import logging
@@ -24,11 +25,14 @@ from semant_demo.weaviate_exceptions import (
 from weaviate.classes.query import QueryReference
 
 from semant_demo.weaviate_utils.helpers import WeaviateHelpers
+from semant_demo.weaviate_utils.span_index import span_index
+from semant_demo.metrics import instrument_methods
 import semant_demo.schemas as schemas
 
 from semant_demo.schema.spans import PostSpan, PatchSpan
 
 
+@instrument_methods("span")
 class Span():
     def __init__(self, client: WeaviateAsyncClient, collectionNames: schemas.CollectionNames):
         self.client = client
@@ -109,7 +113,7 @@ class Span():
             }
         )
 
-        return schemas.TagSpan(
+        created = schemas.TagSpan(
             id=str(span_id),
             chunkId=span.chunkId,
             tagId=span.tagId,
@@ -119,6 +123,68 @@ class Span():
             reason=span.reason,
             confidence=span.confidence,
         )
+        span_index.span_saved(created)
+        return created
+
+    async def create_many(self, spans: list[PostSpan]) -> list[schemas.TagSpan | None]:
+        """
+        Create many spans (with their chunk and tag references) in one batch insert.
+
+        Returns the created spans in the order of ``spans``; spans rejected by
+        Weaviate are logged and returned as None.
+        """
+        if not self.span_collection:
+            raise RuntimeError("Span_test collection not available")
+        if not spans:
+            return []
+
+        if any(s.reason is not None or s.confidence is not None for s in spans):
+            await self._ensure_ai_properties()
+
+        objects = []
+        for span in spans:
+            properties: dict = {
+                "start": span.start,
+                "end": span.end,
+                "type": span.type.value if span.type is not None else None,
+            }
+            if span.reason is not None:
+                properties["reason"] = span.reason
+            if span.confidence is not None:
+                properties["confidence"] = float(span.confidence)
+            objects.append(DataObject(
+                properties=properties,
+                uuid=uuid4(),
+                references={
+                    "tag": span.tagId,
+                    "text_chunk": span.chunkId
+                }
+            ))
+
+        response = await self.span_collection.data.insert_many(objects)
+
+        created: list[schemas.TagSpan | None] = []
+        for i, (span, obj) in enumerate(zip(spans, objects)):
+            error = response.errors.get(i)
+            if error is not None:
+                logging.getLogger(__name__).warning(
+                    "Batch insert of span failed (chunk=%s, tag=%s): %s",
+                    span.chunkId, span.tagId, error.message,
+                )
+                created.append(None)
+                continue
+            created.append(schemas.TagSpan(
+                id=str(obj.uuid),
+                chunkId=span.chunkId,
+                tagId=span.tagId,
+                start=span.start,
+                end=span.end,
+                type=span.type,
+                reason=span.reason,
+                confidence=span.confidence,
+            ))
+            span_index.span_saved(created[-1])
+        return created
 
     async def delete(self, span_id: str) -> None:
         """
@@ -128,6 +194,7 @@ class Span():
             raise RuntimeError("Span_test collection not available")
 
         await self.helpers.delete_span_cascade(span_id=span_id)
+        span_index.span_deleted(span_id)
 
     async def read(self, span_id: str) -> schemas.TagSpan:
         """
@@ -373,7 +440,9 @@ class Span():
                 to=dumped_fields["tagId"],
             )
 
-        return await self.read(span_id)
+        updated = await self.read(span_id)
+        span_index.span_saved(updated)
+        return updated
 
     async def bulk_update(
         self,
@@ -511,4 +580,6 @@ class Span():
                     )
             if len(objs) < PAGE_SIZE:
                 break
+        if deleted:
+            span_index.invalidate_document(document_id)
         return deleted
\ No newline at end of file
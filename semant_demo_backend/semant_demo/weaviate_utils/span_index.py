@@ -0,0 +1,358 @@
+"""
+In-memory interval index of spans per (document, collection).
+
+Spans are stored against their first chunk with ``start``/``end`` measured
+across the concatenation of consecutive chunks of the document. The index
+keeps the chunk layout of the document (order, character offset, length), so
+every span becomes a ``[start, end)`` interval in document coordinates and
+overlap queries ("spans overlapping a selection", "spans touching chunks
+N..M") are answered by an interval tree in O(log n + k) instead of fetching
+chunk ranges and scanning spans.
+
+Indexes are built lazily (chunk layout + ``Span.read_batch``) by
+:data:`span_index` and kept current by the span write paths (``Span``,
+tag approval in ``TextChunk`` and the tag and collection delete cascades).
+Writes made by other worker processes are not seen, so indexes are rebuilt
+after ``SPAN_INDEX_TTL`` seconds.
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from weaviate.classes.query import Filter, Sort
+
+import semant_demo.schemas as schemas
+from semant_demo.config import config
+
+if TYPE_CHECKING:
+    from semant_demo.weaviate_utils.weaviate_abstraction import WeaviateAbstraction
+
+
+@dataclass(frozen=True)
+class ChunkExtent:
+    id: str
+    order: int
+    offset: int  # character offset of the chunk in the concatenated document text
+    length: int
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+
+@dataclass(frozen=True)
+class SpanSegment:
+    chunk_id: str
+    order: int
+    start: int  # offset within the chunk
+    end: int
+
+
+class IntervalTree:
+    """
+    Static interval tree over half-open ``[start, end)`` intervals: intervals
+    sorted by start form an implicit balanced binary tree, every node keeps the
+    maximal end of its subtree, so subtrees that cannot overlap a query are
+    skipped.
+    """
+
+    def __init__(self, intervals: list[tuple[int, int, object]]):
+        self._intervals = sorted(intervals, key=lambda i: (i[0], i[1]))
+        self._max_end = [0] * len(self._intervals)
+        self._build(0, len(self._intervals))
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def _build(self, lo: int, hi: int) -> int:
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        max_end = max(self._intervals[mid][1], self._build(lo, mid), self._build(mid + 1, hi))
+        self._max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start: int, end: int) -> list[object]:
+        """Items whose interval overlaps ``[start, end)``, ordered by interval start."""
+        found: list[object] = []
+        self._query(0, len(self._intervals), start, end, found)
+        return found
+
+    def _query(self, lo: int, hi: int, start: int, end: int, found: list[object]):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] <= start:
+            return
+        self._query(lo, mid, start, end, found)
+        i_start, i_end, item = self._intervals[mid]
+        if i_start >= end:
+            # everything to the right starts even later
+            return
+        if i_end > start:
+            found.append(item)
+        self._query(mid + 1, hi, start, end, found)
+
+
+class DocumentSpanIndex:
+    """
+    Spans of one document visible in one collection, indexed by their
+    document-level character interval.
+    """
+
+    def __init__(self, document_id: str, collection_id: str, chunks: list[ChunkExtent],
+                 spans: list[schemas.TagSpan], tag_ids: set[str]):
+        """
+        :param chunks: all chunks of the document sorted by order
+        :param spans: spans of the collection in the document
+        :param tag_ids: tags of the collection, spans of other tags are not indexed
+        """
+        self.document_id = str(document_id)
+        self.collection_id = str(collection_id)
+        self.chunks = chunks
+        self.tag_ids = set(tag_ids)
+        self._chunk_by_id = {c.id: c for c in chunks}
+        self._orders = [c.order for c in chunks]
+        self._spans: dict[str, schemas.TagSpan] = {}
+        self._tree: IntervalTree | None = None
+        for span in spans:
+            self.add(span)
+
+    def has_chunk(self, chunk_id: str) -> bool:
+        return str(chunk_id) in self._chunk_by_id
+
+    def has_span(self, span_id: str) -> bool:
+        return str(span_id) in self._spans
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def document_range(self, span: schemas.TagSpan) -> tuple[int, int] | None:
+        chunk = self._chunk_by_id.get(str(span.chunkId))
+        if chunk is None:
+            return None
+        return chunk.offset + span.start, chunk.offset + span.end
+
+    def add(self, span: schemas.TagSpan) -> bool:
+        """Adds or replaces a span, returns False if it does not belong to this index."""
+        if str(span.tagId) not in self.tag_ids or not self.has_chunk(span.chunkId):
+            return False
+        self._spans[str(span.id)] = span
+        self._tree = None
+        return True
+
+    def remove(self, span_id: str) -> bool:
+        if self._spans.pop(str(span_id), None) is None:
+            return False
+        self._tree = None
+        return True
+
+    def _get_tree(self) -> IntervalTree:
+        # rebuilt on the first query after a change, O(n log n)
+        if self._tree is None:
+            intervals = []
+            for span in self._spans.values():
+                start, end = self.document_range(span)
+                intervals.append((start, max(end, start + 1), span))
+            self._tree = IntervalTree(intervals)
+        return self._tree
+
+    def overlapping(self, start: int, end: int) -> list[schemas.TagSpan]:
+        """Spans overlapping ``[start, end)`` in document coordinates."""
+        return self._get_tree().overlapping(start, end)
+
+    def chunk_window(self, first_order: int, last_order: int | None = None) -> tuple[int, int] | None:
+        """Document interval covered by chunks with order in ``[first_order, last_order]``."""
+        last_order = first_order if last_order is None else last_order
+        lo = bisect.bisect_left(self._orders, first_order)
+        hi = bisect.bisect_right(self._orders, last_order)
+        if lo >= hi:
+            return None
+        return self.chunks[lo].offset, self.chunks[hi - 1].end
+
+    def touching_orders(self, first_order: int, last_order: int | None = None) -> list[schemas.TagSpan]:
+        """Spans that touch any chunk with order in ``[first_order, last_order]``."""
+        window = self.chunk_window(first_order, last_order)
+        if window is None:
+            return []
+        return self.overlapping(*window)
+
+    def segments(self, span: schemas.TagSpan) -> list[SpanSegment]:
+        """Splits a (possibly cross-chunk) span into per-chunk pieces with chunk-local offsets."""
+        doc_range = self.document_range(span)
+        if doc_range is None:
+            return []
+        start, end = doc_range
+        lo = bisect.bisect_left(self._orders, self._chunk_by_id[str(span.chunkId)].order)
+        segments = []
+        for chunk in self.chunks[lo:]:
+            if chunk.offset >= end:
+                break
+            if chunk.end <= start:
+                continue
+            segments.append(SpanSegment(
+                chunk_id=chunk.id,
+                order=chunk.order,
+                start=max(start, chunk.offset) - chunk.offset,
+                end=min(end, chunk.end) - chunk.offset,
+            ))
+        return segments
+
+
+async def fetch_chunk_extents(searcher: WeaviateAbstraction, document_id: str) -> list[ChunkExtent]:
+    """Layout of all chunks of a document (the same concatenation cross-chunk spans are measured in)."""
+    chunks_collection = searcher.client.collections.get(searcher.collectionNames.chunks_collection_name)
+    filters = Filter.by_ref("document").by_id().equal(document_id)
+    page_size = 500
+    offset = 0
+    raw: list[tuple[int, str, int]] = []
+    while True:
+        response = await chunks_collection.query.fetch_objects(
+            filters=filters,
+            limit=page_size,
+            offset=offset,
+            sort=Sort.by_property("order", ascending=True),
+            return_properties=["order", "text"],
+        )
+        for obj in response.objects:
+            raw.append((obj.properties.get("order") or 0, str(obj.uuid), len(obj.properties.get("text") or "")))
+        if len(response.objects) < page_size:
+            break
+        offset += page_size
+
+    extents = []
+    position = 0
+    for order, chunk_id, length in sorted(raw):
+        extents.append(ChunkExtent(id=chunk_id, order=order, offset=position, length=length))
+        position += length
+    return extents
+
+
+class SpanIndexRegistry:
+    """
+    LRU of :class:`DocumentSpanIndex` keyed by (document id, collection id).
+
+    Indexes are built on first use, concurrent requests for the same document
+    share one build. Write hooks update cached indexes in place; changes the
+    index cannot apply itself (span of an unknown tag, bulk deletes) drop the
+    affected indexes, they are rebuilt on next use. Indexes older than ``ttl``
+    seconds are rebuilt as well, which bounds staleness caused by writes of
+    other workers.
+    """
+
+    def __init__(self, max_documents: int = 64, ttl: float = 60.0):
+        self.max_documents = max_documents
+        self.ttl = ttl
+        self._indexes: OrderedDict[tuple[str, str], DocumentSpanIndex] = OrderedDict()
+        self._built_at: dict[tuple[str, str], float] = {}
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+        # bumped by every write hook, a build that overlapped a write is not cached
+        self._writes = 0
+        self.builds = 0
+
+    async def get(self, searcher: WeaviateAbstraction, document_id: str, collection_id: str) -> DocumentSpanIndex:
+        key = (str(document_id), str(collection_id))
+        index = self._indexes.get(key)
+        if index is not None and time.monotonic() - self._built_at[key] < self.ttl:
+            self._indexes.move_to_end(key)
+            return index
+        self._drop([key])
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        writes_before = self._writes
+        try:
+            index = await self._build(searcher, *key)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        if self._writes == writes_before and self.ttl > 0:
+            self._indexes[key] = index
+            self._built_at[key] = time.monotonic()
+            while len(self._indexes) > self.max_documents:
+                evicted, _ = self._indexes.popitem(last=False)
+                del self._built_at[evicted]
+        future.set_result(index)
+        return index
+
+    async def _build(self, searcher: WeaviateAbstraction, document_id: str, collection_id: str) -> DocumentSpanIndex:
+        chunks, tags = await asyncio.gather(
+            fetch_chunk_extents(searcher, document_id),
+            searcher.userCollection.read_all_tags(UUID(collection_id)),
+        )
+        spans_by_chunk = await searcher.span.read_batch([c.id for c in chunks], collection_id)
+        self.builds += 1
+        return DocumentSpanIndex(
+            document_id=document_id,
+            collection_id=collection_id,
+            chunks=chunks,
+            spans=[span for spans in spans_by_chunk.values() for span in spans],
+            tag_ids={str(t.id) for t in tags},
+        )
+
+    def _drop(self, keys: list[tuple[str, str]]):
+        for key in keys:
+            self._indexes.pop(key, None)
+            self._built_at.pop(key, None)
+
+    def span_saved(self, span: schemas.TagSpan):
+        """Span was created or updated."""
+        self._writes += 1
+        stale = []
+        for key, index in self._indexes.items():
+            index.remove(span.id)
+            if not index.has_chunk(span.chunkId):
+                continue
+            if str(span.tagId) in index.tag_ids:
+                index.add(span)
+            else:
+                # tag unknown to the index - from another collection or created after the build
+                stale.append(key)
+        self._drop(stale)
+
+    def span_deleted(self, span_id: str):
+        self._writes += 1
+        for index in self._indexes.values():
+            index.remove(span_id)
+
+    def invalidate_document(self, document_id: str):
+        self._writes += 1
+        self._drop([key for key in self._indexes if key[0] == str(document_id)])
+
+    def invalidate_chunk(self, chunk_id: str):
+        """Spans of the chunk were written without a span object to apply (tag approval)."""
+        self._writes += 1
+        self._drop([key for key, index in self._indexes.items() if index.has_chunk(chunk_id)])
+
+    def invalidate_collection(self, collection_id: str):
+        self._writes += 1
+        self._drop([key for key in self._indexes if key[1] == str(collection_id)])
+
+    def invalidate_tag(self, tag_id: str):
+        self._writes += 1
+        self._drop([key for key, index in self._indexes.items() if str(tag_id) in index.tag_ids])
+
+    def clear(self):
+        self._writes += 1
+        self._indexes.clear()
+        self._built_at.clear()
+
+
+span_index = SpanIndexRegistry(ttl=config.SPAN_INDEX_TTL)
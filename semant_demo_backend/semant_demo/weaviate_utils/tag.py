@@ -20,12 +20,15 @@ from semant_demo.weaviate_exceptions import (
 
 import semant_demo.schemas as schemas
 from semant_demo.weaviate_utils.helpers import WeaviateHelpers
+from semant_demo.weaviate_utils.span_index import span_index
+from semant_demo.metrics import instrument_methods
 from semant_demo.schema.tags import PostTag, Tag as TagSchema, PatchTag
 from uuid import UUID
 
 import logging
 
 
+@instrument_methods("tag")
 class Tag():
     def __init__(self, client: WeaviateAsyncClient, collectionNames: schemas.CollectionNames):
         self.client = client
@@ -207,6 +210,7 @@ class Tag():
             raise WeaviateOperationError("Tag not found")
 
         await self.helpers.delete_tag_cascade(tag_uuid)
+        span_index.invalidate_tag(tag_uuid)
 
     def read_spans():
         pass
@@ -29,14 +29,18 @@ from weaviate.classes.query import Filter
 
 from semant_demo import schemas
 from semant_demo.config import Config
-from semant_demo.gemma_embedding import get_query_embedding, get_hyde_document_embedding
+from semant_demo.gemma_embedding import EMBEDDING_UNAVAILABLE, get_query_embedding, get_hyde_document_embedding
 from weaviate.classes.query import QueryReference
 from semant_demo.config import config
 
 import logging
 
 from semant_demo.weaviate_utils.helpers import WeaviateHelpers
+from semant_demo.metrics import instrument_methods
+from semant_demo.tracing import trace_span, traced
+from semant_demo.weaviate_utils.span_index import span_index
 
+@instrument_methods("text_chunk")
 class TextChunk():
     def __init__(self, client: WeaviateAsyncClient, collectionNames: schemas.CollectionNames):
         self.client = client
@@ -52,7 +56,22 @@ class TextChunk():
         filters = Filter()
         return await self.helpers.fetch_chunks(filters=filters)
 
-    async def search(self, search_request: schemas.SearchRequest) -> schemas.SearchResponse:
+    async def embed_query(self, search_request: schemas.SearchRequest) -> list[float] | None:
+        """
+        Embedding of the query as used by search, None for text search which needs no vector
+        """
+        if search_request.type == schemas.SearchType.text:
+            return None
+        if search_request.is_hyde == False:
+            return await get_query_embedding(search_request.query)
+        return await get_hyde_document_embedding(search_request.query)
+
+    @traced("text_chunk.search", lambda self, search_request, *args, **kwargs: {
+        "type": search_request.type.value, "limit": search_request.limit})
+    async def search(self, search_request: schemas.SearchRequest, query_vector: list[float] | None = None,
+                     embedding_error: BaseException | None = None) -> schemas.SearchResponse:
+        # query_vector: precomputed embedding of the query (e.g. from RetrievalMemo), computed here when not given
+        # embedding_error: the caller failed to embed the query, text search is used without embedding again
         # Build filters
         filters = []
         if search_request.user_collection_id:
@@ -105,71 +124,78 @@ class TextChunk():
         ]
 
         t1 = time()
-        if search_request.type == schemas.SearchType.hybrid:
-            if search_request.is_hyde == False:
-                q_vector = await get_query_embedding(search_request.query)
-            else:
-                q_vector = await get_hyde_document_embedding(search_request.query)
-
-            # Execute hybrid search
-            result = await self.chunk_collection.query.hybrid(
-                query=search_request.query,
-                alpha=search_request.hybrid_search_alpha,
-                vector=q_vector,
-                limit=search_request.limit,
-                filters=combined_filter,
-                return_references=[QueryReference(link_on="document", return_properties=document_properties_to_return),
-                    # TODO: Do not fetch tags if not needed. (xtomas36)
-                    QueryReference(
-                        link_on="automaticTag",                 # the reference property
-                        return_properties=["uuid", "tag_name"]  # properties from the referenced tags
-                    ),
-                    QueryReference(
-                        link_on="positiveTag",
-                        return_properties=["uuid", "tag_name"]
-                    ),
-                ]
-            )
-        elif search_request.type == schemas.SearchType.text:
-            # Execute text search
-            result = await self.chunk_collection.query.bm25(
-                query=search_request.query,
-                limit=search_request.limit,
-                filters=combined_filter,
-                return_references=[QueryReference(link_on="document", return_properties=document_properties_to_return),
-                         QueryReference(
-                        link_on="automaticTag",                 # the reference property
-                        return_properties=["uuid", "tag_name"]  # properties from the referenced tags
-                    ),
-                    QueryReference(
-                        link_on="positiveTag",
-                        return_properties=["uuid", "tag_name"]
-                    ),
-                ]
-            )
-        elif search_request.type == schemas.SearchType.vector:
-            if search_request.is_hyde == False:
-                q_vector = await get_query_embedding(search_request.query)
+        # None for text search
+        q_vector = query_vector
+        search_log = []
+        if q_vector is None and embedding_error is None:
+            try:
+                q_vector = await self.embed_query(search_request)
+            except EMBEDDING_UNAVAILABLE as e:
+                embedding_error = e
+        if embedding_error is not None and search_request.type != schemas.SearchType.text:
+            # degraded: text (BM25) search only while the embedding service is unavailable,
+            # the response reports the search type actually used
+            logging.warning(f"Embedding unavailable, falling back to text search: {embedding_error}")
+            search_log.append(f"Embeddings unavailable, {search_request.type.value} search replaced by text search.")
+            search_request = search_request.model_copy(update={"type": schemas.SearchType.text})
+
+        # references (document metadata, tags) are expanded by Weaviate within the query
+        with trace_span("weaviate.query"):
+            if search_request.type == schemas.SearchType.hybrid:
+                # Execute hybrid search
+                result = await self.chunk_collection.query.hybrid(
+                    query=search_request.query,
+                    alpha=search_request.hybrid_search_alpha,
+                    vector=q_vector,
+                    limit=search_request.limit,
+                    filters=combined_filter,
+                    return_references=[QueryReference(link_on="document", return_properties=document_properties_to_return),
+                        # TODO: Do not fetch tags if not needed. (xtomas36)
+                        QueryReference(
+                            link_on="automaticTag",                 # the reference property
+                            return_properties=["uuid", "tag_name"]  # properties from the referenced tags
+                        ),
+                        QueryReference(
+                            link_on="positiveTag",
+                            return_properties=["uuid", "tag_name"]
+                        ),
+                    ]
+                )
+            elif search_request.type == schemas.SearchType.text:
+                # Execute text search
+                result = await self.chunk_collection.query.bm25(
+                    query=search_request.query,
+                    limit=search_request.limit,
+                    filters=combined_filter,
+                    return_references=[QueryReference(link_on="document", return_properties=document_properties_to_return),
+                             QueryReference(
+                            link_on="automaticTag",                 # the reference property
+                            return_properties=["uuid", "tag_name"]  # properties from the referenced tags
+                        ),
+                        QueryReference(
+                            link_on="positiveTag",
+                            return_properties=["uuid", "tag_name"]
+                        ),
+                    ]
+                )
+            elif search_request.type == schemas.SearchType.vector:
+                result = await self.chunk_collection.query.near_vector(
+                    near_vector=q_vector,
+                    limit=search_request.limit,
+                    filters=combined_filter,
+                    return_references=[QueryReference(link_on="document", return_properties=document_properties_to_return),
+                        QueryReference(
+                            link_on="automaticTag",                 # the reference property
+                            return_properties=["uuid", "tag_name"]  # properties from the referenced tags
+                        ),
+                        QueryReference(
+                            link_on="positiveTag",
+                            return_properties=["uuid", "tag_name"]
+                        ),
+                    ]
+                )
             else:
-                q_vector = await get_hyde_document_embedding(search_request.query)
-
-            result = await self.chunk_collection.query.near_vector(
-                near_vector=q_vector,
-                limit=search_request.limit,
-                filters=combined_filter,
-                return_references=[QueryReference(link_on="document", return_properties=document_properties_to_return),
-                    QueryReference(
-                        link_on="automaticTag",                 # the reference property
-                        return_properties=["uuid", "tag_name"]  # properties from the referenced tags
-                    ),
-                    QueryReference(
-                        link_on="positiveTag",
-                        return_properties=["uuid", "tag_name"]
-                    ),
-                ]
-            )
-        else:
-            raise ValueError(f"Unknown search type: {search_request.type}")
+                raise ValueError(f"Unknown search type: {search_request.type}")
 
         search_time = time() - t1
 
@@ -188,45 +214,46 @@ class TextChunk():
             return [str(r.uuid) for r in ref_block.objects]
         tags_result = []
 
-        for obj in result.objects:
-            chunk_data = obj.properties
-            doc_objs = obj.references.get("document").objects
-            if not doc_objs:
-                continue
-            first_doc = doc_objs[0]
-            if "library" not in first_doc.properties or not first_doc.properties["library"]:
-                first_doc.properties["library"] = "mzk"
-
-            document_obj = schemas.Document(
-                id=first_doc.uuid,
-                **first_doc.properties,
-            )
-            chunk = schemas.TextChunkWithDocument(
-                id=obj.uuid,
-                **chunk_data,
-                document_object=document_obj,
-                document=first_doc.uuid
-            )
-            chunk.text = chunk.text.replace("-\n", "").replace("\n", " ")
-            results.append(chunk)
+        with trace_span("parse_results", objects=len(result.objects)):
+            for obj in result.objects:
+                chunk_data = obj.properties
+                doc_objs = obj.references.get("document").objects
+                if not doc_objs:
+                    continue
+                first_doc = doc_objs[0]
+                if "library" not in first_doc.properties or not first_doc.properties["library"]:
+                    first_doc.properties["library"] = "mzk"
+
+                document_obj = schemas.Document(
+                    id=first_doc.uuid,
+                    **first_doc.properties,
+                )
+                chunk = schemas.TextChunkWithDocument(
+                    id=obj.uuid,
+                    **chunk_data,
+                    document_object=document_obj,
+                    document=first_doc.uuid
+                )
+                chunk.text = chunk.text.replace("-\n", "").replace("\n", " ")
+                results.append(chunk)
 
-            # add tag info for this chunk
-            refs = obj.references or {}
+                # add tag info for this chunk
+                refs = obj.references or {}
 
-            auto_ids = ref_uuids(refs.get("automaticTag"))
-            pos_ids = ref_uuids(refs.get("positiveTag"))
+                auto_ids = ref_uuids(refs.get("automaticTag"))
+                pos_ids = ref_uuids(refs.get("positiveTag"))
 
-            requested_ids = search_request.tag_uuids
+                requested_ids = search_request.tag_uuids
 
-            auto_ids = list(set(auto_ids) & set(requested_ids))
-            pos_ids = list(set(pos_ids) & set(requested_ids))
-            tags_result.append({'chunk_id': str(chunk.id), 'positive_tags_ids': pos_ids, 'automatic_tags_ids': auto_ids})
+                auto_ids = list(set(auto_ids) & set(requested_ids))
+                pos_ids = list(set(pos_ids) & set(requested_ids))
+                tags_result.append({'chunk_id': str(chunk.id), 'positive_tags_ids': pos_ids, 'automatic_tags_ids': auto_ids})
 
         response = schemas.SearchResponse(
             results=results,
             search_request=search_request,
             time_spent=search_time,
-            search_log=[log_entry],
+            search_log=[*search_log, log_entry],
             tags_result=tags_result,
         )
         logging.info(f'Response created in {time() - t1:.2f} seconds')
@@ -247,6 +274,7 @@ class TextChunk():
                 "text_chunk": chunk_id
             }
         )
+        span_index.invalidate_chunk(chunk_id)
 
     async def untag(self, span_id: str):
         if not self.span_collection:
@@ -254,6 +282,7 @@ class TextChunk():
 
         try:
             await self.span_collection.data.delete_by_id(uuid=span_id)
+            span_index.span_deleted(span_id)
             return True
         except Exception as e:
             logging.error(f"Error deleting span with id {span_id}: {e}")
@@ -366,6 +395,9 @@ class TextChunk():
         except Exception as e:
             logging.error(f"Failed to approve tag. Error: {e}")
             return False
+        finally:
+            # spans of the chunk may have been created or retyped
+            span_index.invalidate_chunk(data.chunkID)
 
     async def disapprove_tag(self, data: schemas.ApproveTagReq) -> bool:
         """
@@ -473,6 +505,9 @@ class TextChunk():
         except Exception as e:
             logging.error(f"Failed to disapprove tag. Error: {e}")
             return False
+        finally:
+            # spans of the chunk may have been created or retyped
+            span_index.invalidate_chunk(data.chunkID)
 
     def get_tags():
         pass
@@ -32,10 +32,16 @@ from semant_demo.schema.chunks import Chunk
 from semant_demo.schema.spans import SpanType
 
 from semant_demo.weaviate_utils.helpers import WeaviateHelpers
+from semant_demo.weaviate_utils.collection_access import collection_access_cache
+from semant_demo.metrics import instrument_methods
 from semant_demo.users.models import User
 
 
+@instrument_methods("user_collection")
 class UserCollection():
+    PAGE_SIZE = 100
+    COLLECTION_PROPERTIES = ["name", "owner", "description", "color", "created_at", "updated_at"]
+
     def __init__(self, client: WeaviateAsyncClient, collectionNames: schemas.CollectionNames):
         self.client = client
         self.collectionNames = collectionNames
@@ -66,6 +72,7 @@ class UserCollection():
                 "updated_at": now
             }
         )
+        collection_access_cache.invalidate_user(user.id)
         return Collection(
             id=new_collection_uuid,
             name=collection.name,
@@ -97,35 +104,41 @@ class UserCollection():
             color=props.get("color")
         )
 
-    async def read_all(self, user: User) -> list[Collection]:
+    async def read_all(self, user: User, limit: int | None = None, offset: int = 0) -> list[Collection]:
         """
-        Retrieves all collections for given user
+        Retrieves collections of given user ordered by creation time, all of them if limit is None
         """
         try:
+            usercollection_collection = self.client.collections.get(self.collectionNames.user_collection_name)
             # filter collections by user
             filters = (
                 Filter.by_property("user_id").equal(user.id)
             )
-            results = await self.client.collections.get(self.collectionNames.user_collection_name).query.fetch_objects(
-                filters=filters
-            )
-            logging.info(f"User Id: {user.id}\nRaw results: {results}")
             collections_response = []
-            if results.objects is not None:
-                if len(results.objects) > 0:
-                    collections = results.objects
-                    # map collection data to expected response format
-                    for o in collections:
-                        props = o.properties
-                        collections_response.append(Collection(
-                            id=o.uuid,
-                            name=props.get("name"),
-                            owner=props.get("owner"),
-                            description=props.get("description"),
-                            created_at=props.get("created_at"),
-                            updated_at=props.get("updated_at"),
-                            color=props.get("color")
-                        ))
+            while True:
+                page_size = self.PAGE_SIZE if limit is None else min(self.PAGE_SIZE, limit - len(collections_response))
+                results = await usercollection_collection.query.fetch_objects(
+                    filters=filters,
+                    limit=page_size,
+                    offset=offset,
+                    sort=Sort.by_property("created_at").by_id(),
+                    return_properties=self.COLLECTION_PROPERTIES,
+                )
+                # map collection data to expected response format
+                for o in results.objects:
+                    props = o.properties
+                    collections_response.append(Collection(
+                        id=o.uuid,
+                        name=props.get("name"),
+                        owner=props.get("owner"),
+                        description=props.get("description"),
+                        created_at=props.get("created_at"),
+                        updated_at=props.get("updated_at"),
+                        color=props.get("color")
+                    ))
+                offset += len(results.objects)
+                if len(results.objects) < page_size or (limit is not None and len(collections_response) >= limit):
+                    break
 
             return collections_response
         except WeaviateConnectionError as e:
@@ -148,6 +161,38 @@ class UserCollection():
             logging.error(f"Unexpected error fetching chunks: {str(e)}")
             raise WeaviateServerError(str(e))
 
+    async def read_all_ids(self, user: User) -> set[str]:
+        """
+        Retrieves ids of all collections of given user (no properties)
+        """
+        usercollection_collection = self.client.collections.get(self.collectionNames.user_collection_name)
+        ids: set[str] = set()
+        offset = 0
+        while True:
+            results = await usercollection_collection.query.fetch_objects(
+                filters=Filter.by_property("user_id").equal(user.id),
+                limit=self.PAGE_SIZE,
+                offset=offset,
+                sort=Sort.by_id(),
+                return_properties=[],
+            )
+            ids.update(str(o.uuid) for o in results.objects)
+            if len(results.objects) < self.PAGE_SIZE:
+                return ids
+            offset += self.PAGE_SIZE
+
+    async def has_access(self, user: User, collection_id: str) -> bool:
+        """
+        Checks that the collection belongs to the user, collection ids of users are cached.
+        An id missing from the cached ids is checked once more against freshly loaded ids,
+        the collection may have been created since (e.g. through another worker).
+        """
+        ids = await collection_access_cache.get_or_load(user.id, lambda: self.read_all_ids(user))
+        if str(collection_id) in ids:
+            return True
+        ids = await collection_access_cache.reload(user.id, lambda: self.read_all_ids(user))
+        return str(collection_id) in ids
+
     async def read_collection_stats(self, collection_id: UUID) -> CollectionStats | None:
         """
         Computes aggregate statistics for one collection.
@@ -268,6 +313,11 @@ class UserCollection():
             raise WeaviateOperationError("Collection not found")
         
         await self.helpers.delete_user_collection_cascade(collection_id)
+        owner_id = collection_response.properties.get("user_id")
+        if owner_id is not None:
+            collection_access_cache.invalidate_user(owner_id)
+        else:
+            collection_access_cache.clear()
 
     async def read_all_tags(self, collection_id: UUID) -> list[Tag]:
         """
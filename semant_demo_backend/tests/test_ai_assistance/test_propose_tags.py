@@ -0,0 +1,124 @@
+import asyncio
+import json
+import unittest
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import httpx
+
+from semant_demo import schemas
+from fastapi import HTTPException
+
+from semant_demo.ai_assistance.topicer_client import topicer_cache
+from semant_demo.circuit_breaker import CircuitBreaker
+from semant_demo.routes.propose_tags_routes import _propose_tags_stream, propose_tags
+
+
+TAG_ID = uuid.uuid4()
+
+
+def make_request(texts: list[str]) -> schemas.AutoAnnotationSuggestionRequest:
+    doc_id = uuid.uuid4()
+    return schemas.AutoAnnotationSuggestionRequest(
+        chunks=[
+            schemas.TextChunk(id=uuid.uuid4(), text=text, start_page_id=uuid.uuid4(), from_page=0, to_page=0,
+                              document=doc_id, order=i)
+            for i, text in enumerate(texts)
+        ],
+        tags=[schemas.TagData(tag_uuid=TAG_ID, tag_name="person", tag_shorthand="P", tag_color="red",
+                              tag_pictogram="p", tag_definition="Person", tag_examples=[],
+                              collection_name="collection")],
+    )
+
+
+class TestProposeTags(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        topicer_cache.clear()
+        self.requests = 0
+        self.running = 0
+        self.max_running = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            self.requests += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            # later chunks finish first
+            await asyncio.sleep(0.05 / len(body["text_chunk"]["text"]))
+            self.running -= 1
+            if body["text_chunk"]["text"] == "fail":
+                return httpx.Response(500, json={"detail": "LLM down"})
+            return httpx.Response(200, json={
+                "id": body["text_chunk"]["id"],
+                "tag_span_proposals": [
+                    {"tag": body["tags"][0], "span_start": 0, "span_end": 1, "confidence": 0.9}
+                ],
+            })
+
+        @asynccontextmanager
+        async def fake_topicer_client():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://topicer") as c:
+                yield c
+
+        self.client_patch = patch("semant_demo.routes.propose_tags_routes.topicer_client", fake_topicer_client)
+        self.client_patch.start()
+        self.concurrency_patch = patch("semant_demo.routes.propose_tags_routes.config.TOPICER_PROPOSE_CONCURRENCY", 3)
+        self.concurrency_patch.start()
+        self.disk_patch = patch.object(topicer_cache, "disk_path", None)
+        self.disk_patch.start()
+        self.breaker = CircuitBreaker("topicer", min_calls=1, window=60, open_seconds=60)
+        self.breaker_patch = patch("semant_demo.routes.propose_tags_routes.topicer_breaker", self.breaker)
+        self.breaker_patch.start()
+
+    def tearDown(self):
+        self.client_patch.stop()
+        self.concurrency_patch.stop()
+        self.disk_patch.stop()
+        self.breaker_patch.stop()
+        topicer_cache.clear()
+
+    async def test_chunks_are_proposed_concurrently_in_request_order(self):
+        body = make_request(["a" * n for n in range(1, 8)])
+        response = await propose_tags(body)
+
+        self.assertEqual([str(c.id) for c in body.chunks], [s.chunkId for s in response.suggestions])
+        self.assertEqual(3, self.max_running)
+        self.assertEqual(7, self.requests)
+
+    async def test_repeated_request_is_served_from_cache(self):
+        await propose_tags(make_request(["first text", "second text"]))
+        body = make_request(["first text", "second text"])
+        response = await propose_tags(body)
+
+        self.assertEqual(2, self.requests)
+        # cached payload is bound to the chunks of the new request
+        self.assertEqual([str(c.id) for c in body.chunks], [s.chunkId for s in response.suggestions])
+
+    async def test_stream_reports_each_chunk(self):
+        body = make_request(["slow", "fail", "fast chunk text"])
+        lines = [json.loads(line) async for line in _propose_tags_stream(body)]
+
+        by_chunk = {line["chunk_id"]: line for line in lines}
+        self.assertEqual({str(c.id) for c in body.chunks}, set(by_chunk))
+        self.assertEqual(str(body.chunks[2].id), lines[0]["chunk_id"])
+        self.assertIn("status 500", by_chunk[str(body.chunks[1].id)]["error"])
+        self.assertEqual(1, len(by_chunk[str(body.chunks[0].id)]["suggestions"]))
+
+    async def test_open_circuit_fails_fast_with_503(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await propose_tags(make_request(["fail"]))
+        self.assertEqual(502, ctx.exception.status_code)
+        self.assertEqual("open", self.breaker.state)
+        requests = self.requests
+
+        with self.assertRaises(HTTPException) as ctx:
+            await propose_tags(make_request(["first text"]))
+        self.assertEqual(503, ctx.exception.status_code)
+        self.assertIn("unavailable", ctx.exception.detail)
+        self.assertEqual(requests, self.requests)
+
+        lines = [json.loads(line) async for line in _propose_tags_stream(make_request(["second text"]))]
+        self.assertIn("unavailable", lines[0]["error"])
+        self.assertEqual(requests, self.requests)
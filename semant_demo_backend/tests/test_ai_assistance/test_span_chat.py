@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from semant_demo import schemas
+from semant_demo.ai_assistance.span_chat import SpanContextCache, build_context_message
+
+
+def make_span(span_id: str = "span-1", tag_id: str = "tag-1", start: int = 0, end: int = 5) -> schemas.TagSpan:
+    return schemas.TagSpan(id=span_id, chunkId="chunk-1", tagId=tag_id, start=start, end=end)
+
+
+class TestSpanContextCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.build = patch(
+            "semant_demo.ai_assistance.span_chat.build_context_message",
+            AsyncMock(side_effect=self._build)
+        )
+        self.build_mock = self.build.start()
+        self.cache = SpanContextCache(max_size=2, ttl=60)
+
+    def tearDown(self):
+        self.build.stop()
+
+    @staticmethod
+    async def _build(searcher, *, span):
+        await asyncio.sleep(0)
+        return f"context {span.id} {span.start}-{span.end}"
+
+    async def test_context_is_built_once_per_span_version(self):
+        span = make_span()
+        first, second = await asyncio.gather(
+            self.cache.get_or_build(None, span),
+            self.cache.get_or_build(None, span),
+        )
+        third = await self.cache.get_or_build(None, make_span())
+        self.assertEqual(first, second)
+        self.assertEqual(first, third)
+        self.assertEqual(1, self.build_mock.await_count)
+
+        moved = await self.cache.get_or_build(None, make_span(start=1))
+        self.assertEqual("context span-1 1-5", moved)
+        self.assertEqual(2, self.build_mock.await_count)
+
+    async def test_invalidation(self):
+        await self.cache.get_or_build(None, make_span("span-1", tag_id="tag-1"))
+        await self.cache.get_or_build(None, make_span("span-2", tag_id="tag-2"))
+
+        self.cache.invalidate_tag("tag-1")
+        self.assertIsNone(self.cache.get(make_span("span-1", tag_id="tag-1")))
+        self.assertIsNotNone(self.cache.get(make_span("span-2", tag_id="tag-2")))
+
+        self.cache.invalidate_span("span-2")
+        self.assertIsNone(self.cache.get(make_span("span-2", tag_id="tag-2")))
+
+    async def test_least_recently_used_span_is_evicted(self):
+        for span_id in ("span-1", "span-2", "span-3"):
+            await self.cache.get_or_build(None, make_span(span_id))
+        self.assertIsNone(self.cache.get(make_span("span-1")))
+        self.assertIsNotNone(self.cache.get(make_span("span-3")))
+
+    async def test_failed_build_is_not_cached(self):
+        self.build_mock.side_effect = RuntimeError("weaviate down")
+        with self.assertRaises(RuntimeError):
+            await self.cache.get_or_build(None, make_span())
+        self.build_mock.side_effect = self._build
+        self.assertEqual("context span-1 0-5", await self.cache.get_or_build(None, make_span()))
+
+
+class TestBuildContextMessage(unittest.IsolatedAsyncioTestCase):
+
+    async def test_tag_and_chunk_are_read_concurrently(self):
+        running = 0
+        max_running = 0
+
+        async def slow(result, *_):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return result
+
+        tag = MagicMock(shorthand=None, definition="A person", examples=[])
+        tag.name = "Person"
+        searcher = MagicMock()
+        searcher.tag.read = AsyncMock(side_effect=partial(slow, tag))
+        searcher.document.read = AsyncMock(return_value=None)
+
+        with patch(
+            "semant_demo.ai_assistance.span_chat._fetch_chunk_with_doc",
+            AsyncMock(side_effect=partial(slow, ({"text": "Tomas Masaryk", "order": 0}, "doc-1")))
+        ), patch("semant_demo.ai_assistance.span_chat._fetch_chunks_in_range", AsyncMock(return_value=[])):
+            context = await build_context_message(
+                searcher,
+                span=schemas.TagSpan(id="span-1", chunkId="chunk-1", tagId="00000000-0000-0000-0000-000000000001",
+                                     start=6, end=13)
+            )
+
+        self.assertEqual(2, max_running)
+        self.assertIn("- Name: Person", context)
+        self.assertIn("Tomas <<<SPAN>>>Masaryk<<<END_SPAN>>>", context)
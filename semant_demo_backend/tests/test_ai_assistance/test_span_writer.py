@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+from semant_demo import schemas
+from semant_demo.ai_assistance.span_writer import BatchSpanWriter
+from semant_demo.schema.spans import PostSpan
+
+
+def make_span(chunk_id: str, start: int, tag_id: str = "tag-1") -> PostSpan:
+    return PostSpan(chunkId=chunk_id, tagId=tag_id, start=start, end=start + 5, type=schemas.SpanType.auto)
+
+
+async def create_many(spans: list[PostSpan]) -> list[schemas.TagSpan | None]:
+    await asyncio.sleep(0)
+    return [
+        None if span.start < 0 else schemas.TagSpan(id=str(uuid.uuid4()), **span.model_dump())
+        for span in spans
+    ]
+
+
+class TestBatchSpanWriter(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.searcher = MagicMock()
+        self.searcher.span.create_many = AsyncMock(side_effect=create_many)
+
+    async def test_concurrent_writes_share_one_batch(self):
+        async with BatchSpanWriter(self.searcher, flush_interval=0.01) as writer:
+            results = await asyncio.gather(*(
+                writer.write([make_span(f"chunk-{i}", 0), make_span(f"chunk-{i}", 10)]) for i in range(5)
+            ))
+
+        self.assertEqual(1, self.searcher.span.create_many.await_count)
+        self.assertEqual(10, len(self.searcher.span.create_many.await_args.args[0]))
+        for i, spans in enumerate(results):
+            self.assertEqual([f"chunk-{i}"] * 2, [s.chunkId for s in spans])
+
+    async def test_full_batch_is_written_immediately(self):
+        async with BatchSpanWriter(self.searcher, max_batch_size=2, flush_interval=10) as writer:
+            spans = await asyncio.wait_for(writer.write([make_span("chunk", 0), make_span("chunk", 10)]), 1)
+        self.assertEqual(2, len(spans))
+
+    async def test_existing_and_repeated_spans_are_skipped(self):
+        existing = {"chunk": [schemas.TagSpan(id="old", chunkId="chunk", tagId="tag-1", start=0, end=5)]}
+        async with BatchSpanWriter(self.searcher, existing=existing, flush_interval=0) as writer:
+            first, second = await asyncio.gather(
+                writer.write([make_span("chunk", 0), make_span("chunk", 10)]),
+                writer.write([make_span("chunk", 10), make_span("chunk", 10, tag_id="tag-2")]),
+            )
+        self.assertEqual([10], [s.start for s in first])
+        self.assertEqual(["tag-2"], [s.tagId for s in second])
+        self.assertEqual(2, writer.duplicates)
+
+    async def test_rejected_spans_are_left_out(self):
+        async with BatchSpanWriter(self.searcher, flush_interval=0) as writer:
+            spans = await writer.write([make_span("chunk", -3), make_span("chunk", 10)])
+        self.assertEqual([10], [s.start for s in spans])
+
+    async def test_failed_batch_fails_its_writers(self):
+        self.searcher.span.create_many.side_effect = RuntimeError("weaviate down")
+        async with BatchSpanWriter(self.searcher, flush_interval=0) as writer:
+            with self.assertRaises(RuntimeError):
+                await writer.write([make_span("chunk", 0)])
+            # not stored, so it is not treated as a duplicate next time
+            self.searcher.span.create_many.side_effect = create_many
+            self.assertEqual(1, len(await writer.write([make_span("chunk", 0)])))
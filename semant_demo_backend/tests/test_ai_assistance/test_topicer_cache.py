@@ -0,0 +1,149 @@
+"""
+Tests of the Topicer response cache against a local fake Topicer server.
+"""
+import asyncio
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from semant_demo.ai_assistance import topicer_client as tc
+
+
+def create_fake_topicer() -> tuple[FastAPI, dict[str, int]]:
+    app = FastAPI()
+    calls = {"propose": 0}
+
+    @app.post("/v1/tags/propose/texts")
+    async def propose(request: Request):
+        body = await request.json()
+        calls["propose"] += 1
+        await asyncio.sleep(0.05)
+        if body["text_chunk"]["text"] == "fail":
+            return JSONResponse(status_code=500, content={"detail": "LLM down"})
+        return {
+            "id": body["text_chunk"]["id"],
+            "tag_span_proposals": [
+                {"tag": tag, "span_start": 0, "span_end": 4, "confidence": 0.8, "reason": "fits"}
+                for tag in body["tags"]
+            ],
+        }
+
+    return app, calls
+
+
+class FakeTopicerServer:
+    """Fake Topicer served by uvicorn on a free local port in a background thread."""
+
+    def __init__(self):
+        self.app, self.calls = create_fake_topicer()
+        self.socket = socket.socket()
+        self.socket.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.socket.getsockname()[1]}"
+        self.server = uvicorn.Server(uvicorn.Config(self.app, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.socket]}, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("fake Topicer did not start")
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+        self.socket.close()
+
+
+TAGS = [
+    {"id": "tag-1", "name": "person", "definition": "A person", "examples": ["Masaryk"]},
+    {"id": "tag-2", "name": "place", "definition": "A place", "examples": ["Brno"]},
+]
+
+
+class TestTopicerCache(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.topicer = FakeTopicerServer()
+        cls.topicer.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.topicer.stop()
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.topicer.calls["propose"] = 0
+        self.cache = tc.TopicerResultCache(max_size=16, ttl=60, disk_path=self.tmp.name)
+        self.patches = [
+            patch.object(tc, "topicer_cache", self.cache),
+            patch.object(tc.config, "TOPICER_URL", self.topicer.url),
+            patch.object(tc.config, "TOPICER_CONFIG_NAME", "fake"),
+        ]
+        for p in self.patches:
+            p.start()
+        await tc.close_topicer_client()
+
+    async def asyncTearDown(self):
+        await tc.close_topicer_client()
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    async def propose(self, text: str, tags=TAGS, chunk_id: str = "chunk-1"):
+        async with tc.topicer_client() as client:
+            return await tc.propose_for_text_chunk(client, chunk_id=chunk_id, chunk_text=text, tags=tags)
+
+    async def test_identical_requests_are_coalesced(self):
+        results = await asyncio.gather(*(self.propose("Masaryk was born in Hodonín.") for _ in range(5)))
+        self.assertEqual(1, self.topicer.calls["propose"])
+        self.assertEqual(4, self.cache.coalesced)
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(["tag-1", "tag-2"], [p["tag"]["id"] for p in results[0]])
+
+    async def test_cache_key_ignores_chunk_id_and_tag_order(self):
+        await self.propose("Masaryk was born in Hodonín.", chunk_id="chunk-1")
+        await self.propose("Masaryk was born in Hodonín.", tags=list(reversed(TAGS)), chunk_id="chunk-2")
+        self.assertEqual(1, self.topicer.calls["propose"])
+
+        await self.propose("Masaryk was born in Hodonín.", tags=TAGS[:1])
+        self.assertEqual(2, self.topicer.calls["propose"])
+
+    def test_value_shapes_do_not_share_keys(self):
+        key = tc.topicer_cache_key("text", TAGS, "fake", tc.PROPOSALS_NAMESPACE)
+        self.assertNotEqual(key, tc.topicer_cache_key("text", TAGS, "fake", tc.PAYLOAD_NAMESPACE))
+
+    async def test_disk_tier_survives_restart(self):
+        first = await self.propose("Masaryk was born in Hodonín.")
+
+        restarted = tc.TopicerResultCache(max_size=16, ttl=60, disk_path=self.tmp.name)
+        with patch.object(tc, "topicer_cache", restarted):
+            second = await self.propose("Masaryk was born in Hodonín.")
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.topicer.calls["propose"])
+        self.assertEqual(1, restarted.disk_hits)
+
+    async def test_expired_entries_are_refetched(self):
+        self.cache.ttl = -1
+        await self.propose("Masaryk was born in Hodonín.")
+        await self.propose("Masaryk was born in Hodonín.")
+        self.assertEqual(2, self.topicer.calls["propose"])
+
+    async def test_failures_are_not_cached(self):
+        results = await asyncio.gather(self.propose("fail"), self.propose("fail"), return_exceptions=True)
+        self.assertTrue(all(isinstance(r, tc.TopicerError) for r in results))
+        self.assertEqual(1, self.topicer.calls["propose"])
+
+        with self.assertRaises(tc.TopicerError):
+            await self.propose("fail")
+        self.assertEqual(2, self.topicer.calls["propose"])
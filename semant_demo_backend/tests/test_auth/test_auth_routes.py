@@ -232,3 +232,49 @@ async def test_duplicate_username(client: AsyncClient):
         },
     )
     assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cached_user_sees_updates_and_password_change(client: AsyncClient):
+    """Repeated requests with one token are served from the user cache, updates invalidate it."""
+    from semant_demo.users.user_cache import auth_user_cache
+
+    login_response = await client.post(
+        LOGIN_URL,
+        data={"username": TEST_USERNAME, "password": TEST_PASSWORD2},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    token = login_response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    await client.get(ME_URL, headers=headers)
+    hits = auth_user_cache.hits
+    response = await client.get(ME_URL, headers=headers)
+    assert response.status_code == 200, response.text
+    assert auth_user_cache.hits == hits + 1
+
+    response = await client.patch(ME_URL, json={"name": "Cached Name"}, headers=headers)
+    assert response.status_code == 200, response.text
+    response = await client.get(ME_URL, headers=headers)
+    assert response.json()["name"] == "Cached Name"
+
+    new_password = "Chang3dPassw0rd!"
+    response = await client.patch(ME_URL, json={"password": new_password}, headers=headers)
+    assert response.status_code == 200, response.text
+    response = await client.post(
+        LOGIN_URL,
+        data={"username": TEST_USERNAME, "password": TEST_PASSWORD2},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 400
+
+
+def test_user_cache_is_disabled_with_several_workers(monkeypatch):
+    """A worker's cache is not invalidated by changes through other workers, so it is not used."""
+    from semant_demo.config import Config
+
+    monkeypatch.setenv("AUTH_USER_CACHE_TTL", "60")
+    monkeypatch.setenv("WORKERS", "1")
+    assert Config().AUTH_USER_CACHE_TTL == 60
+    monkeypatch.setenv("WORKERS", "4")
+    assert Config().AUTH_USER_CACHE_TTL == 0
@@ -0,0 +1,172 @@
+import asyncio
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from semant_demo import schemas
+from semant_demo.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from semant_demo.config import config
+from semant_demo.routes.summarizer_routes import search
+from semant_demo.schemas import SearchResponse
+from semant_demo.summarization.templated import ModelOptions, TemplatedSearchResultsSummarizer
+from semant_demo.weaviate_utils.text_chunk import TextChunk
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def http_status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://embedding/embed_query")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+class TestCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4, window=30.0, open_seconds=10.0,
+                                      slow_call_s=2.0, clock=self.clock)
+        self.failing = self.breaker.protect(AsyncMock(side_effect=httpx.ConnectError("refused")))
+        self.working = self.breaker.protect(AsyncMock(return_value="ok"))
+
+    async def fail(self, times: int):
+        for _ in range(times):
+            with self.assertRaises(httpx.ConnectError):
+                await self.failing()
+
+    async def test_opens_at_failure_rate_and_fails_fast(self):
+        await self.working()
+        await self.working()
+        await self.fail(1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        await self.fail(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.available)
+
+        with self.assertRaises(CircuitOpenError) as raised:
+            await self.working()
+        self.assertEqual(raised.exception.retry_after, 10.0)
+
+    async def test_failures_leave_the_window(self):
+        await self.fail(3)
+        self.clock.now += 31
+        await self.working()
+        await self.fail(1)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats()["calls"], 2)
+
+    async def test_half_open_probe_closes_or_reopens(self):
+        await self.fail(4)
+        self.clock.now += 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        await self.fail(1)
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.clock.now += 10
+        self.assertEqual(await self.working(), "ok")
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats()["calls"], 0)
+
+    async def test_one_probe_at_a_time(self):
+        await self.fail(4)
+        self.clock.now += 10
+        started = asyncio.Event()
+
+        async def slow_probe():
+            started.set()
+            await asyncio.sleep(0.01)
+
+        probe = asyncio.create_task(self.breaker.protect(slow_probe)())
+        await started.wait()
+        with self.assertRaises(CircuitOpenError):
+            await self.working()
+        await probe
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    async def test_slow_calls_count_as_failures(self):
+        async def slow():
+            self.clock.now += 3
+
+        for _ in range(4):
+            await self.breaker.protect(slow)()
+        self.assertEqual(self.breaker.state, OPEN)
+
+    async def test_client_errors_and_returned_errors(self):
+        client_error = self.breaker.protect(AsyncMock(side_effect=http_status_error(422)))
+        for _ in range(4):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await client_error()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        for _ in range(4):
+            with self.breaker.guard() as call:
+                call.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+
+    async def test_disabled(self):
+        breaker = CircuitBreaker("disabled", min_calls=1, enabled=False)
+        for _ in range(3):
+            with self.assertRaises(httpx.ConnectError):
+                await breaker.protect(AsyncMock(side_effect=httpx.ConnectError("refused")))()
+        self.assertTrue(breaker.available)
+
+
+class TestSummariesSkipped(unittest.IsolatedAsyncioTestCase):
+
+    async def test_no_llm_calls_while_circuit_open(self):
+        api = MagicMock(available=False)
+        api.process_single_request = AsyncMock()
+        summarizer = TemplatedSearchResultsSummarizer(
+            api=api,
+            gen_title_model_options=ModelOptions(),
+            gen_results_summary_model_options=ModelOptions(),
+            gen_query_summary_model_options=ModelOptions()
+        )
+        request = MagicMock(query="q", search_title_generate=True, search_summary_generate=True,
+                            search_results_summary_generate=True)
+        response = SearchResponse.model_construct(results=[MagicMock()], results_summary=None)
+
+        await summarizer(request, response)
+
+        api.process_single_request.assert_not_called()
+        self.assertIsNone(response.results_summary)
+
+
+class TestTextSearchFallback(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.request = schemas.SearchRequest(query="Masaryk", type=schemas.SearchType.hybrid, tag_uuids=[],
+                                             positive=False, automatic=False)
+
+    async def test_failed_embedding_of_the_route_is_not_retried(self):
+        text_chunk = TextChunk(MagicMock(), config.collectionNames)
+        text_chunk.chunk_collection.query.bm25 = AsyncMock(return_value=SimpleNamespace(objects=[]))
+        searcher = MagicMock(textChunk=text_chunk)
+        searcher.userCollection.has_access = AsyncMock(return_value=True)
+        self.request.user_collection_id = str(uuid.uuid4())
+
+        with patch.object(TextChunk, "embed_query", AsyncMock(side_effect=httpx.ConnectError("refused"))) as embed:
+            response = await search(self.request, searcher=searcher, summarizer=AsyncMock(),
+                                    current_user=SimpleNamespace(id=uuid.uuid4()))
+
+        self.assertEqual(1, embed.await_count)
+        text_chunk.chunk_collection.query.bm25.assert_awaited_once()
+        self.assertEqual(schemas.SearchType.text, response.search_request.type)
+
+    async def test_client_errors_do_not_fall_back(self):
+        text_chunk = TextChunk(MagicMock(), config.collectionNames)
+        with patch.object(TextChunk, "embed_query", AsyncMock(side_effect=http_status_error(422))):
+            with self.assertRaises(httpx.HTTPStatusError):
+                await text_chunk.search(self.request)
+
+
+if __name__ == "__main__":
+    unittest.main()
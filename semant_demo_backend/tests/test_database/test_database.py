@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import inspect, text
+
+from semant_demo.database import create_db_engine
+from semant_demo.migrations import MIGRATIONS, current_revision, migrate
+from semant_demo.schemas import TasksBase
+
+
+class TestDatabase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp.name, 'tasks.db')}",
+                                       sqlite_wal=True, busy_timeout_ms=2500)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def test_sqlite_connections_use_wal(self):
+        async with self.engine.connect() as connection:
+            self.assertEqual("wal", (await connection.execute(text("PRAGMA journal_mode"))).scalar())
+            self.assertEqual(1, (await connection.execute(text("PRAGMA synchronous"))).scalar())  # NORMAL
+            self.assertEqual(2500, (await connection.execute(text("PRAGMA busy_timeout"))).scalar())
+
+    async def test_migrations_create_the_schema_once(self):
+        self.assertIsNone(await current_revision(self.engine))
+        self.assertEqual([m.revision for m in MIGRATIONS], [m.revision for m in await migrate(self.engine)])
+        self.assertEqual([], await migrate(self.engine))
+        self.assertEqual(MIGRATIONS[-1].revision, await current_revision(self.engine))
+
+        async with self.engine.connect() as connection:
+            tables = await connection.run_sync(lambda sync: inspect(sync).get_table_names())
+        self.assertTrue({"tasks", "rag_user_feedback", "user", "schema_migrations"} <= set(tables))
+
+    async def test_databases_created_before_migrations_are_upgraded(self):
+        async with self.engine.begin() as connection:
+            await connection.run_sync(TasksBase.metadata.create_all)
+            await connection.execute(text("DROP INDEX ix_tasks_time_updated"))
+
+        await migrate(self.engine)
+        async with self.engine.connect() as connection:
+            indexes = await connection.run_sync(lambda sync: inspect(sync).get_indexes("tasks"))
+        self.assertEqual(["ix_tasks_time_updated"], [index["name"] for index in indexes])
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+
+from semant_demo.config import config
+from semant_demo.feedback_sink import BatchWriter, JsonlBatchWriter, WebhookSender, close_feedback_sinks
+from semant_demo.routes.feedback_routes import exp_router as feedback_router
+
+
+class TestBatchWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_queued_records_are_written_in_batches(self):
+        batches = []
+
+        async def write_batch(batch):
+            batches.append(batch)
+
+        writer = BatchWriter("test", write_batch, max_batch=40, max_queue=100)
+        self.assertTrue(all(writer.submit(i) for i in range(100)))
+        self.assertFalse(writer.submit(100))
+        await writer.close()
+
+        self.assertEqual([40, 40, 20], [len(batch) for batch in batches])
+        self.assertEqual((100, 1), (writer.written, writer.dropped))
+
+    async def test_jsonl_writer_appends_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "logs", "feedback.jsonl")
+            writer = JsonlBatchWriter("test_log", path, fsync_interval=0)
+            for i in range(3):
+                writer.submit({"message": f"zpráva {i}"})
+            await writer.close()
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(["zpráva 0", "zpráva 1", "zpráva 2"], [json.loads(line)["message"] for line in f])
+
+    async def test_webhook_retries_failed_deliveries(self):
+        calls = []
+
+        def handler(request: httpx.Request):
+            calls.append(json.loads(request.content))
+            return httpx.Response(503 if len(calls) in (1, 2, 4, 5, 6) else 200)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        sender = WebhookSender("test_webhook", "http://hook.test", retries=2, backoff=0, client=client)
+        sender.submit({"id": 1})
+        sender.submit({"id": 2})
+        await sender.close()
+
+        # the first record is delivered on the third attempt, the second one fails three times
+        self.assertEqual([1, 1, 1, 2, 2, 2], [call["id"] for call in calls])
+        self.assertEqual((1, 1), (sender.written, sender.failed))
+
+
+class TestFeedbackRoute(unittest.IsolatedAsyncioTestCase):
+
+    async def test_feedback_is_logged_in_background(self):
+        app = FastAPI()
+        app.include_router(feedback_router)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "feedback.jsonl")
+            with patch.object(config, "FEEDBACK_LOG_PATH", path), patch.object(config, "FEEDBACK_WEBHOOK_URL", ""):
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    response = await client.post("/api/v1/feedback", json={
+                        "type": "bug", "subject": "Search", "message": " Slow search ", "email": None})
+                await close_feedback_sinks()
+
+            self.assertEqual({"status": "success"}, response.json())
+            with open(path, encoding="utf-8") as f:
+                record = json.loads(f.readline())
+        self.assertEqual(("bug", "Slow search"), (record["feedback_type"], record["message"]))
@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from fastapi import FastAPI
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+
+from semant_demo import metrics
+from semant_demo.config import config
+from semant_demo.llm_api import APIRequest, OpenAsyncAPI
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_prometheus_text_format(self):
+        histogram = metrics.Histogram("test_duration_seconds", "Test latency", ["route"], buckets=(0.1, 1.0))
+        histogram.labels('/a"b').observe(0.05)
+        histogram.labels('/a"b').observe(0.5)
+        histogram.labels('/a"b').observe(5)
+        self.assertEqual([
+            "# HELP test_duration_seconds Test latency",
+            "# TYPE test_duration_seconds histogram",
+            'test_duration_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+            'test_duration_seconds_bucket{route="/a\\"b",le="1.0"} 2',
+            'test_duration_seconds_bucket{route="/a\\"b",le="+Inf"} 3',
+            'test_duration_seconds_sum{route="/a\\"b"} 5.55',
+            'test_duration_seconds_count{route="/a\\"b"} 3',
+        ], histogram.render().splitlines())
+
+        with self.assertRaises(ValueError):
+            histogram.labels("a", "b")
+
+    def test_cache_hit_ratio_is_read_when_scraped(self):
+        registry = metrics.MetricsRegistry()
+        cache = type("Cache", (), {"hits": 3, "misses": 1})()
+        registry.register_cache("test", cache)
+        self.assertIn('semant_cache_hit_ratio{cache="test"} 0.75', registry.render())
+
+
+class TestInstrumentation(unittest.IsolatedAsyncioTestCase):
+
+    def test_disabled_instrumentation_returns_functions_unchanged(self):
+        async def call():
+            pass
+
+        class Component:
+            async def read(self):
+                pass
+
+        read = Component.read
+        with patch.object(config, "METRICS_ENABLED", False):
+            self.assertIs(call, metrics.observe_call(metrics.EMBEDDING_CALL_DURATION, "embedding", "x")(call))
+            self.assertIs(read, metrics.instrument_methods("component")(Component).read)
+
+    async def test_methods_and_llm_calls_are_recorded(self):
+        with patch.object(config, "METRICS_ENABLED", True):
+            @metrics.instrument_methods("test_component")
+            class Component:
+                async def read(self, fail: bool = False):
+                    if fail:
+                        raise RuntimeError("weaviate down")
+                    return 1
+
+                async def _private(self):
+                    pass
+
+            class InstrumentedAPI(OpenAsyncAPI):
+                process_single_request = metrics.observe_llm_call("openai")(OpenAsyncAPI.process_single_request)
+
+        self.assertEqual(1, await Component().read())
+        with self.assertRaises(RuntimeError):
+            await Component().read(fail=True)
+        self.assertEqual(1, metrics.WEAVIATE_CALL_DURATION.labels("test_component", "read", "ok").count)
+        self.assertEqual(1, metrics.WEAVIATE_CALL_DURATION.labels("test_component", "read", "error").count)
+        self.assertEqual(0, metrics.IN_FLIGHT.labels("weaviate").value)
+        self.assertFalse(hasattr(Component._private, "__wrapped__"))
+
+        api = InstrumentedAPI(api_key="key", concurrency=1, pool_interval=1)
+        api.client = AsyncMock()
+        api.client.chat.completions.create.return_value = ChatCompletion(
+            id="chatcmpl-1", object="chat.completion", created=1677652288, model="test-model",
+            choices=[Choice(finish_reason="stop", index=0, message=ChatCompletionMessage(content="hi", role="assistant"))],
+            usage=CompletionUsage(prompt_tokens=12, completion_tokens=3, total_tokens=15),
+        )
+        request = APIRequest(custom_id="gen_title", model="test-model", messages=[{"role": "user", "content": "x"}])
+        await api.process_single_request(request)
+        self.assertEqual(1, metrics.LLM_CALL_DURATION.labels("openai", "test-model", "gen_title", "ok").count)
+        self.assertEqual(12, metrics.LLM_TOKENS.labels("test-model", "gen_title", "prompt").value)
+        self.assertEqual(3, metrics.LLM_TOKENS.labels("test-model", "gen_title", "completion").value)
+
+    async def test_middleware_labels_requests_by_route_template(self):
+        app = FastAPI()
+
+        @app.get("/api/test_metrics/{item_id}")
+        async def item(item_id: str):
+            return {"id": item_id}
+
+        app.add_middleware(metrics.MetricsMiddleware)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/api/test_metrics/1")
+            await client.get("/api/test_metrics/2")
+            await client.get("/missing")
+
+        self.assertEqual(2, metrics.HTTP_REQUEST_DURATION.labels("GET", "/api/test_metrics/{item_id}", 200).count)
+        self.assertIn('route="unmatched",status="404"', metrics.registry.render())
@@ -0,0 +1,60 @@
+import asyncio
+import time
+import unittest
+
+from semant_demo.profiler import IDLE_FRAME, ProfilerBusyError, SamplingProfiler, profile
+from semant_demo.tracing import TraceSpan, _current_span
+
+
+def busy_parse(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(i * i for i in range(1000))
+
+
+async def busy_request():
+    for _ in range(10):
+        busy_parse(0.02)
+        await asyncio.sleep(0)
+
+
+class TestSamplingProfiler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_collapsed_stacks_are_prefixed_by_their_task(self):
+        task = asyncio.create_task(busy_request(), name="request")
+        profiler = await profile(0.3, interval=0.002)
+        await task
+
+        self.assertGreater(profiler.samples, 0)
+        lines = profiler.collapsed().splitlines()
+        busy = [line for line in lines if "test_profiler:busy_parse" in line]
+        self.assertTrue(busy)
+        stack, count = busy[0].rsplit(" ", 1)
+        self.assertEqual("busy_request", stack.split(";")[0])
+        self.assertTrue(stack.split(";")[-1].startswith("tests.test_profiler.test_profiler:"))
+        self.assertGreater(int(count), 0)
+
+    async def test_idle_samples_are_dropped_unless_requested(self):
+        profiler = await profile(0.1, interval=0.002, include_idle=True)
+        self.assertIn(IDLE_FRAME, profiler.collapsed())
+        profiler = await profile(0.1, interval=0.002)
+        self.assertNotIn(IDLE_FRAME, profiler.collapsed())
+
+    @unittest.skipUnless(hasattr(asyncio.Task, "get_context"), "Task.get_context is new in Python 3.12")
+    async def test_traced_tasks_are_named_by_their_request(self):
+        token = _current_span.set(TraceSpan("GET /api/search"))
+        try:
+            task = asyncio.create_task(busy_request())
+        finally:
+            _current_span.reset(token)
+        profiler = await profile(0.2, interval=0.002)
+        await task
+        self.assertTrue(profiler.collapsed().startswith("GET /api/search;"))
+
+    async def test_one_profile_at_a_time(self):
+        with SamplingProfiler():
+            with self.assertRaises(ProfilerBusyError):
+                SamplingProfiler().start()
+        # released after the first one stopped
+        with SamplingProfiler():
+            pass
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import ToolMessage
+
+from semant_demo.config import Config
+from semant_demo.rag.agentic_rag import xmartiAgentRag
+from semant_demo.schemas import RagRequest, RagSearch, SearchResponse, TextChunkWithDocument, Document
+
+
+def make_tool_call(name: str, **arguments):
+    return SimpleNamespace(
+        id=str(uuid.uuid4()),
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments))
+    )
+
+
+def make_chunk(text: str) -> TextChunkWithDocument:
+    doc_id = uuid.uuid4()
+    return TextChunkWithDocument(
+        id=uuid.uuid5(uuid.NAMESPACE_URL, text),
+        start_page_id=doc_id,
+        from_page=0,
+        to_page=0,
+        order=0,
+        text=text,
+        document=doc_id,
+        document_object=Document(id=doc_id, library="mzk", title="doc")
+    )
+
+
+class TestAgentToolExecution(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        config = Config()
+        config.OPENAI_API_KEY = "test_key"
+        self.rag = xmartiAgentRag(config, {
+            "search_type": "hybrid",
+            "alpha": 0.5,
+            "chunk_limit": 5,
+            "agent_iterations": 5,
+            "tool_concurrency": 4,
+            "presearch_sub_queries": True,
+            "prompts": {"system_prompt_template": "Budget {remaining_iterations}"}
+        })
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+        async def search(request, query_vector=None):
+            self.concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.concurrent)
+            await asyncio.sleep(0.01)
+            self.concurrent -= 1
+            return SearchResponse(results=[make_chunk(request.query)], search_request=request, time_spent=0.0,
+                                  search_log=[], tags_result=[])
+
+        self.searcher = MagicMock()
+        self.searcher.textChunk.search = AsyncMock(side_effect=search)
+        self.embed = patch("semant_demo.rag.retrieval_memo.get_query_embedding", AsyncMock(return_value=[0.1]))
+        self.embed.start()
+        self.request = RagRequest(question="What is X and what is Y?", rag_search=RagSearch(), history=[])
+
+    def tearDown(self):
+        self.embed.stop()
+
+    async def test_all_tool_calls_of_turn_are_executed(self):
+        calls = [make_tool_call("weaviate_search", query="X"), make_tool_call("weaviate_search", query="Y")]
+        seen_messages = []
+
+        async def invoke(messages, temperature=0.6):
+            seen_messages.append(list(messages))
+            if len(seen_messages) == 1:
+                return SimpleNamespace(tool_calls=calls, content="")
+            return SimpleNamespace(tool_calls=None, content="X and Y [doc 1]")
+
+        self.rag.llm = SimpleNamespace(invoke=invoke)
+        response = await self.rag.rag_request(self.request, self.searcher)
+
+        self.assertEqual("X and Y [doc 1]", response.rag_answer)
+        self.assertEqual(2, self.max_concurrent)
+        tool_messages = [m for m in seen_messages[1] if isinstance(m, ToolMessage)]
+        self.assertEqual([c.id for c in calls], [m.tool_call_id for m in tool_messages])
+        self.assertEqual(["X", "Y"], [s.text for s in response.sources])
+        self.assertEqual(2, response.timing["tool_weaviate_search_calls"])
+        self.assertEqual(2, response.timing["agent_turns"])
+
+    async def test_decomposed_sub_queries_are_presearched(self):
+        decompose = make_tool_call("decompose_question", question=self.request.question)
+
+        async def decompose_question(question):
+            return json.dumps({"is_multi_part": True, "sub_queries": ["What is X", "What is Y"]})
+
+        turns = [SimpleNamespace(tool_calls=[decompose], content=""),
+                 SimpleNamespace(tool_calls=None, content="answer")]
+
+        async def invoke(messages, temperature=0.6):
+            return turns.pop(0)
+
+        self.rag.llm = SimpleNamespace(invoke=invoke)
+        with patch("semant_demo.rag.agentic_rag.DecomposeQuestionTool.decompose_question",
+                   new=lambda _, question: decompose_question(question)):
+            response = await self.rag.rag_request(self.request, self.searcher)
+
+        self.assertEqual(2, self.searcher.textChunk.search.await_count)
+        self.assertEqual(["What is X", "What is Y"], [s.text for s in response.sources])
+        self.assertIn("presearch_time", response.timing)
+
+    async def test_all_sub_queries_are_presearched_beyond_concurrency(self):
+        self.rag.tool_concurrency = 1
+        decompose = make_tool_call("decompose_question", question=self.request.question)
+
+        async def decompose_question(question):
+            return json.dumps({"is_multi_part": True, "sub_queries": ["What is X", "What is Y", "What is Z"]})
+
+        turns = [SimpleNamespace(tool_calls=[decompose], content=""),
+                 SimpleNamespace(tool_calls=None, content="answer")]
+
+        async def invoke(messages, temperature=0.6):
+            return turns.pop(0)
+
+        self.rag.llm = SimpleNamespace(invoke=invoke)
+        with patch("semant_demo.rag.agentic_rag.DecomposeQuestionTool.decompose_question",
+                   new=lambda _, question: decompose_question(question)):
+            response = await self.rag.rag_request(self.request, self.searcher)
+
+        self.assertEqual(3, self.searcher.textChunk.search.await_count)
+        self.assertEqual(["What is X", "What is Y", "What is Z"], [s.text for s in response.sources])
+
+    async def test_time_budget_stops_agent(self):
+        self.rag.agent_time_budget = 0.0
+
+        async def invoke(messages, temperature=0.6):
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(tool_calls=[make_tool_call("weaviate_search", query="X")], content="")
+
+        self.rag.llm = SimpleNamespace(invoke=invoke)
+        response = await self.rag.rag_request(self.request, self.searcher)
+
+        self.assertEqual(0, response.timing["agent_turns"])
+        self.assertEqual(1, response.timing["time_budget_exhausted"])
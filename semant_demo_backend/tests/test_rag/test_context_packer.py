@@ -0,0 +1,101 @@
+import unittest
+import uuid
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from semant_demo.rag.context_packer import (ContextPacker, approx_token_count, generate_with_stats,
+                                            merge_overlapping, strip_boilerplate)
+from semant_demo.schemas import Document, TextChunkWithDocument
+
+
+def make_chunk(document: uuid.UUID, order: int | None, text: str, page: int = 0) -> TextChunkWithDocument:
+    return TextChunkWithDocument(
+        id=uuid.uuid4(),
+        title="title",
+        start_page_id=uuid.uuid4(),
+        from_page=page,
+        to_page=page,
+        order=order,
+        text=text,
+        document=document,
+        document_object=Document(id=document, library="mzk", title="doc")
+    )
+
+
+class TestContextPacker(unittest.TestCase):
+
+    def setUp(self):
+        self.doc_a = uuid.uuid4()
+        self.doc_b = uuid.uuid4()
+
+    def test_strip_boilerplate(self):
+        text = "Masaryk byl zvo-\nlen prezidentem.\n  - 12 -  \nDalší text ........ konec\\n"
+        self.assertEqual("Masaryk byl zvolen prezidentem. Další text konec", strip_boilerplate(text))
+
+    def test_merge_overlapping(self):
+        first = "Tomáš Garrigue Masaryk was elected the first president"
+        second = "was elected the first president of Czechoslovakia in 1918."
+        self.assertEqual(
+            "Tomáš Garrigue Masaryk was elected the first president of Czechoslovakia in 1918.",
+            merge_overlapping(first, second)
+        )
+        self.assertEqual("first text second text", merge_overlapping("first text", "second text"))
+
+    def test_duplicates_of_same_document_are_removed(self):
+        text = "Masaryk was elected the first president of Czechoslovakia in 1918."
+        packed = ContextPacker().pack([
+            make_chunk(self.doc_a, 1, text),
+            make_chunk(self.doc_a, 5, text[:40]),
+            make_chunk(self.doc_b, 1, text),
+        ])
+        self.assertEqual(2, len(packed.passages))
+        self.assertEqual(1, packed.duplicate_chunks)
+        self.assertEqual([self.doc_a, self.doc_b], [p.document for p in packed.passages])
+
+    def test_adjacent_chunks_are_merged_in_rank_order(self):
+        chunks = [
+            make_chunk(self.doc_b, 3, "Unrelated passage about the weather in Brno."),
+            make_chunk(self.doc_a, 2, "elected the first president of Czechoslovakia in 1918.", page=2),
+            make_chunk(self.doc_a, 1, "Masaryk was elected the first president", page=1),
+        ]
+        packed = ContextPacker().pack(chunks)
+        self.assertEqual(1, packed.merged_chunks)
+        self.assertEqual(2, len(packed.passages))
+        self.assertEqual(self.doc_b, packed.passages[0].document)
+        merged = packed.passages[1]
+        self.assertEqual("Masaryk was elected the first president of Czechoslovakia in 1918.", merged.text)
+        self.assertEqual(1, merged.from_page)
+        self.assertEqual(2, merged.to_page)
+
+    def test_budget_truncates_and_drops_passages(self):
+        sentence = "Masaryk was elected president. "
+        chunks = [make_chunk(uuid.uuid4(), 0, sentence * 40) for _ in range(3)]
+        passage_tokens = approx_token_count(strip_boilerplate(sentence * 40))
+        packer = ContextPacker(token_budget=passage_tokens + 150, passage_overhead_tokens=10, min_passage_tokens=64)
+        packed = packer.pack(chunks)
+
+        self.assertEqual(2, len(packed.passages))
+        self.assertEqual(1, packed.truncated_passages)
+        self.assertEqual(1, packed.dropped_passages)
+        self.assertLessEqual(packed.tokens, packer.token_budget)
+        self.assertTrue(packed.passages[1].text.endswith("president."))
+        self.assertLess(len(packed.passages[1].text), len(packed.passages[0].text))
+
+
+class TestGenerateWithStats(unittest.IsolatedAsyncioTestCase):
+
+    async def test_returns_answer_and_stats(self):
+        prompt = ChatPromptTemplate.from_messages([("human", "Context: {context_string}\nQuestion: {question_string}")])
+        model = FakeListChatModel(responses=["Masaryk [doc1]"])
+        answer, stats = await generate_with_stats(
+            prompt=prompt,
+            model=model,
+            output_parser=StrOutputParser(),
+            inputs={"context_string": "x" * 350, "question_string": "Who?"},
+            label="test"
+        )
+        self.assertEqual("Masaryk [doc1]", answer)
+        self.assertGreaterEqual(stats["prompt_tokens"], 100)
+        self.assertLessEqual(stats["prefill_time"], stats["generation_time"])
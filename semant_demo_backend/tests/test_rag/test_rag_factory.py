@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from semant_demo.config import config
+from semant_demo.rag.rag_factory import (RAG_IMPLEMENTATIONS, RAG_INSTANCES, BaseRag, RagUnavailableError,
+                                         get_all_rag_configurations, rag_factory, register_rag_class)
+
+CONFIG = """
+id: router_test
+name: Router test
+description: Returns a fixed answer
+class_name: TestRag
+params:
+  model_type: none
+"""
+
+
+class BrokenRag(BaseRag):
+    def __init__(self, global_config, param_config):
+        raise ValueError("missing API key")
+
+
+class TestLazyRagFactory(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        register_rag_class(BrokenRag)
+        self.tmp = tempfile.TemporaryDirectory()
+        Path(self.tmp.name, "test.yaml").write_text(CONFIG)
+        Path(self.tmp.name, "broken.yaml").write_text(CONFIG.replace("TestRag", "BrokenRag").replace("router_test", "broken"))
+        Path(self.tmp.name, "unknown.yaml").write_text(CONFIG.replace("TestRag", "NoSuchRag").replace("router_test", "x"))
+        rag_factory(global_config=config, configs_path=self.tmp.name)
+
+    def tearDown(self):
+        RAG_INSTANCES.clear()
+        RAG_IMPLEMENTATIONS.pop("BrokenRag", None)
+        self.tmp.cleanup()
+
+    async def test_instance_created_on_first_use(self):
+        self.assertEqual(sorted(c.id for c in get_all_rag_configurations()), ["broken", "router_test"])
+        self.assertIn("router_test", RAG_INSTANCES)
+        self.assertNotIn("x", RAG_INSTANCES)
+        self.assertFalse(RAG_INSTANCES.is_created("router_test"))
+
+        instance = await RAG_INSTANCES.get_instance("router_test")
+        self.assertEqual(type(instance).__name__, "TestRag")
+        self.assertEqual(instance.model_type, "none")
+        self.assertIs(RAG_INSTANCES["router_test"], instance)
+
+    async def test_failed_instance_is_unavailable_and_hidden(self):
+        with self.assertRaises(RagUnavailableError):
+            await RAG_INSTANCES.get_instance("broken")
+        self.assertTrue(RAG_INSTANCES.has_failed("broken"))
+        self.assertEqual([c.id for c in get_all_rag_configurations()], ["router_test"])
+
+
+if __name__ == "__main__":
+    unittest.main()
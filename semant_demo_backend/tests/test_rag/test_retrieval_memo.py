@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from semant_demo.rag.retrieval_memo import RetrievalMemo
+from semant_demo.schemas import SearchRequest, SearchResponse, SearchType, TextChunkWithDocument, Document
+
+
+def make_chunk(chunk_id: uuid.UUID) -> TextChunkWithDocument:
+    doc_id = uuid.uuid4()
+    return TextChunkWithDocument(
+        id=chunk_id,
+        title="title",
+        start_page_id=doc_id,
+        from_page=0,
+        to_page=0,
+        order=0,
+        text="text",
+        document=doc_id,
+        document_object=Document(id=doc_id, library="mzk", title="doc")
+    )
+
+
+def make_request(query: str, limit: int = 5, alpha: float = 0.5, is_hyde: bool = False) -> SearchRequest:
+    return SearchRequest(query=query, limit=limit, type=SearchType.hybrid, hybrid_search_alpha=alpha,
+                         tag_uuids=[], positive=False, automatic=False, is_hyde=is_hyde)
+
+
+class TestRetrievalMemo(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.chunk_ids = [uuid.uuid4() for _ in range(10)]
+
+        async def search(request, query_vector=None):
+            await asyncio.sleep(0)
+            return SearchResponse(
+                results=[make_chunk(i) for i in self.chunk_ids[:request.limit]],
+                search_request=request,
+                time_spent=0.0,
+                search_log=[],
+                tags_result=[]
+            )
+
+        self.searcher = MagicMock()
+        self.searcher.textChunk.search = AsyncMock(side_effect=search)
+        self.embed = patch("semant_demo.rag.retrieval_memo.get_query_embedding", AsyncMock(return_value=[0.1, 0.2]))
+        self.embed_mock = self.embed.start()
+        self.memo = RetrievalMemo(self.searcher)
+
+    def tearDown(self):
+        self.embed.stop()
+
+    async def test_near_identical_queries_are_searched_once(self):
+        first, second = await asyncio.gather(
+            self.memo.search(make_request("Who was Masaryk?")),
+            self.memo.search(make_request("  who was   masaryk "))
+        )
+        self.assertEqual(1, self.searcher.textChunk.search.await_count)
+        self.assertEqual(1, self.embed_mock.await_count)
+        self.assertEqual([c.id for c in first.results], [c.id for c in second.results])
+        self.assertEqual(1, self.memo.searches_avoided)
+        self.assertEqual(1, self.memo.embeddings_avoided)
+
+    async def test_smaller_limit_served_from_bigger_search(self):
+        await self.memo.search(make_request("masaryk", limit=10))
+        response = await self.memo.search(make_request("masaryk", limit=3))
+        self.assertEqual(1, self.searcher.textChunk.search.await_count)
+        self.assertEqual(self.chunk_ids[:3], [c.id for c in response.results])
+        self.assertEqual(3, response.search_request.limit)
+
+    async def test_different_alpha_reuses_embedding_and_chunks(self):
+        first = await self.memo.search(make_request("masaryk", alpha=0.5))
+        second = await self.memo.search(make_request("masaryk", alpha=0.9))
+        self.assertEqual(2, self.searcher.textChunk.search.await_count)
+        self.assertEqual(1, self.embed_mock.await_count)
+        self.assertIs(first.results[0], second.results[0])
+        self.assertEqual(5, self.memo.chunks_reused)
+        self.assertDictEqual(
+            {
+                "retrieval_searches": 2,
+                "retrieval_searches_avoided": 0,
+                "retrieval_embeddings": 1,
+                "retrieval_embeddings_avoided": 1,
+                "retrieval_chunks_reused": 5,
+            },
+            {k: v for k, v in self.memo.stats().items() if k != "retrieval_search_time"}
+        )
+
+    async def test_failed_search_is_not_memoized(self):
+        search = self.searcher.textChunk.search.side_effect
+        self.searcher.textChunk.search.side_effect = RuntimeError("down")
+        with self.assertRaises(RuntimeError):
+            await self.memo.search(make_request("masaryk"))
+
+        self.searcher.textChunk.search.side_effect = search
+        response = await self.memo.search(make_request("masaryk"))
+        self.assertEqual(self.chunk_ids[:5], [c.id for c in response.results])
+        self.assertEqual(2, self.searcher.textChunk.search.await_count)
+        self.assertEqual(0, self.memo.searches_avoided)
@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+
+from semant_demo.rag.web_search import WebSearcher, StaticWebSearchProvider, keyword_key
+
+
+class SlowProvider(StaticWebSearchProvider):
+    def __init__(self, latency: float):
+        super().__init__(default=["snippet"], latency=latency)
+        self.running = 0
+        self.max_running = 0
+
+    async def search(self, query: str, max_results: int) -> list[str]:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.latency)
+            return [f"{query} result", "shared result"]
+        finally:
+            self.running -= 1
+
+
+class TestWebSearcher(unittest.IsolatedAsyncioTestCase):
+
+    def test_keyword_key(self):
+        self.assertEqual(keyword_key("Masaryk, 1918 president"), keyword_key("president masaryk 1918?"))
+
+    async def test_cached_by_keyword_set(self):
+        provider = StaticWebSearchProvider(results={"masaryk 1918": ["first president"]})
+        searcher = WebSearcher(provider)
+
+        self.assertEqual(["first president"], await searcher.search("Masaryk 1918"))
+        self.assertEqual(["first president"], await searcher.search("1918, masaryk"))
+        self.assertEqual(1, provider.calls)
+
+    async def test_expired_cache_entry_is_searched_again(self):
+        provider = StaticWebSearchProvider(default=["result"])
+        searcher = WebSearcher(provider, cache_ttl=0.0)
+
+        await searcher.search("masaryk")
+        await asyncio.sleep(0.01)
+        await searcher.search("masaryk")
+        self.assertEqual(2, provider.calls)
+
+    async def test_concurrency_is_limited(self):
+        provider = SlowProvider(latency=0.02)
+        searcher = WebSearcher(provider, max_concurrency=2)
+
+        await asyncio.gather(*(searcher.search(f"query {i}") for i in range(6)))
+        self.assertEqual(2, provider.max_running)
+
+    async def test_timeout_keeps_slot_until_provider_finishes(self):
+        provider = SlowProvider(latency=0.1)
+        searcher = WebSearcher(provider, max_concurrency=1, timeout=0.02)
+
+        self.assertEqual([], await searcher.search("slow query"))
+        # the first search still runs, so the second one cannot get the slot in time
+        self.assertEqual([], await searcher.search("another query"))
+        self.assertEqual(1, provider.max_running)
+
+        await asyncio.sleep(0.1)
+        searcher.timeout = 1.0
+        self.assertEqual(["another query result", "shared result"], await searcher.search("another query"))
+
+    async def test_search_many_merges_variants(self):
+        provider = SlowProvider(latency=0.02)
+        searcher = WebSearcher(provider, max_concurrency=4)
+
+        results = await searcher.search_many(["masaryk 1918", "Who was the first president?", "1918 Masaryk"])
+        self.assertEqual(["masaryk 1918 result", "shared result", "Who was the first president? result"], results)
+        self.assertEqual(2, provider.max_running)
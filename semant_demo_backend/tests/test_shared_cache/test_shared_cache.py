@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock
+
+from semant_demo.shared_cache import MemoryCacheBackend, SharedCache, SQLiteCacheBackend
+
+
+class TestSharedCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_sqlite_backend_is_shared_by_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            # two backends on one file stand for two workers
+            first, second = SQLiteCacheBackend(path), SQLiteCacheBackend(path)
+            embeddings = SharedCache("query_embedding", ttl=60, backend=first)
+            compute = AsyncMock(return_value=[0.5, 1.0])
+            key = embeddings.make_key("http://gemma", "Praha")
+
+            self.assertEqual([0.5, 1.0], await embeddings.get_or_compute(key, compute))
+            other_worker = SharedCache("query_embedding", ttl=60, backend=second)
+            self.assertEqual([0.5, 1.0], await other_worker.get_or_compute(key, compute))
+            compute.assert_awaited_once()
+            self.assertEqual((1, 0), (other_worker.hits, other_worker.misses))
+
+            await first.set("expired", b"1", ttl=-1)
+            self.assertIsNone(await second.get("expired"))
+            await first.close()
+            await second.close()
+
+    async def test_sqlite_backend_keeps_the_newest_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteCacheBackend(os.path.join(tmp, "cache.db"), max_entries=3)
+            backend.PRUNE_EVERY = 5
+            for i in range(5):
+                await backend.set(f"key{i}", str(i).encode(), ttl=60)
+            self.assertEqual([None, None, b"2", b"3", b"4"], [await backend.get(f"key{i}") for i in range(5)])
+            await backend.close()
+
+    async def test_disabled_cache_always_computes(self):
+        cache = SharedCache("llm_summary", ttl=0, backend=MemoryCacheBackend())
+        compute = AsyncMock(return_value="summary")
+        for _ in range(2):
+            self.assertEqual("summary", await cache.get_or_compute(cache.make_key("q"), compute))
+        self.assertEqual(2, compute.await_count)
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# cumulative import time budget of semant_demo.main in seconds, about twice the measured 3.6 s so that
+# a slow or loaded machine passes but an eagerly imported SDK does not. STARTUP_IMPORT_BUDGET_S
+# tightens it (e.g. on a known CI machine), 0 disables the check.
+IMPORT_BUDGET_S = float(os.getenv("STARTUP_IMPORT_BUDGET_S") or 7.2)
+
+# provider SDKs imported on first use of a RAG or tagging task, never on startup
+LAZY_MODULES = ["langchain_core", "langchain_openai", "langchain_ollama", "langchain_google_genai",
+                "langgraph", "ddgs", "semant_demo.rag.rag_generator", "semant_demo.rag.agentic_rag",
+                "semant_demo.rag.incremental_rag"]
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds of every module imported with ``module``."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time:      self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartupImportTime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.times = import_times("semant_demo.main")
+
+    def test_provider_sdks_are_not_imported(self):
+        imported = [module for module in LAZY_MODULES if module in self.times]
+        self.assertEqual(imported, [])
+
+    @unittest.skipIf(IMPORT_BUDGET_S <= 0, "the import time check is disabled by STARTUP_IMPORT_BUDGET_S=0")
+    def test_import_within_budget(self):
+        seconds = self.times["semant_demo.main"] / 1e6
+        self.assertLess(seconds, IMPORT_BUDGET_S,
+                        f"importing semant_demo.main took {seconds:.2f} s, the budget is {IMPORT_BUDGET_S} s")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from semant_demo import schemas
+from semant_demo.database import create_db_engine
+from semant_demo.migrations import migrate
+from semant_demo.schemas import Task
+from semant_demo.tagging.job_runner import TaggingJobRunner, queue_tagging_task, request_cancel
+
+REQUEST = schemas.TaggingTaskReqTemplate(
+    tag_name="Castle", tag_shorthand="C", tag_color="#fff", tag_pictogram="castle", tag_definition="Castles",
+    tag_examples=["Karlštejn"], collection_name="Chunks",
+    task_config=schemas.TaggingConfig(name="test", description="", class_name="OllamaProxyRunnable",
+                                      prompt_template="{tag_name}", params={"model_type": "OLLAMA", "model_name": "m"}),
+)
+
+
+class TestTaggingJobRunner(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp.name, 'tasks.db')}")
+        await migrate(self.engine)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.started = []
+        self.release = asyncio.Event()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def run_job(self, request, task_id):
+        self.started.append((request.tag_name, task_id))
+        await self.release.wait()
+
+    def runner(self) -> TaggingJobRunner:
+        return TaggingJobRunner(self.session_maker, self.run_job, os.path.join(self.tmp.name, "job.lock"),
+                                max_concurrent=1)
+
+    async def status(self, task_id: str) -> str:
+        async with self.session_maker() as session:
+            return (await session.get(Task, task_id)).status
+
+    async def test_only_the_lock_holder_runs_queued_tasks(self):
+        async with self.session_maker() as session:
+            await queue_tagging_task(session, "task-1", REQUEST)
+            await queue_tagging_task(session, "task-2", REQUEST)
+
+        job_worker, other_worker = self.runner(), self.runner()
+        self.assertTrue(job_worker.acquire_lock())
+        self.assertFalse(other_worker.acquire_lock())
+
+        await job_worker.poll()
+        await asyncio.sleep(0)
+        self.assertEqual(1, len(self.started))
+        running = self.started[0][1]
+        self.assertEqual("RUNNING", await self.status(running))
+
+        # cancelled through the database, from any worker
+        async with self.session_maker() as session:
+            self.assertTrue(await request_cancel(session, running))
+        await job_worker.poll()
+        await asyncio.gather(*job_worker.running.values(), return_exceptions=True)
+        self.assertEqual("CANCELED", await self.status(running))
+
+        job_worker.release_lock()
+        self.assertTrue(other_worker.acquire_lock())
+        await other_worker.poll()
+        await asyncio.sleep(0)
+        self.assertEqual({"task-1", "task-2"}, {task_id for _, task_id in self.started})
+        self.release.set()
+        await asyncio.gather(*other_worker.running.values())
+        other_worker.release_lock()
+
+    async def test_pending_tasks_are_cancelled_at_once(self):
+        async with self.session_maker() as session:
+            await queue_tagging_task(session, "task-1", REQUEST)
+            self.assertTrue(await request_cancel(session, "task-1"))
+            self.assertFalse(await request_cancel(session, "missing"))
+        self.assertEqual("CANCELED", await self.status("task-1"))
+        await self.runner().poll()
+        self.assertEqual([], self.started)
+
+    async def test_tasks_of_stopped_job_workers_are_requeued(self):
+        now = datetime.now(timezone.utc)
+        owners = {
+            "killed": ("other-host:1", now - timedelta(seconds=120)),
+            "alive": ("other-host:2", now),
+            "previous-lock-holder": (f"{socket.gethostname()}:1", now),
+        }
+        async with self.session_maker() as session:
+            for task_id, (worker_id, heartbeat_at) in owners.items():
+                await queue_tagging_task(session, task_id, REQUEST)
+                await session.execute(update(Task).where(Task.taskId == task_id).values(
+                    status="RUNNING", worker_id=worker_id, heartbeat_at=heartbeat_at))
+            await session.commit()
+
+        runner = TaggingJobRunner(self.session_maker, self.run_job, os.path.join(self.tmp.name, "job.lock"),
+                                  max_concurrent=4, stale_after=60)
+        self.assertTrue(runner.acquire_lock())
+        await runner.poll()
+        await asyncio.sleep(0)
+        self.assertEqual({"killed", "previous-lock-holder"}, {task_id for _, task_id in self.started})
+        self.assertEqual("RUNNING", await self.status("alive"))
+        self.release.set()
+        await asyncio.gather(*runner.running.values())
+        runner.release_lock()
+
+    async def test_shutdown_requeues_running_tasks(self):
+        async with self.session_maker() as session:
+            await queue_tagging_task(session, "task-1", REQUEST)
+        runner = self.runner()
+        run = asyncio.create_task(runner.run())
+        while not self.started:
+            await asyncio.sleep(0.01)
+        run.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+        self.assertEqual("PENDING", await self.status("task-1"))
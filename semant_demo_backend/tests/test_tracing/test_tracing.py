@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+
+from semant_demo.config import config
+from semant_demo.tracing import (
+    TIMING_HEADER,
+    SlowRequestLog,
+    TraceSpan,
+    TracingMiddleware,
+    _current_span,
+    trace_span,
+    traced,
+)
+
+with patch.object(config, "TRACING_ENABLED", True):
+    @traced("embedding.embed_query", lambda query: {"chars": len(query)})
+    async def embed(query: str):
+        await asyncio.sleep(0)
+        return [0.0]
+
+
+class TestSpans(unittest.IsolatedAsyncioTestCase):
+
+    async def test_spans_outside_a_trace_do_nothing(self):
+        with trace_span("weaviate.query") as span:
+            self.assertIsNone(span)
+        self.assertEqual([0.0], await embed("query"))
+
+    async def test_spans_of_concurrent_tasks_attach_to_their_parent(self):
+        root = TraceSpan("GET /api/search")
+        token = _current_span.set(root)
+        try:
+            with trace_span("text_chunk.search"):
+                await asyncio.gather(embed("first"), embed("second"))
+            with self.assertRaises(RuntimeError):
+                with trace_span("weaviate.query"):
+                    raise RuntimeError("down")
+        finally:
+            _current_span.reset(token)
+
+        search, query = root.children
+        self.assertEqual(["embedding.embed_query"] * 2, [c.name for c in search.children])
+        self.assertEqual({"chars": 5}, search.children[0].attributes)
+        self.assertEqual("RuntimeError", query.attributes["error"])
+        self.assertIsNone(_current_span.get())
+
+
+class TestTracingMiddleware(unittest.IsolatedAsyncioTestCase):
+
+    async def test_slow_requests_are_logged_with_span_tree_and_timing_header(self):
+        app = FastAPI()
+
+        @app.get("/api/test_search/{query}")
+        async def search(query: str):
+            with trace_span("text_chunk.search"):
+                await embed(query)
+            return {"ok": True}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "slow.jsonl")
+            app.add_middleware(TracingMiddleware, slow_request_ms=0, sink=SlowRequestLog(path), timing_header=True)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/api/test_search/hello")
+
+            self.assertTrue(response.headers[TIMING_HEADER].startswith("total;dur="))
+            self.assertIn('embedding.embed_query;dur=', response.headers[TIMING_HEADER])
+            with open(path, encoding="utf-8") as f:
+                record = json.loads(f.readline())
+
+        self.assertEqual("GET /api/test_search/hello", record["name"])
+        self.assertEqual({"status": 200, "route": "/api/test_search/{query}"}, record["attributes"])
+        embedding = record["children"][0]["children"][0]
+        self.assertEqual("embedding.embed_query", embedding["name"])
+        self.assertGreaterEqual(embedding["start_ms"], 0)
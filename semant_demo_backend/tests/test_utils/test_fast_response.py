@@ -0,0 +1,78 @@
+import json
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from semant_demo import schemas
+from semant_demo.utils.fast_response import CompressionMiddleware, FastJSONResponse, negotiate_encoding
+
+
+def make_document(i: int) -> schemas.Document:
+    return schemas.Document(id=uuid.uuid4(), library="mzk", title=f"Kniha {i}", yearIssued=1900 + i,
+                            dateIssued=datetime(1900 + i, 5, 1, tzinfo=timezone.utc), keywords=["a", "b"])
+
+
+class TestFastJSONResponse(unittest.TestCase):
+
+    def test_same_json_as_fastapi_serialisation(self):
+        spans = [schemas.TagSpan(chunkId="c", tagId="t", start=i, end=i + 5, type=schemas.SpanType.pos)
+                 for i in range(3)]
+        self.assertEqual([s.model_dump(mode="json") for s in spans], json.loads(FastJSONResponse(spans).body))
+
+        detail = schemas.DocumentDetail(document=make_document(1), chunks=[
+            schemas.DocumentDetailChunkOutline(id=uuid.uuid4(), document=uuid.uuid4(), order=1, in_user_collection=False)
+        ])
+        self.assertEqual(detail.model_dump(mode="json", exclude_none=True),
+                         json.loads(FastJSONResponse(detail, exclude_none=True).body))
+
+    def test_negotiate_encoding(self):
+        self.assertEqual("gzip", negotiate_encoding("gzip, deflate"))
+        self.assertIsNone(negotiate_encoding("gzip;q=0, identity"))
+        self.assertIsNone(negotiate_encoding(""))
+        self.assertIn(negotiate_encoding("*"), ("br", "gzip"))
+
+
+class TestCompressionMiddleware(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        app = FastAPI()
+
+        @app.get("/large")
+        async def large():
+            return FastJSONResponse({"text": "slovo " * 1000})
+
+        @app.get("/small")
+        async def small():
+            return {"ok": True}
+
+        @app.get("/stream")
+        async def stream():
+            return StreamingResponse(iter([b"x" * 2000, b"y" * 2000]), media_type="application/x-ndjson")
+
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_only_complete_large_responses_are_compressed(self):
+        response = await self.client.get("/large", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertLess(int(response.headers["content-length"]), 6000)
+        self.assertEqual("slovo " * 1000, response.json()["text"])
+
+        response = await self.client.get("/large", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", response.headers)
+
+        response = await self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual({"ok": True}, response.json())
+
+        response = await self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(4000, len(response.content))
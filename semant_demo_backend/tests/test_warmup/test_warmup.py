@@ -0,0 +1,45 @@
+import asyncio
+import unittest
+
+from semant_demo.warmup import Warmup, warm_up_templates
+
+
+class TestWarmup(unittest.IsolatedAsyncioTestCase):
+
+    async def test_ready_after_all_steps_also_failed_ones(self):
+        started = asyncio.Event()
+
+        async def ok():
+            started.set()
+
+        async def broken():
+            raise ConnectionError("refused")
+
+        async def hanging():
+            await asyncio.sleep(10)
+
+        warmup = Warmup({"ok": ok, "broken": broken, "hanging": hanging}, timeout=0.05)
+        self.assertFalse(warmup.ready)
+        self.assertEqual(warmup.report()["steps"]["ok"], {"ok": None})
+
+        await warmup.run()
+
+        self.assertTrue(warmup.ready)
+        self.assertTrue(started.is_set())
+        steps = warmup.report()["steps"]
+        self.assertTrue(steps["ok"]["ok"])
+        self.assertEqual(steps["broken"]["error"], "ConnectionError: refused")
+        self.assertIn("timed out", steps["hanging"]["error"])
+
+    async def test_no_steps(self):
+        warmup = Warmup({})
+        await warmup.run()
+        self.assertEqual(warmup.report()["status"], "ready")
+
+    async def test_summarizer_templates_render(self):
+        # the default summarizer prompts render with the warm-up data
+        await warm_up_templates()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+
+from semant_demo import schemas
+from semant_demo.routes.summarizer_routes import search
+from semant_demo.schema.collections import PostCollection
+from semant_demo.weaviate_utils import user_collection as uc
+from semant_demo.weaviate_utils.collection_access import CollectionAccessCache
+
+USER = SimpleNamespace(id=uuid.uuid4(), name="alice")
+COLLECTION_ID = str(uuid.uuid4())
+
+
+class TestCollectionAccess(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = CollectionAccessCache(ttl=60)
+        self.cache_patch = patch.object(uc, "collection_access_cache", self.cache)
+        self.cache_patch.start()
+        client = MagicMock()
+        client.collections.get.return_value.data.insert = AsyncMock(return_value=uuid.uuid4())
+        self.user_collection = uc.UserCollection(client, MagicMock())
+
+        async def read_all_ids(user):
+            await asyncio.sleep(0.01)
+            return {COLLECTION_ID}
+
+        self.user_collection.read_all_ids = AsyncMock(side_effect=read_all_ids)
+
+    def tearDown(self):
+        self.cache_patch.stop()
+
+    async def test_ids_are_loaded_once_per_user(self):
+        results = await asyncio.gather(*(self.user_collection.has_access(USER, COLLECTION_ID) for _ in range(5)))
+        self.assertEqual([True] * 5, results)
+        self.assertEqual(1, self.user_collection.read_all_ids.await_count)
+
+    async def test_unknown_id_is_reloaded_once(self):
+        self.assertTrue(await self.user_collection.has_access(USER, COLLECTION_ID))
+        self.assertFalse(await self.user_collection.has_access(USER, str(uuid.uuid4())))
+        self.assertEqual(2, self.user_collection.read_all_ids.await_count)
+
+    async def test_collection_created_elsewhere_is_found(self):
+        await self.user_collection.has_access(USER, COLLECTION_ID)
+        created = str(uuid.uuid4())
+        self.user_collection.read_all_ids.side_effect = None
+        self.user_collection.read_all_ids.return_value = {COLLECTION_ID, created}
+        self.assertTrue(await self.user_collection.has_access(USER, created))
+        self.assertTrue(await self.user_collection.has_access(USER, created))
+        self.assertEqual(2, self.user_collection.read_all_ids.await_count)
+
+    async def test_create_invalidates_the_owner(self):
+        await self.user_collection.has_access(USER, COLLECTION_ID)
+        await self.user_collection.create(PostCollection(name="new", color="red"), USER)
+        await self.user_collection.has_access(USER, COLLECTION_ID)
+        self.assertEqual(2, self.user_collection.read_all_ids.await_count)
+
+
+class TestSearchAuthorization(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.events: list[str] = []
+
+        async def step(name, result):
+            self.events.append(f"{name} start")
+            await asyncio.sleep(0.02)
+            self.events.append(f"{name} end")
+            return result
+
+        self.searcher = MagicMock()
+        self.searcher.textChunk.embed_query = lambda req: step("embed", [0.1, 0.2])
+        self.searcher.userCollection.has_access = lambda user, collection_id: step(
+            "access", collection_id == COLLECTION_ID)
+        self.searcher.textChunk.search = AsyncMock(return_value=SimpleNamespace(time_spent=0.0))
+        self.request = schemas.SearchRequest(query="Masaryk", user_collection_id=COLLECTION_ID,
+                                             tag_uuids=[], positive=False, automatic=False)
+
+    async def test_access_check_runs_concurrently_with_embedding(self):
+        await search(self.request, searcher=self.searcher, summarizer=AsyncMock(), current_user=USER)
+        self.assertEqual(["access start", "embed start"], sorted(self.events[:2]))
+        self.assertEqual([0.1, 0.2], self.searcher.textChunk.search.await_args.kwargs["query_vector"])
+
+    async def test_foreign_collection_is_forbidden(self):
+        self.request.user_collection_id = str(uuid.uuid4())
+        with self.assertRaises(HTTPException) as ctx:
+            await search(self.request, searcher=self.searcher, summarizer=AsyncMock(), current_user=USER)
+        self.assertEqual(403, ctx.exception.status_code)
+        self.searcher.textChunk.search.assert_not_awaited()
@@ -0,0 +1,161 @@
+import asyncio
+import operator
+import random
+import re
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from weaviate.collections.classes.filters import _FilterAnd, _Operator
+
+from semant_demo.config import config
+from semant_demo.weaviate_utils.document import Document
+from semant_demo.weaviate_utils.document_browse import BrowseCursor, InvalidCursorError
+
+
+class FakeDocumentCollection:
+    """In-memory Documents collection understanding the filters and sorts used by browsing."""
+
+    def __init__(self, documents: list[SimpleNamespace]):
+        self.documents = documents
+        self.fetches: list[dict] = []
+        self.counts = 0
+        self.query = SimpleNamespace(fetch_objects=self.fetch_objects)
+        self.aggregate = SimpleNamespace(over_all=self.over_all)
+
+    def _matches(self, obj, filters) -> bool:
+        if filters is None:
+            return True
+        if isinstance(filters, _FilterAnd):
+            return all(self._matches(obj, f) for f in filters.filters)
+        if filters.target == "_id" and filters.operator == _Operator.CONTAINS_ANY:
+            return str(obj.uuid) in filters.value
+        value = obj.properties.get(filters.target)
+        if filters.operator == _Operator.LIKE:
+            needle = filters.value.strip("*").lower()
+            return any(needle in v.lower() for v in ([value] if isinstance(value, str) else value or []))
+        if value is None:
+            return False
+        compare = {_Operator.GREATER_THAN_EQUAL: operator.ge, _Operator.LESS_THAN_EQUAL: operator.le}[filters.operator]
+        if isinstance(value, str):
+            # word tokenization: every token of the filter value is compared with the tokens of the property
+            tokens = re.findall(r"\w+", value.lower())
+            return all(any(compare(t, f) for t in tokens) for f in re.findall(r"\w+", filters.value.lower()))
+        return compare(value, filters.value)
+
+    async def fetch_objects(self, filters=None, limit=None, offset=None, sort=None, after=None, return_properties=None):
+        await asyncio.sleep(0)
+        self.fetches.append({"offset": offset, "after": after, "filters": filters})
+        objects = sorted((o for o in self.documents if self._matches(o, filters)), key=lambda o: str(o.uuid))
+        for spec in reversed(sort.sorts if sort else []):
+            def get(o, prop=spec.prop):
+                return str(o.uuid) if prop == "_id" else o.properties.get(prop)
+            # documents without the property come last
+            present = sorted((o for o in objects if get(o) is not None), key=get, reverse=not spec.ascending)
+            objects = present + [o for o in objects if get(o) is None]
+        if after is not None:
+            objects = [o for o in objects if str(o.uuid) > after]
+        objects = objects[offset or 0:]
+        return SimpleNamespace(objects=objects[:limit])
+
+    async def over_all(self, filters=None, total_count=True):
+        self.counts += 1
+        return SimpleNamespace(total_count=sum(self._matches(o, filters) for o in self.documents))
+
+
+def make_documents(n: int) -> list[SimpleNamespace]:
+    rng = random.Random(3)
+    documents = []
+    for i in range(n):
+        # long runs of equal years and a few documents without a year
+        year = None if i % 17 == 0 else 1900 + rng.randrange(6)
+        documents.append(SimpleNamespace(uuid=uuid.UUID(int=rng.getrandbits(128)),
+                                         properties={"title": f"Book {i}", "yearIssued": year}))
+    return documents
+
+
+class TestBrowseDocuments(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.collection = FakeDocumentCollection(make_documents(120))
+        client = MagicMock()
+        client.collections.get.return_value = self.collection
+        self.document = Document(client, config.collectionNames)
+
+    async def walk(self, **params) -> list[uuid.UUID]:
+        seen = []
+        cursor = None
+        for _ in range(120):
+            page = await self.document.browse_documents(limit=7, cursor=cursor, **params)
+            self.assertEqual(120, page.total_count)
+            seen += [item.id for item in page.items]
+            if not page.has_more:
+                return seen
+            cursor = page.next_cursor
+        self.fail("the walk does not end")
+
+    async def test_keyset_walk_returns_every_document_once(self):
+        for sort_desc in (False, True):
+            with self.subTest(sort_desc=sort_desc):
+                seen = await self.walk(sort_by="yearIssued", sort_desc=sort_desc)
+                self.assertEqual(120, len(seen))
+                self.assertEqual({d.uuid for d in self.collection.documents}, set(seen))
+
+        # offsets only skip within a run of equal years, except for the trailing documents without a year
+        without_year = sum(d.properties["yearIssued"] is None for d in self.collection.documents)
+        longest_run = max(sum(d.properties["yearIssued"] == year for d in self.collection.documents)
+                          for year in range(1900, 1906))
+        deep = [f for f in self.collection.fetches if (f["offset"] or 0) > longest_run]
+        self.assertLessEqual(len(deep), 2 * (without_year // 7 + 1))
+
+    async def test_word_tokenized_text_sort_is_paged_by_offset(self):
+        for sort_desc in (False, True):
+            with self.subTest(sort_desc=sort_desc):
+                seen = await self.walk(sort_by="title", sort_desc=sort_desc)
+                self.assertEqual(120, len(set(seen)))
+                expected = sorted(self.collection.documents, key=lambda d: (d.properties["title"], str(d.uuid)))
+                if sort_desc:
+                    expected = sorted(expected, key=lambda d: d.properties["title"], reverse=True)
+                self.assertEqual([d.uuid for d in expected], seen)
+        self.assertTrue(all(f["filters"] is None for f in self.collection.fetches))
+
+    async def test_unsorted_browse_uses_after_cursor(self):
+        seen = await self.walk()
+        self.assertEqual(sorted(d.uuid for d in self.collection.documents), seen)
+        # besides the first page only its offset prefetch (the walk continues by cursor) has no after
+        self.assertEqual([7], [f["offset"] for f in self.collection.fetches[1:] if f["after"] is None])
+
+    async def test_next_page_is_prefetched_and_count_cached(self):
+        first = await self.document.browse_documents(limit=10, sort_by="yearIssued")
+        await asyncio.sleep(0.01)
+        second = await self.document.browse_documents(limit=10, sort_by="yearIssued", cursor=first.next_cursor)
+        await asyncio.sleep(0.01)
+        fetches = len(self.collection.fetches)
+
+        third = await self.document.browse_documents(limit=10, sort_by="yearIssued", cursor=second.next_cursor)
+        await asyncio.sleep(0.01)
+        # the third page came from the prefetch, the only new fetch is the prefetch of the fourth one
+        self.assertEqual(fetches + 1, len(self.collection.fetches))
+        self.assertEqual(1, self.document.browse_prefetcher.used)
+        self.assertEqual(1, self.collection.counts)
+        self.assertFalse({i.id for i in second.items} & {i.id for i in third.items})
+
+    async def test_offset_paging_is_prefetched(self):
+        # the browse UI pages by next_offset
+        first = await self.document.browse_documents(limit=10, sort_by="title")
+        await asyncio.sleep(0.01)
+        second = await self.document.browse_documents(limit=10, sort_by="title", offset=first.next_offset)
+        await asyncio.sleep(0.01)
+        self.assertEqual(1, self.document.browse_prefetcher.used)
+        # the first page, the prefetch of the second one and the prefetch of the third one
+        self.assertEqual(3, len(self.collection.fetches))
+        self.assertEqual(20, second.next_offset)
+        self.assertFalse({i.id for i in first.items} & {i.id for i in second.items})
+
+    async def test_cursor_of_another_query_is_rejected(self):
+        page = await self.document.browse_documents(limit=10, sort_by="title")
+        with self.assertRaises(InvalidCursorError):
+            await self.document.browse_documents(limit=10, sort_by="title", sort_desc=True, cursor=page.next_cursor)
+        with self.assertRaises(InvalidCursorError):
+            BrowseCursor.decode("not a cursor", signature="")
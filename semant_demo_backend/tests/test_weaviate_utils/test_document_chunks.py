@@ -0,0 +1,137 @@
+import asyncio
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from weaviate.collections.classes.filters import _FilterAnd, _Operator
+
+from semant_demo import schemas
+from semant_demo.config import config
+from semant_demo.weaviate_utils.document import Document
+from semant_demo.weaviate_utils.document_browse import InvalidCursorError
+
+DOCUMENT_ID = str(uuid.uuid4())
+COLLECTION_ID = str(uuid.uuid4())
+
+
+class FakeChunksCollection:
+    """Chunks of one document; every third chunk belongs to the user collection."""
+
+    def __init__(self, count: int, orders: list[int | None] | None = None, nulls_first: bool = False):
+        self.nulls_first = nulls_first
+        self.chunks = [
+            SimpleNamespace(
+                uuid=uuid.uuid4(),
+                properties={"order": order, "text": f"text {order}", "title": f"Chapter {page // 10}",
+                            "start_page_id": str(uuid.uuid4()), "from_page": page, "to_page": page},
+                references={"document": [DOCUMENT_ID], "userCollection": [COLLECTION_ID] if page % 3 == 0 else []},
+            )
+            for order in (orders if orders is not None else reversed(range(count)))
+            for page in [order or 0]
+        ]
+        self.requests: list[dict] = []
+        self.query = SimpleNamespace(fetch_objects=self.fetch_objects)
+        self.aggregate = SimpleNamespace(over_all=self.over_all)
+
+    def _matches(self, obj, filters) -> bool:
+        if isinstance(filters, _FilterAnd):
+            return all(self._matches(obj, f) for f in filters.filters)
+        target = filters.target
+        if not isinstance(target, str):
+            return filters.value in obj.references[target.link_on]
+        if target == "_id":
+            return str(obj.uuid) in filters.value
+        value = obj.properties[target]
+        if value is None:
+            return False
+        return {
+            _Operator.GREATER_THAN: value > filters.value,
+            _Operator.GREATER_THAN_EQUAL: value >= filters.value,
+            _Operator.LESS_THAN_EQUAL: value <= filters.value,
+        }[filters.operator]
+
+    async def fetch_objects(self, filters=None, limit=None, sort=None, return_properties=None, offset=None, **kwargs):
+        await asyncio.sleep(0)
+        self.requests.append({"limit": limit, "return_properties": return_properties, "offset": offset, **kwargs})
+        objects = [o for o in self.chunks if self._matches(o, filters)]
+        if sort is not None:
+            def key(o):
+                order = o.properties["order"]
+                return (order is not None) == self.nulls_first, order or 0, str(o.uuid)
+            objects.sort(key=key)
+        objects = objects[offset or 0:][:limit]
+        return SimpleNamespace(objects=[
+            SimpleNamespace(uuid=o.uuid, properties={
+                k: v for k, v in o.properties.items() if return_properties is None or k in return_properties})
+            for o in objects
+        ])
+
+    async def over_all(self, filters=None, total_count=True):
+        return SimpleNamespace(total_count=sum(self._matches(o, filters) for o in self.chunks))
+
+
+class TestReadDocumentChunks(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.chunks = FakeChunksCollection(25)
+        documents = MagicMock()
+        documents.query.fetch_object_by_id = MagicMock(
+            side_effect=lambda document_id: asyncio.sleep(0, SimpleNamespace(uuid=document_id, properties={"title": "Book"})))
+        client = MagicMock()
+        client.collections.get.side_effect = lambda name: (
+            self.chunks if name == config.collectionNames.chunks_collection_name else documents)
+        self.document = Document(client, config.collectionNames)
+        self.document.CHUNK_PAGE_SIZE = 10
+
+    async def test_whole_document_is_paged_by_order(self):
+        detail = await self.document.read_document_chunks(DOCUMENT_ID, COLLECTION_ID)
+
+        self.assertEqual(list(range(25)), [c.order for c in detail.chunks])
+        self.assertEqual([c.order % 3 == 0 for c in detail.chunks], [c.in_user_collection for c in detail.chunks])
+        self.assertEqual("text 7", detail.chunks[7].text)
+        self.assertIsNone(detail.next_cursor)
+        # three chunk pages, each with one membership query
+        self.assertEqual(6, len(self.chunks.requests))
+        # offsets only skip the returned chunks sharing the order of the last one
+        self.assertTrue(all((r["offset"] or 0) <= 1 for r in self.chunks.requests))
+
+    async def test_outline_window_with_cursor(self):
+        outline = schemas.ChunkProjection.outline
+        first = await self.document.read_document_chunks(
+            DOCUMENT_ID, COLLECTION_ID, projection=outline, from_order=5, to_order=15, limit=4)
+        self.assertEqual([5, 6, 7, 8], [c.order for c in first.chunks])
+        self.assertIsInstance(first.chunks[0], schemas.DocumentDetailChunkOutline)
+        self.assertNotIn("text", self.chunks.requests[0]["return_properties"])
+
+        orders = [c.order for c in first.chunks]
+        cursor = first.next_cursor
+        while cursor:
+            page = await self.document.read_document_chunks(
+                DOCUMENT_ID, COLLECTION_ID, projection=outline, from_order=5, to_order=15, limit=4, cursor=cursor)
+            orders += [c.order for c in page.chunks]
+            cursor = page.next_cursor
+        self.assertEqual(list(range(5, 16)), orders)
+
+        with self.assertRaises(InvalidCursorError):
+            await self.document.read_document_chunks(DOCUMENT_ID, COLLECTION_ID, to_order=20, limit=4,
+                                                     cursor=first.next_cursor)
+
+    async def test_duplicate_and_missing_orders(self):
+        orders = [0, 1, 1, 1, 1, 1, 2, 3, 3, None, None, 4, 5, 5, None]
+        for nulls_first in (False, True):
+            for limit in (None, 2, 4):
+                with self.subTest(nulls_first=nulls_first, limit=limit):
+                    self.chunks = FakeChunksCollection(0, orders=orders, nulls_first=nulls_first)
+                    self.document.CHUNK_PAGE_SIZE = 3
+                    ids = []
+                    cursor = None
+                    while True:
+                        page = await self.document.read_document_chunks(
+                            DOCUMENT_ID, COLLECTION_ID, limit=limit, cursor=cursor)
+                        ids += [c.id for c in page.chunks]
+                        cursor = page.next_cursor
+                        if cursor is None:
+                            break
+                    self.assertEqual(sorted(c.uuid for c in self.chunks.chunks), sorted(ids))
+                    self.assertEqual(len(orders), len(set(ids)))
@@ -0,0 +1,125 @@
+import asyncio
+import random
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from semant_demo.config import config
+from semant_demo.weaviate_utils.document import Document
+from semant_demo.weaviate_utils.document_metadata_index import DocumentMetadataIndex, fold
+from tests.test_weaviate_utils.test_document_browse import FakeDocumentCollection
+
+
+DOCUMENTS = [
+    {"title": "Paměti z Hodonína", "author": ["Tomáš Garrigue Masaryk"], "publisher": "Orbis"},
+    {"title": "Hodonín a okolí", "author": ["Jan Novák"], "publisher": "Melantrich"},
+    {"title": "Brněnské pověsti", "author": ["Jan Nováček"], "documentType": "BOOK"},
+]
+
+
+def make_index() -> DocumentMetadataIndex:
+    index = DocumentMetadataIndex()
+    for i, properties in enumerate(DOCUMENTS):
+        index.add(f"doc-{i}", properties)
+    return index.freeze()
+
+
+class TestDocumentMetadataIndex(unittest.TestCase):
+
+    def test_fold_removes_case_and_diacritics(self):
+        self.assertEqual("prilis zlutoucky kun", fold("Příliš ŽLUŤOUČKÝ kůň"))
+
+    def test_match_by_token_prefix_without_diacritics(self):
+        index = make_index()
+        self.assertEqual({"doc-0", "doc-1"}, index.match("title", "hodonin"))
+        self.assertEqual({"doc-1", "doc-2"}, index.match("author", "jan nov"))
+        self.assertEqual({"doc-2"}, index.match("author", "NOVÁČ"))
+        self.assertEqual(set(), index.match("publisher", "odeon"))
+        self.assertIsNone(index.match("title", "**"))
+
+    def test_match_follows_like_on_words(self):
+        index = make_index()
+        # inside a word, as LIKE *odon* would
+        self.assertEqual({"doc-0", "doc-1"}, index.match("title", "odon"))
+        self.assertEqual({"doc-1", "doc-2"}, index.match("author", "ová"))
+        # every word has to match, in any order
+        self.assertEqual({"doc-1", "doc-2"}, index.match("author", "nov jan"))
+        self.assertEqual({"doc-0"}, index.match("title", "hodonina pameti"))
+        self.assertEqual(set(), index.match("title", "hodonin brno"))
+
+    def test_substring_lookup_matches_a_scan(self):
+        rng = random.Random(5)
+        words = ["".join(rng.choice("abcdeč") for _ in range(rng.randint(1, 9))) for _ in range(300)]
+        index = DocumentMetadataIndex()
+        for i in range(100):
+            index.add(f"doc-{i}", {"title": " ".join(rng.sample(words, 3))})
+        index.freeze()
+        for part in ["a", "č", "ab", "cde", "abca", "bcdab", "eeeeeee"]:
+            expected = set().union(*(ids for token, ids in index._postings["title"].items() if fold(part) in token))
+            self.assertEqual(expected, index.match("title", part) or set(), part)
+
+    def test_spellings_expand_folded_words(self):
+        self.assertEqual(["hodonín"], make_index().spellings("Hodonin"))
+
+
+class TestBrowsePlanner(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        documents = [SimpleNamespace(uuid=uuid.uuid4(), properties=dict(p)) for p in DOCUMENTS]
+        self.collection = FakeDocumentCollection(documents)
+        client = MagicMock()
+        client.collections.get.return_value = self.collection
+        self.document = Document(client, config.collectionNames)
+
+    async def test_like_until_index_is_built_then_token_index(self):
+        cold = self.document._plan_browse_filters(None, "hodonin", None, None, None)
+        self.assertEqual("like", cold.strategy)
+
+        await self.document.metadata_index.get(self.document._build_metadata_index)
+        warm = self.document._plan_browse_filters(None, "hodonin", None, None, None)
+        self.assertEqual("token_index", warm.strategy)
+
+        page = await self.document.browse_documents(title="hodonin", sort_by="title")
+        self.assertEqual(["Hodonín a okolí", "Paměti z Hodonína"], [d.title for d in page.items])
+        self.assertEqual(2, page.total_count)
+
+    async def test_no_match_skips_the_query(self):
+        await self.document.metadata_index.get(self.document._build_metadata_index)
+        fetches = len(self.collection.fetches)
+        page = await self.document.browse_documents(title="hodonin", publisher="odeon")
+        self.assertEqual([], page.items)
+        self.assertEqual(fetches, len(self.collection.fetches))
+
+    async def test_broad_filter_falls_back_to_like(self):
+        await self.document.metadata_index.get(self.document._build_metadata_index)
+        with patch.object(config, "DOCUMENT_METADATA_MAX_ID_FILTER", 1):
+            plan = self.document._plan_browse_filters(None, None, "jan", None, None)
+        self.assertEqual("like", plan.strategy)
+
+    async def rebuilt_index(self, previous):
+        """The index replacing ``previous``, waits for its build (the index is frozen in a thread)."""
+        for _ in range(200):
+            index = self.document.metadata_index.current(self.document._build_metadata_index)
+            if index is not previous:
+                return index
+            await asyncio.sleep(0.005)
+        self.fail("the index was not rebuilt")
+
+    async def test_rebuilt_when_documents_change(self):
+        first = await self.document.metadata_index.get(self.document._build_metadata_index)
+        self.collection.documents.append(SimpleNamespace(uuid=uuid.uuid4(), properties={"title": "Nové Zámky"}))
+        self.document.metadata_index.check_interval = 0
+        await asyncio.sleep(0.001)
+
+        self.document._plan_browse_filters(None, "zamky", None, None, None)
+        await self.rebuilt_index(first)
+        plan = self.document._plan_browse_filters(None, "zamky", None, None, None)
+        self.assertEqual("token_index", plan.strategy)
+        self.assertFalse(plan.empty)
+
+    async def test_invalidate_rebuilds_on_next_use(self):
+        first = await self.document.metadata_index.get(self.document._build_metadata_index)
+        self.document.metadata_index.invalidate()
+        self.assertIs(first, self.document.metadata_index.current(self.document._build_metadata_index))
+        await self.rebuilt_index(first)
@@ -0,0 +1,128 @@
+import asyncio
+import random
+import unittest
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from semant_demo import schemas
+from semant_demo.weaviate_utils import span_index as si
+
+
+def make_span(chunk_id: str, start: int, end: int, tag_id: str = "tag-1") -> schemas.TagSpan:
+    return schemas.TagSpan(id=str(uuid.uuid4()), chunkId=chunk_id, tagId=tag_id, start=start, end=end)
+
+
+# three chunks of 10 characters: [0, 10), [10, 20), [20, 30)
+COLLECTION_ID = str(uuid.uuid4())
+CHUNKS = [si.ChunkExtent(id=f"chunk-{i}", order=i, offset=10 * i, length=10) for i in range(3)]
+
+
+class TestIntervalTree(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        intervals = []
+        for i in range(300):
+            start = rng.randrange(1000)
+            intervals.append((start, start + rng.randrange(1, 80), i))
+        tree = si.IntervalTree(intervals)
+
+        for _ in range(200):
+            start = rng.randrange(1000)
+            end = start + rng.randrange(1, 100)
+            expected = {i for s, e, i in intervals if s < end and e > start}
+            self.assertEqual(expected, set(tree.overlapping(start, end)))
+
+
+class TestDocumentSpanIndex(unittest.TestCase):
+
+    def test_cross_chunk_span_touches_later_chunks(self):
+        cross = make_span("chunk-0", 8, 14)
+        local = make_span("chunk-2", 1, 3)
+        foreign = make_span("chunk-1", 0, 2, tag_id="tag-of-other-collection")
+        index = si.DocumentSpanIndex("doc", "col", CHUNKS, [cross, local, foreign], {"tag-1"})
+
+        self.assertEqual(2, len(index))
+        self.assertEqual([cross], index.touching_orders(1))
+        self.assertEqual([cross, local], index.touching_orders(0, 2))
+        self.assertEqual(
+            [si.SpanSegment("chunk-0", 0, 8, 10), si.SpanSegment("chunk-1", 1, 0, 4)],
+            index.segments(cross),
+        )
+
+    def test_updates_are_visible_to_queries(self):
+        span = make_span("chunk-0", 0, 2)
+        index = si.DocumentSpanIndex("doc", "col", CHUNKS, [span], {"tag-1"})
+        self.assertEqual([], index.touching_orders(2))
+
+        moved = span.model_copy(update={"chunkId": "chunk-2"})
+        index.add(moved)
+        self.assertEqual([moved], index.touching_orders(2))
+        self.assertEqual([], index.touching_orders(0))
+
+        index.remove(span.id)
+        self.assertEqual([], index.touching_orders(0, 2))
+
+
+class TestSpanIndexRegistry(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.registry = si.SpanIndexRegistry(max_documents=2)
+        self.spans = [make_span("chunk-0", 0, 4)]
+        self.searcher = MagicMock()
+        self.searcher.userCollection.read_all_tags = AsyncMock(return_value=[MagicMock(id="tag-1")])
+
+        async def read_batch(chunk_ids, collection_id):
+            await asyncio.sleep(0.01)
+            return {"chunk-0": list(self.spans)}
+
+        self.searcher.span.read_batch = AsyncMock(side_effect=read_batch)
+        self.extents_patch = patch.object(si, "fetch_chunk_extents", AsyncMock(return_value=CHUNKS))
+        self.extents_patch.start()
+
+    def tearDown(self):
+        self.extents_patch.stop()
+
+    async def test_concurrent_gets_share_one_build(self):
+        indexes = await asyncio.gather(*(self.registry.get(self.searcher, "doc", COLLECTION_ID) for _ in range(5)))
+        self.assertTrue(all(index is indexes[0] for index in indexes))
+        self.assertEqual(1, self.registry.builds)
+
+        await self.registry.get(self.searcher, "doc", COLLECTION_ID)
+        self.assertEqual(1, self.registry.builds)
+
+    async def test_write_hooks_keep_index_current(self):
+        index = await self.registry.get(self.searcher, "doc", COLLECTION_ID)
+        created = make_span("chunk-1", 0, 3)
+        self.registry.span_saved(created)
+        self.assertEqual([created], index.touching_orders(1))
+
+        self.registry.span_deleted(created.id)
+        self.assertEqual([], index.touching_orders(1))
+
+        # a tag the index does not know forces a rebuild
+        self.registry.span_saved(make_span("chunk-1", 0, 3, tag_id="new-tag"))
+        self.assertIsNot(index, await self.registry.get(self.searcher, "doc", COLLECTION_ID))
+        self.assertEqual(2, self.registry.builds)
+
+    async def test_build_overlapping_a_write_is_not_cached(self):
+        build = asyncio.create_task(self.registry.get(self.searcher, "doc", COLLECTION_ID))
+        await asyncio.sleep(0)
+        self.registry.invalidate_document("doc")
+        await build
+
+        await self.registry.get(self.searcher, "doc", COLLECTION_ID)
+        self.assertEqual(2, self.registry.builds)
+
+    async def test_chunk_writes_and_ttl_rebuild(self):
+        await self.registry.get(self.searcher, "doc", COLLECTION_ID)
+        # tag approval writes spans of a chunk without a span object to apply
+        self.registry.invalidate_chunk("chunk-1")
+        await self.registry.get(self.searcher, "doc", COLLECTION_ID)
+        self.assertEqual(2, self.registry.builds)
+
+        # writes of other workers are picked up once the index expires
+        self.registry.ttl = 0.01
+        await asyncio.sleep(0.02)
+        await self.registry.get(self.searcher, "doc", COLLECTION_ID)
+        self.assertEqual(3, self.registry.builds)
@@ -0,0 +1,132 @@
+"""
+Benchmarks of document metadata filtering over the full Documents collection.
+
+Compares the strategies the backend browse planner chooses from:
+  - ``like``        — ``LIKE *word*`` filter (scan of the collection)
+  - ``token_index`` — in-memory folded-token index lookup + ``contains_any`` on ids
+  - ``token_index_match`` — the in-process index lookup alone (time spent on the event loop)
+  - ``bm25``        — BM25 over title/author/publisher/documentType with field weights
+
+Query words are sampled from real document metadata, both as stored and
+folded (lower case, without diacritics). Read-only, nothing is modified.
+
+Requires the backend package (``semant_demo``) to be importable for the token index.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+import weaviate
+from weaviate.classes.query import Filter, MetadataQuery
+
+from semant_demo.weaviate_utils.document_metadata_index import (
+    METADATA_FIELDS,
+    DocumentMetadataIndex,
+    fold,
+    tokenize,
+)
+
+from . import config as cfg
+from .utils import compute_stats, get_client, log, save_results, timed_call
+
+BM25_FIELDS = ["title^3", "author^2", "publisher", "documentType"]
+
+
+async def build_index(client: weaviate.WeaviateAsyncClient) -> tuple[DocumentMetadataIndex, dict[str, dict]]:
+    """Reads metadata of all documents (keyset paged by uuid) into the token index."""
+    documents = client.collections.get(cfg.DOCUMENTS_COLLECTION)
+    index = DocumentMetadataIndex()
+    properties: dict[str, dict] = {}
+    after = None
+    while True:
+        response = await documents.query.fetch_objects(
+            limit=1000, after=after, return_properties=list(METADATA_FIELDS))
+        for obj in response.objects:
+            index.add(str(obj.uuid), obj.properties)
+            properties[str(obj.uuid)] = obj.properties
+        if len(response.objects) < 1000:
+            break
+        after = response.objects[-1].uuid
+    return index.freeze(), properties
+
+
+def sample_queries(properties: dict[str, dict], n: int) -> list[tuple[str, str]]:
+    """(field, word) pairs sampled from the metadata, half of them folded."""
+    rng = random.Random(cfg.DOCUMENT_QUERY_SEED)
+    candidates = []
+    for props in properties.values():
+        for field in METADATA_FIELDS:
+            value = props.get(field)
+            texts = [value] if isinstance(value, str) else (value or [])
+            for text in texts:
+                candidates += [(field, word) for word in text.split() if len(tokenize(word)) == 1 and len(word) >= 4]
+    rng.shuffle(candidates)
+    queries = candidates[:n]
+    return [(field, fold(word) if i % 2 else word) for i, (field, word) in enumerate(queries)]
+
+
+async def run_document_benchmarks() -> list[dict]:
+    client = await get_client()
+    try:
+        documents = client.collections.get(cfg.DOCUMENTS_COLLECTION)
+        t0 = time.perf_counter()
+        index, properties = await build_index(client)
+        build_time = time.perf_counter() - t0
+        log.info(f"Token index over {index.documents} documents built in {build_time:.2f}s")
+
+        queries = sample_queries(properties, cfg.DOCUMENT_QUERY_COUNT)
+        strategies = ["like", "token_index", "token_index_match", "bm25"]
+        latencies: dict[str, list[float]] = {strategy: [] for strategy in strategies}
+        hits: dict[str, list[int]] = {strategy: [] for strategy in strategies}
+
+        for field, word in queries:
+            response, elapsed = await timed_call(
+                documents.query.fetch_objects,
+                filters=Filter.by_property(field).like(f"*{word}*"),
+                limit=cfg.DOCUMENT_PAGE_SIZE,
+            )
+            latencies["like"].append(elapsed)
+            hits["like"].append(len(response.objects))
+
+            t0 = time.perf_counter()
+            ids = index.match(field, word) or set()
+            latencies["token_index_match"].append(time.perf_counter() - t0)
+            hits["token_index_match"].append(len(ids))
+            objects = []
+            if ids:
+                response = await documents.query.fetch_objects(
+                    filters=Filter.by_id().contains_any(sorted(ids)[:cfg.DOCUMENT_MAX_ID_FILTER]),
+                    limit=cfg.DOCUMENT_PAGE_SIZE,
+                )
+                objects = response.objects
+            latencies["token_index"].append(time.perf_counter() - t0)
+            hits["token_index"].append(len(objects))
+
+            response, elapsed = await timed_call(
+                documents.query.bm25,
+                query=" ".join([word, *index.spellings(word)]),
+                query_properties=BM25_FIELDS,
+                limit=cfg.DOCUMENT_PAGE_SIZE,
+                return_metadata=MetadataQuery(score=True),
+            )
+            latencies["bm25"].append(elapsed)
+            hits["bm25"].append(len(response.objects))
+    finally:
+        await client.close()
+
+    results = [
+        {
+            "operation": f"Document metadata filter ({strategy})",
+            "documents": index.documents,
+            "queries": len(queries),
+            "mean_hits": round(sum(hits[strategy]) / max(len(queries), 1), 2),
+            **compute_stats(samples).to_dict(),
+        }
+        for strategy, samples in latencies.items()
+    ]
+    results.append({"operation": "Token index build", "documents": index.documents,
+                    "total_time_ms": round(build_time * 1000, 3)})
+    save_results("document_search", results)
+    return results
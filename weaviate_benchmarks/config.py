@@ -13,6 +13,7 @@ WEAVIATE_GRPC_PORT = int(os.getenv("WEAVIATE_GRPC_PORT", 50051))
 # ── Collection names (database-specific) ────────────────────────────────────
 CHUNKS_COLLECTION = os.getenv("BENCH_CHUNKS_COLLECTION", "Chunks_test")
 TAG_COLLECTION = os.getenv("BENCH_TAG_COLLECTION", "Tag_test")
+DOCUMENTS_COLLECTION = os.getenv("BENCH_DOCUMENTS_COLLECTION", "Documents")
 
 # ── Benchmark identifiers (used as prefixes so cleanup is safe) ─────────────
 BENCH_PREFIX = "__bench_"  # all benchmark-created objects use this prefix
@@ -35,6 +36,13 @@ CHUNK_SAMPLE_SIZE = 50
 # Maximum batch size when reading chunks (used by batch read test)
 READ_BATCH_SIZE = 100
 
+# Document metadata search benchmark: number of sampled query words, page size
+# of each query, cap of the id filter and seed of the sampling
+DOCUMENT_QUERY_COUNT = 200
+DOCUMENT_PAGE_SIZE = 50
+DOCUMENT_MAX_ID_FILTER = 5000
+DOCUMENT_QUERY_SEED = 42
+
 # Output directories
 RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR", os.path.join(os.path.dirname(__file__), "results"))
 PLOTS_DIR = os.getenv("BENCH_PLOTS_DIR", os.path.join(os.path.dirname(__file__), "plots"))
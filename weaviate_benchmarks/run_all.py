@@ -14,6 +14,7 @@ import json
 import sys
 import time
 
+from .bench_documents import run_document_benchmarks
 from .bench_tags import run_tag_benchmarks
 from .plotting import generate_all_plots
 from .report import generate_report, compile_report
@@ -69,6 +70,7 @@ async def main():
     parser.add_argument("--report", action="store_true", help="Only regenerate LaTeX report from existing results")
     parser.add_argument("--compile-report", action="store_true", help="Also compile the LaTeX report to PDF")
     parser.add_argument("--cleanup", action="store_true", help="Only run cleanup (remove benchmark data)")
+    parser.add_argument("--documents", action="store_true", help="Only run the document metadata search benchmark")
     args = parser.parse_args()
 
     ensure_dirs()
@@ -89,6 +91,11 @@ async def main():
             compile_report(tex_path)
         return
 
+    if args.documents:
+        document_results = await run_document_benchmarks()
+        _print_summary(document_results, "DOCUMENT SEARCH RESULTS")
+        return
+
     # Pre-run cleanup to remove stale data from aborted runs
     await _safety_cleanup()
 